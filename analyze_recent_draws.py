@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import json
 from pathlib import Path
 import pandas as pd
 from collections import Counter
@@ -12,6 +11,8 @@ import numpy as np
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
+from core.storage import get_history_cache
+
 def analyze_recent_draws():
     """Analyzes the last 30 draws for statistical patterns."""
     try:
@@ -21,10 +22,10 @@ def analyze_recent_draws():
             print(f"错误: 数据文件 {data_file} 不存在。")
             return
 
-        with open(data_file, 'r', encoding='utf-8') as f:
-            history = json.load(f)['data']
+        # 通过历史缓存读取，包含追加日志中尚未合并的最新开奖
+        history = get_history_cache().get_records(data_file)
         
-        df = pd.DataFrame(history)
+        df = pd.DataFrame(list(history))
         df['draw_date'] = pd.to_datetime(df['draw_date'])
         df = df.sort_values('draw_date', ascending=False).reset_index(drop=True)
 
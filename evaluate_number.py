@@ -5,17 +5,16 @@
 根据历史数据从统计角度评价指定号码
 """
 
-import json
 import sys
 from collections import Counter
 from typing import Dict, List, Tuple
 import numpy as np
 
+from src.core.storage import get_history_cache
+
 def load_history_data(file_path: str) -> List[Dict]:
-    """加载历史数据"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['data']
+    """加载历史数据（含追加日志中尚未合并的最新开奖）"""
+    return get_history_cache().get_records(file_path)
 
 def analyze_frequency(history_data: List[Dict], periods: int = 100) -> Dict:
     """分析号码频率"""
@@ -3,6 +3,7 @@ import sys
 import os
 import random
 from collections import Counter
+import numpy as np
 import pandas as pd
 
 # Add src to path
@@ -10,6 +11,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'
 
 from src.core.generators.smart_generator import SmartNumberGenerator
 from src.core.data_manager import LotteryDataManager
+from src.core.storage import OverlapIndex, get_combination_table
 
 def get_all_ssq_history(data_manager):
     """Get all historical SSQ draw numbers."""
@@ -22,52 +24,32 @@ def get_all_ssq_history(data_manager):
     # history['red_numbers'] typically contains lists of ints or strings
     return history['red_numbers'].tolist()
 
-def check_overlap_all_history(red, history_list):
+def build_history_index(history_list):
+    """Build a bitmask index over the historical red numbers (lists or comma-separated strings)."""
+    index = OverlapIndex('red_numbers', extra_field=None)
+    index.extend({'red_numbers': hist_red} for hist_red in reversed(history_list))
+    return index
+
+def check_overlap_all_history(red, history_index):
     """
     Check if the candidate 'red' has > 3 overlap with ANY historical draw.
     Returns True if valid (max overlap <= 3), False otherwise.
     """
-    if not history_list:
+    if not len(history_index):
         return True
-    
-    candidate_set = set(red)
-    
-    for hist_red in history_list:
-        # hist_red might be a list or string, handle both
-        if isinstance(hist_red, str):
-            h_set = set(int(x) for x in hist_red.split(','))
-        else:
-            h_set = set(hist_red)
-            
-        overlap = len(candidate_set & h_set)
-        if overlap > 3:
-            return False # Failed: found a historical draw with > 3 matches
-            
-    return True # Passed: no historical draw has > 3 matches
-
-def check_odd_even(red):
-    # Odd: 1, 3, ... Even: 2, 4, ...
-    odds = sum(1 for x in red if x % 2 != 0)
-    evens = 6 - odds
-    ratio = (odds, evens)
-    return ratio in [(3, 3), (4, 2), (2, 4)]
 
-def check_big_small(red):
-    # SSQ Red: 1-33.
-    # Usually: Small 1-16, Big 17-33.
-    small = sum(1 for x in red if 1 <= x <= 16)
-    big = sum(1 for x in red if 17 <= x <= 33)
-    ratio = (big, small) # Requirement says "Big/Small ratio"
-    # User said: "Big/Small ratio can be 3:3, 2:4, 4:2"
-    # Order usually implies Big:Small.
-    return ratio in [(3, 3), (2, 4), (4, 2)]
+    # One popcount per draw over the bitmask index instead of building sets
+    return int(history_index.overlap_counts(red).max()) <= 3
 
-def check_zones(red):
-    # Zone 1: 1-11, Zone 2: 12-22, Zone 3: 23-33
-    z1 = sum(1 for x in red if 1 <= x <= 11)
-    z2 = sum(1 for x in red if 12 <= x <= 22)
-    z3 = sum(1 for x in red if 23 <= x <= 33)
-    return (z1 == 2 and z2 == 2 and z3 == 2)
+def build_pattern_mask(table):
+    """
+    Mask over all C(33,6) red combinations (indexed by colex rank) that pass the pattern checks:
+    - Odd/Even ratio 3:3, 4:2 or 2:4
+    - Big/Small ratio 3:3, 2:4 or 4:2 (Small 1-16, Big 17-33)
+    - Zone distribution 2-2-2 (Zone 1: 1-11, Zone 2: 12-22, Zone 3: 23-33)
+    """
+    return (table.mask(odd=(2, 4), zone1=2, zone2=2, zone3=2)
+            & np.isin(table.count_in(17, 33), (2, 3, 4)))
 
 def main():
     print("Initializing Generator...")
@@ -79,7 +61,11 @@ def main():
     # Get all history for overlap check
     data_manager = LotteryDataManager()
     history_list = get_all_ssq_history(data_manager)
+    history_index = build_history_index(history_list)
     print(f"Loaded {len(history_list)} historical draws.")
+
+    table = get_combination_table('ssq')
+    allowed = build_pattern_mask(table)
     
     target_count = 1
     generated_count = 0
@@ -115,18 +101,12 @@ def main():
         red = candidate.red
         blue = candidate.blue
         
-        # Check constraints
-        if not check_odd_even(red):
-            continue
-            
-        if not check_big_small(red):
-            continue
-            
-        if not check_zones(red):
+        # Check pattern constraints (one lookup in the precomputed mask)
+        if not allowed[table.rank(red)]:
             continue
             
         # Check history overlap LAST (most expensive check)
-        if not check_overlap_all_history(red, history_list):
+        if not check_overlap_all_history(red, history_index):
             continue
             
         # Found one!
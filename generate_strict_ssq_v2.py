@@ -8,35 +8,14 @@ sys.path.append(os.getcwd())
 
 from src.core.generators.smart_generator import SmartNumberGenerator
 from src.core.data_manager import LotteryDataManager
-from src.core.generators.anti_popular.sequence_analyzer import SequenceAnalyzer
+from src.core.storage import OverlapIndex, get_combination_table
 
-def check_conditions(red_balls):
-    # 1. Odd/Even Ratio 3:3
-    odd_count = sum(1 for n in red_balls if n % 2 != 0)
-    if odd_count != 3:
-        return False, f"Odd/Even Ratio is {odd_count}:{6-odd_count}"
+def build_condition_mask(table):
+    """Mask over all C(33,6) red combinations that satisfy every pattern condition."""
+    return (table.mask(odd=3, zone1=2, zone2=2, zone3=2)  # Odd/Even 3:3, Zones 2-2-2 (1-11, 12-22, 23-33)
+            & (table.count_in(17, 33) == 3)                # Big/Small 3:3 (Small: 1-16, Big: 17-33)
+            & (table['max_run'] >= 2))                     # At least one pair of consecutive numbers
 
-    # 2. Big/Small Ratio 3:3 (Small: 1-16, Big: 17-33)
-    big_count = sum(1 for n in red_balls if n >= 17)
-    if big_count != 3:
-        return False, f"Big/Small Ratio is {big_count}:{6-big_count}"
-
-    # 3. Zone Distribution 2-2-2
-    # Zone 1: 1-11, Zone 2: 12-22, Zone 3: 23-33
-    z1 = sum(1 for n in red_balls if 1 <= n <= 11)
-    z2 = sum(1 for n in red_balls if 12 <= n <= 22)
-    z3 = sum(1 for n in red_balls if 23 <= n <= 33)
-    if not (z1 == 2 and z2 == 2 and z3 == 2):
-        return False, f"Zone Dist is {z1}-{z2}-{z3}"
-
-    # 4. Consecutive Numbers (At least one pair)
-    # Using SequenceAnalyzer.max_consecutive_run
-    # 1 means no consecutive (1, 3, 5). 2 means (1, 2).
-    run = SequenceAnalyzer.max_consecutive_run(red_balls)
-    if run < 2:
-        return False, "No consecutive numbers"
-
-    return True, "OK"
 
 def main():
     print("Initializing Generator with Strict Anti-Popular Rules + Custom Filters...")
@@ -75,17 +54,24 @@ def main():
                 pass
     history_reds = valid_history
     print(f"Loaded {len(history_reds)} valid historical records.")
+    history_index = OverlapIndex('red_numbers', extra_field=None)
+    history_index.extend({'red_numbers': past_red} for past_red in history_reds)
 
     # 2. Initialize Generator
     generator = SmartNumberGenerator('ssq')
-    # Use strict mode as base
-    generator.set_anti_popular_config(enabled=True, mode='strict')
+    # Use strict mode as base; strict forbids consecutive numbers, which the pattern conditions require
+    generator.set_anti_popular_config(enabled=True, mode='strict', max_run=2)
     
     max_history_overlap = 3
     found = False
     attempts = 0
     max_attempts = 10000 
     
+    # Pattern conditions as one mask over all red combinations
+    table = get_combination_table('ssq')
+    allowed = build_condition_mask(table)
+    print(f"{int(allowed.sum())} of {len(table)} red combinations satisfy the pattern conditions.")
+
     start_time = time.time()
     
     while not found and attempts < max_attempts:
@@ -107,25 +93,13 @@ def main():
         red = candidate.red
         blue = candidate.blue
         
-        # 1. Custom Pattern Checks
-        ok, reason = check_conditions(red)
-        if not ok:
-            # print(f"DEBUG: {red} failed: {reason}")
+        # 1. Custom Pattern Checks (mask lookup by colex rank)
+        if not allowed[table.rank(red)]:
             continue
             
-        # 2. History Overlap Check
-        max_overlap_found = 0
-        overlap_fail = False
-        for past_red in history_reds:
-            overlap = SequenceAnalyzer.overlap_count(red, past_red)
-            if overlap > max_overlap_found:
-                max_overlap_found = overlap
-            
-            if max_overlap_found > max_history_overlap:
-                overlap_fail = True
-                break
-        
-        if overlap_fail:
+        # 2. History Overlap Check (bitmask popcount against every past draw)
+        max_overlap_found = int(history_index.overlap_counts(red).max())
+        if max_overlap_found > max_history_overlap:
             continue
             
         # If we reached here, ALL conditions met
@@ -138,7 +112,7 @@ def main():
         print(f"Odd/Even: 3:3")
         print(f"Big/Small: 3:3")
         print(f"Zones: 2-2-2")
-        print(f"Consecutive Run: {SequenceAnalyzer.max_consecutive_run(red)}")
+        print(f"Consecutive Run: {table.row(red)['max_run']}")
         print(f"Max History Overlap: {max_overlap_found}")
         print("-" * 30)
 
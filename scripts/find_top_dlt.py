@@ -5,20 +5,25 @@
 说明：
 - 评分体系使用现有 DLTNumberEvaluator，一致性完全对齐
 - 后区已纳入总分计算
-- 为保证可运行性，使用启发式剪枝：先选取高质量前区池，再组合并筛选模式
-- 若分数并列，将全部列出
+- 默认使用启发式剪枝：先选取高质量前区池，再组合并筛选模式
+- --exhaustive 时不剪枝，搜索全部 C(35,5)×C(12,2) 注号码
+- 搜索由分片搜索引擎执行：--workers 多进程并行，--checkpoint-dir 保存分片检查点以便中断后继续
+- --branch-bound 时改用分支定界搜索：按得分上界剪枝，结果与全量评分一致，只评分少量号码
+- 若分数并列，将全部列出（同分按号码顺序）
 
 用法：
     python scripts/find_top_dlt.py --top 5 --periods 100 --pool-size 20 --out docs/TOP_DLT_NUMBERS.md
+    python scripts/find_top_dlt.py --top 5 --exhaustive --workers 8 --checkpoint-dir data/cache/top_dlt
+    python scripts/find_top_dlt.py --top 5 --exhaustive --branch-bound
 """
 
 import argparse
-import itertools
 import os
 import sys
 import time
 from collections import Counter
-from typing import List, Tuple, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any
 
 import numpy as np
 
@@ -29,63 +34,26 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.core.evaluators.dlt_evaluator import DLTNumberEvaluator
+from src.core.evaluators.branch_bound import branch_bound_top_k
+from src.core.evaluators.sharded_search import SearchSpace, console_progress, search_top_k
+from src.core.storage import get_combination_table
 
 
-def calc_ac_value(nums: List[int]) -> int:
-    """计算AC值（号码复杂度）"""
-    s = sorted(nums)
-    diffs = set()
-    n = len(s)
-    for i in range(n):
-        for j in range(i + 1, n):
-            diffs.add(s[j] - s[i])
-    return len(diffs) - (n - 1)
+@lru_cache(maxsize=None)
+def pattern_mask() -> np.ndarray:
+    """全部前区组合的模式过滤掩码（按组合序编号）"""
+    table = get_combination_table('dlt')
+    # 奇偶 2..3，大小 2..3 (大: >=18)，至少覆盖2个区（1-12,13-24,25-35），跨度 10..34，和值 70..130，AC 值 >= 3
+    return table.mask(odd=(2, 3), big=(2, 3), zones=(2, 3), span=(10, 34), sum=(70, 130)) & (table['ac'] >= 3)
 
 
-def passes_pattern_filters(front: Tuple[int, ...]) -> bool:
-    """前区模式过滤器"""
-    # 奇偶 2..3
-    odd = sum(1 for n in front if n % 2)
-    if not (2 <= odd <= 3):
-        return False
-    
-    # 大小 2..3 (大: >=18)
-    big = sum(1 for n in front if n >= 18)
-    if not (2 <= big <= 3):
-        return False
-    
-    # 区间至少覆盖2个区（1-12,13-24,25-35）
-    z1 = sum(1 for n in front if 1 <= n <= 12)
-    z2 = sum(1 for n in front if 13 <= n <= 24)
-    z3 = sum(1 for n in front if 25 <= n <= 35)
-    if (z1 > 0) + (z2 > 0) + (z3 > 0) < 2:
-        return False
-    
-    # 跨度 10..34
-    span = max(front) - min(front)
-    if not (10 <= span <= 34):
-        return False
-    
-    # 和值 70..130
-    s = sum(front)
-    if not (70 <= s <= 130):
-        return False
-    
-    # AC 值 >= 3
-    if calc_ac_value(list(front)) < 3:
-        return False
-    
-    return True
+def pattern_filter(front: np.ndarray) -> np.ndarray:
+    """前区模式过滤（每行一组升序前区号码），返回通过过滤的掩码"""
+    return get_combination_table('dlt').contains(pattern_mask(), front)
 
 
-def build_history_exact_set(history_data: List[Dict[str, Any]]) -> set:
-    """构建历史完全匹配集合（前区+后区）"""
-    exact = set()
-    for draw in history_data:
-        f = tuple(sorted(draw['front_numbers']))
-        b = tuple(sorted(draw['back_numbers']))
-        exact.add((f, b))
-    return exact
+# 检查点签名使用组合表掩码识别过滤条件
+pattern_filter.pattern_mask = pattern_mask
 
 
 def build_front_pool(history_data: List[Dict[str, Any]], periods: int, pool_size: int) -> List[int]:
@@ -120,39 +88,9 @@ def build_front_pool(history_data: List[Dict[str, Any]], periods: int, pool_size
     return pool
 
 
-def build_back_pool(history_data: List[Dict[str, Any]], periods: int) -> List[int]:
-    """构建后区号码池（返回所有12个号码，按评分排序）"""
-    recent = history_data[:periods]
-    back_counter = Counter()
-    for d in recent:
-        back_counter.update(d['back_numbers'])
-    back_theory = periods * 2 / 12 if periods else 0
-
-    # 计算遗漏期数
-    back_missing = {i: 0 for i in range(1, 13)}
-    for num in range(1, 13):
-        for i, draw in enumerate(history_data):
-            if num in draw['back_numbers']:
-                back_missing[num] = i
-                break
-    avg_miss = float(np.mean(list(back_missing.values()))) if back_missing else 1.0
-
-    # 单号评分
-    scores = []
-    for n in range(1, 13):
-        freq = back_counter.get(n, 0)
-        freq_score = (freq / back_theory) if back_theory > 0 else 0
-        miss = back_missing.get(n, 0)
-        inv_missing = max(0.0, 1.0 - (miss / (avg_miss * 1.5 if avg_miss > 0 else 1.0)))
-        score = 0.6 * freq_score + 0.4 * inv_missing
-        scores.append((score, n))
-
-    scores.sort(reverse=True)
-    pool = [n for _, n in scores]
-    return pool
-
-
-def find_top_dlt(top_k: int = 5, periods: int = 100, pool_size: int = 20, out_path: str = None) -> List[Dict[str, Any]]:
+def find_top_dlt(top_k: int = 5, periods: int = 100, pool_size: int = 20, out_path: str = None,
+                 exhaustive: bool = False, workers: int = 1, checkpoint_dir: str = None,
+                 progress: bool = False, branch_bound: bool = False) -> List[Dict[str, Any]]:
     """
     搜索评分最高的大乐透号码组合
     
@@ -161,69 +99,55 @@ def find_top_dlt(top_k: int = 5, periods: int = 100, pool_size: int = 20, out_pa
         periods: 统计期数
         pool_size: 前区候选池大小
         out_path: 输出文件路径（可选）
+        exhaustive: 是否搜索全部号码（不剪枝）
+        workers: 并行进程数
+        checkpoint_dir: 分片检查点目录（可选）
+        progress: 是否在控制台输出进度
+        branch_bound: 是否使用分支定界搜索（忽略 workers、checkpoint_dir）
     
     Returns:
         评分最高的号码组合列表
     """
-    evaluator = DLTNumberEvaluator('data/dlt_history.json')
-    history = evaluator.load_history()
-
-    # 历史完全匹配集合（用于排除）
-    history_exact = build_history_exact_set(history)
-
-    # 构建高质量前区池和后区池
-    front_pool = build_front_pool(history, periods, pool_size)
-    back_pool = build_back_pool(history, periods)
-
-    candidates = []
-    total_checked = 0
-    start = time.time()
-
-    # 遍历前区组合
-    for front in itertools.combinations(front_pool, 5):
-        if not passes_pattern_filters(front):
-            continue
-        f_sorted = tuple(sorted(front))
-        
-        # 遍历后区组合
-        for back in itertools.combinations(back_pool, 2):
-            b_sorted = tuple(sorted(back))
-            if (f_sorted, b_sorted) in history_exact:
-                continue
-            
-            res = evaluator.evaluate(list(f_sorted), list(b_sorted))
-            score = res['total_score']
-            candidates.append((score, f_sorted, b_sorted))
-            total_checked += 1
-
-    # 全量按分数降序
-    ranked = sorted(candidates, key=lambda x: x[0], reverse=True)
-
-    # 选择前 top_k（包含并列）
-    results = []
-    if ranked:
-        # 第K名的分数作为截断，包含并列
-        kth_index = min(top_k, len(ranked)) - 1
-        cutoff_score = ranked[kth_index][0]
-        for s, f, b in ranked:
-            if s < cutoff_score and not np.isclose(s, cutoff_score):
-                break
-            results.append({
-                'front_numbers': list(f),
-                'back_numbers': list(b),
-                'total_score': round(float(s), 1)
-            })
-
-    elapsed = time.time() - start
+    history_file = 'data/dlt_history.json'
+    history = DLTNumberEvaluator(history_file).load_history()
+
+    if exhaustive:
+        space = SearchSpace.for_lottery('dlt')
+    else:
+        # 高质量前区池内的组合（筛选模式），后区使用全部组合
+        space = SearchSpace.for_lottery('dlt', build_front_pool(history, periods, pool_size), pattern_filter)
+
+    # 评分并排除历史完全一致的号码，前 top_k（第K名的分数作为截断，包含并列）
+    if branch_bound:
+        search = branch_bound_top_k(space, top_k, history, {'history_file': history_file},
+                                    progress=console_progress if progress else None)
+        total_checked, throughput = search.scored, search.throughput
+    else:
+        search = search_top_k(space, top_k, history, {'history_file': history_file}, workers=workers,
+                              checkpoint_dir=checkpoint_dir, progress=console_progress if progress else None)
+        total_checked, throughput = search.checked, search.throughput
+    results = [{
+        'front_numbers': [int(n) for n in ticket[:5]],
+        'back_numbers': [int(n) for n in ticket[5:]],
+        'total_score': round(float(s), 1)
+    } for s, ticket in search.results]
+    elapsed = search.elapsed
 
     # 输出报告
     if out_path:
         lines = []
-        lines.append('# 大乐透最高评分号码（剪枝搜索）')
+        lines.append(f'# 大乐透最高评分号码（{"全空间搜索" if exhaustive else "剪枝搜索"}）')
         lines.append('')
         lines.append(f'- 评分时间: {time.strftime("%Y-%m-%d %H:%M:%S")}')
-        lines.append(f'- 搜索设置: periods={periods}, pool_size={pool_size}')
-        lines.append(f'- 评估组合数: {total_checked}, 用时: {elapsed:.2f}s')
+        if exhaustive:
+            lines.append(f'- 搜索设置: periods={periods}, 全部 C(35,5)×C(12,2) 注')
+        else:
+            lines.append(f'- 搜索设置: periods={periods}, pool_size={pool_size}')
+        lines.append(f'- 评估组合数: {total_checked}, 用时: {elapsed:.2f}s, 吞吐: {throughput:,.0f} 注/秒')
+        if branch_bound:
+            lines.append(f'- 分支定界: 评分 {search.scored_fraction:.3%} 的号码, 上界计算 {search.nodes} 次')
+        else:
+            lines.append(f'- 并行进程: {workers}, 分片: {search.shards}（检查点恢复 {search.resumed_shards}）')
         lines.append('')
         if not results:
             lines.append('> 未找到符合条件的组合（可能全部命中历史完全一致）。')
@@ -248,11 +172,15 @@ def main():
     parser.add_argument('--periods', type=int, default=100, help='统计期数，默认100')
     parser.add_argument('--pool-size', type=int, default=20, help='前区候选池大小，默认20')
     parser.add_argument('--out', type=str, default='docs/TOP_DLT_NUMBERS.md', help='输出文件路径')
+    parser.add_argument('--exhaustive', action='store_true', help='不剪枝，搜索全部 C(35,5)×C(12,2) 注号码')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('--checkpoint-dir', type=str, default=None, help='分片检查点目录（中断后重新运行可继续）')
+    parser.add_argument('--branch-bound', action='store_true', help='使用分支定界搜索（只评分可能进入前N名的号码）')
     args = parser.parse_args()
 
     print(f"开始搜索大乐透最高评分号码...")
     print(f"  - 统计期数: {args.periods}")
-    print(f"  - 前区候选池: {args.pool_size}")
+    print(f"  - 前区候选池: {'全部号码' if args.exhaustive else args.pool_size}")
     print(f"  - 返回数量: {args.top}")
     print()
 
@@ -260,7 +188,12 @@ def main():
         top_k=args.top,
         periods=args.periods,
         pool_size=args.pool_size,
-        out_path=args.out
+        out_path=args.out,
+        exhaustive=args.exhaustive,
+        workers=args.workers,
+        checkpoint_dir=args.checkpoint_dir,
+        progress=True,
+        branch_bound=args.branch_bound,
     )
 
     print(f"\n搜索完成！")
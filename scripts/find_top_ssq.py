@@ -5,20 +5,25 @@
 说明：
 - 评分体系使用现有 SSQNumberEvaluator，一致性完全对齐
 - 蓝球已纳入总分计算：频率与遗漏分按红:蓝=70%:30% 融合
-- 为保证可运行性，使用启发式剪枝：先选取高质量红球池，再组合并筛选模式
-- 若分数并列，将全部列出
+- 默认使用启发式剪枝：先选取高质量红球池，再组合并筛选模式
+- --exhaustive 时不剪枝，搜索全部 C(33,6)×16 注号码
+- 搜索由分片搜索引擎执行：--workers 多进程并行，--checkpoint-dir 保存分片检查点以便中断后继续
+- --branch-bound 时改用分支定界搜索：按得分上界剪枝，结果与全量评分一致，只评分少量号码
+- 若分数并列，将全部列出（同分按号码顺序）
 
 用法：
     python scripts/find_top_ssq.py --top 5 --periods 100 --pool-size 18 --out docs/TOP_SSQ_NUMBERS.md
+    python scripts/find_top_ssq.py --top 5 --exhaustive --workers 8 --checkpoint-dir data/cache/top_ssq
+    python scripts/find_top_ssq.py --top 5 --exhaustive --branch-bound
 """
 
 import argparse
-import itertools
 import os
 import sys
 import time
 from collections import Counter
-from typing import List, Tuple, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any
 
 import numpy as np
 
@@ -28,58 +33,27 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.core.evaluators.branch_bound import branch_bound_top_k
+from src.core.evaluators.sharded_search import SearchSpace, console_progress, search_top_k
 from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import get_combination_table
 
 
-def calc_ac_value(nums: List[int]) -> int:
-    s = sorted(nums)
-    diffs = set()
-    n = len(s)
-    for i in range(n):
-        for j in range(i + 1, n):
-            diffs.add(s[j] - s[i])
-    return len(diffs) - (n - 1)
-
-
-def passes_pattern_filters(reds: Tuple[int, ...]) -> bool:
-    # 奇偶 2..4
-    odd = sum(1 for n in reds if n % 2)
-    if not (2 <= odd <= 4):
-        return False
-    # 大小 2..4 (大: >=18)
-    big = sum(1 for n in reds if n >= 18)
-    if not (2 <= big <= 4):
-        return False
-    # 区间至少覆盖2个区（1-11,12-22,23-33）
-    z1 = sum(1 for n in reds if 1 <= n <= 11)
-    z2 = sum(1 for n in reds if 12 <= n <= 22)
-    z3 = sum(1 for n in reds if 23 <= n <= 33)
-    if (z1 > 0) + (z2 > 0) + (z3 > 0) < 2:
-        return False
-    # 跨度 10..32
-    span = max(reds) - min(reds)
-    if not (10 <= span <= 32):
-        return False
-    # 和值 70..150
-    s = sum(reds)
-    if not (70 <= s <= 150):
-        return False
-    # AC 值 >= 4
-    if calc_ac_value(list(reds)) < 4:
-        return False
-    return True
-
-
-def build_history_exact_set(history_data: List[Dict[str, Any]]) -> set:
-    exact = set()
-    for draw in history_data:
-        r = tuple(sorted(draw['red_numbers']))
-        b = int(draw['blue_number'])
-        exact.add((r, b))
-    return exact
-
-
-# 蓝球已纳入评分，将在主循环中为每组红球遍历全部蓝球进行评分选择
+@lru_cache(maxsize=None)
+def pattern_mask() -> np.ndarray:
+    """全部红球组合的模式过滤掩码（按组合序编号）"""
+    table = get_combination_table('ssq')
+    # 奇偶 2..4，大小 2..4 (大: >=18)，至少覆盖2个区（1-11,12-22,23-33），跨度 10..32，和值 70..150，AC 值 >= 4
+    return table.mask(odd=(2, 4), big=(2, 4), zones=(2, 3), span=(10, 32), sum=(70, 150)) & (table['ac'] >= 4)
+
+
+def pattern_filter(reds: np.ndarray) -> np.ndarray:
+    """红球模式过滤（每行一组升序红球），返回通过过滤的掩码"""
+    return get_combination_table('ssq').contains(pattern_mask(), reds)
+
+
+# 检查点签名使用组合表掩码识别过滤条件
+pattern_filter.pattern_mask = pattern_mask
 
 
 def build_red_pool(history_data: List[Dict[str, Any]], periods: int, pool_size: int) -> List[int]:
@@ -115,69 +89,57 @@ def build_red_pool(history_data: List[Dict[str, Any]], periods: int, pool_size:
 
 def find_top_ssq(top_k: int = 5, periods: int = 100, pool_size: int = 18, out_path: str = None,
                  freq_blue_weight: float = 0.3, miss_blue_weight: float = 0.3,
-                 missing_curve: str = 'linear', missing_sigma_factor: float = 1.0) -> List[Dict[str, Any]]:
-    evaluator = SSQNumberEvaluator(
-        'data/ssq_history.json',
-        freq_blue_weight=freq_blue_weight,
-        missing_blue_weight=miss_blue_weight,
-        missing_curve=missing_curve,
-        missing_sigma_factor=missing_sigma_factor,
-    )
-    history = evaluator.load_history()
-
-    # 历史完全匹配集合（用于排除）
-    history_exact = build_history_exact_set(history)
-
-
-    # 构建高质量红球池并组合
-    red_pool = build_red_pool(history, periods, pool_size)
-
-    candidates = []
-    total_checked = 0
-    start = time.time()
-
-    for reds in itertools.combinations(red_pool, 6):
-        if not passes_pattern_filters(reds):
-            continue
-        r_sorted = tuple(sorted(reds))
-        for b in range(1, 17):
-            if (r_sorted, b) in history_exact:
-                continue
-            res = evaluator.evaluate(list(r_sorted), b)
-            score = res['total_score']
-            candidates.append((score, r_sorted, b))
-            total_checked += 1
-
-    # 全量按分数降序
-    ranked = sorted(candidates, key=lambda x: x[0], reverse=True)
-
-    # 选择前 top_k（包含并列）
-    results = []
-    if ranked:
-        # 第K名的分数作为截断，包含并列
-        kth_index = min(top_k, len(ranked)) - 1
-        cutoff_score = ranked[kth_index][0]
-        for s, r, b in ranked:
-            if s < cutoff_score and not np.isclose(s, cutoff_score):
-                break
-            results.append({
-                'red_numbers': list(r),
-                'blue_number': b,
-                'total_score': round(float(s), 1)
-            })
-
-    elapsed = time.time() - start
+                 missing_curve: str = 'linear', missing_sigma_factor: float = 1.0,
+                 exhaustive: bool = False, workers: int = 1, checkpoint_dir: str = None,
+                 progress: bool = False, branch_bound: bool = False) -> List[Dict[str, Any]]:
+    evaluator_options = {
+        'history_file': 'data/ssq_history.json',
+        'freq_blue_weight': freq_blue_weight,
+        'missing_blue_weight': miss_blue_weight,
+        'missing_curve': missing_curve,
+        'missing_sigma_factor': missing_sigma_factor,
+    }
+    history = SSQNumberEvaluator(evaluator_options['history_file']).load_history()
+
+    if exhaustive:
+        space = SearchSpace.for_lottery('ssq')
+    else:
+        # 高质量红球池内的组合，并筛选模式
+        space = SearchSpace.for_lottery('ssq', build_red_pool(history, periods, pool_size), pattern_filter)
+
+    # 评分并排除历史完全一致的号码，前 top_k（第K名的分数作为截断，包含并列）
+    if branch_bound:
+        search = branch_bound_top_k(space, top_k, history, evaluator_options,
+                                    progress=console_progress if progress else None)
+        total_checked, throughput = search.scored, search.throughput
+    else:
+        search = search_top_k(space, top_k, history, evaluator_options, workers=workers,
+                              checkpoint_dir=checkpoint_dir, progress=console_progress if progress else None)
+        total_checked, throughput = search.checked, search.throughput
+    results = [{
+        'red_numbers': [int(n) for n in ticket[:6]],
+        'blue_number': int(ticket[6]),
+        'total_score': round(float(s), 1)
+    } for s, ticket in search.results]
+    elapsed = search.elapsed
 
     # 输出报告
     if out_path:
         lines = []
-        lines.append('# 双色球最高评分号码（剪枝搜索）')
+        lines.append(f'# 双色球最高评分号码（{"全空间搜索" if exhaustive else "剪枝搜索"}）')
         lines.append('')
         lines.append(f'- 评分时间: {time.strftime("%Y-%m-%d %H:%M:%S")}')
-        lines.append(f'- 搜索设置: periods={periods}, pool_size={pool_size}')
+        if exhaustive:
+            lines.append(f'- 搜索设置: periods={periods}, 全部 C(33,6)×16 注')
+        else:
+            lines.append(f'- 搜索设置: periods={periods}, pool_size={pool_size}')
         lines.append(f'- 蓝球权重: freq={freq_blue_weight:.2f}, missing={miss_blue_weight:.2f}')
         lines.append(f'- 遗漏曲线: {missing_curve} (sigma_factor={missing_sigma_factor})')
-        lines.append(f'- 评估组合数: {total_checked}, 用时: {elapsed:.2f}s')
+        lines.append(f'- 评估组合数: {total_checked}, 用时: {elapsed:.2f}s, 吞吐: {throughput:,.0f} 注/秒')
+        if branch_bound:
+            lines.append(f'- 分支定界: 评分 {search.scored_fraction:.3%} 的号码, 上界计算 {search.nodes} 次')
+        else:
+            lines.append(f'- 并行进程: {workers}, 分片: {search.shards}（检查点恢复 {search.resumed_shards}）')
         lines.append('')
         if not results:
             lines.append('> 未找到符合条件的组合（可能全部命中历史完全一致）。')
@@ -207,6 +169,10 @@ def main():
     parser.add_argument('--miss-blue-weight', type=float, default=0.3, help='遗漏维度蓝球权重（0-1）')
     parser.add_argument('--missing-curve', type=str, default='linear', choices=['linear', 'gaussian'], help='遗漏得分曲线')
     parser.add_argument('--missing-sigma-factor', type=float, default=1.0, help='高斯曲线sigma与平均遗漏的比例系数')
+    parser.add_argument('--exhaustive', action='store_true', help='不剪枝，搜索全部 C(33,6)×16 注号码')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('--checkpoint-dir', type=str, default=None, help='分片检查点目录（中断后重新运行可继续）')
+    parser.add_argument('--branch-bound', action='store_true', help='使用分支定界搜索（只评分可能进入前N名的号码）')
 
     args = parser.parse_args()
 
@@ -219,6 +185,11 @@ def main():
         miss_blue_weight=args.miss_blue_weight,
         missing_curve=args.missing_curve,
         missing_sigma_factor=args.missing_sigma_factor,
+        exhaustive=args.exhaustive,
+        workers=args.workers,
+        checkpoint_dir=args.checkpoint_dir,
+        progress=True,
+        branch_bound=args.branch_bound,
     )
     # 控制台输出简表
     if not results:
@@ -3,6 +3,7 @@ from typing import Dict, List, Any, Optional
 
 from .base_analyzer import BaseAnalyzer
 from ..exceptions import AnalysisError
+from ..storage import OccurrenceTable, history_occurrence_tables
 
 class FrequencyAnalyzer(BaseAnalyzer):
     """频率分析器"""
@@ -47,8 +48,7 @@ class FrequencyAnalyzer(BaseAnalyzer):
         # 红球分析
         red_numbers = self.extract_numbers(data, 'red_numbers')
         if red_numbers:
-            red_frequency = self.calculate_frequency(red_numbers, self.config['red_range'])
-            red_missing = self.calculate_missing_values(red_numbers, self.config['red_range'])
+            red_frequency, red_missing = self._frequency_and_missing(red_numbers, self.config['red_range'], data, 'red')
             red_classification = self.classify_hot_cold_numbers(red_frequency)
             red_stats = self.calculate_statistics(red_numbers)
             red_patterns = self.analyze_patterns(red_numbers)
@@ -75,8 +75,10 @@ class FrequencyAnalyzer(BaseAnalyzer):
                            if pd.notna(row['blue_1'])]
         
         if blue_numbers:
-            blue_frequency = self.calculate_frequency(blue_numbers, self.config['blue_range'])
-            blue_missing = self.calculate_missing_values(blue_numbers, self.config['blue_range'])
+            # 出现次数表按 blue_number 列构建，使用 blue_1 列时单独构建
+            blue_data = data if 'blue_number' in data.columns else None
+            blue_frequency, blue_missing = self._frequency_and_missing(
+                blue_numbers, self.config['blue_range'], blue_data, 'blue')
             blue_classification = self.classify_hot_cold_numbers(blue_frequency)
             blue_stats = self.calculate_statistics(blue_numbers)
             
@@ -98,8 +100,7 @@ class FrequencyAnalyzer(BaseAnalyzer):
         # 前区分析
         front_numbers = self.extract_numbers(data, 'front_numbers')
         if front_numbers:
-            front_frequency = self.calculate_frequency(front_numbers, self.config['front_range'])
-            front_missing = self.calculate_missing_values(front_numbers, self.config['front_range'])
+            front_frequency, front_missing = self._frequency_and_missing(front_numbers, self.config['front_range'], data, 'front')
             front_classification = self.classify_hot_cold_numbers(front_frequency)
             front_stats = self.calculate_statistics(front_numbers)
             front_patterns = self.analyze_patterns(front_numbers)
@@ -117,8 +118,7 @@ class FrequencyAnalyzer(BaseAnalyzer):
         # 后区分析
         back_numbers = self.extract_numbers(data, 'back_numbers')
         if back_numbers:
-            back_frequency = self.calculate_frequency(back_numbers, self.config['back_range'])
-            back_missing = self.calculate_missing_values(back_numbers, self.config['back_range'])
+            back_frequency, back_missing = self._frequency_and_missing(back_numbers, self.config['back_range'], data, 'back')
             back_classification = self.classify_hot_cold_numbers(back_frequency)
             back_stats = self.calculate_statistics(back_numbers)
             back_patterns = self.analyze_patterns(back_numbers)
@@ -135,6 +135,33 @@ class FrequencyAnalyzer(BaseAnalyzer):
         
         return result
     
+    def _frequency_and_missing(self, numbers_list: List[List[int]], number_range: tuple,
+                               data: Optional[pd.DataFrame] = None, zone: Optional[str] = None):
+        """由一张出现次数表同时计算号码频率和遗漏值
+
+        与 calculate_frequency、calculate_missing_values 结果相同（列表最后一期为最新，
+        从未出现的号码遗漏值为总期数）。提取号码时没有跳过任何行时，直接使用按数据版本
+        共享的整份数据的出现次数表。
+
+        Args:
+            numbers_list: 号码列表的列表
+            number_range: 号码范围 (min, max)
+            data: 提取号码的历史数据
+            zone: 号码区名（如 'red'、'blue'）
+
+        Returns:
+            (频率字典, 遗漏值字典)
+        """
+        table = None
+        if data is not None and zone is not None and len(numbers_list) == len(data):
+            table = history_occurrence_tables(self.lottery_type, data, newest_first=False).get(zone)
+        if table is None or table.max_number != number_range[1]:
+            table = OccurrenceTable.from_draws(numbers_list, number_range[1], newest_first=False)
+        numbers = range(number_range[0], number_range[1] + 1)
+        counts = table.frequency().tolist()
+        missing = table.missing(default=len(numbers_list)).tolist()
+        return {num: counts[num] for num in numbers}, {num: missing[num] for num in numbers}
+    
     def _get_top_numbers(self, frequency: Dict[int, int], count: int, reverse: bool = True) -> List[Dict[str, Any]]:
         """获取频率最高/最低的号码
         
@@ -7,16 +7,54 @@ API数据解析器
 """
 
 import re
+import copy
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 from bs4 import BeautifulSoup
 
 class APIParser:
     """API数据解析器基类"""
 
+    # 已解析响应体的结果（按解析器、彩票类型和响应体摘要索引，所有解析器实例共享）
+    PARSED_CACHE_SIZE = 256
+    _parsed_bodies: 'OrderedDict[tuple, List[Dict]]' = OrderedDict()
+    _parsed_lock = threading.Lock()
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
+    def parse_body(self, data: Any, lottery_type: str, digest: Optional[str] = None) -> List[Dict]:
+        """解析API数据，响应体摘要相同的数据只解析一次
+
+        Args:
+            data: API返回的原始数据
+            lottery_type: 彩票类型
+            digest: 响应体摘要，为 None 时总是重新解析
+
+        Returns:
+            解析后的数据列表（调用方可以自由修改）
+        """
+        if digest is None:
+            return self.parse(data, lottery_type)
+
+        key = (type(self).__name__, lottery_type, digest)
+        with self._parsed_lock:
+            parsed = self._parsed_bodies.get(key)
+            if parsed is not None:
+                self._parsed_bodies.move_to_end(key)
+        if parsed is not None:
+            return copy.deepcopy(parsed)
+
+        parsed = self.parse(data, lottery_type)
+        if parsed:
+            with self._parsed_lock:
+                self._parsed_bodies[key] = copy.deepcopy(parsed)
+                while len(self._parsed_bodies) > self.PARSED_CACHE_SIZE:
+                    self._parsed_bodies.popitem(last=False)
+        return parsed
+
     def parse(self, data: Any, lottery_type: str) -> List[Dict]:
         """解析API数据
 
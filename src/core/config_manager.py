@@ -45,7 +45,14 @@ class ConfigManager:
                 "data_path": "data",
                 "date_limit": "2020-01-01",
                 "cache_ttl_hours": 24,
-                "max_periods": 1000
+                "max_periods": 1000,
+                "columnar_store": True,
+                "incremental_update": True,
+                "journal_compact_threshold": 100,
+                "bounded_load": True,
+                "vectorized_cleaning": True,
+                "vectorized_validation": True,
+                "parallel_validation": False
             },
             
             # 网络请求配置
@@ -54,7 +61,9 @@ class ConfigManager:
                 "max_retry": 3,
                 "retry_delay": 1,
                 "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "verify_ssl": True
+                "verify_ssl": True,
+                "response_cache": True,
+                "cache_max_mb": 50
             },
             
             # 彩票类型配置
@@ -105,7 +114,9 @@ class ConfigManager:
             "analysis": {
                 "default_periods": 100,
                 "hot_cold_threshold": 3,
-                "feature_cache_size": 1000
+                "feature_cache_size": 1000,
+                "memo_cache_size": 256,
+                "filter_cache_size": 65536
             },
             
             # API配置
@@ -113,7 +124,13 @@ class ConfigManager:
                 "ssq_url": "https://www.cwl.gov.cn/cwl_admin/front/cwlkj/search/kjxx/findDrawNotice",
                 "dlt_url": "https://webapi.sporttery.cn/gateway/lottery/getHistoryPageListV1.qry",
                 "page_size": 30,
-                "max_pages": 100
+                "max_pages": 100,
+                "fetch_mode": "hedged",
+                "hedge_delay": 2.0,
+                "max_parallel_sources": 3,
+                "page_concurrency": 4,
+                "host_rate_limit": 4.0,
+                "host_rate_burst": 4
             }
         }
     
@@ -1,18 +1,32 @@
+import numpy as np
 import pandas as pd
 import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
-import time
+from urllib.parse import urlparse
+import threading
 from .config_manager import get_config_manager
 from .network_client import get_network_client
+from .hedged_fetcher import HedgedFetcher, SourceStatsRegistry
+from .paginated_fetcher import Page, PageCursorStore, PaginatedFetcher, get_host_bucket
 from .validation import DataValidator, DataCleaner
 from .api_parsers import get_parser
+from .storage import (
+    ColumnarDrawStore, DrawArrays, HistoryJournal, get_history_cache, record_digests, sort_records,
+    source_signature, write_json_atomic
+)
 
 class LotteryDataManager:
     """彩票数据管理器"""
 
+    # 原始记录的必需列
+    REQUIRED_COLUMNS = {
+        'ssq': ['draw_num', 'draw_date', 'red_numbers', 'blue_number', 'sales', 'prize_pool'],
+        'dlt': ['draw_num', 'draw_date', 'front_numbers', 'back_numbers', 'sales', 'prize_pool']
+    }
+
     def __init__(self, data_path: Optional[str] = None):
         """初始化数据管理器
 
@@ -54,8 +68,19 @@ class LotteryDataManager:
             for lottery_type in self.LOTTERY_TYPES.keys()
         }
 
+        # 列式存储（按需创建）
+        self._columnar_stores: Dict[str, Optional[ColumnarDrawStore]] = {}
+
+        # 数据源统计（按需创建）
+        self._source_stats: Optional[SourceStatsRegistry] = None
+        self._page_cursors: Optional[PageCursorStore] = None
+
     def get_history_data(self, lottery_type: str, periods: Optional[int] = None) -> pd.DataFrame:
-        """获取历史数据 (从 JSON 文件读取)
+        """获取历史数据
+
+        同一进程内共享一份解析结果（见 HistoryCache），返回只读视图。
+        优先从列式存储读取；存储不存在或与 JSON 文件不同步时走 JSON 解析、
+        清洗、验证流程，并将结果写回列式存储。
 
         Args:
             lottery_type: 彩票类型 ('ssq'/'dlt')
@@ -67,127 +92,586 @@ class LotteryDataManager:
         if lottery_type not in self.LOTTERY_TYPES:
             raise ValueError(f"不支持的彩票类型: {lottery_type}")
 
+        file_path = self.data_files[lottery_type]
+        if not file_path.exists():
+            self.logger.warning(f"数据文件不存在: {file_path}")
+            return pd.DataFrame()
+
+        history_cache = get_history_cache()
+        kind = f'frame:{lottery_type}'
+        build_key = self._columnar_build_key()
         try:
-            file_path = self.data_files[lottery_type]
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    raw_data = json.load(f)
-                # 假设 JSON 文件结构为 {'data': [...], 'fetch_time': ..., 'total_periods': ...}
-                data_list = raw_data.get('data', [])
-                if not data_list:
-                     return pd.DataFrame()
-
-                df = pd.DataFrame(data_list)
-
-                # --- 确保核心列存在并进行必要转换 --- >
-                required_cols = {
-                    'ssq': ['draw_num', 'draw_date', 'red_numbers', 'blue_number', 'sales', 'prize_pool'],
-                    'dlt': ['draw_num', 'draw_date', 'front_numbers', 'back_numbers', 'sales', 'prize_pool']
-                }
-                if not all(col in df.columns for col in required_cols[lottery_type]):
-                    self.logger.error(f"{file_path} 缺少必需的列。预期: {required_cols[lottery_type]}, 实际: {list(df.columns)}")
-                    # 尝试保留共有列，但可能导致后续分析失败
-                    common_cols = list(set(df.columns) & set(required_cols[lottery_type]))
-                    if not common_cols:
-                        return pd.DataFrame()
-                    df = df[common_cols]
-                    # return pd.DataFrame() # 或者直接返回空，更安全
-
-                # --- 统一 date 字段格式并排序 --- >
-                if 'draw_date' in df.columns:
-                     try:
-                         df['draw_date'] = pd.to_datetime(df['draw_date'].astype(str).str[:10])
-                         # 按日期降序排序 (最新在前)
-                         df = df.sort_values('draw_date', ascending=False)
-                     except Exception as e:
-                          self.logger.error(f"处理 draw_date 列时出错: {e}, 将尝试继续但不排序。")
-                else:
-                     self.logger.warning(f"{file_path} 缺少 'draw_date' 列，无法排序和过滤日期。")
-                     # 如果没有日期列，无法按日期过滤，可以选择返回全部或报错
-                     # return pd.DataFrame() # 或者返回空 DataFrame
-
-                # --- 添加日期过滤 --- >
-                if 'draw_date' in df.columns:
-                     original_count = len(df)
-                     df = df[df['draw_date'] >= self.date_limit].copy() # 使用 .copy() 避免 SettingWithCopyWarning
-                     filtered_count = len(df)
-                     if original_count > filtered_count:
-                         self.logger.info(f"日期过滤: {original_count} -> {filtered_count} 条记录")
-                # <-------------------
-
-                # 转换 'numbers' 列（如果存在且需要的话，但优选直接使用号码列表列）
-                if 'numbers' in df.columns and lottery_type == 'ssq' and 'red_numbers' not in df.columns:
-                    # 尝试从 'numbers' 列恢复号码列表
-                     try:
-                         split_nums = df['numbers'].str.split(',', expand=True)
-                         if split_nums.shape[1] == 7:
-                             df['red_numbers'] = split_nums.iloc[:, :6].apply(lambda row: [int(n) for n in row], axis=1)
-                             df['blue_number'] = split_nums.iloc[:, 6].astype(int) # 注意这里是单个数字，非列表
-                         else:
-                             self.logger.warning("ssq numbers 列格式不为 7 位")
-                     except Exception as e:
-                         self.logger.error(f"从 ssq numbers 列恢复失败: {e}")
-                elif 'numbers' in df.columns and lottery_type == 'dlt' and 'front_numbers' not in df.columns:
-                     try:
-                         split_nums = df['numbers'].str.split(',', expand=True)
-                         if split_nums.shape[1] == 7:
-                             df['front_numbers'] = split_nums.iloc[:, :5].apply(lambda row: [int(n) for n in row], axis=1)
-                             df['back_numbers'] = split_nums.iloc[:, 5:].apply(lambda row: [int(n) for n in row], axis=1)
-                         else:
-                             self.logger.warning("dlt numbers 列格式不为 7 位")
-                     except Exception as e:
-                         self.logger.error(f"从 dlt numbers 列恢复失败: {e}")
-
-                # 确保数值列是数值类型
-                numeric_cols = ['sales', 'prize_pool']
-                for col in numeric_cols:
-                     if col in df.columns:
-                         df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                # <-------------------------------------
-
-                # 数据验证和清洗
-                if not df.empty:
-                    try:
-                        # 先进行数据清洗
-                        df, cleaning_report = self.cleaners[lottery_type].clean_data(
-                            df, auto_fix=True, remove_invalid=True
-                        )
-                        
-                        # 记录清洗结果
-                        if cleaning_report['data_quality']['data_quality_score'] < 95:
-                            self.logger.warning(
-                                f"{lottery_type} 数据质量评分: "
-                                f"{cleaning_report['data_quality']['data_quality_score']:.1f}%"
-                            )
-                        
-                        # 最终验证
-                        validation_result = self.validators[lottery_type].validate(df)
-                        if not validation_result['valid']:
-                            self.logger.warning(
-                                f"{lottery_type} 数据验证发现 {validation_result['summary']['error_count']} 个错误"
-                            )
-                            
-                    except Exception as e:
-                        self.logger.error(f"数据验证和清洗失败: {str(e)}")
-
-                # 为分析器添加展开的号码列
-                if not df.empty:
-                    df = self._expand_number_columns(df, lottery_type)
-
-                if periods:
-                    df = df.head(periods)
-
-                return df
-            else:
-                self.logger.warning(f"数据文件不存在: {file_path}")
-                return pd.DataFrame()
+            df = None
+            if periods and self.config_manager.get('data.bounded_load', True):
+                # 只需要最近 N 期时，全量数据未就绪则只处理最新的记录
+                df = history_cache.peek_frame(kind, file_path, build_key)
+                if df is None:
+                    df = self._get_recent_history(lottery_type, periods)
+            if df is None:
+                df = history_cache.get_frame(
+                    kind, file_path,
+                    lambda: self._load_history_frame(lottery_type),
+                    extra_key=build_key
+                )
+        except FileNotFoundError:
+            self.logger.warning(f"数据文件不存在: {file_path}")
+            return pd.DataFrame()
+
+        if periods:
+            df = df.head(periods)
+        return df
+
+    def _get_recent_history(self, lottery_type: str, periods: int) -> Optional[pd.DataFrame]:
+        """只读取最新的若干期数据
+
+        列式存储同步时只读取其最新窗口内的行；否则排序和日期过滤只作用于全部原始记录的日期，
+        DataFrame 构建、清洗、验证、号码展开只作用于排序后的前缀窗口。两种方式的结果都与
+        全量处理后再截取前 N 期一致。窗口按 2 的幂取整，使不同期数的请求可以共享缓存。
+
+        Args:
+            lottery_type: 彩票类型
+            periods: 需要的期数
+
+        Returns:
+            最新数据DataFrame；窗口内有效记录不足时返回 None（由调用方走全量流程）
+        """
+        window = 64
+        while window < periods + max(8, periods // 8):
+            window *= 2
+
+        columnar = self._columnar_store_fresh(lottery_type)
+
+        def load() -> pd.DataFrame:
+            if columnar:
+                df = self._load_from_columnar_store(lottery_type, limit=window)
+                if df is not None:
+                    return df
+            return self._load_history_from_json(lottery_type, limit=window)
+
+        df = get_history_cache().get_frame(
+            f'recent:{lottery_type}', self.data_files[lottery_type], load,
+            extra_key=(self._columnar_build_key(), window, columnar)
+        )
+        if len(df) < periods:
+            return None
+        return df
+
+    def _columnar_store_fresh(self, lottery_type: str) -> bool:
+        """列式存储是否可直接使用"""
+        store = self._get_columnar_store(lottery_type)
+        if store is None:
+            return False
+        try:
+            return store.is_fresh(self.data_files[lottery_type], self._columnar_build_key())
+        except Exception:
+            return False
+
+    def _load_history_frame(self, lottery_type: str) -> pd.DataFrame:
+        """加载完整历史数据
+
+        列式存储同步时直接读取；否则优先只处理上次校验之后新增的记录，
+        无法增量时走完整流程。结果连同清洗/验证报告写回列式存储。
+        """
+        df = self._load_from_columnar_store(lottery_type)
+        if df is not None:
+            return df
+
+        file_path = self.data_files[lottery_type]
+        try:
+            signature = source_signature(file_path)
+        except OSError:
+            signature = None
+        data_list = self._read_history_records(lottery_type)
+        if not data_list:
+            return pd.DataFrame()
+
+        digests = record_digests(data_list)
+        result = self._load_history_incremental(lottery_type, data_list, digests)
+        if result is None:
+            df, reports = self._run_history_pipeline(lottery_type, data_list=data_list)
+            reports.pop('pre_clean_rows', None)
+        else:
+            df, reports = result
+        if not df.empty:
+            self._write_columnar_store(lottery_type, df, reports, digests, signature)
+        return df
+
+    def _load_history_incremental(self, lottery_type: str, data_list: List[Dict],
+                                  digests: np.ndarray) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """基于上次校验通过的列式存储，只清洗、验证新增记录
+
+        要求：上次的原始记录全部保留且未修改，新增记录（日期过滤后）全部晚于已有数据，
+        且期号不重复。满足时结果与完整流程一致，否则返回 None。
+
+        Args:
+            lottery_type: 彩票类型
+            data_list: 当前全部原始记录
+            digests: 原始记录摘要
+
+        Returns:
+            (DataFrame, 合并后的报告)，无法增量时返回 None
+        """
+        store = self._get_columnar_store(lottery_type)
+        if store is None:
+            return None
+        meta = store.read_meta()
+        if meta is None or meta.get('build_key') != self._columnar_build_key():
+            return None
+        verified = store.load_extra_array('raw_digest')
+        if verified is None:
+            return None
+
+        is_new = ~np.isin(digests, verified)
+        if np.unique(digests[~is_new]).size != np.unique(verified).size:
+            # 有已校验的记录被修改或删除
+            return None
+
+        base_df = store.load_frame()
+        if base_df is None:
+            return None
+        base_reports = meta.get('attachments', {}).get('reports', {})
+        if not is_new.any():
+            return base_df, base_reports
+
+        new_records = [record for record, flag in zip(data_list, is_new) if flag]
+        new_df, _ = self._prepare_history_frame(new_records, lottery_type)
+        added = len(new_df)
+        if added == 0:
+            return base_df, base_reports
+        if 'draw_date' not in new_df.columns or base_df.empty:
+            return None
+        if new_df['draw_date'].min() <= base_df['draw_date'].max():
+            return None
+
+        new_df, new_reports = self._clean_history_frame(new_df, lottery_type)
+        if list(new_df.columns) != list(base_df.columns):
+            return None
+        if new_df['draw_num'].isin(base_df['draw_num']).any():
+            return None
+
+        # 完整流程中索引为排序后的位置，新增记录在前，已有记录整体后移
+        base_df.index = base_df.index + added
+        for col in base_df.columns:
+            base_dtype, new_dtype = base_df[col].dtype, new_df[col].dtype
+            if base_dtype == new_dtype:
+                continue
+            if new_df[col].isna().all() and pd.api.types.is_numeric_dtype(base_dtype):
+                new_df[col] = new_df[col].astype(np.float64)
+            elif not (pd.api.types.is_numeric_dtype(base_dtype) and pd.api.types.is_numeric_dtype(new_dtype)):
+                return None
+        df = pd.concat([new_df, base_df])
+
+        self.logger.info(f"{lottery_type} 增量校验 {added} 条新记录")
+        return df, self._merge_reports(base_reports, new_reports, added)
+
+    @staticmethod
+    def _shift_rows(results: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+        """验证结果 details['rows'] 中的行索引整体后移 offset（返回副本）"""
+        shifted = []
+        for result in results:
+            details = result.get('details') or {}
+            if offset and 'rows' in details:
+                details = dict(details, rows=[row + offset for row in details['rows']])
+                result = dict(result, details=details)
+            shifted.append(result)
+        return shifted
+
+    @classmethod
+    def _merge_reports(cls, base: Dict[str, Any], new: Dict[str, Any], offset: int = 0) -> Dict[str, Any]:
+        """合并已有数据与新增数据的清洗/验证报告
+
+        Args:
+            base: 已有数据的报告
+            new: 新增数据的报告
+            offset: 已有数据在合并结果中的索引偏移（新增记录条数）
+
+        Returns:
+            合并后的报告
+        """
+        if not base:
+            return new
+        merged: Dict[str, Any] = {}
+
+        base_val, new_val = base.get('validation') or {}, new.get('validation') or {}
+        validation = {
+            'valid': base_val.get('valid', True) and new_val.get('valid', True),
+            'errors': cls._shift_rows(base_val.get('errors', []), offset) + new_val.get('errors', []),
+            'warnings': cls._shift_rows(base_val.get('warnings', []), offset) + new_val.get('warnings', []),
+            'infos': cls._shift_rows(base_val.get('infos', []), offset) + new_val.get('infos', []),
+        }
+        validation['total_issues'] = len(validation['errors']) + len(validation['warnings']) + len(validation['infos'])
+        validation['summary'] = {
+            'error_count': len(validation['errors']),
+            'warning_count': len(validation['warnings']),
+            'info_count': len(validation['infos'])
+        }
+        merged['validation'] = validation
+
+        base_clean, new_clean = base.get('cleaning') or {}, new.get('cleaning') or {}
+        stats = {
+            key: base_clean.get(key, 0) + new_clean.get(key, 0)
+            for key in ('total_records', 'cleaned_records', 'removed_records', 'fixed_records')
+        }
+        stats['issues_found'] = base_clean.get('issues_found', []) + new_clean.get('issues_found', [])
+        cleaning = dict(stats)
+        cleaning['cleaning_stats'] = dict(stats)
+        cleaning['validation_result'] = validation
+        cleaning['data_quality'] = {
+            'total_records': stats['total_records'],
+            'valid_records': stats['cleaned_records'],
+            'data_quality_score': stats['cleaned_records'] / max(stats['total_records'], 1) * 100,
+            'issues_resolved': len(stats['issues_found']),
+            'validation_passed': validation['valid']
+        }
+        merged['cleaning'] = cleaning
+        return merged
+
+    def get_data_quality_report(self, lottery_type: str) -> Dict[str, Any]:
+        """获取最近一次加载历史数据时的清洗和验证报告
+
+        报告随列式存储持久化，数据未变化时无需重新清洗即可获取。
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
 
+        Returns:
+            {'cleaning': 清洗报告, 'validation': 验证结果}，无数据时返回空字典
+        """
+        if lottery_type not in self.LOTTERY_TYPES:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+
+        store = self._get_columnar_store(lottery_type)
+        if store is None:
+            reports = self._run_history_pipeline(lottery_type)[1]
+            reports.pop('pre_clean_rows', None)
+            return reports
+        if not self._columnar_store_fresh(lottery_type):
+            get_history_cache().invalidate(self.data_files[lottery_type])
+            self.get_history_data(lottery_type)
+        meta = store.read_meta() if self._columnar_store_fresh(lottery_type) else None
+        if meta is None:
+            return {}
+        return meta.get('attachments', {}).get('reports', {})
+
+    def get_history_arrays(self, lottery_type: str) -> Optional[DrawArrays]:
+        """获取列式历史数据（只读数组，最新在前）
+
+        适合需要直接做 numpy 向量化计算的调用方，避免构造 DataFrame。
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+
+        Returns:
+            DrawArrays，列式存储不可用时返回 None
+        """
+        if lottery_type not in self.LOTTERY_TYPES:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+
+        store = self._get_columnar_store(lottery_type)
+        if store is None:
+            return None
+        if not store.is_fresh(self.data_files[lottery_type], self._columnar_build_key()):
+            # 通过完整流程重建存储
+            self.get_history_data(lottery_type)
+            if not store.is_fresh(self.data_files[lottery_type], self._columnar_build_key()):
+                return None
+        return store.load_arrays(mmap=True)
+
+    def _get_columnar_store(self, lottery_type: str) -> Optional[ColumnarDrawStore]:
+        """获取列式存储实例，配置关闭或类型不支持时返回 None"""
+        if not self.config_manager.get('data.columnar_store', True):
+            return None
+        if lottery_type not in self._columnar_stores:
+            try:
+                store_dir = self.data_path / 'cache' / 'columnar' / lottery_type
+                self._columnar_stores[lottery_type] = ColumnarDrawStore(store_dir, lottery_type)
+            except ValueError:
+                self._columnar_stores[lottery_type] = None
+        return self._columnar_stores[lottery_type]
+
+    def _columnar_build_key(self) -> str:
+        """列式存储构建参数标识（日期过滤条件或清洗/验证规则版本变化时存储失效）"""
+        return (f"date_limit={self.date_limit.date().isoformat()};"
+                f"cleaner={DataCleaner.RULES_VERSION};validator={DataValidator.RULES_VERSION}")
+
+    def _load_from_columnar_store(self, lottery_type: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """从列式存储读取历史数据（limit 表示只读取最新的若干行），存储不可用时返回 None"""
+        store = self._get_columnar_store(lottery_type)
+        file_path = self.data_files[lottery_type]
+        if store is None or not file_path.exists():
+            return None
+        try:
+            if not store.is_fresh(file_path, self._columnar_build_key()):
+                return None
+            return store.load_frame(limit)
+        except Exception as e:
+            self.logger.warning(f"读取 {lottery_type} 列式存储失败，回退到 JSON: {e}")
+            return None
+
+    def _write_columnar_store(self, lottery_type: str, df: pd.DataFrame,
+                              reports: Optional[Dict[str, Any]] = None,
+                              digests: Optional[np.ndarray] = None,
+                              signature: Optional[Dict[str, int]] = None) -> None:
+        """将处理后的历史数据及其清洗/验证报告写入列式存储
+
+        Args:
+            lottery_type: 彩票类型
+            df: 处理后的历史数据
+            reports: 清洗/验证报告
+            digests: 原始记录摘要（用于下次增量校验）
+            signature: 读取数据前的源文件签名，写入时文件已变化则放弃写入
+        """
+        store = self._get_columnar_store(lottery_type)
+        if store is None:
+            return
+        file_path = self.data_files[lottery_type]
+        try:
+            if signature is not None and source_signature(file_path) != signature:
+                self.logger.debug(f"{lottery_type} 数据文件在处理期间发生变化，跳过写入列式存储")
+                return
+            extra_arrays = {'raw_digest': digests} if digests is not None else None
+            store.write(df, file_path, self._columnar_build_key(),
+                        attachments={'reports': reports or {}}, extra_arrays=extra_arrays)
+        except Exception as e:
+            self.logger.warning(f"写入 {lottery_type} 列式存储失败: {e}")
+
+    def _invalidate_columnar_store(self, lottery_type: str) -> None:
+        """使列式存储和进程级缓存失效（数据文件被改写前后调用）"""
+        store = self._get_columnar_store(lottery_type)
+        if store is not None:
+            store.invalidate()
+        get_history_cache().invalidate(self.data_files[lottery_type])
+
+    def _load_history_from_json(self, lottery_type: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """从 JSON 文件读取并清洗、验证、展开历史数据
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+            limit: 只处理按日期排序、过滤后的前 limit 条记录，None 表示全部
+
+        Returns:
+            历史数据DataFrame（最新在前）
+        """
+        return self._run_history_pipeline(lottery_type, limit)[0]
+
+    def _read_history_records(self, lottery_type: str) -> Optional[List[Dict]]:
+        """读取原始记录列表（基础文件 + 追加日志），文件不存在或格式错误时返回 None"""
+        file_path = self.data_files[lottery_type]
+        if not file_path.exists():
+            self.logger.warning(f"数据文件不存在: {file_path}")
+            return None
+        try:
+            raw_data = HistoryJournal(file_path).read_raw()
         except json.JSONDecodeError as e:
-             self.logger.error(f"读取 JSON 文件失败: {file_path}, 错误: {e}")
-             return pd.DataFrame()
+            self.logger.error(f"读取 JSON 文件失败: {file_path}, 错误: {e}")
+            return None
+        # 假设 JSON 文件结构为 {'data': [...], 'fetch_time': ..., 'total_periods': ...}
+        return raw_data.get('data', [])
+
+    def _run_history_pipeline(self, lottery_type: str, limit: Optional[int] = None,
+                              data_list: Optional[List[Dict]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """历史数据处理流程：解析、排序、日期过滤、清洗、验证、展开
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+            limit: 只处理按日期排序、过滤后的前 limit 条记录，None 表示全部
+            data_list: 原始记录列表，None 表示从数据文件读取
+
+        Returns:
+            (历史数据DataFrame, 报告字典 {'cleaning': ..., 'validation': ..., 'pre_clean_rows': ...})
+        """
+        reports: Dict[str, Any] = {}
+        try:
+            if data_list is None:
+                data_list = self._read_history_records(lottery_type)
+            if not data_list:
+                return pd.DataFrame(), reports
+
+            df, value_dtypes = self._prepare_history_frame(data_list, lottery_type, limit)
+            reports['pre_clean_rows'] = len(df)
+            df, cleaning_reports = self._clean_history_frame(df, lottery_type, value_dtypes)
+            reports.update(cleaning_reports)
+            return df, reports
+
         except Exception as e:
             self.logger.error(f"获取历史数据失败: {str(e)}")
-            return pd.DataFrame()
+            return pd.DataFrame(), reports
+
+    def _prepare_history_frame(self, data_list: List[Dict], lottery_type: str,
+                               limit: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """构建原始 DataFrame：必需列检查、日期排序与过滤、号码恢复、数值转换
+
+        Returns:
+            (DataFrame, 需要对齐的数值字段 dtype)
+        """
+        if limit is not None and len(data_list) > limit:
+            result = self._prepare_newest_frame(data_list, lottery_type, limit)
+            if result is not None:
+                return result
+
+        file_path = self.data_files[lottery_type]
+        df = pd.DataFrame(data_list)
+
+        # --- 确保核心列存在并进行必要转换 --- >
+        required_cols = self.REQUIRED_COLUMNS
+        if not all(col in df.columns for col in required_cols[lottery_type]):
+            self.logger.error(f"{file_path} 缺少必需的列。预期: {required_cols[lottery_type]}, 实际: {list(df.columns)}")
+            # 尝试保留共有列，但可能导致后续分析失败
+            common_cols = list(set(df.columns) & set(required_cols[lottery_type]))
+            if not common_cols:
+                return pd.DataFrame(), {}
+            df = df[common_cols]
+            # return pd.DataFrame() # 或者直接返回空，更安全
+
+        # --- 统一 date 字段格式并排序 --- >
+        if 'draw_date' in df.columns:
+             try:
+                 df['draw_date'] = pd.to_datetime(df['draw_date'].astype(str).str[:10])
+                 # 按日期降序排序 (最新在前)
+                 df = df.sort_values('draw_date', ascending=False)
+             except Exception as e:
+                  self.logger.error(f"处理 draw_date 列时出错: {e}, 将尝试继续但不排序。")
+        else:
+             self.logger.warning(f"{file_path} 缺少 'draw_date' 列，无法排序和过滤日期。")
+             # 如果没有日期列，无法按日期过滤，可以选择返回全部或报错
+             # return pd.DataFrame() # 或者返回空 DataFrame
+
+        # --- 添加日期过滤 --- >
+        if 'draw_date' in df.columns:
+             original_count = len(df)
+             df = df[df['draw_date'] >= self.date_limit].copy() # 使用 .copy() 避免 SettingWithCopyWarning
+             filtered_count = len(df)
+             if original_count > filtered_count:
+                 self.logger.info(f"日期过滤: {original_count} -> {filtered_count} 条记录")
+        # <-------------------
+
+        # 转换 'numbers' 列（如果存在且需要的话，但优选直接使用号码列表列）
+        if 'numbers' in df.columns and lottery_type == 'ssq' and 'red_numbers' not in df.columns:
+            # 尝试从 'numbers' 列恢复号码列表
+             try:
+                 split_nums = df['numbers'].str.split(',', expand=True)
+                 if split_nums.shape[1] == 7:
+                     df['red_numbers'] = split_nums.iloc[:, :6].apply(lambda row: [int(n) for n in row], axis=1)
+                     df['blue_number'] = split_nums.iloc[:, 6].astype(int) # 注意这里是单个数字，非列表
+                 else:
+                     self.logger.warning("ssq numbers 列格式不为 7 位")
+             except Exception as e:
+                 self.logger.error(f"从 ssq numbers 列恢复失败: {e}")
+        elif 'numbers' in df.columns and lottery_type == 'dlt' and 'front_numbers' not in df.columns:
+             try:
+                 split_nums = df['numbers'].str.split(',', expand=True)
+                 if split_nums.shape[1] == 7:
+                     df['front_numbers'] = split_nums.iloc[:, :5].apply(lambda row: [int(n) for n in row], axis=1)
+                     df['back_numbers'] = split_nums.iloc[:, 5:].apply(lambda row: [int(n) for n in row], axis=1)
+                 else:
+                     self.logger.warning("dlt numbers 列格式不为 7 位")
+             except Exception as e:
+                 self.logger.error(f"从 dlt numbers 列恢复失败: {e}")
+
+        # 确保数值列是数值类型
+        numeric_cols = ['sales', 'prize_pool']
+        for col in numeric_cols:
+             if col in df.columns:
+                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        # <-------------------------------------
+
+        # 只处理最新的记录，数值字段 dtype 与全量处理保持一致
+        value_dtypes = {}
+        if limit is not None and len(df) > limit:
+            value_dtypes = self.cleaners[lottery_type].infer_numeric_dtypes(df)
+            df = df.head(limit).copy()
+
+        return df, value_dtypes
+
+    def _prepare_newest_frame(self, data_list: List[Dict], lottery_type: str,
+                              limit: int) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """只为按日期排序、过滤后的前 limit 条记录构建原始 DataFrame
+
+        排序和日期过滤只作用于日期列，号码等其余字段只取窗口内的记录；数值字段的转换和
+        dtype 推断仍覆盖全部过滤后的记录，结果与构建完整 DataFrame 后截取前 limit 行一致。
+
+        Returns:
+            (DataFrame, 需要对齐的数值字段 dtype)；缺少必需列或日期无法解析时返回 None（走完整流程）
+        """
+        columns = list(dict.fromkeys(key for record in data_list for key in record))
+        if not all(col in columns for col in self.REQUIRED_COLUMNS[lottery_type]):
+            return None
+        try:
+            dates = pd.to_datetime(pd.Series([record.get('draw_date') for record in data_list]).astype(str).str[:10])
+        except Exception:
+            return None
+
+        # 与完整流程相同的排序（最新在前）和日期过滤
+        order = dates.sort_values(ascending=False).index.to_numpy()
+        order = order[(dates >= self.date_limit).to_numpy()[order]]
+        if len(order) < len(data_list):
+            self.logger.info(f"日期过滤: {len(data_list)} -> {len(order)} 条记录")
+
+        # 数值字段按全部过滤后的记录转换，dtype 与完整流程一致
+        value_cols = [col for col in ('prize_pool', 'sales', 'first_prize_num', 'first_prize_amount')
+                      if col in columns]
+        values = pd.DataFrame([{col: data_list[i][col] for col in value_cols if col in data_list[i]}
+                               for i in order], columns=value_cols, index=order)
+        for col in ('sales', 'prize_pool'):
+            values[col] = pd.to_numeric(values[col], errors='coerce').fillna(0)
+        value_dtypes = {}
+        if len(order) > limit:
+            value_dtypes = self.cleaners[lottery_type].infer_numeric_dtypes(values)
+
+        window = order[:limit]
+        df = pd.DataFrame([data_list[i] for i in window], columns=columns, index=window)
+        df['draw_date'] = dates.to_numpy()[window]
+        for col in ('sales', 'prize_pool'):
+            df[col] = values[col].to_numpy()[:limit]
+        return df, value_dtypes
+
+    def _clean_history_frame(self, df: pd.DataFrame, lottery_type: str,
+                             value_dtypes: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """清洗、验证并展开号码列
+
+        Returns:
+            (DataFrame, {'cleaning': 清洗报告, 'validation': 验证结果})
+        """
+        reports: Dict[str, Any] = {}
+
+        # 数据验证和清洗
+        if not df.empty:
+            try:
+                # 先进行数据清洗
+                df, cleaning_report = self.cleaners[lottery_type].clean_data(
+                    df, auto_fix=True, remove_invalid=True
+                )
+                reports['cleaning'] = cleaning_report
+                
+                # 记录清洗结果
+                if cleaning_report['data_quality']['data_quality_score'] < 95:
+                    self.logger.warning(
+                        f"{lottery_type} 数据质量评分: "
+                        f"{cleaning_report['data_quality']['data_quality_score']:.1f}%"
+                    )
+                
+                # 最终验证（清洗器已对同一份结果执行过相同规则的验证，直接复用）
+                validation_result = cleaning_report.get('validation_result')
+                if validation_result is None:
+                    validation_result = self.validators[lottery_type].validate(df)
+                reports['validation'] = validation_result
+                if not validation_result['valid']:
+                    self.logger.warning(
+                        f"{lottery_type} 数据验证发现 {validation_result['summary']['error_count']} 个错误"
+                    )
+                    
+            except Exception as e:
+                self.logger.error(f"数据验证和清洗失败: {str(e)}")
+
+        for col, dtype in (value_dtypes or {}).items():
+            if col in df.columns and df[col].dtype != dtype:
+                df[col] = df[col].astype(dtype)
+
+        # 为分析器添加展开的号码列
+        if not df.empty:
+            df = self._expand_number_columns(df, lottery_type)
+
+        return df, reports
 
     def update_data(self, lottery_type: str) -> bool:
         """更新最新数据 (保存为 JSON)
@@ -204,58 +688,83 @@ class LotteryDataManager:
             if new_data_list is None: # 注意区分 None (获取失败) 和 [] (无新数据)
                 return False
 
-            # 读取现有数据
+            # 已有期号（基础文件的期号索引 + 追加日志，不解析全部历史数据）
             file_path = self.data_files[lottery_type]
-            existing_data_list = []
+            journal = HistoryJournal(file_path)
+            known_draw_nums = set()
+            base_readable = False
             if file_path.exists():
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        existing_raw_data = json.load(f)
-                    existing_data_list = existing_raw_data.get('data', [])
-                except json.JSONDecodeError:
+                    known_draw_nums = journal.known_keys()
+                    base_readable = True
+                except ValueError:
                     self.logger.warning(f"现有 JSON 文件格式错误: {file_path}，将覆盖。")
                 except Exception as e:
                     self.logger.error(f"读取现有 JSON 文件时出错: {e}，将尝试覆盖。")
 
-            # 合并数据并去重 (基于字典列表操作)
-            combined_data_dict = {item['draw_num']: item for item in existing_data_list}
-            new_items_added = 0
+            # 筛选新增记录 (基于期号去重)
+            new_items = []
             for item in new_data_list:
-                if item['draw_num'] not in combined_data_dict:
-                    combined_data_dict[item['draw_num']] = item
-                    new_items_added += 1
+                if item['draw_num'] not in known_draw_nums:
+                    known_draw_nums.add(item['draw_num'])
+                    new_items.append(item)
 
-            if new_items_added == 0 and new_data_list is not None: # 检查是否真的获取了数据但无新内容
+            if not new_items: # 检查是否真的获取了数据但无新内容
                  self.logger.info(f"没有新的 {lottery_type} 数据需要更新。")
                  return True # 认为更新成功，因为没有新数据
 
-            final_data_list = list(combined_data_dict.values())
+            fetch_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._invalidate_columnar_store(lottery_type)
 
-            # 按期号降序排序 (期号通常是年份+序号，可以转数字比较)
-            try:
-                 final_data_list.sort(key=lambda x: int(x['draw_num']), reverse=True)
-            except (ValueError, TypeError):
-                 self.logger.warning("部分期号无法转换为整数进行排序，将按字符串排序。")
-                 final_data_list.sort(key=lambda x: x['draw_num'], reverse=True)
-
-            # 准备保存的数据结构
-            output_data = {
-                'fetch_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'total_periods': len(final_data_list),
-                'data': final_data_list
-            }
-
-            # 保存更新后的数据到 JSON 文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            if base_readable and self.config_manager.get('data.incremental_update', True):
+                # 增量模式：只追加新记录，基础文件保持不变
+                journal.append(new_items, fetch_time)
+                total = len(known_draw_nums)
+                threshold = self.config_manager.get('data.journal_compact_threshold', 100)
+                if threshold and journal.pending_count() >= threshold:
+                    journal.compact()
+            else:
+                # 全量写入（原子替换），同时并入已有日志
+                existing_data_list = get_history_cache().get_records(file_path) if base_readable else []
+                final_data_list = sort_records(list(existing_data_list) + new_items)
+                total = len(final_data_list)
+                output_data = {
+                    'fetch_time': fetch_time,
+                    'total_periods': total,
+                    'data': final_data_list
+                }
+                write_json_atomic(file_path, output_data)
+                journal.remember_base(final_data_list)
+                journal.discard()
+            get_history_cache().invalidate(file_path)
 
-            self.logger.info(f"数据更新成功: {lottery_type}，新增 {new_items_added} 条记录，总计 {len(final_data_list)} 条。")
+            self.logger.info(f"数据更新成功: {lottery_type}，新增 {len(new_items)} 条记录，总计 {total} 条。")
             return True
 
         except Exception as e:
             self.logger.error(f"更新数据失败: {str(e)}", exc_info=True) # 打印 traceback
             return False
 
+    def compact_history(self, lottery_type: str) -> bool:
+        """将追加日志中的新记录压缩合并到历史数据文件
+
+        Args:
+            lottery_type: 彩票类型
+
+        Returns:
+            是否执行了压缩
+        """
+        if lottery_type not in self.LOTTERY_TYPES:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        try:
+            compacted = HistoryJournal(self.data_files[lottery_type]).compact()
+        except Exception as e:
+            self.logger.error(f"压缩 {lottery_type} 历史数据日志失败: {e}")
+            return False
+        if compacted:
+            self._invalidate_columnar_store(lottery_type)
+        return compacted
+
     def _fetch_online_data_as_list(self, lottery_type: str, page_size: int = None) -> Optional[List[Dict]]:
         """获取在线数据并直接返回解析后的字典列表
 
@@ -272,35 +781,51 @@ class LotteryDataManager:
         
         # 获取备选API列表
         backup_apis = self.config_manager.get(f'api.backup_apis.{lottery_type}', [])
-        
-        # 尝试每个API源
+
+        sources = []
         for api_index, api_config in enumerate(backup_apis):
             api_name = api_config.get('name', f'API{api_index + 1}')
-            self.logger.info(f"尝试使用 {api_name} 获取 {lottery_type} 数据...")
-            
-            try:
-                result = self._fetch_from_single_api(api_config, lottery_type, page_size)
-                if result:
-                    self.logger.info(f"成功从 {api_name} 获取到 {len(result)} 条数据")
-                    return result
-                else:
-                    self.logger.warning(f"{api_name} 返回空数据，尝试下一个API源")
-                    
-            except Exception as e:
-                self.logger.error(f"从 {api_name} 获取数据失败: {str(e)}")
-                continue
-        
-        # 所有API都失败了
-        self.logger.error(f"所有 {lottery_type} API源都无法获取数据")
-        return None
-    
-    def _fetch_from_single_api(self, api_config: Dict, lottery_type: str, page_size: int) -> Optional[List[Dict]]:
+            if any(api_name == name for name, _ in sources):
+                api_name = f'{api_name}#{api_index + 1}'
+            sources.append((api_name, lambda cancel_event, api_config=api_config: self._fetch_from_single_api(
+                api_config, lottery_type, page_size, cancel_event)))
+
+        fetcher = HedgedFetcher(
+            stats=self._get_source_stats(),
+            mode=self.config_manager.get('api.fetch_mode', 'hedged'),
+            hedge_delay=self.config_manager.get('api.hedge_delay', 2.0),
+            max_workers=self.config_manager.get('api.max_parallel_sources', 3)
+        )
+        outcome = fetcher.fetch(sources, validate=self._is_valid_fetch_result)
+        if outcome is None:
+            # 所有API都失败了
+            self.logger.error(f"所有 {lottery_type} API源都无法获取数据")
+            return None
+
+        self.logger.info(f"成功从 {outcome.source} 获取到 {len(outcome.value)} 条数据")
+        return outcome.value
+
+    def _get_source_stats(self) -> SourceStatsRegistry:
+        """获取数据源统计登记表（保存在数据目录下，跨进程保留）"""
+        if self._source_stats is None:
+            self._source_stats = SourceStatsRegistry(self.data_path / 'source_stats.json')
+        return self._source_stats
+
+    @staticmethod
+    def _is_valid_fetch_result(result: Any) -> bool:
+        """数据源返回的结果是否可用：非空且每条记录都有期号"""
+        return (isinstance(result, list) and len(result) > 0
+                and all(isinstance(item, dict) and item.get('draw_num') for item in result))
+
+    def _fetch_from_single_api(self, api_config: Dict, lottery_type: str, page_size: int,
+                               cancel_event: Optional[threading.Event] = None) -> Optional[List[Dict]]:
         """从单个API源获取数据
         
         Args:
             api_config: API配置
             lottery_type: 彩票类型
             page_size: 页面大小
+            cancel_event: 取消事件，被设置后分页获取在下一页之前停止
             
         Returns:
             解析后的数据列表
@@ -322,75 +847,40 @@ class LotteryDataManager:
         
         # 根据API类型调整参数
         if api_type == 'sporttery':
-            return self._fetch_sporttery_data(network_client, parser, base_url, base_params, headers, lottery_type, page_size)
+            return self._fetch_sporttery_data(network_client, parser, base_url, base_params, headers, lottery_type, page_size,
+                                              cancel_event)
         elif api_type in ['500wan', 'sina', 'netease']:
             return self._fetch_simple_api_data(network_client, parser, base_url, base_params, headers, lottery_type, page_size)
         elif api_type == 'cwl':
-            return self._fetch_cwl_data(network_client, parser, base_url, base_params, headers, lottery_type, page_size)
+            return self._fetch_cwl_data(network_client, parser, base_url, base_params, headers, lottery_type, page_size,
+                                             cancel_event)
         else:
             self.logger.error(f"不支持的API类型: {api_type}")
             return None
     
     def _fetch_sporttery_data(self, network_client, parser, base_url: str, params: Dict, headers: Dict, 
-                             lottery_type: str, page_size: int) -> Optional[List[Dict]]:
+                             lottery_type: str, page_size: int,
+                             cancel_event: Optional[threading.Event] = None) -> Optional[List[Dict]]:
         """获取体彩网数据（支持分页）"""
-        max_pages = self.config_manager.get('api.max_pages', 100)
-        all_items = []
-        page_no = 1
-        fetch_delay = 1
-        
         # 更新页面大小参数
         params['pageSize'] = str(page_size)
-        
-        while page_no <= max_pages:
-            params['pageNo'] = str(page_no)
-            
-            try:
-                data = network_client.get_json(base_url, params=params, headers=headers)
-                parsed_items = parser.parse(data, lottery_type)
-                
-                if not parsed_items:
-                    if page_no == 1:
-                        # 第一页就没数据，可能是API问题
-                        self.logger.warning("体彩网API第一页返回空数据")
-                        return None
-                    else:
-                        # 后续页面没数据，正常结束
-                        break
-                
-                all_items.extend(parsed_items)
-                
-                # 检查日期限制
-                if parsed_items:
-                    last_item_date_str = parsed_items[-1].get('draw_date', '')
-                    try:
-                        last_item_dt = pd.to_datetime(last_item_date_str)
-                        if last_item_dt < self.date_limit:
-                            break
-                    except ValueError:
-                        pass
-                
-                # 检查是否还有更多页面
-                if isinstance(data, dict) and data.get('success'):
-                    total_count = data.get('value', {}).get('total', 0)
-                    page_size_param = int(params.get('pageSize', 30))
-                    if total_count > 0 and page_size_param > 0:
-                        total_pages = (total_count + page_size_param - 1) // page_size_param
-                        if page_no >= total_pages:
-                            break
-                
-                page_no += 1
-                if page_no <= max_pages:
-                    time.sleep(fetch_delay)
-                    
-            except Exception as e:
-                self.logger.error(f"获取体彩网第 {page_no} 页数据失败: {str(e)}")
-                if page_no == 1:
-                    return None  # 第一页失败直接返回
-                else:
-                    break  # 后续页面失败则结束
-        
-        return all_items if all_items else None
+
+        def fetch_page(page_no: int) -> Page:
+            data, digest = network_client.get_json_with_digest(base_url, params=dict(params, pageNo=str(page_no)),
+                                                               headers=headers)
+            page = Page(page_no, parser.parse_body(data, lottery_type, digest))
+            # 根据总记录数计算总页数
+            if isinstance(data, dict) and data.get('success'):
+                total_count = data.get('value', {}).get('total', 0)
+                if total_count > 0 and page_size > 0:
+                    page.total_pages = (total_count + page_size - 1) // page_size
+            return page
+
+        items = self._fetch_paginated(fetch_page, base_url, lottery_type, page_size, cancel_event)
+        if items is None:
+            # 第一页就没数据，可能是API问题
+            self.logger.warning("体彩网API第一页未返回数据")
+        return items
     
     def _fetch_simple_api_data(self, network_client, parser, base_url: str, params: Dict, headers: Dict,
                               lottery_type: str, page_size: int) -> Optional[List[Dict]]:
@@ -406,12 +896,12 @@ class LotteryDataManager:
             
             # 根据API类型选择请求方式
             if base_url.endswith('.json'):
-                data = network_client.get_json(base_url, params=params, headers=headers)
+                data, digest = network_client.get_json_with_digest(base_url, params=params, headers=headers)
             else:
                 response = network_client.get(base_url, params=params, headers=headers)
-                data = response.text
+                data, digest = response.text, response.body_digest
             
-            parsed_items = parser.parse(data, lottery_type)
+            parsed_items = parser.parse_body(data, lottery_type, digest)
             return parsed_items if parsed_items else None
             
         except Exception as e:
@@ -419,62 +909,75 @@ class LotteryDataManager:
             return None
     
     def _fetch_cwl_data(self, network_client, parser, base_url: str, params: Dict, headers: Dict,
-                       lottery_type: str, page_size: int) -> Optional[List[Dict]]:
+                       lottery_type: str, page_size: int,
+                       cancel_event: Optional[threading.Event] = None) -> Optional[List[Dict]]:
         """获取福彩网数据（支持分页）"""
-        max_pages = self.config_manager.get('api.max_pages', 100)
-        all_items = []
-        page_no = 1
-        fetch_delay = 1
-        
         # 更新页面大小参数
         params['pageSize'] = str(page_size)
-        
-        while page_no <= max_pages:
-            params['pageNo'] = str(page_no)
-            
-            try:
-                data = network_client.get_json(base_url, params=params, headers=headers)
-                parsed_items = parser.parse(data, lottery_type)
-                
-                if not parsed_items:
-                    if page_no == 1:
-                        self.logger.warning("福彩网API第一页返回空数据")
-                        return None
-                    else:
-                        break
-                
-                all_items.extend(parsed_items)
-                
-                # 检查日期限制
-                if parsed_items:
-                    last_item_date_str = parsed_items[-1].get('draw_date', '')
-                    try:
-                        last_item_dt = pd.to_datetime(last_item_date_str)
-                        if last_item_dt < self.date_limit:
-                            break
-                    except ValueError:
-                        pass
-                
-                # 检查是否还有更多页面
-                if isinstance(data, dict) and data.get('state') == 0:
-                    # 福彩网的分页逻辑可能需要根据实际API调整
-                    if len(parsed_items) < int(params.get('pageSize', 30)):
-                        break  # 返回数据少于请求数量，说明没有更多数据
-                
-                page_no += 1
-                if page_no <= max_pages:
-                    time.sleep(fetch_delay)
-                    
-            except Exception as e:
-                self.logger.error(f"获取福彩网第 {page_no} 页数据失败: {str(e)}")
-                if page_no == 1:
-                    return None
-                else:
-                    break
-        
-        return all_items if all_items else None
-    
 
+        def fetch_page(page_no: int) -> Page:
+            data, digest = network_client.get_json_with_digest(base_url, params=dict(params, pageNo=str(page_no)),
+                                                               headers=headers)
+            page = Page(page_no, parser.parse_body(data, lottery_type, digest))
+            # 返回数据少于请求数量，说明没有更多数据
+            if isinstance(data, dict) and data.get('state') == 0:
+                page.last = len(page.items) < page_size
+            return page
+
+        items = self._fetch_paginated(fetch_page, base_url, lottery_type, page_size, cancel_event)
+        if items is None:
+            self.logger.warning("福彩网API第一页未返回数据")
+        return items
+
+    def _fetch_paginated(self, fetch_page, base_url: str, lottery_type: str, page_size: int,
+                         cancel_event: Optional[threading.Event] = None) -> Optional[List[Dict]]:
+        """并发分页获取，遇到本地已有期号时停止，中断的回填下次从游标处继续
+
+        Args:
+            fetch_page: 分页获取函数，接收页码返回 Page
+            base_url: API地址（用于按主机限速和区分游标）
+            lottery_type: 彩票类型
+            page_size: 页面大小
+            cancel_event: 取消事件
+
+        Returns:
+            按页码顺序合并的记录列表，第一页失败或为空时返回 None
+        """
+        bucket = get_host_bucket(
+            urlparse(base_url).netloc,
+            self.config_manager.get('api.host_rate_limit', 4.0),
+            self.config_manager.get('api.host_rate_burst', 4)
+        )
+        fetcher = PaginatedFetcher(
+            concurrency=self.config_manager.get('api.page_concurrency', 4),
+            bucket=bucket,
+            cursors=self._get_page_cursors(),
+            max_pages=self.config_manager.get('api.max_pages', 100)
+        )
+        return fetcher.fetch(
+            fetch_page,
+            cursor_key=f'{lottery_type}:{base_url}:{page_size}',
+            known_draw_nums=self._known_draw_nums(lottery_type),
+            date_limit=self.date_limit,
+            cancel_event=cancel_event
+        )
+
+    def _get_page_cursors(self) -> PageCursorStore:
+        """获取回填游标存储（保存在数据目录下）"""
+        if self._page_cursors is None:
+            self._page_cursors = PageCursorStore(self.data_path / 'fetch_cursors.json')
+        return self._page_cursors
+
+    def _known_draw_nums(self, lottery_type: str) -> set:
+        """本地已保存的期号（读取失败时返回空集合，此时完整回填）"""
+        file_path = self.data_files.get(lottery_type)
+        if file_path is None or not file_path.exists():
+            return set()
+        try:
+            return {str(item.get('draw_num')) for item in get_history_cache().get_records(file_path)}
+        except Exception as e:
+            self.logger.warning(f"读取已有期号失败: {e}")
+            return set()
 
     def get_issue_data(self, lottery_type: str, issue: str) -> Optional[Dict]:
         """从本地历史数据中获取指定期号的数据 (从 JSON 读取)
@@ -492,8 +995,7 @@ class LotteryDataManager:
             return None
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            raw_data = HistoryJournal(file_path).read_raw()
             data_list = raw_data.get('data', [])
 
             for item in data_list:
@@ -535,6 +1037,12 @@ class LotteryDataManager:
             if format == 'json':
                  source_file = self.data_files[lottery_type]
                  if source_file.exists():
+                     journal = HistoryJournal(source_file)
+                     if journal.journal_path.exists():
+                         # 存在未压缩的追加日志时导出合并后的数据
+                         with open(file_path_obj, 'w', encoding='utf-8') as f:
+                             json.dump(journal.read_raw(), f, ensure_ascii=False, indent=2)
+                         return True
                      import shutil
                      shutil.copyfile(source_file, file_path_obj)
                      return True
@@ -610,9 +1118,7 @@ class LotteryDataManager:
             existing_data_list = []
             if target_file_path.exists():
                 try:
-                    with open(target_file_path, 'r', encoding='utf-8') as f:
-                        existing_raw_data = json.load(f)
-                    existing_data_list = existing_raw_data.get('data', [])
+                    existing_data_list = HistoryJournal(target_file_path).read_records()
                 except Exception as e:
                     self.logger.warning(f"读取现有数据文件 {target_file_path} 出错: {e}，将覆盖。")
 
@@ -637,8 +1143,10 @@ class LotteryDataManager:
                 'data': final_data_list
             }
 
-            with open(target_file_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            self._invalidate_columnar_store(lottery_type)
+            write_json_atomic(target_file_path, output_data)
+            HistoryJournal(target_file_path).discard()
+            get_history_cache().invalidate(target_file_path)
 
             self.logger.info(f"成功从 {file_path} 导入 {imported_count} 条新记录到 {target_file_path}。")
             return True
@@ -6,12 +6,97 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
-import json
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config_manager import get_config_manager
+from ..storage import (
+    MemoCache, OccurrenceTable, OverlapIndex, data_version, get_history_cache, get_occurrence_tables,
+    next_data_version, occurrence_tables
+)
+
+
+# evaluate 结果的详细程度
+DETAIL_LEVELS = ('scores', 'summary', 'full')
+
+
+class EvaluationResult(dict):
+    """按需生成完整详情的评价结果
+
+    只含得分（及摘要）；首次访问 frequency、missing、pattern、historical、suggestions
+    等详情键时才计算完整评价结果并补入，已有的得分不变。遍历键值（keys/items/values、
+    迭代、len、json.dumps、dict(...)）或检查详情键是否存在时同样先补全详情。
+    """
+
+    DETAIL_KEYS = ('frequency', 'missing', 'pattern', 'historical', 'suggestions')
+
+    def __init__(self, data: Dict[str, Any], full_loader: Callable[[], Dict[str, Any]]):
+        """初始化结果
+
+        Args:
+            data: 已计算的得分和摘要
+            full_loader: 计算完整评价结果的函数
+        """
+        super().__init__(data)
+        self._full_loader: Optional[Callable[[], Dict[str, Any]]] = full_loader
+
+    def load_full(self) -> 'EvaluationResult':
+        """计算并补入完整详情（只计算一次）"""
+        loader, self._full_loader = self._full_loader, None
+        if loader is not None:
+            for key, value in loader().items():
+                self.setdefault(key, value)
+        return self
+
+    def __missing__(self, key):
+        if key in self.DETAIL_KEYS and self._full_loader is not None:
+            self.load_full()
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self.DETAIL_KEYS and not dict.__contains__(self, key):
+            self.load_full()
+        return super().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        if key in self.DETAIL_KEYS and not dict.__contains__(self, key):
+            self.load_full()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        return dict.__iter__(self.load_full())
+
+    def __len__(self) -> int:
+        return dict.__len__(self.load_full())
+
+    def keys(self):
+        return dict.keys(self.load_full())
+
+    def items(self):
+        return dict.items(self.load_full())
+
+    def values(self):
+        return dict.values(self.load_full())
+
+    def __reduce__(self):
+        # 序列化前先补全详情，反序列化为普通字典
+        return dict, (dict(self.load_full()),)
 
 
 class BaseNumberEvaluator(ABC):
     """基础号码评价器抽象类"""
+
+    # 综合得分权重
+    SCORE_WEIGHTS = {
+        'frequency': 0.25,    # 频率权重 25%
+        'missing': 0.25,      # 遗漏权重 25%
+        'pattern': 0.30,      # 模式权重 30%
+        'uniqueness': 0.20    # 独特性权重 20%
+    }
+
+    # 彩票类型（子类设置，用于历史号码位图索引）
+    LOTTERY_TYPE = None
     
     def __init__(self, history_file: str):
         """初始化评价器
@@ -21,35 +106,128 @@ class BaseNumberEvaluator(ABC):
         """
         self.history_file = history_file
         self.history_data = None
-        self._cache = {}
-    
+        # 统计缓存：有条目数上限，键中包含历史数据版本，新开奖数据写入后自动失效
+        self._cache = MemoCache(type(self).__name__,
+                                get_config_manager().get('analysis.memo_cache_size', 256),
+                                source=history_file)
+        self._history_index = None
+        # 固定使用的内存历史数据（见 use_history）
+        self._fixed_history = None
+
+    def use_history(self, history_data: List[Dict]) -> None:
+        """固定使用内存中的历史数据，不再读取历史数据文件
+
+        用于多进程搜索的工作进程，保证各进程使用同一份历史数据快照。
+
+        Args:
+            history_data: 历史数据（最新在前，调用方不得再修改）
+        """
+        self._fixed_history = history_data
+        self._cache.set_version(('fixed', next_data_version()))
+        self.history_data = history_data
+
     def load_history(self, force_reload: bool = False) -> List[Dict]:
         """加载历史数据
-        
+
+        数据来自进程级共享缓存，多个评价器共用同一份只读记录；
+        文件变化后缓存自动失效，评价器内部的统计缓存随之清空。
+
         Args:
             force_reload: 是否强制重新加载
-            
+
         Returns:
-            历史数据列表
+            历史数据列表（只读）
         """
-        if self.history_data is None or force_reload:
-            if force_reload:
-                self.clear_cache()
-            
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.history_data = data.get('data', [])
-            except FileNotFoundError:
-                raise FileNotFoundError(f"历史数据文件不存在: {self.history_file}")
-            except json.JSONDecodeError:
-                raise ValueError(f"历史数据文件格式错误: {self.history_file}")
-        
+        if self._fixed_history is not None:
+            return self._fixed_history
+
+        history_cache = get_history_cache()
+        if force_reload:
+            history_cache.invalidate(self.history_file)
+
+        history_data = history_cache.get_records(self.history_file)
+        if history_data is not self.history_data:
+            self._cache.set_version(data_version(history_data))
+            self.history_data = history_data
+
         return self.history_data
     
+    def get_history_index(self, history_data: List[Dict]) -> OverlapIndex:
+        """历史号码位图索引
+
+        历史数据增加新的期时只追加新期的位图，不重建索引。
+
+        Args:
+            history_data: 历史数据（最新在前）
+
+        Returns:
+            与 history_data 同步的索引
+        """
+        if self._history_index is None:
+            self._history_index = OverlapIndex.for_lottery(self.LOTTERY_TYPE)
+        self._history_index.sync(history_data)
+        return self._history_index
+
+    def get_occurrence_tables(self, history_data: List[Dict]) -> Dict[str, OccurrenceTable]:
+        """各号码区的出现次数前缀和表
+
+        同一历史数据文件的评价器共用一份表，任意期数的频率和遗漏都直接查表。
+
+        Args:
+            history_data: 历史数据（最新在前）
+
+        Returns:
+            区名到出现次数表的字典
+        """
+        tables = self._cache.get('occurrence_tables')
+        if tables is None:
+            if self._fixed_history is not None:
+                tables = occurrence_tables(self.LOTTERY_TYPE, history_data)
+            else:
+                tables = get_occurrence_tables(self.LOTTERY_TYPE, self.history_file)
+            if any(len(table) != len(history_data) for table in tables.values()):
+                # 共享表与当前历史数据不一致（加载期间文件被改写）时单独构建
+                tables = occurrence_tables(self.LOTTERY_TYPE, history_data)
+            self._cache['occurrence_tables'] = tables
+        return tables
+
+    @staticmethod
+    def check_detail_level(detail_level: str) -> None:
+        """检查结果详细程度参数
+
+        Raises:
+            ValueError: 不支持的详细程度
+        """
+        if detail_level not in DETAIL_LEVELS:
+            raise ValueError(f"不支持的详细程度: {detail_level}，可选 {DETAIL_LEVELS}")
+
+    def make_result(self, scores: Dict[str, Any], summary: Optional[Dict[str, Any]],
+                    full_loader: Callable[[], Dict[str, Any]]) -> EvaluationResult:
+        """组装只含得分（及摘要）的评价结果
+
+        Args:
+            scores: calculate_composite_score 返回的得分字典
+            summary: 各维度摘要（None 表示不包含）
+            full_loader: 计算完整评价结果的函数
+
+        Returns:
+            首次访问详情时再计算完整结果的 EvaluationResult
+        """
+        data = {
+            'scores': scores,
+            'total_score': scores['total'],
+            'rating': scores['rating'],
+            'stars': scores['stars'],
+        }
+        if summary is not None:
+            data['summary'] = summary
+        return EvaluationResult(data, full_loader)
+
     @abstractmethod
     def evaluate(self, *args, **kwargs) -> Dict[str, Any]:
         """评价号码（子类必须实现）
+
+        detail_level 为 'scores' 或 'summary' 时只返回得分（及摘要），详情在首次访问时生成。
         
         Returns:
             评价结果字典，包含：
@@ -78,12 +256,7 @@ class BaseNumberEvaluator(ABC):
             包含各维度得分、总分和评级的字典
         """
         # 权重配置
-        weights = {
-            'frequency': 0.25,    # 频率权重 25%
-            'missing': 0.25,      # 遗漏权重 25%
-            'pattern': 0.30,      # 模式权重 30%
-            'uniqueness': 0.20    # 独特性权重 20%
-        }
+        weights = self.SCORE_WEIGHTS
         
         # 计算加权总分
         total_score = (
@@ -180,7 +353,11 @@ class BaseNumberEvaluator(ABC):
     
     def clear_cache(self):
         """清空缓存"""
-        self._cache.clear()
+        self._cache.invalidate()
+
+    def cache_info(self) -> Dict[str, Any]:
+        """统计缓存的命中、淘汰等信息"""
+        return self._cache.info()
     
     def get_cache_key(self, *args) -> str:
         """生成缓存键
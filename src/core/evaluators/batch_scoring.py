@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量评分内核
+评价器 evaluate_many 使用的数组运算：模式指标、历史重合度查询、与逐注评价一致的舍入，
+组合序编号，分块评分时的流式前 K 名选取，以及分支定界搜索用的得分上界
+"""
+
+import itertools
+from dataclasses import dataclass
+from math import comb
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..storage.combination_table import ac_values, binomial_table, colex_unrank
+
+# 每次批量处理的最大注数（控制中间数组的内存占用）
+CHUNK_SIZE = 1 << 18
+
+# 批量得分的维度
+SCORE_KEYS = ('frequency', 'missing', 'pattern', 'uniqueness', 'total')
+
+
+def as_number_array(numbers, width: int, number_range: Tuple[int, int], label: str,
+                    count: Optional[int] = None) -> np.ndarray:
+    """校验并转换号码数组
+
+    Args:
+        numbers: 号码数组，形状 (N, width)
+        width: 每注号码个数
+        number_range: 号码取值范围
+        label: 错误信息中的名称
+        count: 期望的注数（None 表示不检查）
+
+    Returns:
+        int64 号码数组
+
+    Raises:
+        ValueError: 形状、类型不正确或号码超出范围
+    """
+    numbers = np.asarray(numbers)
+    if numbers.ndim != 2 or numbers.shape[1] != width or (count is not None and numbers.shape[0] != count):
+        raise ValueError(f"{label}数组形状应为 ({'N' if count is None else count}, {width})，实际为 {numbers.shape}")
+    if numbers.size and not np.issubdtype(numbers.dtype, np.integer):
+        raise ValueError(f"{label}数组必须为整数类型")
+    numbers = numbers.astype(np.int64, copy=False)
+    if numbers.size and (numbers.min() < number_range[0] or numbers.max() > number_range[1]):
+        raise ValueError(f"{label}号码超出范围 {number_range}")
+    return numbers
+
+
+def score_in_chunks(score_chunk: Callable[..., Dict[str, np.ndarray]], *arrays: np.ndarray) -> Dict[str, np.ndarray]:
+    """按 CHUNK_SIZE 分块计算得分并拼接"""
+    chunks = [score_chunk(*(array[start:start + CHUNK_SIZE] for array in arrays))
+              for start in range(0, len(arrays[0]), CHUNK_SIZE)]
+    if not chunks:
+        return {key: np.zeros(0) for key in SCORE_KEYS}
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in SCORE_KEYS}
+
+
+def python_round(values: np.ndarray, ndigits: int = 1, numpy_scalar: Optional[np.ndarray] = None) -> np.ndarray:
+    """与逐注评价中 round 结果一致的舍入
+
+    round 对 Python float 按十进制精确舍入，对 np.float64 则与 np.round 相同
+    （先乘以 10**ndigits 再取整）；两者在 .5 附近可能不同，此时 Python float
+    元素改用 round 逐个计算。
+
+    Args:
+        values: 待舍入的数组
+        ndigits: 保留的小数位数
+        numpy_scalar: 逐注评价中为 np.float64 的元素（None 表示均为 Python float）
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if numpy_scalar is not None:
+        ambiguous &= ~numpy_scalar
+    ambiguous = np.flatnonzero(ambiguous)
+    if len(ambiguous):
+        flat = result.reshape(-1)
+        source = values.reshape(-1)
+        flat[ambiguous] = [round(float(source[i]), ndigits) for i in ambiguous]
+    return result
+
+
+def row_mean(values: np.ndarray) -> np.ndarray:
+    """逐行均值，按列顺序累加（与 np.mean 对短列表的累加顺序一致）"""
+    total = np.zeros(values.shape[0], dtype=np.float64)
+    for column in range(values.shape[1]):
+        total = total + values[:, column]
+    return total / values.shape[1]
+
+
+def tier_points(best: np.ndarray, good: np.ndarray, best_points: int = 20, good_points: int = 15) -> np.ndarray:
+    """模式评分：最佳区间得满分，合理区间得部分分，其余不得分"""
+    return np.where(best, best_points, np.where(good, good_points, 0))
+
+
+def is_number(value, max_number: int) -> bool:
+    """是否为 1..max_number 范围内的整数号码"""
+    try:
+        return int(value) == value and 1 <= value <= max_number
+    except (TypeError, ValueError):
+        return False
+
+
+def row_has_duplicates(numbers: np.ndarray) -> np.ndarray:
+    """逐行判断是否有重复号码"""
+    ordered = np.sort(numbers, axis=1)
+    return (np.diff(ordered, axis=1) == 0).any(axis=1)
+
+
+class SubsetPresence:
+    """历史号码子集表
+
+    把历史每期号码集合的所有 k 元子集按组合序（colex）编号记录在稠密布尔表中，
+    一注号码与历史的最大重合数即其存在于表中的最大子集的元素个数。
+    历史各期可以分组登记（一期可属于多个组），查询时按组只统计组内各期。
+    """
+
+    def __init__(self, max_number: int, max_size: int, draws: Iterable[Iterable[int]],
+                 groups: Optional[Iterable[Iterable[int]]] = None, group_count: int = 1):
+        """构建子集表
+
+        Args:
+            max_number: 号码上限（号码取值 1..max_number）
+            max_size: 记录的最大子集大小（一注号码的个数）
+            draws: 历史每期的号码
+            groups: 每期所属的组编号（None 表示全部属于第 0 组）
+            group_count: 组数
+        """
+        self.max_number = max_number
+        self.max_size = max_size
+        self.group_count = group_count
+        # binomial[n, k] = C(n, k)
+        self.binomial = binomial_table(max_number, max_size)
+        self.sizes = [comb(max_number, k) for k in range(max_size + 1)]
+        # tables[k][group * C(max_number, k) + rank]；0 元子集表示组内有历史数据
+        self.tables = [np.zeros(group_count * size, dtype=bool) for size in self.sizes]
+
+        regular: List[List[int]] = []
+        regular_groups: List[int] = []
+        draw_groups = groups if groups is not None else itertools.repeat((0,))
+        for numbers, members in zip(draws, draw_groups):
+            unique = sorted({int(n) - 1 for n in numbers if self._valid(n)})
+            for group in members:
+                self.tables[0][group] = True
+                if len(unique) == max_size:
+                    regular.append(unique)
+                    regular_groups.append(group)
+                    continue
+                for k in range(1, min(len(unique), max_size) + 1):
+                    for subset in itertools.combinations(unique, k):
+                        self.tables[k][group * self.sizes[k] + self._rank_one(subset)] = True
+        if regular:
+            rows = np.array(regular, dtype=np.int64)
+            offsets = np.array(regular_groups, dtype=np.int64)
+            for k in range(1, max_size + 1):
+                for columns in itertools.combinations(range(max_size), k):
+                    self.tables[k][offsets * self.sizes[k] + self.ranks(rows[:, columns])] = True
+
+    def _valid(self, number) -> bool:
+        return is_number(number, self.max_number)
+
+    def _rank_one(self, subset: Sequence[int]) -> int:
+        return int(sum(self.binomial[c, i + 1] for i, c in enumerate(subset)))
+
+    def ranks(self, subsets: np.ndarray) -> np.ndarray:
+        """升序排列的 0 基号码子集（每行一个）的组合序编号"""
+        rank = np.zeros(subsets.shape[0], dtype=np.int64)
+        for i in range(subsets.shape[1]):
+            rank += self.binomial[subsets[:, i], i + 1]
+        return rank
+
+    def contains(self, sorted_numbers: np.ndarray) -> np.ndarray:
+        """整注号码（升序，1 基）是否在历史中出现过（第 0 组）"""
+        return self.tables[sorted_numbers.shape[1]][self.ranks(sorted_numbers - 1)]
+
+    def max_overlap(self, sorted_numbers: np.ndarray, groups: Optional[np.ndarray] = None,
+                    floor: Optional[np.ndarray] = None) -> np.ndarray:
+        """每注号码（升序、无重复，1 基）与历史各期的最大重合数
+
+        Args:
+            sorted_numbers: 号码数组，每行一注
+            groups: 每注查询的组编号（None 表示第 0 组）
+            floor: 每注已知的下界，只查找大于下界的重合数（None 表示 0）
+
+        Returns:
+            最大重合数；不超过下界（或组内没有历史数据）时返回下界
+        """
+        zero_based = sorted_numbers - 1
+        count, width = zero_based.shape
+        groups = np.zeros(count, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        result = np.zeros(count, dtype=np.int64) if floor is None else np.array(floor, dtype=np.int64)
+        pending = np.arange(count)
+        for k in range(width, -1, -1):
+            pending = pending[result[pending] < k]
+            if not len(pending):
+                break
+            rows = zero_based[pending]
+            offsets = groups[pending] * self.sizes[k]
+            if k == 0:
+                found = self.tables[0][offsets]
+            else:
+                found = np.zeros(len(pending), dtype=bool)
+                for columns in itertools.combinations(range(width), k):
+                    found |= self.tables[k][offsets + self.ranks(rows[:, columns])]
+            result[pending[found]] = k
+            pending = pending[~found]
+        return result
+
+
+def lex_ranks(sorted_numbers: np.ndarray, max_number: int) -> np.ndarray:
+    """升序 1 基号码组合在全部 C(max_number, k) 组合中的字典序编号"""
+    size = sorted_numbers.shape[1]
+    binomial = binomial_table(max_number, size)
+    # 把号码 n 映射为 max_number - n 后的组合序编号即字典序的逆序
+    mirrored = (max_number - sorted_numbers)[:, ::-1]
+    rank = np.zeros(len(sorted_numbers), dtype=np.int64)
+    for i in range(size):
+        rank += binomial[mirrored[:, i], i + 1]
+    return comb(max_number, size) - 1 - rank
+
+
+def composite_scores(freq_score: np.ndarray, missing_score: np.ndarray, pattern_score: np.ndarray,
+                     uniqueness_score: np.ndarray, weights: Dict[str, float],
+                     numpy_scalar: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """批量计算综合得分（与 calculate_composite_score 的运算顺序和舍入一致）
+
+    Args:
+        freq_score, missing_score, pattern_score, uniqueness_score: 各维度得分数组
+        weights: 综合得分权重
+        numpy_scalar: 逐注评价中频率/遗漏得分为 np.float64 的元素（键为 'frequency'、'missing'）
+    """
+    numpy_scalar = numpy_scalar or {}
+    freq_numpy = numpy_scalar.get('frequency')
+    missing_numpy = numpy_scalar.get('missing')
+    total_numpy = None
+    if freq_numpy is not None or missing_numpy is not None:
+        no_rows = np.zeros(len(freq_score), dtype=bool)
+        total_numpy = (no_rows if freq_numpy is None else freq_numpy) | \
+                      (no_rows if missing_numpy is None else missing_numpy)
+
+    total = (freq_score * weights['frequency'] +
+             missing_score * weights['missing'] +
+             pattern_score * weights['pattern'] +
+             uniqueness_score * weights['uniqueness'])
+    return {
+        'frequency': python_round(freq_score, 1, freq_numpy),
+        'missing': python_round(missing_score, 1, missing_numpy),
+        'pattern': python_round(pattern_score),
+        'uniqueness': python_round(uniqueness_score),
+        'total': python_round(total, 1, total_numpy),
+    }
+
+
+def ranges_overlap(low: np.ndarray, high: np.ndarray, target_low: float, target_high: float) -> np.ndarray:
+    """取值区间 [low, high] 与目标区间 [target_low, target_high] 是否相交"""
+    return (high >= target_low) & (low <= target_high)
+
+
+@dataclass
+class ScoreBounds:
+    """综合得分的可分离上界模型（分支定界搜索用）
+
+    主区频率、遗漏得分是号码取值均值的单调不减函数，模式得分和独特性得分由已选号码给出
+    上界，副区对综合得分的贡献可加。已选部分主区号码时，补足剩余号码的最好情况即为上界；
+    上界不考虑舍入（综合得分舍入到 0.1，可能高出上界 0.05）。
+    """
+    main_count: int
+    freq_values: np.ndarray                             # 按号码索引的频率取值
+    freq_score: Callable[[np.ndarray], np.ndarray]      # 均值 -> 主区频率得分（单调不减）
+    freq_weight: float                                  # 主区频率得分在综合得分中的权重
+    missing_values: np.ndarray                          # 按号码索引的遗漏取值（越大越好）
+    missing_score: Callable[[np.ndarray], np.ndarray]   # 均值 -> 主区遗漏得分（单调不减）
+    missing_weight: float
+    pattern_bound: Callable[[np.ndarray, int], np.ndarray]  # (已选号码, 剩余个数) -> 模式得分上界
+    pattern_weight: float
+    presence: 'SubsetPresence'                          # 历史主区子集表
+    overlap_points: int                                 # 每个重合号码扣除的独特性分数
+    uniqueness_weight: float
+    extra_scores: Callable[[np.ndarray], np.ndarray]    # 副区号码组合 (E, w) -> 对综合得分的贡献
+
+    def upper(self, numbers: np.ndarray, freq_rest: np.ndarray, missing_rest: np.ndarray) -> np.ndarray:
+        """已选部分主区号码时主区部分综合得分的上界（不含副区贡献）
+
+        Args:
+            numbers: 已选号码 (N, d)，d <= main_count
+            freq_rest: 剩余号码频率取值之和的上界 (N,)
+            missing_rest: 剩余号码遗漏取值之和的上界 (N,)
+        """
+        count, chosen = numbers.shape
+        freq_mean = (self.freq_values[numbers].sum(axis=1) + freq_rest) / self.main_count
+        missing_mean = (self.missing_values[numbers].sum(axis=1) + missing_rest) / self.main_count
+        overlap = np.zeros(count, dtype=np.int64)
+        if chosen:
+            # 已选号码与历史的最大重合数只会随号码增加而增大
+            overlap = self.presence.max_overlap(np.sort(numbers, axis=1))
+        uniqueness = np.maximum(0, 100 - overlap * self.overlap_points)
+        return (self.freq_weight * self.freq_score(freq_mean) +
+                self.missing_weight * self.missing_score(missing_mean) +
+                self.pattern_weight * self.pattern_bound(numbers, self.main_count - chosen) +
+                self.uniqueness_weight * uniqueness)
+
+
+class StreamingTopK:
+    """分块评分的流式前 K 名（含并列）
+
+    只保留不低于当前第 K 名分数的条目：第 K 名分数为截断线，与截断线相等（np.isclose）
+    的并列条目全部保留。输出按分数降序，同分按序号（默认为加入的先后顺序）升序，与对全部
+    候选稳定排序后截断的结果一致。各分片的局部结果可用 push 合并（传入各自的序号）。
+    """
+
+    def __init__(self, k: int):
+        """初始化
+
+        Args:
+            k: 名次数（并列时实际条目可能更多）
+        """
+        if k < 1:
+            raise ValueError(f"k 必须为正整数，实际为 {k}")
+        self.k = k
+        self.seen = 0
+        self._scores = np.zeros(0, dtype=np.float64)
+        self._order = np.zeros(0, dtype=np.int64)
+        self._items: Optional[np.ndarray] = None
+
+    @property
+    def cutoff(self) -> Optional[float]:
+        """当前截断分数（不足 K 条时为 None）"""
+        if len(self._scores) < self.k:
+            return None
+        return float(-np.partition(-self._scores, self.k - 1)[self.k - 1])
+
+    def _keep(self, scores: np.ndarray, cutoff: float) -> np.ndarray:
+        return (scores >= cutoff) | np.isclose(scores, cutoff)
+
+    def push(self, scores: np.ndarray, items: np.ndarray, order: Optional[np.ndarray] = None) -> None:
+        """加入一批候选
+
+        Args:
+            scores: 得分数组，形状 (N,)
+            items: 候选数组，形状 (N, ...)，与得分一一对应
+            order: 同分时的排序序号（None 表示按加入顺序）
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        items = np.asarray(items)
+        if order is None:
+            order = np.arange(self.seen, self.seen + len(scores), dtype=np.int64)
+        else:
+            order = np.asarray(order, dtype=np.int64)
+        self.seen += len(scores)
+
+        cutoff = self.cutoff
+        if cutoff is not None:
+            mask = self._keep(scores, cutoff)
+            scores, items, order = scores[mask], items[mask], order[mask]
+        if not len(scores):
+            return
+
+        self._scores = np.concatenate([self._scores, scores])
+        self._order = np.concatenate([self._order, order])
+        self._items = items.copy() if self._items is None else np.concatenate([self._items, items])
+        cutoff = self.cutoff
+        if cutoff is not None:
+            mask = self._keep(self._scores, cutoff)
+            self._scores, self._order, self._items = self._scores[mask], self._order[mask], self._items[mask]
+
+    def entries(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """当前保留的 (得分, 候选, 序号) 数组（未排序）"""
+        if self._items is None:
+            return self._scores, np.zeros((0,)), self._order
+        return self._scores, self._items, self._order
+
+    def results(self) -> List[Tuple[float, np.ndarray]]:
+        """前 K 名（含并列），按分数降序、同分按序号排列
+
+        Returns:
+            (得分, 候选) 列表
+        """
+        if self._items is None:
+            return []
+        ranking = np.lexsort((self._order, -self._scores))
+        return [(float(self._scores[i]), self._items[i]) for i in ranking]
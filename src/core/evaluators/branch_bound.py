@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分支定界搜索
+按号码的单项得分从高到低逐个选取主区号码，用评价器给出的可分离得分上界（ScoreBounds）
+估计子树内号码的最高综合得分，剪去不可能超过当前第 K 名的子树。结果与全空间搜索
+（sharded_search.search_top_k）完全一致，包括并列名次及其顺序，但只需评分少量号码。
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import batch_scoring
+from .sharded_search import EVALUATORS, LAYOUTS, ProgressCallback, SearchSpace, history_exact_keys, number_masks
+
+logger = logging.getLogger(__name__)
+
+# 剪枝余量：综合得分舍入到 0.1（最多高出上界 0.05），第 K 名并列按 np.isclose 判断
+BOUND_SLACK = 0.05 + 1e-3 + 1e-6
+
+
+@dataclass
+class BranchBoundResult:
+    """分支定界搜索结果"""
+    results: List[Tuple[float, np.ndarray]]  # 前 K 名（含并列）: (得分, 主区号码 + 副区号码)
+    scored: int                               # 实际评分的号码注数
+    nodes: int                                # 计算上界的部分号码组合数
+    space_size: int                           # 搜索空间注数（过滤前）
+    elapsed: float                            # 用时（秒）
+
+    @property
+    def throughput(self) -> float:
+        """评分吞吐（注/秒）"""
+        return self.scored / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def scored_fraction(self) -> float:
+        """实际评分的注数占搜索空间的比例"""
+        return self.scored / self.space_size if self.space_size else 0.0
+
+
+class _BoundSearch:
+    """一次分支定界搜索的状态
+
+    节点为按单项得分排序后的号码位置组合（升序），子节点在最后一个位置之后追加一个位置；
+    剩余号码的频率、遗漏取值之和用各位置之后的最大若干项之和作为上界。
+    """
+
+    def __init__(self, space: SearchSpace, top_k: int, evaluator, periods: Optional[int]):
+        self.space = space
+        self.evaluator = evaluator
+        self.periods = periods
+        self.bounds: batch_scoring.ScoreBounds = evaluator.score_bounds(periods)
+        self.main_max, self.count, self.extra_max, _ = LAYOUTS[space.lottery_type]
+        self.top = batch_scoring.StreamingTopK(top_k)
+        self.nodes = 0
+        self.scored = 0
+
+        bounds = self.bounds
+        numbers = np.asarray(space.main_numbers, dtype=np.int64)
+        # 单个号码的得分（假设全部号码与之相同）从高到低排列，使高分组合先被搜索
+        single = (bounds.freq_weight * bounds.freq_score(bounds.freq_values[numbers]) +
+                  bounds.missing_weight * bounds.missing_score(bounds.missing_values[numbers]))
+        self.ordered = numbers[np.argsort(-single, kind='stable')]
+        self.freq_rest = self._suffix_best(bounds.freq_values[self.ordered])
+        self.missing_rest = self._suffix_best(bounds.missing_values[self.ordered])
+
+        self.extras = np.array(space.extras, dtype=np.int64)
+        self.extra_scores = np.asarray(bounds.extra_scores(self.extras), dtype=np.float64)
+        self.best_extra = float(self.extra_scores.max()) if len(self.extras) else 0.0
+        self.extra_keys = number_masks(self.extras)
+        self.exact_keys = history_exact_keys(space, evaluator.load_history())
+
+    def _suffix_best(self, values: np.ndarray) -> np.ndarray:
+        """table[j, r] = 位置 j 之后（含 j）最大 r 个取值之和"""
+        size = len(values)
+        table = np.zeros((size + 1, self.count + 1), dtype=np.float64)
+        for start in range(size):
+            best = np.cumsum(np.sort(values[start:])[::-1])[:self.count]
+            table[start, 1:len(best) + 1] = best
+        return table
+
+    def upper(self, positions: np.ndarray) -> np.ndarray:
+        """节点（含副区最好情况）的综合得分上界"""
+        self.nodes += len(positions)
+        chosen = positions.shape[1]
+        start = positions[:, -1] + 1 if chosen else np.zeros(len(positions), dtype=np.int64)
+        remaining = self.count - chosen
+        return self.bounds.upper(self.ordered[positions], self.freq_rest[start, remaining],
+                                 self.missing_rest[start, remaining]) + self.best_extra
+
+    def children(self, positions: np.ndarray) -> np.ndarray:
+        """子节点：在最后一个位置之后追加一个位置（保证剩余位置足够补足号码）"""
+        chosen = positions.shape[1]
+        last = positions[:, -1] if chosen else np.full(len(positions), -1, dtype=np.int64)
+        limit = len(self.ordered) - (self.count - chosen - 1)
+        counts = np.maximum(0, limit - (last + 1))
+        parents = np.repeat(np.arange(len(positions)), counts)
+        offsets = np.arange(len(parents)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.hstack([positions[parents], (last[parents] + 1 + offsets)[:, None]])
+
+    def prune(self, positions: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """剪去上界低于当前第 K 名的节点"""
+        cutoff = self.top.cutoff
+        if cutoff is None:
+            return positions, upper
+        keep = upper >= cutoff - BOUND_SLACK
+        return positions[keep], upper[keep]
+
+    def expand(self, root: np.ndarray) -> None:
+        """搜索一个子树：逐层展开并剪枝，到主区号码选满时评分"""
+        positions = root[None, :]
+        while positions.shape[1] < self.count and len(positions):
+            positions = self.children(positions)
+            positions, _ = self.prune(positions, self.upper(positions))
+        if len(positions):
+            self.score_leaves(positions)
+
+    def score_leaves(self, positions: np.ndarray) -> None:
+        """为主区号码已选满的节点搭配副区号码，对上界不低于第 K 名的号码评分"""
+        mains = np.sort(self.ordered[positions], axis=1)
+        if self.space.main_filter is not None:
+            keep = np.asarray(self.space.main_filter(mains), dtype=bool)
+            mains, positions = mains[keep], positions[keep]
+        if not len(mains):
+            return
+        main_upper = self.upper(positions) - self.best_extra
+        extra_count = len(self.extras)
+        main_rows = np.repeat(np.arange(len(mains)), extra_count)
+        extra_rows = np.tile(np.arange(extra_count), len(mains))
+        upper = main_upper[main_rows] + self.extra_scores[extra_rows]
+        cutoff = self.top.cutoff
+        keep = np.ones(len(main_rows), dtype=bool) if cutoff is None else upper >= cutoff - BOUND_SLACK
+        keys = (number_masks(mains)[main_rows] << self.extra_max) | self.extra_keys[extra_rows]
+        keep &= ~np.isin(keys, self.exact_keys)
+        main_rows, extra_rows = main_rows[keep], extra_rows[keep]
+        if not len(main_rows):
+            return
+
+        # 上界高的先评分，尽早抬高截断分数
+        ranking = np.argsort(-upper[keep], kind='stable')
+        main_rows, extra_rows = main_rows[ranking], extra_rows[ranking]
+        lex = batch_scoring.lex_ranks(mains, self.main_max)
+        for chunk in range(0, len(main_rows), batch_scoring.CHUNK_SIZE):
+            rows = main_rows[chunk:chunk + batch_scoring.CHUNK_SIZE]
+            extra_idx = extra_rows[chunk:chunk + batch_scoring.CHUNK_SIZE]
+            totals = self.evaluator.evaluate_many(mains[rows], self.extras[extra_idx], self.periods)['total']
+            self.top.push(totals, np.hstack([mains[rows], self.extras[extra_idx]]),
+                          lex[rows] * extra_count + extra_idx)
+            self.scored += len(rows)
+
+
+def branch_bound_top_k(space: SearchSpace, top_k: int, history_data: Sequence[Dict],
+                       evaluator_options: Optional[Dict[str, Any]] = None, periods: Optional[int] = None,
+                       split_depth: Optional[int] = None,
+                       progress: Optional[ProgressCallback] = None) -> BranchBoundResult:
+    """用分支定界查找评分最高的号码（排除与历史某期完全相同的号码）
+
+    先把前 split_depth 个号码位置的全部组合按上界从高到低排列，依次搜索各子树；
+    子树上界低于当前第 K 名时，其后的子树也不可能更好，搜索结束。
+
+    Args:
+        space: 搜索空间（main_filter 只在主区号码选满时检查）
+        top_k: 名次数（含并列）
+        history_data: 历史数据（最新在前）
+        evaluator_options: 评价器构造参数
+        periods: 分析期数（None表示使用全部数据）
+        split_depth: 划分子树的深度（None 表示主区号码个数减 3）
+        progress: 进度回调（按子树计数，剪枝结束时报告完成）
+
+    Returns:
+        搜索结果
+    """
+    start_time = time.time()
+    evaluator = EVALUATORS[space.lottery_type](**dict(evaluator_options or {}))
+    evaluator.use_history(history_data)
+    search = _BoundSearch(space, top_k, evaluator, periods)
+
+    depth = max(0, search.count - 3) if split_depth is None else max(0, min(split_depth, search.count))
+    roots = np.zeros((1, 0), dtype=np.int64)
+    for _ in range(depth):
+        roots = search.children(roots)
+    upper = search.upper(roots)
+    ranking = np.argsort(-upper, kind='stable')
+    roots, upper = roots[ranking], upper[ranking]
+
+    total = len(roots)
+    for done, (root, bound) in enumerate(zip(roots, upper)):
+        cutoff = search.top.cutoff
+        if cutoff is not None and bound < cutoff - BOUND_SLACK:
+            logger.info(f"分支定界：{total - done}/{total} 个子树的上界低于第 {top_k} 名 ({cutoff})，已剪枝")
+            if progress is not None:
+                progress(total, total, 0.0)
+            break
+        search.expand(root)
+        if progress is not None:
+            elapsed = time.time() - start_time
+            progress(done + 1, total, elapsed / (done + 1) * (total - done - 1))
+
+    return BranchBoundResult(search.top.results(), search.scored, search.nodes, space.size,
+                             time.time() - start_time)
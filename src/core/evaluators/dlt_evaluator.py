@@ -5,14 +5,32 @@
 基于历史数据从统计角度评价大乐透号码
 """
 
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from collections import Counter
+from itertools import combinations
 import numpy as np
 from .base_evaluator import BaseNumberEvaluator
+from . import batch_scoring
 
 
 class DLTNumberEvaluator(BaseNumberEvaluator):
     """大乐透号码评价器"""
+
+    LOTTERY_TYPE = 'dlt'
+
+    # 模式指标的评价文字（按评价图标）
+    PATTERN_RATINGS = {
+        'odd_even': {"✅": "奇偶比合理，常见模式", "✓": "奇偶比可接受", "⚠️": "奇偶比极端"},
+        'big_small': {"✅": "大小比合理，常见模式", "✓": "大小比可接受", "⚠️": "大小比极端"},
+        'zone': {"✅": "三区都有号码，分布均衡", "✓": "覆盖两个区间，分布合理", "⚠️": "号码集中在一个区间"},
+        'sum': {"✅": "和值在常见范围内（70-110）", "✓": "和值合理（50-130）", "⚠️": "和值偏离常见范围"},
+        'span': {"✅": "跨度在常见范围内（15-30）", "✓": "跨度合理（10-34）", "⚠️": "跨度偏离常见范围"},
+        'ac_value': {"✅": "AC值较高，号码复杂度好", "✓": "AC值中等，复杂度合理", "⚠️": "AC值较低"},
+        'back_odd_even': {"✅": "后区奇偶比均衡", "✓": "后区奇偶比可接受"},
+    }
+
+    # 模式得分：图标为 ✅ 或 ✓ 的指标得分
+    PATTERN_POINTS = {'odd_even': 15, 'big_small': 15, 'zone': 20, 'sum': 20, 'ac_value': 15, 'back_odd_even': 15}
     
     def __init__(self, history_file: str = 'data/dlt_history.json'):
         """初始化大乐透评价器
@@ -26,7 +44,8 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
         self.front_count = 5  # 前区数量
         self.back_count = 2   # 后区数量
     
-    def evaluate(self, front_numbers: List[int], back_numbers: List[int], periods: int = None, force_reload: bool = False) -> Dict[str, Any]:
+    def evaluate(self, front_numbers: List[int], back_numbers: List[int], periods: int = None, force_reload: bool = False,
+                 detail_level: str = 'full') -> Dict[str, Any]:
         """评价大乐透号码
 
         Args:
@@ -34,10 +53,17 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
             back_numbers: 后区号码列表（2个）
             periods: 分析期数（None表示使用全部数据）
             force_reload: 是否强制重新加载历史数据
+            detail_level: 结果详细程度：'scores' 只含得分，'summary' 另含得分所用的各维度摘要，
+                'full' 含完整分析详情和建议；前两者在首次访问详情键时再生成完整结果
 
         Returns:
             评价结果字典
+
+        Raises:
+            ValueError: 不支持的详细程度
         """
+        self.check_detail_level(detail_level)
+
         # 加载历史数据
         history_data = self.load_history(force_reload=force_reload)
 
@@ -47,6 +73,16 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
         else:
             periods = min(periods, len(history_data))
 
+        if detail_level != 'full':
+            summary = self._score_summary(front_numbers, back_numbers, history_data, periods)
+            return self.make_result(
+                self._compute_scores(summary), summary if detail_level == 'summary' else None,
+                lambda: self._evaluate_full(front_numbers, back_numbers, history_data, periods))
+        return self._evaluate_full(front_numbers, back_numbers, history_data, periods)
+
+    def _evaluate_full(self, front_numbers: List[int], back_numbers: List[int], history_data: List[Dict],
+                       periods: int) -> Dict[str, Any]:
+        """完整评价（含各维度详情和建议）"""
         # 1. 频率分析
         freq_result = self._analyze_frequency(front_numbers, back_numbers, history_data, periods)
 
@@ -77,6 +113,261 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
             'suggestions': suggestions
         }
     
+    def evaluate_many(self, fronts: np.ndarray, backs: np.ndarray, periods: int = None,
+                      force_reload: bool = False) -> Dict[str, np.ndarray]:
+        """批量评价大乐透号码（只计算得分）
+
+        使用预先统计的号码频率/遗漏表和数组化的模式指标，各维度得分与逐注调用
+        evaluate 得到的 scores 一致（含舍入）。
+
+        Args:
+            fronts: 前区号码数组，形状 (N, 5)
+            backs: 后区号码数组，形状 (N, 2)
+            periods: 分析期数（None表示使用全部数据）
+            force_reload: 是否强制重新加载历史数据
+
+        Returns:
+            各维度得分数组：frequency、missing、pattern、uniqueness、total
+
+        Raises:
+            ValueError: 数组形状不正确或号码超出范围
+        """
+        fronts = batch_scoring.as_number_array(fronts, self.front_count, self.front_range, '前区')
+        backs = batch_scoring.as_number_array(backs, self.back_count, self.back_range, '后区', count=len(fronts))
+
+        history_data = self.load_history(force_reload=force_reload)
+        if periods is None:
+            periods = len(history_data)
+        else:
+            periods = min(periods, len(history_data))
+        tables = self._batch_tables(history_data, periods)
+
+        return batch_scoring.score_in_chunks(
+            lambda front_chunk, back_chunk: self._score_batch(front_chunk, back_chunk, history_data, periods, tables),
+            fronts, backs)
+
+    def _batch_tables(self, history_data: List[Dict], periods: int) -> Dict[str, Any]:
+        """批量评分用的号码统计表（带缓存）"""
+        cache_key = self.get_cache_key('batch_tables', periods)
+        tables = self._cache.get(cache_key)
+        if tables is not None:
+            return tables
+
+        counters = self._frequency_counters(history_data, periods)
+        missing_maps = self._missing_maps(history_data)
+        tables = {
+            # 按号码索引（下标 0 不使用）
+            'front_freq': np.array([counters['front'].get(n, 0) for n in range(36)], dtype=np.float64),
+            'front_missing': np.array([missing_maps['front_missing'].get(n, 0) for n in range(36)],
+                                      dtype=np.float64),
+        }
+        tables.update(self._history_subsets(history_data))
+        self._cache[cache_key] = tables
+        return tables
+
+    @staticmethod
+    def _back_pair_rank(low, high):
+        """后区两个号码（0 基，low < high）的组合序编号"""
+        return high * (high - 1) // 2 + low
+
+    def _history_subsets(self, history_data: List[Dict]) -> Dict[str, Any]:
+        """历史前区子集表（整体、按后区号码、按后区号码对分组）和完全匹配键（带缓存）
+
+        一注号码与某期的前后区总重合数 = 前区重合数 + 后区重合数，
+        最大值为 max(整体前区最大重合, 1 + 含任一后区号码各期的前区最大重合,
+        2 + 后区完全相同各期的前区最大重合)。
+        """
+        cache_key = 'history_subsets'
+        subsets = self._cache.get(cache_key)
+        if subsets is not None:
+            return subsets
+
+        fronts = [draw['front_numbers'] for draw in history_data]
+        backs = [sorted({int(n) - 1 for n in draw['back_numbers'] if batch_scoring.is_number(n, 12)})
+                 for draw in history_data]
+        pairs = [[self._back_pair_rank(low, high) for low, high in combinations(back, 2)] for back in backs]
+        front_all = batch_scoring.SubsetPresence(35, self.front_count, fronts)
+        subsets = {
+            'front_all': front_all,
+            'front_by_back': batch_scoring.SubsetPresence(35, self.front_count, fronts, backs, group_count=12),
+            'front_by_pair': batch_scoring.SubsetPresence(35, self.front_count, fronts, pairs, group_count=66),
+        }
+
+        # 完全匹配键：前区组合序编号 * 66 + 后区号码对编号
+        exact_keys = []
+        for draw, back in zip(history_data, backs):
+            front = draw['front_numbers']
+            if (len(set(front)) == self.front_count and len(back) == self.back_count
+                    and len(set(draw['back_numbers'])) == self.back_count
+                    and all(batch_scoring.is_number(n, 35) for n in front)):
+                rank = front_all.ranks(np.array([sorted(int(n) - 1 for n in front)], dtype=np.int64))[0]
+                exact_keys.append(int(rank) * 66 + self._back_pair_rank(*back))
+        subsets['exact_keys'] = np.unique(np.array(exact_keys, dtype=np.int64))
+        self._cache[cache_key] = subsets
+        return subsets
+
+    def score_bounds(self, periods: int = None, force_reload: bool = False) -> batch_scoring.ScoreBounds:
+        """综合得分的可分离上界模型（与 evaluate_many 的得分公式对应，供分支定界搜索使用）
+
+        后区只影响独特性得分，上界只按前区与历史的重合数计算。
+
+        Args:
+            periods: 分析期数（None表示使用全部数据）
+            force_reload: 是否强制重新加载历史数据
+
+        Returns:
+            得分上界模型
+        """
+        history_data = self.load_history(force_reload=force_reload)
+        periods = len(history_data) if periods is None else min(periods, len(history_data))
+        tables = self._batch_tables(history_data, periods)
+        front_theory = periods * 5 / 35
+        weights = self.SCORE_WEIGHTS
+
+        def freq_score(mean):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                freq_raw = (mean / front_theory) * 50 + 50
+            return np.where(freq_raw < 100, freq_raw, 100.0)
+
+        return batch_scoring.ScoreBounds(
+            main_count=self.front_count,
+            freq_values=tables['front_freq'],
+            freq_score=freq_score,
+            freq_weight=weights['frequency'],
+            missing_values=-tables['front_missing'],
+            missing_score=lambda mean: np.clip(100 + mean * 2, 0, 100),
+            missing_weight=weights['missing'],
+            pattern_bound=self._pattern_bound,
+            pattern_weight=weights['pattern'],
+            presence=tables['front_all'],
+            overlap_points=12,
+            uniqueness_weight=weights['uniqueness'],
+            extra_scores=lambda extras: np.zeros(len(extras)),
+        )
+
+    @staticmethod
+    def _pattern_bound(fronts: np.ndarray, remaining: int) -> np.ndarray:
+        """已选部分前区号码、还需 remaining 个号码时模式得分的上界（已选完时为模式得分）"""
+        odd_count = (fronts % 2 == 1).sum(axis=1)
+        big_count = (fronts >= 18).sum(axis=1)
+        zones = np.stack([((fronts >= low) & (fronts <= high)).any(axis=1)
+                          for low, high in ((1, 12), (13, 24), (25, 35))], axis=1).sum(axis=1)
+        # 补足号码后和值的取值范围：最小为加上 1..remaining，最大为加上 35 往下 remaining 个号码
+        sum_low = fronts.sum(axis=1) + remaining * (remaining + 1) // 2
+        sum_high = fronts.sum(axis=1) + remaining * 35 - remaining * (remaining - 1) // 2
+        overlap = batch_scoring.ranges_overlap
+        if remaining:
+            ac_ok = np.ones(len(fronts), dtype=bool)
+        else:
+            ac_ok = batch_scoring.ac_values(np.sort(fronts, axis=1)) >= 3
+        return (
+            15 * overlap(odd_count, odd_count + remaining, 1, 4) +
+            15 * overlap(big_count, big_count + remaining, 1, 4) +
+            20 * (np.minimum(3, zones + remaining) >= 2) +
+            20 * overlap(sum_low, sum_high, 50, 130) +
+            15 * ac_ok +
+            15
+        ).astype(np.float64)
+
+    def _score_batch(self, fronts: np.ndarray, backs: np.ndarray, history_data: List[Dict],
+                     periods: int, tables: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """计算一批号码的各维度得分（运算顺序与 _calculate_scores 一致）"""
+        # 1. 频率得分（期数为 0 时理论频率为 0，逐注评价得到 inf/nan 后取 100）
+        front_theory = periods * 5 / 35
+        with np.errstate(divide='ignore', invalid='ignore'):
+            freq_raw = (batch_scoring.row_mean(tables['front_freq'][fronts]) / front_theory) * 50 + 50
+        freq_numpy = freq_raw < 100
+        freq_score = np.where(freq_numpy, freq_raw, 100.0)
+
+        # 2. 遗漏得分
+        missing_raw = 100 - batch_scoring.row_mean(tables['front_missing'][fronts]) * 2
+        missing_numpy = (missing_raw > 0) & (missing_raw < 100)
+        missing_score = np.clip(missing_raw, 0, 100)
+
+        # 3. 模式得分（后区奇偶总是合理，固定 15 分）
+        sorted_fronts = np.sort(fronts, axis=1)
+        odd_count = (fronts % 2 == 1).sum(axis=1)
+        big_count = (fronts >= 18).sum(axis=1)
+        zones = np.stack([((fronts >= low) & (fronts <= high)).any(axis=1)
+                          for low, high in ((1, 12), (13, 24), (25, 35))], axis=1).sum(axis=1)
+        sum_value = fronts.sum(axis=1)
+        ac_value = batch_scoring.ac_values(sorted_fronts)
+        pattern_score = (
+            15 * ((odd_count >= 1) & (odd_count <= 4)) +
+            15 * ((big_count >= 1) & (big_count <= 4)) +
+            20 * (zones >= 2) +
+            20 * ((sum_value >= 50) & (sum_value <= 130)) +
+            15 * (ac_value >= 3) +
+            15
+        ).astype(np.float64)
+
+        # 4. 独特性得分（与历史的最大前后区总重合数）
+        sorted_backs = np.sort(backs, axis=1)
+        duplicated = (batch_scoring.row_has_duplicates(sorted_fronts) |
+                      (sorted_backs[:, 0] == sorted_backs[:, 1]))
+        max_match = np.zeros(len(fronts), dtype=np.int64)
+        regular = np.flatnonzero(~duplicated)
+        if len(regular):
+            front_rows = sorted_fronts[regular]
+            low, high = sorted_backs[regular, 0] - 1, sorted_backs[regular, 1] - 1
+            best = tables['front_all'].max_overlap(front_rows)
+            for back in (low, high):
+                best = 1 + tables['front_by_back'].max_overlap(front_rows, back, floor=best - 1)
+            best = 2 + tables['front_by_pair'].max_overlap(front_rows, self._back_pair_rank(low, high),
+                                                           floor=best - 2)
+            max_match[regular] = best
+
+        # 与历史某期完全相同的号码：逐注对比在该期停止，只统计更新的各期
+        maybe_exact = np.flatnonzero(max_match == self.front_count + self.back_count)
+        if len(maybe_exact):
+            keys = (tables['front_all'].ranks(sorted_fronts[maybe_exact] - 1) * 66 +
+                    self._back_pair_rank(sorted_backs[maybe_exact, 0] - 1, sorted_backs[maybe_exact, 1] - 1))
+            for row in maybe_exact[np.isin(keys, tables['exact_keys'])]:
+                max_match[row] = self._historical_overlap(fronts[row].tolist(), backs[row].tolist(), history_data)[4]
+        uniqueness_score = np.maximum(0, 100 - max_match * 12).astype(np.float64)
+
+        # 逐注评价中经 np.mean 得到的前区得分是 np.float64，round 的舍入方式随之不同
+        scores = batch_scoring.composite_scores(freq_score, missing_score, pattern_score, uniqueness_score,
+                                                self.SCORE_WEIGHTS,
+                                                {'frequency': freq_numpy, 'missing': missing_numpy})
+
+        # 含重复号码的注按逐注评价计算
+        for row in np.flatnonzero(duplicated):
+            row_scores = self.evaluate(fronts[row].tolist(), backs[row].tolist(), periods, detail_level='scores')['scores']
+            for key in scores:
+                scores[key][row] = row_scores[key]
+        return scores
+
+    def _frequency_counters(self, history_data: List[Dict], periods: int) -> Dict[str, Counter]:
+        """最近 periods 期前后区号码出现次数（由出现次数前缀和表查得，带缓存）"""
+        cache_key = self.get_cache_key('freq_counters', periods)
+        counters = self._cache.get(cache_key)
+        if counters is None:
+            tables = self.get_occurrence_tables(history_data)
+            counters = {zone: Counter({number: count for number, count in enumerate(tables[zone].frequency(periods).tolist())
+                                       if count})
+                        for zone in ('front', 'back')}
+            self._cache[cache_key] = counters
+        return counters
+
+    def _missing_maps(self, history_data: List[Dict]) -> Dict[str, Any]:
+        """所有号码的当前遗漏期数和平均遗漏（带缓存）"""
+        cache_key = 'missing_maps'
+        missing_maps = self._cache.get(cache_key)
+        if missing_maps is None:
+            # 从最新一期开始计算的遗漏期数，从未出现的号码记为 0
+            tables = self.get_occurrence_tables(history_data)
+            front_missing = dict(enumerate(tables['front'].missing(default=0).tolist()[1:], start=1))
+            back_missing = dict(enumerate(tables['back'].missing(default=0).tolist()[1:], start=1))
+            missing_maps = {
+                'front_missing': front_missing,
+                'back_missing': back_missing,
+                'avg_front_missing': np.mean(list(front_missing.values())),
+                'avg_back_missing': np.mean(list(back_missing.values()))
+            }
+            self._cache[cache_key] = missing_maps
+        return missing_maps
+
     def _analyze_frequency(self, front_numbers: List[int], back_numbers: List[int], 
                           history_data: List[Dict], periods: int = 100) -> Dict:
         """频率分析
@@ -90,15 +381,10 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
         Returns:
             频率分析结果
         """
-        recent_data = history_data[:periods]
-        
-        # 统计频率
-        front_counter = Counter()
-        back_counter = Counter()
-        
-        for draw in recent_data:
-            front_counter.update(draw['front_numbers'])
-            back_counter.update(draw['back_numbers'])
+        # 统计频率（带缓存）
+        counters = self._frequency_counters(history_data, periods)
+        front_counter = counters['front']
+        back_counter = counters['back']
         
         # 计算理论频率
         front_theory = periods * 5 / 35  # 每个前区号码理论出现次数
@@ -155,26 +441,12 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
         Returns:
             遗漏分析结果
         """
-        # 计算所有号码的遗漏期数
-        front_missing = {i: 0 for i in range(1, 36)}
-        back_missing = {i: 0 for i in range(1, 13)}
-        
-        # 从最新一期开始，计算每个号码的遗漏期数
-        for num in range(1, 36):
-            for i, draw in enumerate(history_data):
-                if num in draw['front_numbers']:
-                    front_missing[num] = i
-                    break
-        
-        for num in range(1, 13):
-            for i, draw in enumerate(history_data):
-                if num in draw['back_numbers']:
-                    back_missing[num] = i
-                    break
-        
-        # 计算平均遗漏
-        avg_front_missing = np.mean(list(front_missing.values()))
-        avg_back_missing = np.mean(list(back_missing.values()))
+        # 所有号码的遗漏期数和平均遗漏（带缓存）
+        missing_maps = self._missing_maps(history_data)
+        front_missing = missing_maps['front_missing']
+        back_missing = missing_maps['back_missing']
+        avg_front_missing = missing_maps['avg_front_missing']
+        avg_back_missing = missing_maps['avg_back_missing']
         
         # 分析待评价号码的遗漏
         front_missing_details = []
@@ -208,6 +480,49 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
             'avg_back_missing': round(avg_back_missing, 1)
         }
     
+    def _pattern_metrics(self, front_numbers: List[int], back_numbers: List[int]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """模式指标及其评价图标
+
+        Args:
+            front_numbers: 前区号码列表
+            back_numbers: 后区号码列表
+
+        Returns:
+            (指标值, 各指标的评价图标，后区奇偶比为 back_odd_even)；模式得分只依赖图标
+        """
+        sorted_front = sorted(front_numbers)
+        odd_count = sum(1 for n in front_numbers if n % 2 == 1)
+        # 大号：18-35，小号：1-17
+        big_count = sum(1 for n in front_numbers if n >= 18)
+        # 区间：1-12, 13-24, 25-35
+        zones = [sum(1 for n in front_numbers if low <= n <= high) for low, high in ((1, 12), (13, 24), (25, 35))]
+        sum_value = sum(front_numbers)
+        span = max(front_numbers) - min(front_numbers)
+        ac_value = self._calculate_ac_value(sorted_front)
+        back_odd_count = sum(1 for n in back_numbers if n % 2 == 1)
+
+        values = {
+            'sorted': sorted_front,
+            'odd_count': odd_count,
+            'big_count': big_count,
+            'zones': zones,
+            'sum': sum_value,
+            'span': span,
+            'ac_value': ac_value,
+            'back_odd_count': back_odd_count,
+        }
+        icons = {
+            'odd_even': "✅" if 2 <= odd_count <= 3 else "✓" if 1 <= odd_count <= 4 else "⚠️",
+            'big_small': "✅" if 2 <= big_count <= 3 else "✓" if 1 <= big_count <= 4 else "⚠️",
+            'zone': ("✅" if all(z >= 1 for z in zones) else
+                     "✓" if sum(1 for z in zones if z > 0) >= 2 else "⚠️"),
+            'sum': "✅" if 70 <= sum_value <= 110 else "✓" if 50 <= sum_value <= 130 else "⚠️",
+            'span': "✅" if 15 <= span <= 30 else "✓" if 10 <= span <= 34 else "⚠️",
+            'ac_value': "✅" if ac_value >= 5 else "✓" if ac_value >= 3 else "⚠️",
+            'back_odd_even': "✅" if back_odd_count == 1 else "✓",
+        }
+        return values, icons
+
     def _analyze_patterns(self, front_numbers: List[int], back_numbers: List[int]) -> Dict:
         """模式分析
         
@@ -218,57 +533,14 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
         Returns:
             模式分析结果
         """
-        sorted_front = sorted(front_numbers)
-        sorted_back = sorted(back_numbers)
-        
-        # 前区分析
-        # 1. 奇偶比
-        odd_count = sum(1 for n in front_numbers if n % 2 == 1)
-        even_count = 5 - odd_count
-        odd_even_ratio = f"{odd_count}:{even_count}"
-        
-        if 2 <= odd_count <= 3:
-            odd_even_rating = "奇偶比合理，常见模式"
-            odd_even_icon = "✅"
-        elif 1 <= odd_count <= 4:
-            odd_even_rating = "奇偶比可接受"
-            odd_even_icon = "✓"
-        else:
-            odd_even_rating = "奇偶比极端"
-            odd_even_icon = "⚠️"
-        
-        # 2. 大小比（大号：18-35，小号：1-17）
-        big_count = sum(1 for n in front_numbers if n >= 18)
-        small_count = 5 - big_count
-        big_small_ratio = f"{big_count}:{small_count}"
-        
-        if 2 <= big_count <= 3:
-            big_small_rating = "大小比合理，常见模式"
-            big_small_icon = "✅"
-        elif 1 <= big_count <= 4:
-            big_small_rating = "大小比可接受"
-            big_small_icon = "✓"
-        else:
-            big_small_rating = "大小比极端"
-            big_small_icon = "⚠️"
-        
-        # 3. 区间分布（1-12, 13-24, 25-35）
-        zone1 = sum(1 for n in front_numbers if 1 <= n <= 12)
-        zone2 = sum(1 for n in front_numbers if 13 <= n <= 24)
-        zone3 = sum(1 for n in front_numbers if 25 <= n <= 35)
-        zone_distribution = f"{zone1}-{zone2}-{zone3}"
-        
-        if all(z >= 1 for z in [zone1, zone2, zone3]):
-            zone_rating = "三区都有号码，分布均衡"
-            zone_icon = "✅"
-        elif sum(1 for z in [zone1, zone2, zone3] if z > 0) >= 2:
-            zone_rating = "覆盖两个区间，分布合理"
-            zone_icon = "✓"
-        else:
-            zone_rating = "号码集中在一个区间"
-            zone_icon = "⚠️"
-        
-        # 4. 连号检测
+        values, icons = self._pattern_metrics(front_numbers, back_numbers)
+        sorted_front = values['sorted']
+        odd_count = values['odd_count']
+        big_count = values['big_count']
+        zone1, zone2, zone3 = values['zones']
+        back_odd_count = values['back_odd_count']
+
+        # 前区连号检测
         consecutive = []
         for i in range(len(sorted_front) - 1):
             if sorted_front[i+1] - sorted_front[i] == 1:
@@ -284,73 +556,23 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
             consecutive_rating = "连号较多"
             consecutive_icon = "⚠️"
         
-        # 5. 和值
-        sum_value = sum(front_numbers)
-        
-        if 70 <= sum_value <= 110:
-            sum_rating = "和值在常见范围内（70-110）"
-            sum_icon = "✅"
-        elif 50 <= sum_value <= 130:
-            sum_rating = "和值合理（50-130）"
-            sum_icon = "✓"
-        else:
-            sum_rating = "和值偏离常见范围"
-            sum_icon = "⚠️"
-        
-        # 6. 跨度
-        span = max(front_numbers) - min(front_numbers)
-        
-        if 15 <= span <= 30:
-            span_rating = "跨度在常见范围内（15-30）"
-            span_icon = "✅"
-        elif 10 <= span <= 34:
-            span_rating = "跨度合理（10-34）"
-            span_icon = "✓"
-        else:
-            span_rating = "跨度偏离常见范围"
-            span_icon = "⚠️"
-        
-        # 7. AC值
-        ac_value = self._calculate_ac_value(sorted_front)
-        
-        if ac_value >= 5:
-            ac_rating = "AC值较高，号码复杂度好"
-            ac_icon = "✅"
-        elif ac_value >= 3:
-            ac_rating = "AC值中等，复杂度合理"
-            ac_icon = "✓"
-        else:
-            ac_rating = "AC值较低"
-            ac_icon = "⚠️"
-        
-        # 后区分析
-        back_odd_count = sum(1 for n in back_numbers if n % 2 == 1)
-        back_even_count = 2 - back_odd_count
-        back_odd_even_ratio = f"{back_odd_count}:{back_even_count}"
-        
-        if back_odd_count == 1:
-            back_odd_even_rating = "后区奇偶比均衡"
-            back_odd_even_icon = "✅"
-        else:
-            back_odd_even_rating = "后区奇偶比可接受"
-            back_odd_even_icon = "✓"
-        
+        ratings = self.PATTERN_RATINGS
         return {
             'front': {
                 'odd_even': {
-                    'ratio': odd_even_ratio,
-                    'rating': odd_even_rating,
-                    'icon': odd_even_icon
+                    'ratio': f"{odd_count}:{5 - odd_count}",
+                    'rating': ratings['odd_even'][icons['odd_even']],
+                    'icon': icons['odd_even']
                 },
                 'big_small': {
-                    'ratio': big_small_ratio,
-                    'rating': big_small_rating,
-                    'icon': big_small_icon
+                    'ratio': f"{big_count}:{5 - big_count}",
+                    'rating': ratings['big_small'][icons['big_small']],
+                    'icon': icons['big_small']
                 },
                 'zone': {
-                    'distribution': zone_distribution,
-                    'rating': zone_rating,
-                    'icon': zone_icon
+                    'distribution': f"{zone1}-{zone2}-{zone3}",
+                    'rating': ratings['zone'][icons['zone']],
+                    'icon': icons['zone']
                 },
                 'consecutive': {
                     'count': len(consecutive),
@@ -359,26 +581,26 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
                     'icon': consecutive_icon
                 },
                 'sum': {
-                    'value': sum_value,
-                    'rating': sum_rating,
-                    'icon': sum_icon
+                    'value': values['sum'],
+                    'rating': ratings['sum'][icons['sum']],
+                    'icon': icons['sum']
                 },
                 'span': {
-                    'value': span,
-                    'rating': span_rating,
-                    'icon': span_icon
+                    'value': values['span'],
+                    'rating': ratings['span'][icons['span']],
+                    'icon': icons['span']
                 },
                 'ac_value': {
-                    'value': ac_value,
-                    'rating': ac_rating,
-                    'icon': ac_icon
+                    'value': values['ac_value'],
+                    'rating': ratings['ac_value'][icons['ac_value']],
+                    'icon': icons['ac_value']
                 }
             },
             'back': {
                 'odd_even': {
-                    'ratio': back_odd_even_ratio,
-                    'rating': back_odd_even_rating,
-                    'icon': back_odd_even_icon
+                    'ratio': f"{back_odd_count}:{2 - back_odd_count}",
+                    'rating': ratings['back_odd_even'][icons['back_odd_even']],
+                    'icon': icons['back_odd_even']
                 }
             }
         }
@@ -391,42 +613,34 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
                 differences.add(abs(numbers[i] - numbers[j]))
         return len(differences) - (len(numbers) - 1)
     
+    def _historical_overlap(self, front_numbers: List[int], back_numbers: List[int],
+                            history_data: List[Dict]) -> Tuple[Any, Optional[int], np.ndarray, np.ndarray, int]:
+        """与历史各期的前区、后区重合数
+
+        遇到完全相同的一期即停止，只统计更新的各期。
+
+        Returns:
+            (位图索引, 完全相同的最新一期位置或 None, 各期前区重合数, 各期后区重合数, 最大前后区总重合数)
+        """
+        index = self.get_history_index(history_data)
+        exact_position = index.exact_position(front_numbers, back_numbers)
+        front_match_counts = index.overlap_counts(front_numbers)[:exact_position]
+        back_match_counts = index.extra_overlap_counts(back_numbers)[:exact_position]
+        total_match_counts = front_match_counts + back_match_counts
+        max_match_count = int(total_match_counts.max()) if len(total_match_counts) else 0
+        return index, exact_position, front_match_counts, back_match_counts, max_match_count
+
     def _check_historical(self, front_numbers: List[int], back_numbers: List[int], 
                          history_data: List[Dict]) -> Dict:
         """历史对比"""
-        front_set = set(front_numbers)
-        back_set = set(back_numbers)
-        
-        exact_match = False
-        exact_match_period = None
-        front_match_counts = []
-        back_match_counts = []
-        max_match_count = 0
-        max_match_period = None
-        
-        for draw in history_data:
-            draw_front_set = set(draw['front_numbers'])
-            draw_back_set = set(draw['back_numbers'])
-            
-            # 检查完全匹配
-            if draw_front_set == front_set and draw_back_set == back_set:
-                exact_match = True
-                exact_match_period = draw['draw_num']
-                break
-            
-            # 统计前区匹配数
-            front_match = len(front_set & draw_front_set)
-            front_match_counts.append(front_match)
-            
-            # 统计后区匹配数
-            back_match = len(back_set & draw_back_set)
-            back_match_counts.append(back_match)
-            
-            # 记录最大匹配
-            total_match = front_match + back_match
-            if total_match > max_match_count:
-                max_match_count = total_match
-                max_match_period = draw['draw_num']
+        index, exact_position, front_match_counts, back_match_counts, max_match_count = self._historical_overlap(
+            front_numbers, back_numbers, history_data)
+        exact_match = exact_position is not None
+        exact_match_period = index.label(exact_position)
+
+        # 记录最大匹配（前区+后区，相同时取最新一期）
+        total_match_counts = front_match_counts + back_match_counts
+        max_match_period = index.label(int(total_match_counts.argmax())) if max_match_count > 0 else None
         
         # 评价
         if exact_match:
@@ -445,48 +659,81 @@ class DLTNumberEvaluator(BaseNumberEvaluator):
         return {
             'exact_match': exact_match,
             'exact_match_period': exact_match_period,
-            'max_front_match': max(front_match_counts) if front_match_counts else 0,
-            'max_back_match': max(back_match_counts) if back_match_counts else 0,
+            'max_front_match': int(front_match_counts.max()) if len(front_match_counts) else 0,
+            'max_back_match': int(back_match_counts.max()) if len(back_match_counts) else 0,
             'max_total_match': max_match_count,
             'max_match_period': max_match_period,
-            'avg_front_match': round(np.mean(front_match_counts), 2) if front_match_counts else 0,
-            'avg_back_match': round(np.mean(back_match_counts), 2) if back_match_counts else 0,
+            'avg_front_match': round(np.mean(front_match_counts), 2) if len(front_match_counts) else 0,
+            'avg_back_match': round(np.mean(back_match_counts), 2) if len(back_match_counts) else 0,
             'rating': rating,
             'icon': icon
         }
     
+    def _score_summary(self, front_numbers: List[int], back_numbers: List[int], history_data: List[Dict],
+                       periods: int) -> Dict[str, Any]:
+        """只计算得分所需的各维度统计量（不生成详情）
+
+        Args:
+            front_numbers: 前区号码列表
+            back_numbers: 后区号码列表
+            history_data: 历史数据
+            periods: 分析期数
+
+        Returns:
+            各维度摘要，可直接传给 _compute_scores
+        """
+        counters = self._frequency_counters(history_data, periods)
+        front_missing = self._missing_maps(history_data)['front_missing']
+        _, exact_position, _, _, max_total_match = self._historical_overlap(front_numbers, back_numbers, history_data)
+        return {
+            'front_frequencies': [counters['front'].get(num, 0) for num in front_numbers],
+            'front_theory': periods * 5 / 35,
+            'front_missings': [front_missing[num] for num in front_numbers],
+            'pattern_icons': self._pattern_metrics(front_numbers, back_numbers)[1],
+            'exact_match': exact_position is not None,
+            'max_total_match': max_total_match,
+        }
+
     def _calculate_scores(self, freq_result: Dict, missing_result: Dict, 
                          pattern_result: Dict, historical_result: Dict) -> Dict:
         """计算各维度得分"""
+        front_pattern = pattern_result['front']
+        pattern_icons = {key: front_pattern[key]['icon'] for key in self.PATTERN_RATINGS if key in front_pattern}
+        pattern_icons['back_odd_even'] = pattern_result['back']['odd_even']['icon']
+        return self._compute_scores({
+            'front_frequencies': [detail['frequency'] for detail in freq_result['front_details']],
+            'front_theory': freq_result['front_theory'],
+            'front_missings': [detail['missing'] for detail in missing_result['front_details']],
+            'pattern_icons': pattern_icons,
+            'exact_match': historical_result['exact_match'],
+            'max_total_match': historical_result['max_total_match'],
+        })
+
+    def _compute_scores(self, summary: Dict[str, Any]) -> Dict:
+        """由各维度摘要计算得分
+
+        Args:
+            summary: _score_summary 返回的摘要
+
+        Returns:
+            得分字典
+        """
         # 1. 频率得分
-        front_freqs = [detail['frequency'] for detail in freq_result['front_details']]
-        avg_front_freq = np.mean(front_freqs)
-        freq_score = min(100, (avg_front_freq / freq_result['front_theory']) * 50 + 50)
+        avg_front_freq = np.mean(summary['front_frequencies'])
+        freq_score = min(100, (avg_front_freq / summary['front_theory']) * 50 + 50)
         
         # 2. 遗漏得分
-        front_missings = [detail['missing'] for detail in missing_result['front_details']]
-        avg_front_missing = np.mean(front_missings)
+        avg_front_missing = np.mean(summary['front_missings'])
         missing_score = max(0, min(100, 100 - avg_front_missing * 2))
         
         # 3. 模式得分
         pattern_score = 0
-        front_pattern = pattern_result['front']
-        
-        if front_pattern['odd_even']['icon'] in ['✅', '✓']:
-            pattern_score += 15
-        if front_pattern['big_small']['icon'] in ['✅', '✓']:
-            pattern_score += 15
-        if front_pattern['zone']['icon'] in ['✅', '✓']:
-            pattern_score += 20
-        if front_pattern['sum']['icon'] in ['✅', '✓']:
-            pattern_score += 20
-        if front_pattern['ac_value']['icon'] in ['✅', '✓']:
-            pattern_score += 15
-        if pattern_result['back']['odd_even']['icon'] in ['✅', '✓']:
-            pattern_score += 15
+        for key, points in self.PATTERN_POINTS.items():
+            if summary['pattern_icons'][key] in ['✅', '✓']:
+                pattern_score += points
         
         # 4. 独特性得分
-        uniqueness_score = max(0, 100 - historical_result['max_total_match'] * 12)
+        uniqueness_score = max(0, 100 - summary['max_total_match'] * 12)
         
         # 5. 综合得分
         return self.calculate_composite_score(freq_score, missing_score, pattern_score, uniqueness_score)
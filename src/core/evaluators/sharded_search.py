@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分片搜索引擎
+按主区组合序编号区间把号码空间划分为分片，多进程并行批量评分。工作进程从共享内存读取
+同一份历史号码快照，各自保留局部前 K 名，最后合并；完成的分片写入检查点，中断后重新
+运行时直接跳过。双色球和大乐透的最高评分搜索共用此引擎。
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from math import comb
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..storage import write_json_atomic
+from ..storage.occurrence_table import ZONE_FIELDS
+from ..storage.overlap_index import as_number_list
+from . import batch_scoring
+from .dlt_evaluator import DLTNumberEvaluator
+from .ssq_evaluator import SSQNumberEvaluator
+
+logger = logging.getLogger(__name__)
+
+# 各彩票类型的号码布局: (主区最大号码, 主区号码个数, 副区最大号码, 副区号码个数)
+LAYOUTS = {
+    'ssq': (33, 6, 16, 1),
+    'dlt': (35, 5, 12, 2),
+}
+
+EVALUATORS = {
+    'ssq': SSQNumberEvaluator,
+    'dlt': DLTNumberEvaluator,
+}
+
+# 单个号码（而非号码列表）的字段
+SCALAR_FIELDS = {'blue_number'}
+
+# 进度回调: (已处理注数, 总注数, 预计剩余秒数)
+ProgressCallback = Callable[[int, int, Optional[float]], None]
+
+
+@dataclass(frozen=True)
+class SearchSpace:
+    """号码搜索空间
+
+    主区从 main_numbers 中取 main_count 个号码（按组合序编号），每个主区组合与 extras 中的
+    每个副区组合搭配。main_filter 为可选的主区过滤函数：输入升序号码数组 (N, main_count)，
+    返回布尔掩码；多进程搜索时需为可被 pickle 的模块级函数。基于组合表的过滤函数可设置
+    pattern_mask 属性（返回全部组合掩码的函数），检查点签名直接使用该掩码。
+    """
+    lottery_type: str
+    main_numbers: Tuple[int, ...]
+    main_count: int
+    extras: Tuple[Tuple[int, ...], ...]
+    main_filter: Optional[Callable[[np.ndarray], np.ndarray]] = None
+
+    @classmethod
+    def for_lottery(cls, lottery_type: str, main_pool: Optional[Sequence[int]] = None,
+                    main_filter: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> 'SearchSpace':
+        """构建彩票类型的搜索空间
+
+        Args:
+            lottery_type: 彩票类型 ('ssq' 或 'dlt')
+            main_pool: 主区候选号码（None 表示全部号码）
+            main_filter: 主区过滤函数
+
+        Raises:
+            ValueError: 不支持的彩票类型或候选号码超出范围
+        """
+        if lottery_type not in LAYOUTS:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        main_max, main_count, extra_max, extra_count = LAYOUTS[lottery_type]
+        if main_pool is None:
+            main_numbers = tuple(range(1, main_max + 1))
+        else:
+            main_numbers = tuple(sorted({int(n) for n in main_pool}))
+            if main_numbers and (main_numbers[0] < 1 or main_numbers[-1] > main_max):
+                raise ValueError(f"主区候选号码超出范围 (1, {main_max})")
+        extras = tuple(itertools.combinations(range(1, extra_max + 1), extra_count))
+        return cls(lottery_type, main_numbers, main_count, extras, main_filter)
+
+    @property
+    def main_size(self) -> int:
+        """主区组合数"""
+        return comb(len(self.main_numbers), self.main_count)
+
+    @property
+    def size(self) -> int:
+        """号码总注数（过滤前）"""
+        return self.main_size * len(self.extras)
+
+    def mains(self, start: int, stop: int) -> np.ndarray:
+        """组合序编号在 [start, stop) 内的主区号码（每行升序）"""
+        combos = batch_scoring.colex_unrank(np.arange(start, stop, dtype=np.int64), self.main_count,
+                                            len(self.main_numbers))
+        return np.asarray(self.main_numbers, dtype=np.int64)[combos]
+
+    def filter_digest(self) -> Optional[str]:
+        """主区过滤条件实际掩码的摘要（无过滤条件时为 None）
+
+        过滤函数设置了 pattern_mask 属性时对其返回的组合表掩码求摘要，否则对搜索空间内
+        全部主区组合的过滤结果求摘要。
+        """
+        if self.main_filter is None:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        pattern_mask = getattr(self.main_filter, 'pattern_mask', None)
+        if callable(pattern_mask):
+            digest.update(np.packbits(np.asarray(pattern_mask(), dtype=bool)).tobytes())
+            return digest.hexdigest()
+        main_size = self.main_size
+        for start in range(0, main_size, batch_scoring.CHUNK_SIZE):
+            mains = self.mains(start, min(main_size, start + batch_scoring.CHUNK_SIZE))
+            digest.update(np.packbits(np.asarray(self.main_filter(mains), dtype=bool)).tobytes())
+        return digest.hexdigest()
+
+    def describe(self) -> Dict[str, Any]:
+        """用于检查点签名的描述（过滤条件按名称和实际掩码的摘要识别）"""
+        main_filter = self.main_filter
+        return {
+            'lottery_type': self.lottery_type,
+            'main_numbers': list(self.main_numbers),
+            'main_count': self.main_count,
+            'extras': [list(extra) for extra in self.extras],
+            'main_filter': None if main_filter is None else
+            f'{getattr(main_filter, "__module__", "")}.{getattr(main_filter, "__qualname__", repr(main_filter))}',
+            'main_filter_digest': self.filter_digest(),
+        }
+
+
+def _zone_values(record: Dict, field: str) -> List[int]:
+    """记录中某号码区的有效整数号码"""
+    try:
+        values = as_number_list(record.get(field))
+    except ValueError:
+        return []
+    return [int(n) for n in values if batch_scoring.is_number(n, np.iinfo(np.int16).max)]
+
+
+def pack_history(lottery_type: str, history_data: Sequence[Dict]) -> np.ndarray:
+    """把历史号码打包为 int16 数组：先是每期各号码区的号码个数，然后依次是全部号码"""
+    fields = [field for field, _ in ZONE_FIELDS[lottery_type].values()]
+    zones = [[_zone_values(record, field) for field in fields] for record in history_data]
+    lengths = [len(values) for record_zones in zones for values in record_zones]
+    numbers = [n for record_zones in zones for values in record_zones for n in values]
+    return np.array(lengths + numbers, dtype=np.int16)
+
+
+def unpack_history(lottery_type: str, count: int, array: np.ndarray) -> List[Dict]:
+    """由 pack_history 的数组还原只含期号（期位置）和号码字段的历史记录（最新在前）"""
+    fields = [field for field, _ in ZONE_FIELDS[lottery_type].values()]
+    lengths = array[:count * len(fields)].tolist()
+    numbers = array[count * len(fields):].tolist()
+    records, position = [], 0
+    for i in range(count):
+        record = {'draw_num': str(count - i)}
+        for j, field in enumerate(fields):
+            length = lengths[i * len(fields) + j]
+            values = numbers[position:position + length]
+            position += length
+            record[field] = values[0] if field in SCALAR_FIELDS and length == 1 else values
+        records.append(record)
+    return records
+
+
+class SharedHistory:
+    """共享内存中的只读历史号码快照（pack_history 的数组）"""
+
+    def __init__(self, lottery_type: str, packed: np.ndarray, count: int):
+        """把打包的历史号码写入共享内存
+
+        Args:
+            lottery_type: 彩票类型
+            packed: pack_history 的结果
+            count: 期数
+        """
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, packed.nbytes))
+        np.ndarray(packed.shape, dtype=np.int16, buffer=self._shm.buf)[:] = packed
+        self.spec = {'name': self._shm.name, 'lottery_type': lottery_type,
+                     'records': count, 'size': int(packed.size)}
+
+    @staticmethod
+    def attach(spec: Dict[str, Any]) -> List[Dict]:
+        """在工作进程中读取共享的历史号码，还原为历史记录列表
+
+        Args:
+            spec: SharedHistory.spec
+
+        Returns:
+            历史记录（见 unpack_history）
+        """
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        try:
+            array = np.ndarray((spec['size'],), dtype=np.int16, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+        return unpack_history(spec['lottery_type'], spec['records'], array)
+
+    def close(self) -> None:
+        """释放共享内存"""
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def history_exact_keys(space: SearchSpace, history_data: Sequence[Dict]) -> np.ndarray:
+    """历史各期号码的完全匹配键（主区位图左移副区位数后并上副区位图）"""
+    main_field, extra_field = [field for field, _ in ZONE_FIELDS[space.lottery_type].values()]
+    main_max, main_count, extra_max, extra_count = LAYOUTS[space.lottery_type]
+    keys = set()
+    for record in history_data:
+        main = set(_zone_values(record, main_field))
+        extra = set(_zone_values(record, extra_field))
+        if len(main) != main_count or len(extra) != extra_count:
+            continue
+        if max(main) > main_max or min(main) < 1 or max(extra) > extra_max or min(extra) < 1:
+            continue
+        keys.add((sum(1 << (n - 1) for n in main) << extra_max) | sum(1 << (n - 1) for n in extra))
+    return np.array(sorted(keys), dtype=np.int64)
+
+
+def number_masks(numbers: np.ndarray) -> np.ndarray:
+    """每行号码（1 基）的位图，与 history_exact_keys 的键配合使用"""
+    return np.bitwise_or.reduce(np.left_shift(np.int64(1), numbers - 1), axis=1)
+
+
+# 工作进程状态（由 _init_worker 设置）
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """初始化工作进程：读取共享历史数据并创建评价器"""
+    space = config['space']
+    history_data = config.get('history_data')
+    if history_data is None:
+        history_data = SharedHistory.attach(config['shared_history'])
+    evaluator = EVALUATORS[space.lottery_type](**config['evaluator_options'])
+    evaluator.use_history(history_data)
+    _worker.clear()
+    _worker.update(space=space, top_k=config['top_k'], periods=config.get('periods'), evaluator=evaluator,
+                   exact_keys=history_exact_keys(space, history_data))
+
+
+def _search_shard(shard_id: int, start: int, stop: int) -> Dict[str, Any]:
+    """搜索一个分片（主区组合序编号 [start, stop)），返回局部前 K 名"""
+    space: SearchSpace = _worker['space']
+    evaluator = _worker['evaluator']
+    main_max, _, extra_max, _ = LAYOUTS[space.lottery_type]
+    extras = np.array(space.extras, dtype=np.int64)
+    extra_keys = number_masks(extras)
+    extra_count = len(extras)
+    step = max(1, batch_scoring.CHUNK_SIZE // extra_count)
+
+    top = batch_scoring.StreamingTopK(_worker['top_k'])
+    checked = 0
+    for chunk_start in range(start, stop, step):
+        mains = space.mains(chunk_start, min(stop, chunk_start + step))
+        if space.main_filter is not None:
+            mains = mains[np.asarray(space.main_filter(mains), dtype=bool)]
+        if not len(mains):
+            continue
+        main_rows = np.repeat(np.arange(len(mains)), extra_count)
+        extra_rows = np.tile(np.arange(extra_count), len(mains))
+        keys = (number_masks(mains)[main_rows] << extra_max) | extra_keys[extra_rows]
+        keep = ~np.isin(keys, _worker['exact_keys'])
+        main_rows, extra_rows = main_rows[keep], extra_rows[keep]
+        if not len(main_rows):
+            continue
+
+        tickets = np.hstack([mains[main_rows], extras[extra_rows]])
+        totals = evaluator.evaluate_many(tickets[:, :mains.shape[1]], tickets[:, mains.shape[1]:],
+                                         _worker['periods'])['total']
+        # 同分按号码的字典序排列，与分片方式无关
+        order = batch_scoring.lex_ranks(mains, main_max)[main_rows] * extra_count + extra_rows
+        top.push(totals, tickets, order)
+        checked += len(tickets)
+
+    scores, items, order = top.entries()
+    return {'shard': shard_id, 'start': start, 'stop': stop, 'checked': checked,
+            'scores': scores.tolist(), 'items': np.asarray(items, dtype=np.int64).tolist(),
+            'order': order.tolist()}
+
+
+class ShardCheckpoints:
+    """分片检查点目录
+
+    每个完成的分片保存为一个 JSON 文件；签名（搜索空间、评分参数、历史数据、分片方式）
+    不一致的文件视为无效。
+    """
+
+    def __init__(self, directory: Union[str, Path], signature: str):
+        self.directory = Path(directory)
+        self.signature = signature
+
+    def _path(self, shard_id: int) -> Path:
+        return self.directory / f'shard_{shard_id:05d}.json'
+
+    def load(self, shard_id: int) -> Optional[Dict[str, Any]]:
+        """读取分片结果，不存在或签名不符时返回 None"""
+        try:
+            with open(self._path(shard_id), 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get('signature') != self.signature or payload.get('shard') != shard_id:
+            return None
+        return payload
+
+    def save(self, payload: Dict[str, Any]) -> None:
+        """保存分片结果"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self._path(payload['shard']), dict(payload, signature=self.signature), indent=None)
+
+
+@dataclass
+class SearchResult:
+    """分片搜索结果"""
+    results: List[Tuple[float, np.ndarray]]  # 前 K 名（含并列）: (得分, 主区号码 + 副区号码)
+    checked: int                              # 评分的号码注数（含检查点中的分片）
+    scored: int                               # 本次运行评分的号码注数
+    elapsed: float                            # 本次运行用时（秒）
+    shards: int                               # 分片数
+    resumed_shards: int                       # 从检查点恢复的分片数
+
+    @property
+    def throughput(self) -> float:
+        """本次运行的评分吞吐（注/秒）"""
+        return self.scored / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def search_top_k(space: SearchSpace, top_k: int, history_data: Sequence[Dict],
+                 evaluator_options: Optional[Dict[str, Any]] = None, workers: int = 1,
+                 shards: Optional[int] = None, checkpoint_dir: Optional[Union[str, Path]] = None,
+                 progress: Optional[ProgressCallback] = None, periods: Optional[int] = None) -> SearchResult:
+    """在搜索空间中查找评分最高的号码（排除与历史某期完全相同的号码）
+
+    各进程（含单进程模式）都使用同一份打包后还原的历史号码快照评分，结果与进程数、分片数无关。
+
+    Args:
+        space: 搜索空间
+        top_k: 名次数（含并列）
+        history_data: 历史数据（最新在前），评分和排除均使用这份数据
+        evaluator_options: 评价器构造参数（如蓝球权重、遗漏曲线）
+        workers: 工作进程数（1 表示在当前进程中计算）
+        shards: 分片数（None 表示单进程 1 片、多进程每个进程 8 片）
+        checkpoint_dir: 检查点目录（None 表示不保存）
+        progress: 进度回调
+        periods: 分析期数（None表示使用全部数据）
+
+    Returns:
+        搜索结果
+    """
+    evaluator_options = dict(evaluator_options or {})
+    workers = max(1, int(workers))
+    main_size = space.main_size
+    shard_count = shards or (1 if workers == 1 else workers * 8)
+    shard_count = max(1, min(shard_count, main_size))
+    bounds = [main_size * i // shard_count for i in range(shard_count + 1)]
+    ranges = [(i, bounds[i], bounds[i + 1]) for i in range(shard_count)]
+    extra_count = len(space.extras)
+    total = space.size
+
+    packed = pack_history(space.lottery_type, history_data)
+    checkpoints = None
+    if checkpoint_dir is not None:
+        signature = hashlib.blake2b(json.dumps({
+            'space': space.describe(), 'top_k': top_k, 'shards': shard_count, 'evaluator': evaluator_options,
+            'periods': periods,
+            'history': hashlib.blake2b(packed.tobytes(), digest_size=16).hexdigest(),
+        }, sort_keys=True, default=str).encode('utf-8'), digest_size=16).hexdigest()
+        checkpoints = ShardCheckpoints(checkpoint_dir, signature)
+
+    top = batch_scoring.StreamingTopK(top_k)
+    state = {'checked': 0, 'scored': 0, 'done': 0, 'scanned': 0}
+    pending = []
+    resumed = 0
+    for shard_id, start, stop in ranges:
+        payload = checkpoints.load(shard_id) if checkpoints is not None else None
+        if payload is None:
+            pending.append((shard_id, start, stop))
+            continue
+        resumed += 1
+        _merge(top, payload, state)
+        state['done'] += (stop - start) * extra_count
+    if resumed:
+        logger.info(f"从检查点恢复 {resumed}/{shard_count} 个分片")
+
+    start_time = time.time()
+
+    def finish(payload: Dict[str, Any]) -> None:
+        if checkpoints is not None:
+            checkpoints.save(payload)
+        _merge(top, payload, state)
+        state['scored'] += payload['checked']
+        scanned = (payload['stop'] - payload['start']) * extra_count
+        state['scanned'] += scanned
+        state['done'] += scanned
+        if progress is not None:
+            elapsed = time.time() - start_time
+            rate = state['scanned'] / elapsed if elapsed > 0 else 0.0
+            progress(state['done'], total, (total - state['done']) / rate if rate > 0 else None)
+
+    config = {'space': space, 'top_k': top_k, 'periods': periods, 'evaluator_options': evaluator_options}
+    if workers == 1 or len(pending) <= 1:
+        _init_worker(dict(config, history_data=unpack_history(space.lottery_type, len(history_data), packed)))
+        try:
+            for shard in pending:
+                finish(_search_shard(*shard))
+        finally:
+            _worker.clear()
+    else:
+        shared = SharedHistory(space.lottery_type, packed, len(history_data))
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker,
+                                     initargs=(dict(config, shared_history=shared.spec),)) as executor:
+                futures = [executor.submit(_search_shard, *shard) for shard in pending]
+                for future in as_completed(futures):
+                    finish(future.result())
+        finally:
+            shared.close()
+
+    elapsed = time.time() - start_time
+    return SearchResult([(score, item) for score, item in top.results()], state['checked'], state['scored'],
+                        elapsed, shard_count, resumed)
+
+
+def console_progress(done: int, total: int, eta: Optional[float]) -> None:
+    """在控制台输出搜索进度和预计剩余时间"""
+    percent = done / total * 100 if total else 100.0
+    eta_text = '--:--' if eta is None else time.strftime('%H:%M:%S', time.gmtime(eta))
+    print(f"\r搜索进度 {percent:5.1f}% ({done}/{total} 注)，预计剩余 {eta_text}",
+          end='\n' if done >= total else '', flush=True)
+
+
+def _merge(top: batch_scoring.StreamingTopK, payload: Dict[str, Any], state: Dict[str, int]) -> None:
+    """把分片的局部前 K 名并入结果"""
+    state['checked'] += payload['checked']
+    if payload['scores']:
+        top.push(np.array(payload['scores'], dtype=np.float64), np.array(payload['items'], dtype=np.int64),
+                 np.array(payload['order'], dtype=np.int64))
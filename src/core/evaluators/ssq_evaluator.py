@@ -5,14 +5,31 @@
 基于历史数据从统计角度评价双色球号码
 """
 
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from collections import Counter
 import numpy as np
 from .base_evaluator import BaseNumberEvaluator
+from . import batch_scoring
 
 
 class SSQNumberEvaluator(BaseNumberEvaluator):
     """双色球号码评价器"""
+
+    LOTTERY_TYPE = 'ssq'
+
+    # 模式指标的评价文字（按评价图标）
+    PATTERN_RATINGS = {
+        'odd_even': {"✅": "标准奇偶比（3:3），平衡性好", "✓": "奇偶比合理，常见模式",
+                     "⚠️": "奇偶比极端，出现概率较低"},
+        'big_small': {"✅": "标准大小比（3:3），平衡性好", "✓": "大小比合理，常见模式",
+                      "⚠️": "大小比极端，出现概率较低"},
+        'zone': {"✅": "三区都有号码，分布均衡", "✓": "覆盖两个区间，分布合理",
+                 "⚠️": "号码集中在一个区间，分布不均"},
+        'sum': {"✅": "和值在常见范围内（90-130）", "✓": "和值合理（70-150）", "⚠️": "和值偏离常见范围"},
+        'span': {"✅": "跨度在常见范围内（15-28）", "✓": "跨度合理（10-32）", "⚠️": "跨度偏离常见范围"},
+        'ac_value': {"✅": "AC值较高，号码复杂度好", "✓": "AC值中等，复杂度合理",
+                     "⚠️": "AC值较低，号码可能过于规律"},
+    }
     
     def __init__(self, history_file: str = 'data/ssq_history.json',
                  freq_blue_weight: float = 0.3,
@@ -40,7 +57,8 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         # 防止过小
         self.missing_sigma_factor = float(max(0.01, missing_sigma_factor))
 
-    def evaluate(self, red_numbers: List[int], blue_number: int, periods: int = None, force_reload: bool = False) -> Dict[str, Any]:
+    def evaluate(self, red_numbers: List[int], blue_number: int, periods: int = None, force_reload: bool = False,
+                 detail_level: str = 'full') -> Dict[str, Any]:
         """评价双色球号码
 
         Args:
@@ -48,10 +66,17 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             blue_number: 蓝球号码（1个）
             periods: 分析期数（None表示使用全部数据）
             force_reload: 是否强制重新加载历史数据
+            detail_level: 结果详细程度：'scores' 只含得分，'summary' 另含得分所用的各维度摘要，
+                'full' 含完整分析详情和建议；前两者在首次访问详情键时再生成完整结果
 
         Returns:
             评价结果字典
+
+        Raises:
+            ValueError: 不支持的详细程度
         """
+        self.check_detail_level(detail_level)
+
         # 加载历史数据
         history_data = self.load_history(force_reload=force_reload)
 
@@ -61,6 +86,16 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         else:
             periods = min(periods, len(history_data))
 
+        if detail_level != 'full':
+            summary = self._score_summary(red_numbers, blue_number, history_data, periods)
+            return self.make_result(
+                self._compute_scores(summary), summary if detail_level == 'summary' else None,
+                lambda: self._evaluate_full(red_numbers, blue_number, history_data, periods))
+        return self._evaluate_full(red_numbers, blue_number, history_data, periods)
+
+    def _evaluate_full(self, red_numbers: List[int], blue_number: int, history_data: List[Dict],
+                       periods: int) -> Dict[str, Any]:
+        """完整评价（含各维度详情和建议）"""
         # 1. 频率分析
         freq_result = self._analyze_frequency(red_numbers, blue_number, history_data, periods)
 
@@ -91,6 +126,287 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             'suggestions': suggestions
         }
     
+    def evaluate_many(self, reds: np.ndarray, blues: np.ndarray, periods: int = None,
+                      force_reload: bool = False) -> Dict[str, np.ndarray]:
+        """批量评价双色球号码（只计算得分）
+
+        使用预先统计的号码频率/遗漏表和数组化的模式指标，各维度得分与逐注调用
+        evaluate 得到的 scores 一致（含舍入）。
+
+        Args:
+            reds: 红球号码数组，形状 (N, 6)
+            blues: 蓝球号码数组，形状 (N,)
+            periods: 分析期数（None表示使用全部数据）
+            force_reload: 是否强制重新加载历史数据
+
+        Returns:
+            各维度得分数组：frequency、missing、pattern、uniqueness、total
+
+        Raises:
+            ValueError: 数组形状不正确或号码超出范围
+        """
+        reds = batch_scoring.as_number_array(reds, self.red_count, self.red_range, '红球')
+        blues = batch_scoring.as_number_array(np.reshape(blues, (-1, 1)), 1, self.blue_range, '蓝球',
+                                              count=len(reds))[:, 0]
+
+        history_data = self.load_history(force_reload=force_reload)
+        if periods is None:
+            periods = len(history_data)
+        else:
+            periods = min(periods, len(history_data))
+        tables = self._batch_tables(history_data, periods)
+
+        return batch_scoring.score_in_chunks(
+            lambda red_chunk, blue_chunk: self._score_batch(red_chunk, blue_chunk, history_data, periods, tables),
+            reds, blues)
+
+    def _batch_tables(self, history_data: List[Dict], periods: int) -> Dict[str, Any]:
+        """批量评分用的号码统计表（带缓存）"""
+        cache_key = self.get_cache_key('batch_tables', periods)
+        tables = self._cache.get(cache_key)
+        if tables is not None:
+            return tables
+
+        counters = self._frequency_counters(history_data, periods)
+        missing_maps = self._missing_maps(history_data)
+        tables = {
+            # 按号码索引（下标 0 不使用）
+            'red_freq': np.array([counters['red'].get(n, 0) for n in range(34)], dtype=np.float64),
+            'blue_freq': np.array([counters['blue'].get(n, 0) for n in range(17)], dtype=np.float64),
+            'red_missing': np.array([missing_maps['red_missing'].get(n, 0) for n in range(34)], dtype=np.float64),
+            'blue_missing': np.array([missing_maps['blue_missing'].get(n, 0) for n in range(17)], dtype=np.float64),
+            'avg_red_missing': float(missing_maps['avg_red_missing']),
+            'avg_blue_missing': float(missing_maps['avg_blue_missing']),
+        }
+        tables.update(self._history_subsets(history_data))
+        self._cache[cache_key] = tables
+        return tables
+
+    def _history_subsets(self, history_data: List[Dict]) -> Dict[str, Any]:
+        """历史红球子集表和完全匹配键（带缓存）"""
+        cache_key = 'history_subsets'
+        subsets = self._cache.get(cache_key)
+        if subsets is None:
+            presence = batch_scoring.SubsetPresence(33, self.red_count,
+                                                    (draw['red_numbers'] for draw in history_data))
+            # 完全匹配键：红球组合序编号 * 17 + 蓝球
+            exact_keys = []
+            for draw in history_data:
+                reds = draw['red_numbers']
+                blue = draw['blue_number']
+                if (len(set(reds)) == self.red_count and batch_scoring.is_number(blue, 16)
+                        and all(batch_scoring.is_number(n, 33) for n in reds)):
+                    rank = presence.ranks(np.array([sorted(int(n) - 1 for n in reds)], dtype=np.int64))[0]
+                    exact_keys.append(int(rank) * 17 + int(blue))
+            subsets = {'presence': presence, 'exact_keys': np.unique(np.array(exact_keys, dtype=np.int64))}
+            self._cache[cache_key] = subsets
+        return subsets
+
+    def score_bounds(self, periods: int = None, force_reload: bool = False) -> batch_scoring.ScoreBounds:
+        """综合得分的可分离上界模型（与 evaluate_many 的得分公式对应，供分支定界搜索使用）
+
+        Args:
+            periods: 分析期数（None表示使用全部数据）
+            force_reload: 是否强制重新加载历史数据
+
+        Returns:
+            得分上界模型
+        """
+        history_data = self.load_history(force_reload=force_reload)
+        periods = len(history_data) if periods is None else min(periods, len(history_data))
+        tables = self._batch_tables(history_data, periods)
+        red_theory = periods * 6 / 33
+        blue_theory = periods / 16
+        weights = self.SCORE_WEIGHTS
+        wbf = self.freq_blue_weight
+        wbm = self.missing_blue_weight
+
+        def freq_score(freq, theory):
+            if theory > 0:
+                return np.minimum(100, (freq / theory) * 50 + 50)
+            return np.full(len(freq), 50.0)
+
+        def gaussian(missing, average):
+            sigma = max(1e-6, average * self.missing_sigma_factor)
+            return np.exp(-0.5 * (((missing - average) / sigma) ** 2)) * 100
+
+        if self.missing_curve == 'gaussian':
+            # 高斯曲线：红球遗漏得分是各号码得分的均值
+            missing_values = gaussian(tables['red_missing'], tables['avg_red_missing'])
+            missing_score = lambda mean: mean
+        else:
+            missing_values = -tables['red_missing']
+            missing_score = lambda mean: np.clip(100 + mean * 2, 0, 100)
+
+        def extra_scores(extras):
+            blues = extras[:, 0]
+            blue_missing = tables['blue_missing'][blues]
+            if self.missing_curve == 'gaussian':
+                blue_missing_score = gaussian(blue_missing, tables['avg_blue_missing'])
+            else:
+                blue_missing_score = np.clip(100 - blue_missing * 2, 0, 100)
+            return (weights['frequency'] * wbf * freq_score(tables['blue_freq'][blues], blue_theory) +
+                    weights['missing'] * wbm * blue_missing_score)
+
+        return batch_scoring.ScoreBounds(
+            main_count=self.red_count,
+            freq_values=tables['red_freq'],
+            freq_score=lambda mean: freq_score(mean, red_theory),
+            freq_weight=weights['frequency'] * (1.0 - wbf),
+            missing_values=missing_values,
+            missing_score=missing_score,
+            missing_weight=weights['missing'] * (1.0 - wbm),
+            pattern_bound=self._pattern_bound,
+            pattern_weight=weights['pattern'],
+            presence=tables['presence'],
+            overlap_points=10,
+            uniqueness_weight=weights['uniqueness'],
+            extra_scores=extra_scores,
+        )
+
+    @staticmethod
+    def _pattern_bound(reds: np.ndarray, remaining: int) -> np.ndarray:
+        """已选部分红球、还需 remaining 个红球时模式得分的上界（已选完时为模式得分）"""
+        odd_count = (reds % 2 == 1).sum(axis=1)
+        big_count = (reds >= 18).sum(axis=1)
+        zones = np.stack([((reds >= low) & (reds <= high)).any(axis=1)
+                          for low, high in ((1, 11), (12, 22), (23, 33))], axis=1).sum(axis=1)
+        max_zones = np.minimum(3, zones + remaining)
+        # 补足号码后和值的取值范围：最小为加上 1..remaining，最大为加上 33 往下 remaining 个号码
+        sum_low = reds.sum(axis=1) + remaining * (remaining + 1) // 2
+        sum_high = reds.sum(axis=1) + remaining * 33 - remaining * (remaining - 1) // 2
+        overlap = batch_scoring.ranges_overlap
+        points = (
+            batch_scoring.tier_points(overlap(odd_count, odd_count + remaining, 3, 3),
+                                      overlap(odd_count, odd_count + remaining, 2, 4)) +
+            batch_scoring.tier_points(overlap(big_count, big_count + remaining, 3, 3),
+                                      overlap(big_count, big_count + remaining, 2, 4)) +
+            batch_scoring.tier_points(max_zones == 3, max_zones >= 2) +
+            batch_scoring.tier_points(overlap(sum_low, sum_high, 90, 130), overlap(sum_low, sum_high, 70, 150))
+        )
+        if remaining:
+            points = points + 20
+        else:
+            ac_value = batch_scoring.ac_values(np.sort(reds, axis=1))
+            points = points + batch_scoring.tier_points(ac_value >= 6, ac_value >= 4)
+        return points.astype(np.float64)
+
+    def _score_batch(self, reds: np.ndarray, blues: np.ndarray, history_data: List[Dict],
+                     periods: int, tables: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """计算一批号码的各维度得分（运算顺序与 _calculate_scores 一致）"""
+        # 1. 频率得分
+        red_theory = periods * 6 / 33
+        blue_theory = periods / 16
+        avg_red_freq = batch_scoring.row_mean(tables['red_freq'][reds])
+        if red_theory > 0:
+            red_freq_score = np.minimum(100, (avg_red_freq / red_theory) * 50 + 50)
+        else:
+            red_freq_score = np.full(len(reds), 50.0)
+        if blue_theory > 0:
+            blue_freq_score = np.minimum(100, (tables['blue_freq'][blues] / blue_theory) * 50 + 50)
+        else:
+            blue_freq_score = np.full(len(reds), 50.0)
+        wbf = self.freq_blue_weight
+        freq_score = (1.0 - wbf) * red_freq_score + wbf * blue_freq_score
+
+        # 2. 遗漏得分
+        red_missings = tables['red_missing'][reds]
+        blue_missings = tables['blue_missing'][blues]
+        avg_red_missing_all = tables['avg_red_missing']
+        avg_blue_missing_all = tables['avg_blue_missing']
+        if self.missing_curve == 'gaussian':
+            sigma_r = max(1e-6, avg_red_missing_all * self.missing_sigma_factor)
+            red_scores = np.exp(-0.5 * (((red_missings - avg_red_missing_all) / sigma_r) ** 2)) * 100
+            red_missing_score = batch_scoring.row_mean(red_scores)
+            sigma_b = max(1e-6, avg_blue_missing_all * self.missing_sigma_factor)
+            blue_missing_score = np.exp(-0.5 * (((blue_missings - avg_blue_missing_all) / sigma_b) ** 2)) * 100
+        else:
+            red_missing_score = np.maximum(0, np.minimum(100, 100 - batch_scoring.row_mean(red_missings) * 2))
+            blue_missing_score = np.maximum(0, np.minimum(100, 100 - blue_missings * 2))
+        wbm = self.missing_blue_weight
+        missing_score = (1.0 - wbm) * red_missing_score + wbm * blue_missing_score
+
+        # 3. 模式得分（奇偶、大小、区间、和值、AC值各 20 分）
+        sorted_reds = np.sort(reds, axis=1)
+        odd_count = (reds % 2 == 1).sum(axis=1)
+        big_count = (reds >= 18).sum(axis=1)
+        zones = np.stack([((reds >= low) & (reds <= high)).any(axis=1)
+                          for low, high in ((1, 11), (12, 22), (23, 33))], axis=1).sum(axis=1)
+        sum_value = reds.sum(axis=1)
+        ac_value = batch_scoring.ac_values(sorted_reds)
+        pattern_score = (
+            batch_scoring.tier_points(odd_count == 3, (odd_count >= 2) & (odd_count <= 4)) +
+            batch_scoring.tier_points(big_count == 3, (big_count >= 2) & (big_count <= 4)) +
+            batch_scoring.tier_points(zones == 3, zones >= 2) +
+            batch_scoring.tier_points((sum_value >= 90) & (sum_value <= 130), (sum_value >= 70) & (sum_value <= 150)) +
+            batch_scoring.tier_points(ac_value >= 6, ac_value >= 4)
+        ).astype(np.float64)
+
+        # 4. 独特性得分（与历史的最大红球重合数）
+        presence = tables['presence']
+        duplicated = batch_scoring.row_has_duplicates(sorted_reds)
+        max_match = np.zeros(len(reds), dtype=np.int64)
+        regular = np.flatnonzero(~duplicated)
+        max_match[regular] = presence.max_overlap(sorted_reds[regular])
+        # 与历史某期完全相同的号码：逐注对比在该期停止，只统计更新的各期
+        maybe_exact = np.flatnonzero(max_match == self.red_count)
+        if len(maybe_exact):
+            keys = presence.ranks(sorted_reds[maybe_exact] - 1) * 17 + blues[maybe_exact]
+            for row in maybe_exact[np.isin(keys, tables['exact_keys'])]:
+                max_match[row] = self._historical_overlap(reds[row].tolist(), int(blues[row]), history_data)[3]
+        uniqueness_score = np.maximum(0, 100 - max_match * 10).astype(np.float64)
+
+        # 逐注评价中经 np.mean 得到的红球得分是 np.float64，round 的舍入方式随之不同
+        if red_theory > 0:
+            freq_numpy = red_freq_score < 100
+        else:
+            freq_numpy = np.zeros(len(reds), dtype=bool)
+        if self.missing_curve == 'gaussian':
+            missing_numpy = np.zeros(len(reds), dtype=bool)
+        else:
+            red_missing_raw = 100 - batch_scoring.row_mean(red_missings) * 2
+            missing_numpy = (red_missing_raw > 0) & (red_missing_raw < 100)
+        scores = batch_scoring.composite_scores(freq_score, missing_score, pattern_score, uniqueness_score,
+                                                self.SCORE_WEIGHTS,
+                                                {'frequency': freq_numpy, 'missing': missing_numpy})
+
+        # 含重复号码的注按逐注评价计算
+        for row in np.flatnonzero(duplicated):
+            row_scores = self.evaluate(reds[row].tolist(), int(blues[row]), periods, detail_level='scores')['scores']
+            for key in scores:
+                scores[key][row] = row_scores[key]
+        return scores
+
+    def _frequency_counters(self, history_data: List[Dict], periods: int) -> Dict[str, Counter]:
+        """最近 periods 期红蓝球出现次数（由出现次数前缀和表查得，带缓存）"""
+        cache_key = self.get_cache_key('freq_counters', periods)
+        counters = self._cache.get(cache_key)
+        if counters is None:
+            tables = self.get_occurrence_tables(history_data)
+            counters = {zone: Counter({number: count for number, count in enumerate(tables[zone].frequency(periods).tolist())
+                                       if count})
+                        for zone in ('red', 'blue')}
+            self._cache[cache_key] = counters
+        return counters
+
+    def _missing_maps(self, history_data: List[Dict]) -> Dict[str, Any]:
+        """所有号码的当前遗漏期数和平均遗漏（带缓存）"""
+        cache_key = 'missing_maps'
+        missing_maps = self._cache.get(cache_key)
+        if missing_maps is None:
+            # 从最新一期开始计算的遗漏期数，从未出现的号码记为 0
+            tables = self.get_occurrence_tables(history_data)
+            red_missing = dict(enumerate(tables['red'].missing(default=0).tolist()[1:], start=1))
+            blue_missing = dict(enumerate(tables['blue'].missing(default=0).tolist()[1:], start=1))
+            missing_maps = {
+                'red_missing': red_missing,
+                'blue_missing': blue_missing,
+                'avg_red_missing': round(float(np.mean(list(red_missing.values()))), 1),
+                'avg_blue_missing': round(float(np.mean(list(blue_missing.values()))), 1)
+            }
+            self._cache[cache_key] = missing_maps
+        return missing_maps
+
     def _analyze_frequency(self, red_numbers: List[int], blue_number: int, 
                           history_data: List[Dict], periods: int = 100) -> Dict:
         """频率分析
@@ -104,22 +420,10 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         Returns:
             频率分析结果
         """
-        recent_data = history_data[:periods]
-        
         # 统计频率（带缓存）
-        cache_key = self.get_cache_key('freq_counters', periods)
-        counters = self._cache.get(cache_key)
-        if counters is None:
-            red_counter = Counter()
-            blue_counter = Counter()
-            for draw in recent_data:
-                red_counter.update(draw['red_numbers'])
-                blue_counter[draw['blue_number']] += 1
-            counters = {'red': red_counter, 'blue': blue_counter}
-            self._cache[cache_key] = counters
-        else:
-            red_counter = counters['red']
-            blue_counter = counters['blue']
+        counters = self._frequency_counters(history_data, periods)
+        red_counter = counters['red']
+        blue_counter = counters['blue']
 
         # 计算理论频率
         red_theory = periods * 6 / 33  # 每个红球理论出现次数
@@ -173,34 +477,15 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             遗漏分析结果
         """
         # 计算所有号码的遗漏期数（带缓存）
-        cache_key = 'missing_maps'
-        missing_maps = self._cache.get(cache_key)
-        if missing_maps is None:
-            red_missing = {i: 0 for i in range(1, 34)}
-            blue_missing = {i: 0 for i in range(1, 17)}
-            # 从最新一期开始，计算每个号码的遗漏期数
-            for num in range(1, 34):
-                for i, draw in enumerate(history_data):
-                    if num in draw['red_numbers']:
-                        red_missing[num] = i
-                        break
-            for num in range(1, 17):
-                for i, draw in enumerate(history_data):
-                    if num == draw['blue_number']:
-                        blue_missing[num] = i
-                        break
+        computed = 'missing_maps' not in self._cache
+        missing_maps = self._missing_maps(history_data)
+        red_missing = missing_maps['red_missing']
+        blue_missing = missing_maps['blue_missing']
+        if computed:
+            # 首次计算时按未舍入的平均遗漏分类
             avg_red_missing = float(np.mean(list(red_missing.values())))
             avg_blue_missing = float(np.mean(list(blue_missing.values())))
-            missing_maps = {
-                'red_missing': red_missing,
-                'blue_missing': blue_missing,
-                'avg_red_missing': round(avg_red_missing, 1),
-                'avg_blue_missing': round(avg_blue_missing, 1)
-            }
-            self._cache[cache_key] = missing_maps
         else:
-            red_missing = missing_maps['red_missing']
-            blue_missing = missing_maps['blue_missing']
             avg_red_missing = missing_maps['avg_red_missing']
             avg_blue_missing = missing_maps['avg_blue_missing']
 
@@ -232,6 +517,45 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             'avg_blue_missing': round(avg_blue_missing, 1)
         }
     
+    def _pattern_metrics(self, red_numbers: List[int]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """模式指标及其评价图标
+
+        Args:
+            red_numbers: 红球号码列表
+
+        Returns:
+            (指标值, 各指标的评价图标)；模式得分只依赖图标
+        """
+        sorted_nums = sorted(red_numbers)
+        odd_count = sum(1 for n in red_numbers if n % 2 == 1)
+        # 大号：18-33，小号：1-17
+        big_count = sum(1 for n in red_numbers if n >= 18)
+        # 区间：1-11, 12-22, 23-33
+        zones = [sum(1 for n in red_numbers if low <= n <= high) for low, high in ((1, 11), (12, 22), (23, 33))]
+        sum_value = sum(red_numbers)
+        span = max(red_numbers) - min(red_numbers)
+        ac_value = self._calculate_ac_value(sorted_nums)
+
+        values = {
+            'sorted': sorted_nums,
+            'odd_count': odd_count,
+            'big_count': big_count,
+            'zones': zones,
+            'sum': sum_value,
+            'span': span,
+            'ac_value': ac_value,
+        }
+        icons = {
+            'odd_even': "✅" if odd_count == 3 else "✓" if 2 <= odd_count <= 4 else "⚠️",
+            'big_small': "✅" if big_count == 3 else "✓" if 2 <= big_count <= 4 else "⚠️",
+            'zone': ("✅" if all(z >= 1 for z in zones) else
+                     "✓" if sum(1 for z in zones if z > 0) >= 2 else "⚠️"),
+            'sum': "✅" if 90 <= sum_value <= 130 else "✓" if 70 <= sum_value <= 150 else "⚠️",
+            'span': "✅" if 15 <= span <= 28 else "✓" if 10 <= span <= 32 else "⚠️",
+            'ac_value': "✅" if ac_value >= 6 else "✓" if ac_value >= 4 else "⚠️",
+        }
+        return values, icons
+
     def _analyze_patterns(self, red_numbers: List[int]) -> Dict:
         """模式分析
         
@@ -241,58 +565,13 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         Returns:
             模式分析结果
         """
-        sorted_nums = sorted(red_numbers)
-        
-        # 1. 奇偶比
-        odd_count = sum(1 for n in red_numbers if n % 2 == 1)
-        even_count = 6 - odd_count
-        odd_even_ratio = f"{odd_count}:{even_count}"
-        
-        # 评价奇偶比
-        if odd_count == 3:
-            odd_even_rating = "标准奇偶比（3:3），平衡性好"
-            odd_even_icon = "✅"
-        elif 2 <= odd_count <= 4:
-            odd_even_rating = "奇偶比合理，常见模式"
-            odd_even_icon = "✓"
-        else:
-            odd_even_rating = "奇偶比极端，出现概率较低"
-            odd_even_icon = "⚠️"
-        
-        # 2. 大小比（大号：18-33，小号：1-17）
-        big_count = sum(1 for n in red_numbers if n >= 18)
-        small_count = 6 - big_count
-        big_small_ratio = f"{big_count}:{small_count}"
-        
-        # 评价大小比
-        if big_count == 3:
-            big_small_rating = "标准大小比（3:3），平衡性好"
-            big_small_icon = "✅"
-        elif 2 <= big_count <= 4:
-            big_small_rating = "大小比合理，常见模式"
-            big_small_icon = "✓"
-        else:
-            big_small_rating = "大小比极端，出现概率较低"
-            big_small_icon = "⚠️"
-        
-        # 3. 区间分布（1-11, 12-22, 23-33）
-        zone1 = sum(1 for n in red_numbers if 1 <= n <= 11)
-        zone2 = sum(1 for n in red_numbers if 12 <= n <= 22)
-        zone3 = sum(1 for n in red_numbers if 23 <= n <= 33)
-        zone_distribution = f"{zone1}-{zone2}-{zone3}"
-        
-        # 评价区间分布
-        if all(z >= 1 for z in [zone1, zone2, zone3]):
-            zone_rating = "三区都有号码，分布均衡"
-            zone_icon = "✅"
-        elif sum(1 for z in [zone1, zone2, zone3] if z > 0) >= 2:
-            zone_rating = "覆盖两个区间，分布合理"
-            zone_icon = "✓"
-        else:
-            zone_rating = "号码集中在一个区间，分布不均"
-            zone_icon = "⚠️"
-        
-        # 4. 连号检测
+        values, icons = self._pattern_metrics(red_numbers)
+        sorted_nums = values['sorted']
+        odd_count = values['odd_count']
+        big_count = values['big_count']
+        zone1, zone2, zone3 = values['zones']
+
+        # 连号检测
         consecutive = []
         for i in range(len(sorted_nums) - 1):
             if sorted_nums[i+1] - sorted_nums[i] == 1:
@@ -309,63 +588,22 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             consecutive_rating = "连号较多，可能降低独特性"
             consecutive_icon = "⚠️"
         
-        # 5. 和值
-        sum_value = sum(red_numbers)
-        
-        # 评价和值
-        if 90 <= sum_value <= 130:
-            sum_rating = "和值在常见范围内（90-130）"
-            sum_icon = "✅"
-        elif 70 <= sum_value <= 150:
-            sum_rating = "和值合理（70-150）"
-            sum_icon = "✓"
-        else:
-            sum_rating = "和值偏离常见范围"
-            sum_icon = "⚠️"
-        
-        # 6. 跨度（最大号-最小号）
-        span = max(red_numbers) - min(red_numbers)
-        
-        # 评价跨度
-        if 15 <= span <= 28:
-            span_rating = "跨度在常见范围内（15-28）"
-            span_icon = "✅"
-        elif 10 <= span <= 32:
-            span_rating = "跨度合理（10-32）"
-            span_icon = "✓"
-        else:
-            span_rating = "跨度偏离常见范围"
-            span_icon = "⚠️"
-        
-        # 7. AC值（号码复杂度）
-        ac_value = self._calculate_ac_value(sorted_nums)
-        
-        # 评价AC值
-        if ac_value >= 6:
-            ac_rating = "AC值较高，号码复杂度好"
-            ac_icon = "✅"
-        elif ac_value >= 4:
-            ac_rating = "AC值中等，复杂度合理"
-            ac_icon = "✓"
-        else:
-            ac_rating = "AC值较低，号码可能过于规律"
-            ac_icon = "⚠️"
-        
+        ratings = self.PATTERN_RATINGS
         return {
             'odd_even': {
-                'ratio': odd_even_ratio,
-                'rating': odd_even_rating,
-                'icon': odd_even_icon
+                'ratio': f"{odd_count}:{6 - odd_count}",
+                'rating': ratings['odd_even'][icons['odd_even']],
+                'icon': icons['odd_even']
             },
             'big_small': {
-                'ratio': big_small_ratio,
-                'rating': big_small_rating,
-                'icon': big_small_icon
+                'ratio': f"{big_count}:{6 - big_count}",
+                'rating': ratings['big_small'][icons['big_small']],
+                'icon': icons['big_small']
             },
             'zone': {
-                'distribution': zone_distribution,
-                'rating': zone_rating,
-                'icon': zone_icon
+                'distribution': f"{zone1}-{zone2}-{zone3}",
+                'rating': ratings['zone'][icons['zone']],
+                'icon': icons['zone']
             },
             'consecutive': {
                 'count': len(consecutive),
@@ -374,19 +612,19 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
                 'icon': consecutive_icon
             },
             'sum': {
-                'value': sum_value,
-                'rating': sum_rating,
-                'icon': sum_icon
+                'value': values['sum'],
+                'rating': ratings['sum'][icons['sum']],
+                'icon': icons['sum']
             },
             'span': {
-                'value': span,
-                'rating': span_rating,
-                'icon': span_icon
+                'value': values['span'],
+                'rating': ratings['span'][icons['span']],
+                'icon': icons['span']
             },
             'ac_value': {
-                'value': ac_value,
-                'rating': ac_rating,
-                'icon': ac_icon
+                'value': values['ac_value'],
+                'rating': ratings['ac_value'][icons['ac_value']],
+                'icon': icons['ac_value']
             }
         }
     
@@ -405,6 +643,21 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
                 differences.add(abs(numbers[i] - numbers[j]))
         return len(differences) - (len(numbers) - 1)
     
+    def _historical_overlap(self, red_numbers: List[int], blue_number: int,
+                            history_data: List[Dict]) -> Tuple[Any, Optional[int], np.ndarray, int]:
+        """与历史各期的红球重合数
+
+        遇到完全相同的一期即停止，只统计更新的各期。
+
+        Returns:
+            (位图索引, 完全相同的最新一期位置或 None, 各期红球重合数, 最大红球重合数)
+        """
+        index = self.get_history_index(history_data)
+        exact_position = index.exact_position(red_numbers, [blue_number])
+        red_match_counts = index.overlap_counts(red_numbers)[:exact_position]
+        max_match_count = int(red_match_counts.max()) if len(red_match_counts) else 0
+        return index, exact_position, red_match_counts, max_match_count
+
     def _check_historical(self, red_numbers: List[int], blue_number: int, 
                          history_data: List[Dict]) -> Dict:
         """历史对比
@@ -417,37 +670,16 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         Returns:
             历史对比结果
         """
-        red_set = set(red_numbers)
-        
-        exact_match = False
-        exact_match_period = None
-        red_match_counts = []
-        blue_match_count = 0
-        max_match_period = None
-        max_match_count = 0
-        
-        for draw in history_data:
-            draw_red_set = set(draw['red_numbers'])
-            draw_blue = draw['blue_number']
-            
-            # 检查完全匹配
-            if draw_red_set == red_set and draw_blue == blue_number:
-                exact_match = True
-                exact_match_period = draw['draw_num']
-                break
-            
-            # 统计红球匹配数
-            match_count = len(red_set & draw_red_set)
-            red_match_counts.append(match_count)
-            
-            # 记录最大匹配
-            if match_count > max_match_count:
-                max_match_count = match_count
-                max_match_period = draw['draw_num']
-            
-            # 统计蓝球匹配
-            if draw_blue == blue_number:
-                blue_match_count += 1
+        index, exact_position, red_match_counts, max_match_count = self._historical_overlap(
+            red_numbers, blue_number, history_data)
+        exact_match = exact_position is not None
+        exact_match_period = index.label(exact_position)
+
+        # 记录最大匹配（相同时取最新一期）
+        max_match_period = index.label(int(red_match_counts.argmax())) if max_match_count > 0 else None
+
+        # 统计蓝球匹配
+        blue_match_count = int(index.extra_equal([blue_number])[:exact_position].sum())
         
         # 评价
         if exact_match:
@@ -468,12 +700,43 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             'exact_match_period': exact_match_period,
             'max_red_match': max_match_count,
             'max_match_period': max_match_period,
-            'avg_red_match': round(np.mean(red_match_counts), 2) if red_match_counts else 0,
+            'avg_red_match': round(np.mean(red_match_counts), 2) if len(red_match_counts) else 0,
             'blue_appearance': blue_match_count,
             'rating': rating,
             'icon': icon
         }
     
+    def _score_summary(self, red_numbers: List[int], blue_number: int, history_data: List[Dict],
+                       periods: int) -> Dict[str, Any]:
+        """只计算得分所需的各维度统计量（不生成详情）
+
+        Args:
+            red_numbers: 红球号码列表
+            blue_number: 蓝球号码
+            history_data: 历史数据
+            periods: 分析期数
+
+        Returns:
+            各维度摘要，可直接传给 _compute_scores
+        """
+        counters = self._frequency_counters(history_data, periods)
+        missing_maps = self._missing_maps(history_data)
+        red_missing = missing_maps['red_missing']
+        _, exact_position, _, max_red_match = self._historical_overlap(red_numbers, blue_number, history_data)
+        return {
+            'red_frequencies': [counters['red'].get(num, 0) for num in red_numbers],
+            'red_theory': periods * 6 / 33,
+            'blue_frequency': counters['blue'].get(blue_number, 0),
+            'blue_theory': periods / 16,
+            'red_missings': [red_missing[num] for num in red_numbers],
+            'avg_red_missing': round(missing_maps['avg_red_missing'], 1),
+            'blue_missing': missing_maps['blue_missing'][blue_number],
+            'avg_blue_missing': round(missing_maps['avg_blue_missing'], 1),
+            'pattern_icons': self._pattern_metrics(red_numbers)[1],
+            'exact_match': exact_position is not None,
+            'max_red_match': max_red_match,
+        }
+
     def _calculate_scores(self, freq_result: Dict, missing_result: Dict, 
                          pattern_result: Dict, historical_result: Dict) -> Dict:
         """计算各维度得分
@@ -484,17 +747,41 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             pattern_result: 模式分析结果
             historical_result: 历史对比结果
             
+        Returns:
+            得分字典
+        """
+        red_missings = [detail['missing'] for detail in missing_result['red_details']]
+        return self._compute_scores({
+            'red_frequencies': [detail['frequency'] for detail in freq_result['red_details']],
+            'red_theory': freq_result['red_theory'],
+            'blue_frequency': freq_result['blue_detail']['frequency'],
+            'blue_theory': freq_result['blue_theory'],
+            'red_missings': red_missings,
+            'avg_red_missing': missing_result.get('avg_red_missing', np.mean(red_missings) if red_missings else 0),
+            'blue_missing': missing_result['blue_detail']['missing'],
+            'avg_blue_missing': missing_result.get('avg_blue_missing', 0),
+            'pattern_icons': {key: pattern_result[key]['icon'] for key in self.PATTERN_RATINGS},
+            'exact_match': historical_result['exact_match'],
+            'max_red_match': historical_result['max_red_match'],
+        })
+
+    def _compute_scores(self, summary: Dict[str, Any]) -> Dict:
+        """由各维度摘要计算得分
+
+        Args:
+            summary: _score_summary 返回的摘要
+
         Returns:
             得分字典
         """
         # 1. 频率得分（0-100），引入蓝球影响（可调权重）
-        red_freqs = [detail['frequency'] for detail in freq_result['red_details']]
+        red_freqs = summary['red_frequencies']
         avg_red_freq = np.mean(red_freqs) if red_freqs else 0
-        red_theory = freq_result['red_theory']
+        red_theory = summary['red_theory']
         red_freq_score = min(100, (avg_red_freq / red_theory) * 50 + 50) if red_theory > 0 else 50
 
-        blue_freq = freq_result['blue_detail']['frequency']
-        blue_theory = freq_result['blue_theory']
+        blue_freq = summary['blue_frequency']
+        blue_theory = summary['blue_theory']
         blue_freq_score = min(100, (blue_freq / blue_theory) * 50 + 50) if blue_theory > 0 else 50
 
         wbf = self.freq_blue_weight
@@ -502,8 +789,8 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         freq_score = wrf * red_freq_score + wbf * blue_freq_score
 
         # 2. 遗漏得分（0-100），引入蓝球影响（可选曲线 + 可调权重）
-        red_missings = [detail['missing'] for detail in missing_result['red_details']]
-        avg_red_missing_all = float(missing_result.get('avg_red_missing', np.mean(red_missings) if red_missings else 0))
+        red_missings = summary['red_missings']
+        avg_red_missing_all = float(summary['avg_red_missing'])
         if self.missing_curve == 'gaussian':
             sigma_r = max(1e-6, avg_red_missing_all * self.missing_sigma_factor)
             red_scores = [float(np.exp(-0.5 * (((m - avg_red_missing_all) / sigma_r) ** 2)) * 100) for m in red_missings] if red_missings else [0.0]
@@ -512,8 +799,8 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
             avg_red_missing_sel = np.mean(red_missings) if red_missings else 0
             red_missing_score = max(0, min(100, 100 - avg_red_missing_sel * 2))
 
-        blue_missing_value = float(missing_result['blue_detail']['missing'])
-        avg_blue_missing_all = float(missing_result.get('avg_blue_missing', 0))
+        blue_missing_value = float(summary['blue_missing'])
+        avg_blue_missing_all = float(summary['avg_blue_missing'])
         if self.missing_curve == 'gaussian':
             sigma_b = max(1e-6, avg_blue_missing_all * self.missing_sigma_factor)
             blue_missing_score = float(np.exp(-0.5 * (((blue_missing_value - avg_blue_missing_all) / sigma_b) ** 2)) * 100)
@@ -524,41 +811,17 @@ class SSQNumberEvaluator(BaseNumberEvaluator):
         wrm = 1.0 - wbm
         missing_score = wrm * red_missing_score + wbm * blue_missing_score
 
-        # 3. 模式得分（0-100）（目前仅针对红球模式）
+        # 3. 模式得分（0-100）（目前仅针对红球模式）：奇偶比、大小比、区间分布、和值、AC值各 20 分
         pattern_score = 0
-
-        # 奇偶比（20分）
-        if pattern_result['odd_even']['icon'] == '✅':
-            pattern_score += 20
-        elif pattern_result['odd_even']['icon'] == '✓':
-            pattern_score += 15
-
-        # 大小比（20分）
-        if pattern_result['big_small']['icon'] == '✅':
-            pattern_score += 20
-        elif pattern_result['big_small']['icon'] == '✓':
-            pattern_score += 15
-
-        # 区间分布（20分）
-        if pattern_result['zone']['icon'] == '✅':
-            pattern_score += 20
-        elif pattern_result['zone']['icon'] == '✓':
-            pattern_score += 15
-
-        # 和值（20分）
-        if pattern_result['sum']['icon'] == '✅':
-            pattern_score += 20
-        elif pattern_result['sum']['icon'] == '✓':
-            pattern_score += 15
-
-        # AC值（20分）
-        if pattern_result['ac_value']['icon'] == '✅':
-            pattern_score += 20
-        elif pattern_result['ac_value']['icon'] == '✓':
-            pattern_score += 15
+        for key in ('odd_even', 'big_small', 'zone', 'sum', 'ac_value'):
+            icon = summary['pattern_icons'][key]
+            if icon == '✅':
+                pattern_score += 20
+            elif icon == '✓':
+                pattern_score += 15
 
         # 4. 独特性得分（0-100）（保持以红球相似度为主）
-        uniqueness_score = max(0, 100 - historical_result['max_red_match'] * 10)
+        uniqueness_score = max(0, 100 - summary['max_red_match'] * 10)
 
         # 5. 综合得分
         return self.calculate_composite_score(freq_score, missing_score, pattern_score, uniqueness_score)
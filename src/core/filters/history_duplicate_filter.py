@@ -4,16 +4,19 @@
 用于过滤与历史开奖号码重复过多的候选号码
 """
 
-from typing import Dict, List, Optional, Union, Any
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 
+from ..config_manager import get_config_manager
 from ..models import SSQNumber, DLTNumber
+from ..storage import MemoCache, OverlapIndex, data_version
 
 
-@dataclass
+@dataclass(frozen=True)
 class FilterResult:
-    """过滤结果"""
+    """过滤结果（不可变，缓存的结果可被多个调用方共享）"""
     is_valid: bool              # 是否通过过滤
     overlap_score: float        # 重复度评分（越低越好）
     max_overlap: int            # 最大重复数量
@@ -64,6 +67,10 @@ class HistoryDuplicateFilter:
         self.config = self.DEFAULT_CONFIG[self.lottery_type].copy()
         if config:
             self.config.update(config)
+
+        # 历史索引和过滤结果缓存：键中包含所检查历史记录的版本和配置
+        self._cache = MemoCache(type(self).__name__,
+                                get_config_manager().get('analysis.filter_cache_size', 65536))
     
     def update_config(self, **kwargs):
         """更新配置"""
@@ -83,75 +90,123 @@ class HistoryDuplicateFilter:
         Returns:
             FilterResult: 过滤结果
         """
+        return self.evaluate([candidate], history_data, check_periods)[0]
+
+    def evaluate(self, candidates: List[Union[SSQNumber, DLTNumber]],
+                 history_data: Union[pd.DataFrame, List[Dict]],
+                 check_periods: Optional[int] = None) -> List[FilterResult]:
+        """
+        批量计算过滤结果（与候选号码顺序一致）
+
+        历史数据的位图索引按数据版本缓存；同一版本、同一配置下已计算过的号码直接返回缓存结果，
+        其余号码的重合数、加权重复分数等按矩阵一次算出。
+
+        Args:
+            candidates: 候选号码列表
+            history_data: 历史开奖数据（DataFrame或字典列表）
+            check_periods: 检查期数（覆盖默认配置）
+
+        Returns:
+            List[FilterResult]: 各候选号码的过滤结果
+        """
         periods = check_periods or self.config['check_periods']
-        
-        # 转换历史数据为统一格式
-        records = self._convert_history_data(history_data, periods)
-        
+        version, records, index = self._history_index(history_data, periods)
+
+        config_key = tuple(sorted(self.config.items()))
+        keys = [(version, config_key) + tuple(tuple(numbers) for numbers in self._ticket_numbers(candidate))
+                for candidate in candidates]
+        results = [self._cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = self._compute_results([candidates[i] for i in missing], records, index)
+            for i, result in zip(missing, computed):
+                results[i] = result
+                self._cache.put(keys[i], result)
+        return results
+
+    def _compute_results(self, candidates: List[Union[SSQNumber, DLTNumber]],
+                         records: List[Dict], index: OverlapIndex) -> List[FilterResult]:
+        """按矩阵计算一批候选号码的过滤结果"""
         if not records:
-            return FilterResult(
+            return [FilterResult(
                 is_valid=True,
                 overlap_score=0.0,
                 max_overlap=0,
                 overlap_period=None,
                 reason=None
-            )
-        
-        max_overlap = 0
-        overlap_period = None
-        total_overlap_score = 0.0
-        
-        for i, record in enumerate(records):
-            overlap = self._calculate_overlap(candidate, record)
-            
-            # 1. 完全匹配检查
-            if self.config['exact_match_reject'] and self._is_exact_match(candidate, record):
-                return FilterResult(
+            ) for _ in candidates]
+        if not candidates:
+            return []
+
+        tickets = [self._ticket_numbers(candidate) for candidate in candidates]
+        mains = np.array([main for main, _ in tickets], dtype=np.int64)
+        extras = np.array([extra for _, extra in tickets], dtype=np.int64)
+        counts = index.overlap_matrix(mains)
+
+        # 加权重复分数（近期权重更高），按期累加
+        weights = 1.0 / np.arange(1, counts.shape[1] + 1)
+        overlap_scores = np.cumsum(counts * weights, axis=1)
+
+        # 1. 完全匹配检查；4. 近期严格检查（按期顺序先遇到的规则生效）
+        if self.config['exact_match_reject']:
+            exact = index.exact_positions(mains, extras)
+        else:
+            exact = np.full(len(candidates), -1, dtype=np.int64)
+        violations = counts[:, :self.config['recent_strict_periods']] > self.config['recent_max_overlap']
+        recent = np.where(violations.any(axis=1), violations.argmax(axis=1), -1)
+
+        # 2. 最大重复（相同时取最新一期）
+        max_overlaps = counts.max(axis=1)
+        max_positions = counts.argmax(axis=1)
+        max_allowed = self._get_max_allowed_overlap()
+
+        results = []
+        rows = zip(exact.tolist(), recent.tolist(), max_overlaps.tolist(), max_positions.tolist())
+        for row, (exact_pos, recent_pos, max_overlap, max_pos) in enumerate(rows):
+            if exact_pos >= 0 and (recent_pos < 0 or exact_pos <= recent_pos):
+                label = self._period_label(records, exact_pos)
+                results.append(FilterResult(
                     is_valid=False,
                     overlap_score=100.0,
+                    max_overlap=int(counts[row, exact_pos]),
+                    overlap_period=label,
+                    reason=f"与{label}完全相同"
+                ))
+                continue
+            if recent_pos >= 0:
+                label = self._period_label(records, recent_pos)
+                overlap = int(counts[row, recent_pos])
+                results.append(FilterResult(
+                    is_valid=False,
+                    overlap_score=float(overlap_scores[row, recent_pos]),
                     max_overlap=overlap,
-                    overlap_period=record.get('period', f'第{i+1}期'),
-                    reason=f"与{record.get('period', f'第{i+1}期')}完全相同"
-                )
-            
-            # 2. 更新最大重复
-            if overlap > max_overlap:
-                max_overlap = overlap
-                overlap_period = record.get('period', f'第{i+1}期')
-            
-            # 3. 计算加权重复分数（近期权重更高）
-            weight = 1.0 / (i + 1)
-            total_overlap_score += overlap * weight
-            
-            # 4. 近期严格检查
-            if i < self.config['recent_strict_periods']:
-                if overlap > self.config['recent_max_overlap']:
-                    return FilterResult(
-                        is_valid=False,
-                        overlap_score=total_overlap_score,
-                        max_overlap=overlap,
-                        overlap_period=record.get('period', f'第{i+1}期'),
-                        reason=f"与近期{record.get('period', f'第{i+1}期')}重复{overlap}个号码"
-                    )
-        
-        # 5. 全局最大重复检查
-        max_allowed = self._get_max_allowed_overlap()
-        if max_overlap > max_allowed:
-            return FilterResult(
-                is_valid=False,
+                    overlap_period=label,
+                    reason=f"与近期{label}重复{overlap}个号码"
+                ))
+                continue
+
+            overlap_period = self._period_label(records, max_pos) if max_overlap > 0 else None
+            total_overlap_score = float(overlap_scores[row, -1])
+
+            # 5. 全局最大重复检查
+            if max_overlap > max_allowed:
+                results.append(FilterResult(
+                    is_valid=False,
+                    overlap_score=total_overlap_score,
+                    max_overlap=max_overlap,
+                    overlap_period=overlap_period,
+                    reason=f"与{overlap_period}重复{max_overlap}个，超过阈值{max_allowed}"
+                ))
+                continue
+
+            results.append(FilterResult(
+                is_valid=True,
                 overlap_score=total_overlap_score,
                 max_overlap=max_overlap,
                 overlap_period=overlap_period,
-                reason=f"与{overlap_period}重复{max_overlap}个，超过阈值{max_allowed}"
-            )
-        
-        return FilterResult(
-            is_valid=True,
-            overlap_score=total_overlap_score,
-            max_overlap=max_overlap,
-            overlap_period=overlap_period,
-            reason=None
-        )
+                reason=None
+            ))
+        return results
 
     def filter_batch(self, candidates: List[Union[SSQNumber, DLTNumber]],
                      history_data: Union[pd.DataFrame, List[Dict]],
@@ -167,10 +222,7 @@ class HistoryDuplicateFilter:
         Returns:
             List[tuple]: (候选号码, 过滤结果) 的列表，按重复度排序
         """
-        results = []
-        for candidate in candidates:
-            result = self.filter(candidate, history_data, check_periods)
-            results.append((candidate, result))
+        results = list(zip(candidates, self.evaluate(candidates, history_data, check_periods)))
 
         # 按重复度评分排序（越低越好）
         results.sort(key=lambda x: x[1].overlap_score)
@@ -206,90 +258,78 @@ class HistoryDuplicateFilter:
         else:
             return self.config.get('max_front_overlap', 3)
 
+    def _history_index(self, history_data: Union[pd.DataFrame, List[Dict]],
+                       periods: int) -> Tuple[Hashable, List[Dict], OverlapIndex]:
+        """转换后的最近 periods 期历史记录、其版本及位图索引（内容相同的记录只建立一次索引）
+
+        版本取自转换后的记录内容：不同对象但内容相同的历史数据共用缓存，
+        原地修改或换成其他数据后版本随之变化。
+        """
+        records = self._convert_history_data(history_data, periods)
+        version = data_version(records)
+        index = self._cache.get_or_compute(('history', version), lambda: self._build_index(records))
+        return version, records, index
+
     def _convert_history_data(self, history_data: Union[pd.DataFrame, List[Dict]],
                               periods: int) -> List[Dict]:
         """将历史数据转换为统一格式"""
         if isinstance(history_data, pd.DataFrame):
-            # DataFrame 格式
-            records = []
-            for i, row in history_data.head(periods).iterrows():
-                record = {'period': row.get('period', row.get('draw_number', str(i)))}
-
-                if self.lottery_type == 'ssq':
-                    # 处理红球
-                    if 'red_numbers' in row:
-                        red = row['red_numbers']
-                        if isinstance(red, str):
-                            record['red_numbers'] = [int(x) for x in red.split(',')]
-                        else:
-                            record['red_numbers'] = list(red)
-                    else:
-                        # 尝试从单独列获取
-                        red_cols = [col for col in row.index if col.startswith('red_')]
-                        if red_cols:
-                            record['red_numbers'] = [int(row[col]) for col in sorted(red_cols)]
-
-                    # 处理蓝球
-                    if 'blue_number' in row:
-                        record['blue_number'] = int(row['blue_number'])
-                    elif 'blue' in row:
-                        record['blue_number'] = int(row['blue'])
-                else:
-                    # 处理前区
-                    if 'front_numbers' in row:
-                        front = row['front_numbers']
-                        if isinstance(front, str):
-                            record['front_numbers'] = [int(x) for x in front.split(',')]
-                        else:
-                            record['front_numbers'] = list(front)
-                    else:
-                        front_cols = [col for col in row.index if col.startswith('front_')]
-                        if front_cols:
-                            record['front_numbers'] = [int(row[col]) for col in sorted(front_cols)]
-
-                    # 处理后区
-                    if 'back_numbers' in row:
-                        back = row['back_numbers']
-                        if isinstance(back, str):
-                            record['back_numbers'] = [int(x) for x in back.split(',')]
-                        else:
-                            record['back_numbers'] = list(back)
-                    else:
-                        back_cols = [col for col in row.index if col.startswith('back_')]
-                        if back_cols:
-                            record['back_numbers'] = [int(row[col]) for col in sorted(back_cols)]
-
-                records.append(record)
-            return records
+            # DataFrame 格式，按列转换
+            frame = history_data.head(periods)
+            if 'period' in frame.columns:
+                labels = frame['period'].tolist()
+            elif 'draw_number' in frame.columns:
+                labels = frame['draw_number'].tolist()
+            else:
+                labels = [str(i) for i in frame.index]
+            columns = {'period': labels}
+
+            if self.lottery_type == 'ssq':
+                columns['red_numbers'] = self._number_column(frame, 'red_numbers', 'red_')
+                # 处理蓝球
+                for name in ('blue_number', 'blue'):
+                    if name in frame.columns:
+                        columns['blue_number'] = [int(x) for x in frame[name].tolist()]
+                        break
+            else:
+                columns['front_numbers'] = self._number_column(frame, 'front_numbers', 'front_')
+                columns['back_numbers'] = self._number_column(frame, 'back_numbers', 'back_')
+
+            columns = {key: values for key, values in columns.items() if values is not None}
+            return [dict(zip(columns, values)) for values in zip(*columns.values())]
         else:
             # 列表格式，直接截取
             return history_data[:periods]
 
-    def _calculate_overlap(self, candidate: Union[SSQNumber, DLTNumber],
-                          record: Dict) -> int:
-        """计算主区号码重复数量"""
-        if self.lottery_type == 'ssq':
-            candidate_red = set(candidate.red)
-            history_red = set(record.get('red_numbers', []))
-            return len(candidate_red & history_red)
-        else:
-            candidate_front = set(candidate.front)
-            history_front = set(record.get('front_numbers', []))
-            return len(candidate_front & history_front)
-
-    def _is_exact_match(self, candidate: Union[SSQNumber, DLTNumber],
-                        record: Dict) -> bool:
-        """检查是否完全匹配"""
+    @staticmethod
+    def _number_column(frame: pd.DataFrame, name: str, prefix: str) -> Optional[List[List[int]]]:
+        """号码列（列表或逗号分隔的字符串）；没有该列时尝试从单独的 prefix* 列获取"""
+        if name in frame.columns:
+            return [[int(x) for x in value.split(',')] if isinstance(value, str) else list(value)
+                    for value in frame[name].tolist()]
+        number_cols = sorted(col for col in frame.columns if isinstance(col, str) and col.startswith(prefix))
+        if not number_cols:
+            return None
+        return [[int(x) for x in row] for row in zip(*(frame[col].tolist() for col in number_cols))]
+
+    def _build_index(self, records: List[Dict]) -> OverlapIndex:
+        """为转换后的历史记录建立号码位图索引"""
+        return OverlapIndex.for_lottery(self.lottery_type, records)
+
+    @staticmethod
+    def _period_label(records: List[Dict], position: int) -> str:
+        """期位置对应的期号（缺失时为“第N期”）"""
+        return records[position].get('period', f'第{position + 1}期')
+
+    def _main_numbers(self, candidate: Union[SSQNumber, DLTNumber]) -> List[int]:
+        """候选号码的主区号码（红球/前区）"""
+        return candidate.red if self.lottery_type == 'ssq' else candidate.front
+
+    def _ticket_numbers(self, candidate: Union[SSQNumber, DLTNumber]) -> tuple:
+        """候选号码的 (主区, 副区) 号码"""
         if self.lottery_type == 'ssq':
-            history_red = record.get('red_numbers', [])
-            history_blue = record.get('blue_number')
-            return (sorted(candidate.red) == sorted(history_red)
-                    and candidate.blue == history_blue)
-        else:
-            history_front = record.get('front_numbers', [])
-            history_back = record.get('back_numbers', [])
-            return (sorted(candidate.front) == sorted(history_front)
-                    and sorted(candidate.back) == sorted(history_back))
+            return candidate.red, [candidate.blue]
+        return candidate.front, candidate.back
 
     def get_overlap_stats(self, candidate: Union[SSQNumber, DLTNumber],
                           history_data: Union[pd.DataFrame, List[Dict]],
@@ -306,22 +346,18 @@ class HistoryDuplicateFilter:
             Dict: 详细统计信息
         """
         periods = check_periods or self.config['check_periods']
-        records = self._convert_history_data(history_data, periods)
-
-        overlap_distribution = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}
-        overlap_details = []
-
-        for i, record in enumerate(records):
-            overlap = self._calculate_overlap(candidate, record)
-            if overlap in overlap_distribution:
-                overlap_distribution[overlap] += 1
-
-            if overlap >= 3:  # 只记录重复3个及以上的
-                overlap_details.append({
-                    'period': record.get('period', f'第{i+1}期'),
-                    'overlap_count': overlap,
-                    'position': i + 1
-                })
+        _, records, index = self._history_index(history_data, periods)
+
+        counts = index.overlap_counts(self._main_numbers(candidate))
+        histogram = np.bincount(counts, minlength=7)
+        overlap_distribution = {k: int(histogram[k]) for k in range(7)}
+
+        # 只记录重复3个及以上的
+        overlap_details = [{
+            'period': self._period_label(records, i),
+            'overlap_count': int(counts[i]),
+            'position': i + 1
+        } for i in np.flatnonzero(counts >= 3).tolist()]
 
         return {
             'distribution': overlap_distribution,
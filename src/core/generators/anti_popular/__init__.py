@@ -5,11 +5,17 @@
 
 from .popularity_detector import PopularityDetector
 from .correlation_checker import CorrelationChecker
+from .portfolio import TicketPortfolio
 from .sequence_analyzer import SequenceAnalyzer
+from .acceptance_sampler import AcceptanceTable, AntiPopularSampler, get_acceptance_table
 
 __all__ = [
+    'AcceptanceTable',
+    'AntiPopularSampler',
     'PopularityDetector',
     'CorrelationChecker',
-    'SequenceAnalyzer'
+    'SequenceAnalyzer',
+    'TicketPortfolio',
+    'get_acceptance_table'
 ]
 
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+去热门接受表抽样器
+对红球/前区的全部组合一次性计算热门度分数和硬性拒绝标记（按配置缓存），得到满足条件的
+号码集合，再从中按均匀或按热门度加权的方式逐注抽样；多注之间的重叠约束在每次选中后
+增量更新，不再需要拒绝抽样、降级接受或兜底。重叠约束按轮生效：某一区已没有满足约束的
+号码时开始新的一轮，因此任意注数都能选满，热门度阈值和硬性规则始终不放宽。
+"""
+
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...storage import CombinationTable, get_combination_table
+from ...storage.overlap_index import masks_of, popcount
+from .popularity_detector import PopularityDetector
+
+# 各彩票类型副区的取值: (最大号码, 号码个数)
+EXTRA_LAYOUTS: Dict[str, Tuple[int, int]] = {
+    'ssq': (16, 1),
+    'dlt': (12, 2),
+}
+
+# 按热门度加权时，热门度每高 1 分权重乘以的系数
+SCORE_DECAY = 0.5
+
+
+def main_scores(table: CombinationTable, sum_bounds: Tuple[int, int]) -> np.ndarray:
+    """全部红球/前区组合的热门度分数（PopularityDetector 中红球/前区部分的规则）
+
+    Args:
+        table: 组合属性表
+        sum_bounds: 和值范围（仅双色球使用，大乐透固定为 60-120）
+
+    Returns:
+        按组合序编号索引的分数
+    """
+    numbers = table.numbers
+    if table.lottery_type == 'ssq':
+        return PopularityDetector.calculate_ssq_scores(numbers, None, sum_bounds)
+    return PopularityDetector.calculate_dlt_scores(numbers, None)
+
+
+def main_hard_reject(table: CombinationTable, config: Dict) -> np.ndarray:
+    """全部红球/前区组合是否被硬性规则拒绝（PopularityDetector.check_hard_reject_* 中与主区有关的规则）"""
+    numbers = table.numbers
+    if table.lottery_type == 'ssq':
+        return PopularityDetector.check_hard_reject_ssq_batch(numbers, config)
+    return PopularityDetector.check_hard_reject_dlt_batch(numbers, None, config)
+
+
+def extra_choices(lottery_type: str, config: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """全部副区号码（蓝球/后区组合）及其热门度分数和是否允许
+
+    Returns:
+        (副区号码 (E, 个数), 分数 (E,), 是否允许 (E,))
+    """
+    max_number, count = EXTRA_LAYOUTS[lottery_type]
+    extras = np.array(list(itertools.combinations(range(1, max_number + 1), count)), dtype=np.int64)
+    if lottery_type == 'ssq':
+        scores = ((extras[:, 0] >= 7) & (extras[:, 0] <= 10)).astype(np.int16)
+        return extras, scores, np.ones(len(extras), dtype=bool)
+    consecutive = extras[:, 1] - extras[:, 0] == 1
+    allowed = ~consecutive if config.get('avoid_back_consecutive', False) else np.ones(len(extras), dtype=bool)
+    return extras, consecutive.astype(np.int16), allowed
+
+
+@dataclass
+class AcceptanceTable:
+    """满足去热门条件的号码集合（按配置预计算，只读）"""
+    lottery_type: str
+    max_score: int             # 热门度阈值
+    mains: np.ndarray          # 可接受的红球/前区组合 (M, 个数)，按组合序排列
+    main_scores: np.ndarray    # 各组合的热门度分数 (M,)
+    main_masks: np.ndarray     # 各组合的号码位图 (M,)
+    extras: np.ndarray         # 副区号码 (E, 个数)
+    extra_scores: np.ndarray   # 副区热门度分数 (E,)
+    extra_allowed: np.ndarray  # 副区是否通过硬性规则 (E,)
+    extra_masks: np.ndarray    # 副区号码位图 (E,)
+
+    @classmethod
+    def build(cls, lottery_type: str, config: Dict,
+              table: Optional[CombinationTable] = None) -> 'AcceptanceTable':
+        """计算全部组合的热门度分数和硬性拒绝标记
+
+        红球/前区组合通过硬性规则、且搭配分数最低的可用副区号码后热门度不超过阈值时可接受。
+
+        Raises:
+            ValueError: 没有号码能通过硬性规则，或通过硬性规则的号码热门度都超过 max_score
+        """
+        table = table if table is not None else get_combination_table(lottery_type)
+        extras, extra_scores, extra_allowed = extra_choices(lottery_type, config)
+        if not extra_allowed.any():
+            raise ValueError("没有满足去热门条件的副区号码，请放宽配置")
+        default_sum = (70, 140) if lottery_type == 'ssq' else (60, 120)
+        scores = main_scores(table, tuple(config.get('sum_bounds', default_sum)))
+        # 搭配分数最低的可用副区号码时的热门度
+        best = scores + int(extra_scores[extra_allowed].min())
+        passed = ~main_hard_reject(table, config)
+        if not passed.any():
+            raise ValueError("没有通过硬性规则的号码，请放宽配置")
+
+        max_score = config.get('max_score', 2)
+        lowest = int(best[passed].min())
+        if lowest > max_score:
+            raise ValueError(f"热门度不超过 {max_score} 的号码不存在（可达到的最低热门度为 {lowest}），请放宽配置")
+        accepted = np.flatnonzero(passed & (best <= max_score))
+        mains = np.asarray(table.numbers[accepted], dtype=np.int64)
+        return cls(lottery_type, max_score, mains, scores[accepted], masks_of(mains),
+                   extras, extra_scores, extra_allowed, masks_of(extras))
+
+    def __len__(self) -> int:
+        return len(self.mains)
+
+
+_tables: Dict[Tuple, AcceptanceTable] = {}
+_tables_lock = threading.Lock()
+
+# 影响接受集合的配置项
+_TABLE_KEYS = ('max_score', 'max_run', 'max_same_last_digit', 'odd_bounds', 'sum_bounds', 'avoid_back_consecutive')
+
+
+def get_acceptance_table(lottery_type: str, config: Dict) -> AcceptanceTable:
+    """获取去热门接受表（进程级缓存，按影响接受集合的配置项区分）"""
+    if lottery_type not in EXTRA_LAYOUTS:
+        raise ValueError(f"不支持的彩票类型: {lottery_type}")
+    key = (lottery_type,) + tuple(
+        tuple(value) if isinstance(value, (list, tuple)) else value
+        for value in (config.get(name) for name in _TABLE_KEYS))
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = AcceptanceTable.build(lottery_type, config)
+            _tables[key] = table
+    return table
+
+
+class AntiPopularSampler:
+    """去热门号码抽样器
+
+    从接受表中逐注抽样（号码与副区号码的组合整体满足热门度阈值），并维护与已选号码的重叠约束：
+    双色球为红球最大重叠和蓝球使用次数，大乐透为前区和后区最大重叠。热门度阈值和硬性规则不放宽。
+
+    重叠约束按轮计算，主区和副区各自独立：同一轮内选出的号码两两满足约束；约束下已没有可选的
+    主区号码（或副区号码）时，该区开始新的一轮，只与新一轮内的号码比较。例如双色球每个蓝球限用
+    一次时，第 17 注起开始第二轮蓝球。轮数记录在 main_rounds、extra_rounds 中。
+    """
+
+    def __init__(self, lottery_type: str, config: Dict, weighting: str = 'uniform',
+                 rng: Optional[np.random.Generator] = None):
+        """初始化抽样器
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+            config: 去热门配置（SmartNumberGenerator.anti_popular_config 中对应彩种的部分）
+            weighting: 'uniform' 表示在满足条件的号码中均匀抽样，'score' 表示热门度越低权重越高
+            rng: 随机数生成器（None 表示新建）
+
+        Raises:
+            ValueError: 没有满足去热门条件的号码，或 weighting 不支持
+        """
+        if weighting not in ('uniform', 'score'):
+            raise ValueError(f"不支持的加权方式: {weighting}")
+        self.lottery_type = lottery_type
+        self.table = get_acceptance_table(lottery_type, config)
+        self.weighting = weighting
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        table = self.table
+        self.main_count = table.mains.shape[1]
+        if lottery_type == 'ssq':
+            self.main_limit = config.get('max_red_overlap', 2)
+            self.extra_limit = config.get('max_blue_dup', 1) - 1   # 蓝球已使用次数上限
+        else:
+            self.main_limit = config.get('max_front_overlap', 2)
+            self.extra_limit = config.get('max_back_overlap', 1)
+        # 与已选号码的重叠不超过上限的主区号码（接受表中的下标），按热门度分数分组，每选一注后缩小
+        self.alive = self._group(np.arange(len(table)))
+        # 各副区号码与本轮已选号码的最大重叠（双色球为蓝球本轮已使用次数）
+        self.extra_load = np.zeros(len(table.extras), dtype=np.int64)
+        # 主区、副区重叠约束的当前轮数
+        self.main_rounds = 1
+        self.extra_rounds = 1
+
+    def _group(self, rows: np.ndarray) -> List[np.ndarray]:
+        """按主区热门度分数分组（第 s 组为分数为 s 的号码）"""
+        scores = self.table.main_scores[rows]
+        return [rows[scores == value] for value in range(self.table.max_score + 1)]
+
+    def _pair_weights(self, scores: np.ndarray) -> np.ndarray:
+        """号码组合（主区加副区）按热门度的权重，超过阈值的为 0"""
+        weights = np.where(scores <= self.table.max_score, 1.0, 0.0)
+        if self.weighting == 'score':
+            weights *= SCORE_DECAY ** scores
+        return weights
+
+    def _score_weights(self, extra_ok: np.ndarray) -> np.ndarray:
+        """各主区热门度分数对应的权重（可用副区号码按组合热门度的权重之和），按分数索引"""
+        main_values = np.arange(self.table.max_score + 1)
+        extra_weights = self._pair_weights(main_values[:, None] + self.table.extra_scores[None, :])
+        return (extra_weights * extra_ok).sum(axis=1)
+
+    def _choose(self, weights: np.ndarray) -> int:
+        """按权重抽取一个下标"""
+        cumulative = np.cumsum(weights)
+        return min(int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side='right')),
+                   len(weights) - 1)
+
+    def _new_main_round(self) -> None:
+        """主区开始新的一轮（全部可接受的号码重新可选）"""
+        self.alive = self._group(np.arange(len(self.table)))
+        self.main_rounds += 1
+
+    def _new_extra_round(self) -> None:
+        """副区开始新的一轮"""
+        self.extra_load[:] = 0
+        self.extra_rounds += 1
+
+    def _weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """当前约束下可用的副区号码，以及各主区分数组的抽样权重"""
+        extra_ok = self.table.extra_allowed & (self.extra_load <= self.extra_limit)
+        return extra_ok, self._score_weights(extra_ok) * [len(rows) for rows in self.alive]
+
+    def sample_one(self) -> Tuple[np.ndarray, np.ndarray, int]:
+        """抽取一注并更新重叠约束（约束下已没有可选的号码时先开始新的一轮）
+
+        Returns:
+            (主区号码, 副区号码, 热门度分数)
+        """
+        table = self.table
+        extra_ok, weights = self._weights()
+        if not extra_ok.any():
+            self._new_extra_round()
+            extra_ok, weights = self._weights()
+        if not any(len(rows) for rows in self.alive):
+            self._new_main_round()
+            extra_ok, weights = self._weights()
+        # 剩余的主区号码与副区号码搭配后都超过热门度阈值时，依次开始新的一轮
+        if not weights.sum() > 0 and self.extra_load.any():
+            self._new_extra_round()
+            extra_ok, weights = self._weights()
+        if not weights.sum() > 0:
+            self._new_main_round()
+            extra_ok, weights = self._weights()
+        # 先按各分数组的总权重选组，再在组内均匀选取
+
+        score = self._choose(weights)
+        group = self.alive[score]
+        row = group[self.rng.integers(len(group))]
+        extra = self._choose(extra_ok * self._pair_weights(score + table.extra_scores))
+
+        mask = table.main_masks[row]
+        self.alive = [rows[popcount(table.main_masks[rows] & mask) <= self.main_limit] for rows in self.alive]
+        if self.lottery_type == 'ssq':
+            self.extra_load[extra] += 1
+        else:
+            np.maximum(self.extra_load, popcount(table.extra_masks & table.extra_masks[extra]),
+                       out=self.extra_load)
+        return table.mains[row], table.extras[extra], score + int(table.extra_scores[extra])
+
+    def sample(self, count: int) -> List[Tuple]:
+        """抽取 count 注号码
+
+        Returns:
+            [(红球列表, 蓝球, 分数), ...]（双色球）或 [(前区列表, 后区列表, 分数), ...]（大乐透），
+            与 CorrelationChecker 使用的格式一致
+        """
+        picks = []
+        for _ in range(count):
+            main, extra, score = self.sample_one()
+            if self.lottery_type == 'ssq':
+                picks.append((main.tolist(), int(extra[0]), score))
+            else:
+                picks.append((main.tolist(), extra.tolist(), score))
+        return picks
@@ -7,6 +7,7 @@
 
 from typing import List, Dict, Tuple
 from collections import Counter
+from .portfolio import TicketPortfolio
 from .sequence_analyzer import SequenceAnalyzer
 
 
@@ -120,52 +121,11 @@ class CorrelationChecker:
         Returns:
             多样性分数（0-1，越高越多样）
         """
-        if not picks or len(picks) < 2:
+        if not picks or len(picks) < 2 or lottery_type not in ('ssq', 'dlt'):
             return 1.0
         
-        total_overlap = 0
-        comparison_count = 0
-        
-        if lottery_type == 'ssq':
-            # 计算所有号码对之间的平均重叠度
-            for i in range(len(picks)):
-                for j in range(i + 1, len(picks)):
-                    red1, blue1, _ = picks[i]
-                    red2, blue2, _ = picks[j]
-                    
-                    # 红球重叠度（0-1）
-                    red_overlap = SequenceAnalyzer.overlap_count(red1, red2) / 6.0
-                    total_overlap += red_overlap
-                    
-                    # 蓝球相同加权
-                    if blue1 == blue2:
-                        total_overlap += 0.5
-                    
-                    comparison_count += 1
-        
-        elif lottery_type == 'dlt':
-            for i in range(len(picks)):
-                for j in range(i + 1, len(picks)):
-                    front1, back1, _ = picks[i]
-                    front2, back2, _ = picks[j]
-                    
-                    # 前区重叠度
-                    front_overlap = SequenceAnalyzer.overlap_count(front1, front2) / 5.0
-                    total_overlap += front_overlap
-                    
-                    # 后区重叠度
-                    back_overlap = SequenceAnalyzer.overlap_count(back1, back2) / 2.0
-                    total_overlap += back_overlap * 0.5
-                    
-                    comparison_count += 1
-        
-        if comparison_count == 0:
-            return 1.0
-        
-        avg_overlap = total_overlap / comparison_count
-        diversity = 1.0 - avg_overlap
-        
-        return max(0.0, min(1.0, diversity))
+        # 两两平均重叠度由各号码的使用次数增量计算（见 TicketPortfolio）
+        return TicketPortfolio.from_picks(picks, lottery_type).diversity_score
     
     @staticmethod
     def get_correlation_report(picks: List[Tuple], lottery_type: str = 'ssq') -> Dict:
@@ -179,49 +139,11 @@ class CorrelationChecker:
         Returns:
             相关性分析报告字典
         """
-        report = {
-            'total_picks': len(picks),
-            'diversity_score': CorrelationChecker.calculate_diversity_score(picks, lottery_type),
-            'overlap_details': []
-        }
-        
-        if lottery_type == 'ssq':
-            # 统计蓝球使用情况
-            blue_usage = Counter(pick[1] for pick in picks)
-            report['blue_usage'] = dict(blue_usage)
-            report['unique_blues'] = len(blue_usage)
-            
-            # 统计红球重叠情况
-            overlaps = []
-            for i in range(len(picks)):
-                for j in range(i + 1, len(picks)):
-                    overlap = SequenceAnalyzer.overlap_count(picks[i][0], picks[j][0])
-                    overlaps.append(overlap)
-            
-            if overlaps:
-                report['avg_red_overlap'] = sum(overlaps) / len(overlaps)
-                report['max_red_overlap'] = max(overlaps)
-                report['min_red_overlap'] = min(overlaps)
-        
-        elif lottery_type == 'dlt':
-            # 统计前区和后区重叠情况
-            front_overlaps = []
-            back_overlaps = []
-            
-            for i in range(len(picks)):
-                for j in range(i + 1, len(picks)):
-                    front_overlap = SequenceAnalyzer.overlap_count(picks[i][0], picks[j][0])
-                    back_overlap = SequenceAnalyzer.overlap_count(picks[i][1], picks[j][1])
-                    front_overlaps.append(front_overlap)
-                    back_overlaps.append(back_overlap)
-            
-            if front_overlaps:
-                report['avg_front_overlap'] = sum(front_overlaps) / len(front_overlaps)
-                report['max_front_overlap'] = max(front_overlaps)
-            
-            if back_overlaps:
-                report['avg_back_overlap'] = sum(back_overlaps) / len(back_overlaps)
-                report['max_back_overlap'] = max(back_overlaps)
-        
-        return report
-
+        if lottery_type not in ('ssq', 'dlt'):
+            return {
+                'total_picks': len(picks),
+                'diversity_score': CorrelationChecker.calculate_diversity_score(picks, lottery_type),
+                'overlap_details': []
+            }
+        
+        return TicketPortfolio.from_picks(picks, lottery_type).report()
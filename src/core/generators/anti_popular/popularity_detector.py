@@ -5,8 +5,19 @@
 检测号码组合中的热门选号模式，分数越高表示越"大众化"
 """
 
-from typing import List, Tuple, Dict
-from .sequence_analyzer import SequenceAnalyzer
+from typing import List, Optional, Tuple, Dict
+
+import numpy as np
+
+from .sequence_analyzer import SequenceAnalyzer, as_rows, compact_rows
+
+
+def _graded(values: np.ndarray, grades: List[Tuple[int, int]]) -> np.ndarray:
+    """分档计分：grades 为按下限升序的 [(下限, 分数), ...]，取满足的最高一档"""
+    score = np.zeros(len(values), dtype=np.int64)
+    for threshold, points in grades:
+        score = np.where(values >= threshold, points, score)
+    return score
 
 
 class PopularityDetector:
@@ -38,71 +49,7 @@ class PopularityDetector:
             8. 区间集中：全在一区+3分，5个在一区+1分
             9. 蓝球热门：7-10号+1分
         """
-        score = 0
-        
-        # 1) 连号偏好
-        run = SequenceAnalyzer.max_consecutive_run(red)
-        if run >= 5:
-            score += 5
-        elif run == 4:
-            score += 3
-        elif run == 3:
-            score += 1
-        
-        # 2) 等差偏好
-        if SequenceAnalyzer.is_arithmetic_progression(red):
-            score += 5
-        elif SequenceAnalyzer.has_ap_k_of_m(red, 5):
-            score += 3
-        elif SequenceAnalyzer.has_ap_k_of_m(red, 4):
-            score += 1
-        
-        # 3) 生日化（≤31 过多）
-        birth_like = SequenceAnalyzer.count_birthday_like(red, 31)
-        if birth_like == 6:
-            score += 3
-        elif birth_like >= 5:
-            score += 2
-        
-        # 4) 同尾数过多
-        ld_dist = SequenceAnalyzer.last_digit_distribution(red)
-        max_same_digit = max(ld_dist.values()) if ld_dist else 0
-        if max_same_digit >= 4:
-            score += 3
-        elif max_same_digit == 3:
-            score += 2
-        
-        # 5) 整齐倍数（5的倍数过多）
-        mult5 = SequenceAnalyzer.count_multiples(red, 5)
-        if mult5 >= 4:
-            score += 3
-        elif mult5 == 3:
-            score += 1
-        
-        # 6) 奇偶极端
-        odd, even = SequenceAnalyzer.count_odd_even(red)
-        if odd in (0, 6):
-            score += 1
-        
-        # 7) 和值偏离
-        rsum = sum(red)
-        lo, hi = sum_bounds
-        if rsum < lo or rsum > hi:
-            score += 1
-        
-        # 8) 区间过度集中（三区：1-11, 12-22, 23-33）
-        zone_dist = SequenceAnalyzer.zone_distribution(red, 3, 33)
-        max_zone = max(zone_dist)
-        if max_zone == 6:
-            score += 3
-        elif max_zone >= 5:
-            score += 1
-        
-        # 9) 蓝球"撞大众"（7-10是常见选择）
-        if 7 <= blue <= 10:
-            score += 1
-        
-        return score
+        return int(PopularityDetector.calculate_ssq_scores(as_rows(red), np.array([blue]), sum_bounds)[0])
     
     @staticmethod
     def calculate_dlt_score(front: List[int], back: List[int]) -> int:
@@ -126,54 +73,7 @@ class PopularityDetector:
             7. 和值极端：<60或>120 +1分
             8. 后区连号：+1分
         """
-        score = 0
-        
-        # 1) 前区连号过多
-        max_run = SequenceAnalyzer.max_consecutive_run(front)
-        if max_run >= 4:
-            score += 4
-        elif max_run == 3:
-            score += 2
-        
-        # 2) 等差结构
-        if SequenceAnalyzer.is_arithmetic_progression(front):
-            score += 4
-        elif SequenceAnalyzer.has_ap_k_of_m(front, 4):
-            score += 2
-        
-        # 3) 生日化
-        birthday_like = SequenceAnalyzer.count_birthday_like(front, 31)
-        if birthday_like == 5:
-            score += 4
-        elif birthday_like >= 4:
-            score += 2
-        
-        # 4) 尾数过于集中
-        ld_dist = SequenceAnalyzer.last_digit_distribution(front)
-        max_same_digit = max(ld_dist.values()) if ld_dist else 0
-        if max_same_digit >= 3:
-            score += 2
-        
-        # 5) 0/5 尾数过多
-        zero_five = SequenceAnalyzer.count_multiples(front, 5)
-        if zero_five >= 3:
-            score += 2
-        
-        # 6) 奇偶极端
-        odd, even = SequenceAnalyzer.count_odd_even(front)
-        if odd in (0, 5):
-            score += 1
-        
-        # 7) 和值太极端
-        s = sum(front)
-        if s < 60 or s > 120:
-            score += 1
-        
-        # 8) 后区连号
-        if len(back) == 2 and SequenceAnalyzer.is_consecutive_pair(back[0], back[1]):
-            score += 1
-        
-        return score
+        return int(PopularityDetector.calculate_dlt_scores(as_rows(front), as_rows(back))[0])
     
     @staticmethod
     def check_hard_reject_ssq(red: List[int], blue: int, config: Dict) -> bool:
@@ -188,30 +88,7 @@ class PopularityDetector:
         Returns:
             True表示应该拒绝，False表示通过检查
         """
-        # 连号长度限制
-        max_run_allowed = config.get('max_run', 2)
-        if SequenceAnalyzer.max_consecutive_run(red) > max_run_allowed:
-            return True
-        
-        # 同尾限制
-        max_same_last_digit = config.get('max_same_last_digit', 2)
-        ld_dist = SequenceAnalyzer.last_digit_distribution(red)
-        if any(c > max_same_last_digit for c in ld_dist.values()):
-            return True
-        
-        # 奇偶限制
-        odd_bounds = config.get('odd_bounds', (2, 4))
-        odd, _ = SequenceAnalyzer.count_odd_even(red)
-        if not (odd_bounds[0] <= odd <= odd_bounds[1]):
-            return True
-        
-        # 和值限制
-        sum_bounds = config.get('sum_bounds', (70, 140))
-        rsum = sum(red)
-        if not (sum_bounds[0] <= rsum <= sum_bounds[1]):
-            return True
-        
-        return False
+        return bool(PopularityDetector.check_hard_reject_ssq_batch(as_rows(red), config)[0])
     
     @staticmethod
     def check_hard_reject_dlt(front: List[int], back: List[int], config: Dict) -> bool:
@@ -226,34 +103,132 @@ class PopularityDetector:
         Returns:
             True表示应该拒绝，False表示通过检查
         """
-        # 连号长度限制
-        max_run_allowed = config.get('max_run', 2)
-        if SequenceAnalyzer.max_consecutive_run(front) > max_run_allowed:
-            return True
-        
-        # 尾数集中限制
-        max_same_last_digit = config.get('max_same_last_digit', 2)
-        ld_dist = SequenceAnalyzer.last_digit_distribution(front)
-        if any(c > max_same_last_digit for c in ld_dist.values()):
-            return True
+        return bool(PopularityDetector.check_hard_reject_dlt_batch(as_rows(front), as_rows(back), config)[0])
+
+    # ==================== 批量版本 ====================
+
+    @staticmethod
+    def calculate_ssq_scores(reds: np.ndarray, blues: Optional[np.ndarray],
+                             sum_bounds: Tuple[int, int]) -> np.ndarray:
+        """
+        批量计算双色球号码的热门度分数（规则同 calculate_ssq_score）
         
-        # 奇偶限制
-        odd_bounds = config.get('odd_bounds', (1, 4))
-        odd, _ = SequenceAnalyzer.count_odd_even(front)
-        if odd < odd_bounds[0] or odd > odd_bounds[1]:
-            return True
+        Args:
+            reds: 红球号码 (N, 6)，每行已排序
+            blues: 蓝球号码 (N,)；None 表示只计算红球部分
+            sum_bounds: 和值范围 (下界, 上界)
+            
+        Returns:
+            热门度分数 (N,)
+        """
+        reds = compact_rows(reds)
+        ap = np.where(SequenceAnalyzer.is_arithmetic_progression_batch(reds), 5,
+                      np.where(SequenceAnalyzer.has_ap_k_of_m_batch(reds, 5), 3,
+                               np.where(SequenceAnalyzer.has_ap_k_of_m_batch(reds, 4), 1, 0)))
+        birth_like = SequenceAnalyzer.count_birthday_like_batch(reds, 31)
+        max_zone = SequenceAnalyzer.zone_distribution_batch(reds, 3, 33).max(axis=1)
+        odd, _ = SequenceAnalyzer.count_odd_even_batch(reds)
+        rsum = reds.sum(axis=1, dtype=np.int64)
+        lo, hi = sum_bounds
+        score = (
+            _graded(SequenceAnalyzer.max_consecutive_run_batch(reds), [(3, 1), (4, 3), (5, 5)]) +   # 1) 连号偏好
+            ap +                                                                                     # 2) 等差偏好
+            np.where(birth_like == 6, 3, np.where(birth_like >= 5, 2, 0)) +                         # 3) 生日化
+            _graded(SequenceAnalyzer.last_digit_distribution_batch(reds).max(axis=1), [(3, 2), (4, 3)]) +  # 4) 同尾数
+            _graded(SequenceAnalyzer.count_multiples_batch(reds, 5), [(3, 1), (4, 3)]) +            # 5) 整齐倍数
+            np.isin(odd, (0, 6)) +                                                                   # 6) 奇偶极端
+            ((rsum < lo) | (rsum > hi)) +                                                            # 7) 和值偏离
+            np.where(max_zone == 6, 3, np.where(max_zone >= 5, 1, 0))                                # 8) 区间集中
+        )
+        if blues is not None:
+            blues = np.asarray(blues, dtype=np.int64).reshape(-1)
+            score = score + ((blues >= 7) & (blues <= 10))                                           # 9) 蓝球热门
+        return score.astype(np.int64)
+    
+    @staticmethod
+    def calculate_dlt_scores(fronts: np.ndarray, backs: Optional[np.ndarray]) -> np.ndarray:
+        """
+        批量计算大乐透号码的热门度分数（规则同 calculate_dlt_score）
         
-        # 和值限制
-        sum_bounds = config.get('sum_bounds', (60, 120))
-        s = sum(front)
-        if s < sum_bounds[0] or s > sum_bounds[1]:
-            return True
+        Args:
+            fronts: 前区号码 (N, 5)，每行已排序
+            backs: 后区号码 (N, 2)；None 表示只计算前区部分
+            
+        Returns:
+            热门度分数 (N,)
+        """
+        fronts = compact_rows(fronts)
+        ap = np.where(SequenceAnalyzer.is_arithmetic_progression_batch(fronts), 4,
+                      np.where(SequenceAnalyzer.has_ap_k_of_m_batch(fronts, 4), 2, 0))
+        birthday_like = SequenceAnalyzer.count_birthday_like_batch(fronts, 31)
+        odd, _ = SequenceAnalyzer.count_odd_even_batch(fronts)
+        s = fronts.sum(axis=1, dtype=np.int64)
+        score = (
+            _graded(SequenceAnalyzer.max_consecutive_run_batch(fronts), [(3, 2), (4, 4)]) +         # 1) 前区连号
+            ap +                                                                                     # 2) 等差结构
+            np.where(birthday_like == 5, 4, np.where(birthday_like >= 4, 2, 0)) +                   # 3) 生日化
+            _graded(SequenceAnalyzer.last_digit_distribution_batch(fronts).max(axis=1), [(3, 2)]) +  # 4) 尾数集中
+            _graded(SequenceAnalyzer.count_multiples_batch(fronts, 5), [(3, 2)]) +                  # 5) 0/5 尾数
+            np.isin(odd, (0, 5)) +                                                                   # 6) 奇偶极端
+            ((s < 60) | (s > 120))                                                                   # 7) 和值极端
+        )
+        if backs is not None:
+            score = score + PopularityDetector._back_consecutive(as_rows(backs))                    # 8) 后区连号
+        return score.astype(np.int64)
+    
+    @staticmethod
+    def _back_consecutive(backs: np.ndarray) -> np.ndarray:
+        """逐行判断后区是否为两个连续号码（后区号码个数不是 2 时为假）"""
+        if backs.shape[1] != 2:
+            return np.zeros(len(backs), dtype=bool)
+        return SequenceAnalyzer.is_consecutive_pair_batch(backs[:, 0], backs[:, 1])
+    
+    @staticmethod
+    def _too_many_same_digit(nums: np.ndarray, limit: int) -> np.ndarray:
+        """逐行判断是否有出现的尾数个数超过上限"""
+        counts = SequenceAnalyzer.last_digit_distribution_batch(nums)
+        return ((counts > limit) & (counts > 0)).any(axis=1)
+    
+    @staticmethod
+    def check_hard_reject_ssq_batch(reds: np.ndarray, config: Dict) -> np.ndarray:
+        """
+        批量进行双色球硬性规则检查（规则同 check_hard_reject_ssq，只与红球有关）
         
-        # 后区是否拒绝连续
-        avoid_back_consecutive = config.get('avoid_back_consecutive', False)
-        if avoid_back_consecutive and len(back) == 2:
-            if SequenceAnalyzer.is_consecutive_pair(back[0], back[1]):
-                return True
+        Returns:
+            (N,) 布尔数组，True 表示应该拒绝
+        """
+        reds = compact_rows(reds)
+        odd, _ = SequenceAnalyzer.count_odd_even_batch(reds)
+        odd_bounds = config.get('odd_bounds', (2, 4))
+        sum_bounds = config.get('sum_bounds', (70, 140))
+        rsum = reds.sum(axis=1, dtype=np.int64)
+        return ((SequenceAnalyzer.max_consecutive_run_batch(reds) > config.get('max_run', 2)) |
+                PopularityDetector._too_many_same_digit(reds, config.get('max_same_last_digit', 2)) |
+                (odd < odd_bounds[0]) | (odd > odd_bounds[1]) |
+                (rsum < sum_bounds[0]) | (rsum > sum_bounds[1]))
+    
+    @staticmethod
+    def check_hard_reject_dlt_batch(fronts: np.ndarray, backs: Optional[np.ndarray], config: Dict) -> np.ndarray:
+        """
+        批量进行大乐透硬性规则检查（规则同 check_hard_reject_dlt）
         
-        return False
-
+        Args:
+            fronts: 前区号码 (N, 5)
+            backs: 后区号码 (N, 2)；None 表示只检查前区
+            config: 配置字典
+            
+        Returns:
+            (N,) 布尔数组，True 表示应该拒绝
+        """
+        fronts = compact_rows(fronts)
+        odd, _ = SequenceAnalyzer.count_odd_even_batch(fronts)
+        odd_bounds = config.get('odd_bounds', (1, 4))
+        sum_bounds = config.get('sum_bounds', (60, 120))
+        s = fronts.sum(axis=1, dtype=np.int64)
+        reject = ((SequenceAnalyzer.max_consecutive_run_batch(fronts) > config.get('max_run', 2)) |
+                  PopularityDetector._too_many_same_digit(fronts, config.get('max_same_last_digit', 2)) |
+                  (odd < odd_bounds[0]) | (odd > odd_bounds[1]) |
+                  (s < sum_bounds[0]) | (s > sum_bounds[1]))
+        if backs is not None and config.get('avoid_back_consecutive', False):
+            reject |= PopularityDetector._back_consecutive(as_rows(backs))
+        return reject
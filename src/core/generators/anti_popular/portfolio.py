@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+号码组合的增量多样性统计
+一组已选号码（如合买的数百至数千注）按注保存主区、副区号码位图，并维护每个号码的使用次数。
+两两重叠数之和等于各号码 C(使用次数, 2) 之和，因此每加入一注只需读取该注号码的使用次数即可
+更新多样性分数和平均重叠；最大/最小重叠和“能否加入”的查询对全部已选位图做一次按位与和置位计数。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ...storage.overlap_index import MAX_NUMBER, as_number_list, masks_of, popcount
+from ..candidate_factory import LAYOUTS
+
+# 多样性分数中副区重叠的权重（与 CorrelationChecker 的定义一致）
+EXTRA_WEIGHT = 0.5
+
+
+def _ticket(numbers: Any) -> Tuple[List[int], np.uint64]:
+    """号码（列表、单个号码或逗号分隔的字符串）的去重号码和位图
+
+    Raises:
+        ValueError: 号码超出位图可表示的范围
+    """
+    values = sorted({int(n) for n in as_number_list(numbers)})
+    return values, masks_of(np.array(values, dtype=np.int64).reshape(1, -1))[0]
+
+
+class TicketPortfolio:
+    """号码组合的增量统计
+
+    每加入一注：使用次数和两两重叠数之和 O(号码个数) 更新，最大/最小重叠用全部已选位图
+    （每注一个 uint64）的一次向量化比较更新。
+
+    Examples:
+        >>> portfolio = TicketPortfolio('ssq')
+        >>> if portfolio.can_add(red, max_overlap=3):
+        ...     portfolio.add(red, blue)
+        >>> portfolio.diversity_score
+    """
+
+    def __init__(self, lottery_type: str, capacity: int = 64):
+        """初始化号码组合
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+            capacity: 初始容量（注数，不足时自动扩容）
+        """
+        if lottery_type not in LAYOUTS:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        self.lottery_type = lottery_type
+        _, self.main_count, _, self.extra_count = LAYOUTS[lottery_type]
+        # 各号码被已选号码使用的次数（下标为号码）
+        self.main_usage = np.zeros(MAX_NUMBER + 1, dtype=np.int64)
+        self.extra_usage = np.zeros(MAX_NUMBER + 1, dtype=np.int64)
+        # 两两重叠数之和
+        self.main_pair_overlap = 0
+        self.extra_pair_overlap = 0
+        # 两两重叠数的最大、最小值（不足两注时为 None）
+        self.max_main_overlap: Optional[int] = None
+        self.min_main_overlap: Optional[int] = None
+        self.max_extra_overlap: Optional[int] = None
+        self.min_extra_overlap: Optional[int] = None
+        self._main_masks = np.zeros(max(capacity, 1), dtype=np.uint64)
+        self._extra_masks = np.zeros(max(capacity, 1), dtype=np.uint64)
+        self._extra_order: List[int] = []   # 副区号码首次使用的顺序
+        self._size = 0
+
+    @classmethod
+    def from_picks(cls, picks: Sequence[Tuple], lottery_type: str) -> 'TicketPortfolio':
+        """由 [(主区, 副区, 分数), ...] 格式的号码列表创建（与 CorrelationChecker 使用的格式一致）"""
+        portfolio = cls(lottery_type, capacity=len(picks))
+        for pick in picks:
+            portfolio.add(pick[0], pick[1])
+        return portfolio
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def pair_count(self) -> int:
+        """号码对数"""
+        return self._size * (self._size - 1) // 2
+
+    @property
+    def main_masks(self) -> np.ndarray:
+        """已选号码的主区位图（按加入顺序）"""
+        return self._main_masks[:self._size]
+
+    @property
+    def extra_masks(self) -> np.ndarray:
+        """已选号码的副区位图（按加入顺序）"""
+        return self._extra_masks[:self._size]
+
+    def overlaps(self, main: Any) -> np.ndarray:
+        """主区号码与各已选号码的重叠数（按加入顺序）"""
+        return popcount(self.main_masks & _ticket(main)[1])
+
+    def extra_overlaps(self, extra: Any) -> np.ndarray:
+        """副区号码与各已选号码的重叠数（按加入顺序）"""
+        return popcount(self.extra_masks & _ticket(extra)[1])
+
+    def can_add(self, main: Any, max_overlap: int, extra: Any = None,
+                max_extra_overlap: Optional[int] = None) -> bool:
+        """能否加入而不超过重叠上限
+
+        Args:
+            main: 主区号码
+            max_overlap: 与任一已选号码的主区最大重叠
+            extra: 副区号码（检查副区重叠时需要）
+            max_extra_overlap: 与任一已选号码的副区最大重叠（None 表示不检查）
+
+        Returns:
+            与全部已选号码的重叠均不超过上限时为 True
+        """
+        if not self._size:
+            return True
+        values, mask = _ticket(main)
+        # 使用次数为 0 的号码不会产生重叠，重叠上限不小于其余号码个数时无需比较位图
+        if np.count_nonzero(self.main_usage[values]) > max_overlap and \
+                popcount(self.main_masks & mask).max() > max_overlap:
+            return False
+        if max_extra_overlap is None or extra is None:
+            return True
+        values, mask = _ticket(extra)
+        return not (np.count_nonzero(self.extra_usage[values]) > max_extra_overlap and
+                    popcount(self.extra_masks & mask).max() > max_extra_overlap)
+
+    def add(self, main: Any, extra: Any = None) -> None:
+        """加入一注号码
+
+        Args:
+            main: 主区号码
+            extra: 副区号码（双色球为蓝球，可为单个号码）
+
+        Raises:
+            ValueError: 号码超出位图可表示的范围
+        """
+        main_values, main_mask = _ticket(main)
+        extra_values, extra_mask = _ticket(extra)
+        if self._size:
+            main_overlaps = popcount(self.main_masks & main_mask)
+            extra_overlaps = popcount(self.extra_masks & extra_mask)
+            self.max_main_overlap, self.min_main_overlap = self._extend_range(
+                main_overlaps, self.max_main_overlap, self.min_main_overlap)
+            self.max_extra_overlap, self.min_extra_overlap = self._extend_range(
+                extra_overlaps, self.max_extra_overlap, self.min_extra_overlap)
+
+        # 新号码与已选号码的重叠数之和即该注各号码已有的使用次数之和
+        self.main_pair_overlap += int(self.main_usage[main_values].sum())
+        self.extra_pair_overlap += int(self.extra_usage[extra_values].sum())
+        self._extra_order.extend(n for n in extra_values if not self.extra_usage[n])
+        self.main_usage[main_values] += 1
+        self.extra_usage[extra_values] += 1
+
+        if self._size == len(self._main_masks):
+            self._main_masks = np.concatenate([self._main_masks, np.zeros_like(self._main_masks)])
+            self._extra_masks = np.concatenate([self._extra_masks, np.zeros_like(self._extra_masks)])
+        self._main_masks[self._size] = main_mask
+        self._extra_masks[self._size] = extra_mask
+        self._size += 1
+
+    @staticmethod
+    def _extend_range(overlaps: np.ndarray, high: Optional[int],
+                      low: Optional[int]) -> Tuple[int, int]:
+        """用新一注的重叠数更新最大、最小值"""
+        new_high, new_low = int(overlaps.max()), int(overlaps.min())
+        if high is None:
+            return new_high, new_low
+        return max(high, new_high), min(low, new_low)
+
+    @property
+    def diversity_score(self) -> float:
+        """多样性分数（0-1，越高越多样）：1 - 两两平均重叠度
+
+        每对号码的重叠度为主区重叠数 / 主区个数，加上副区重叠数 / 副区个数 * 0.5
+        （双色球即蓝球相同时加 0.5）。
+        """
+        pairs = self.pair_count
+        if not pairs:
+            return 1.0
+        total_overlap = (self.main_pair_overlap / self.main_count +
+                         EXTRA_WEIGHT * self.extra_pair_overlap / self.extra_count)
+        return max(0.0, min(1.0, 1.0 - total_overlap / pairs))
+
+    def extra_usage_counts(self) -> Dict[int, int]:
+        """副区各号码的使用次数（按首次使用的顺序）"""
+        return {number: int(self.extra_usage[number]) for number in self._extra_order}
+
+    def report(self) -> Dict:
+        """相关性分析报告（与 CorrelationChecker.get_correlation_report 的字段一致）"""
+        report = {
+            'total_picks': self._size,
+            'diversity_score': self.diversity_score,
+            'overlap_details': []
+        }
+        pairs = self.pair_count
+        if self.lottery_type == 'ssq':
+            report['blue_usage'] = self.extra_usage_counts()
+            report['unique_blues'] = len(self._extra_order)
+            if pairs:
+                report['avg_red_overlap'] = self.main_pair_overlap / pairs
+                report['max_red_overlap'] = self.max_main_overlap
+                report['min_red_overlap'] = self.min_main_overlap
+        elif pairs:
+            report['avg_front_overlap'] = self.main_pair_overlap / pairs
+            report['max_front_overlap'] = self.max_main_overlap
+            report['avg_back_overlap'] = self.extra_pair_overlap / pairs
+            report['max_back_overlap'] = self.max_extra_overlap
+        return report
@@ -3,11 +3,35 @@
 """
 序列分析工具
 用于检测号码序列中的各种模式
+
+各检测函数都有批量版本（*_batch），输入为每行一注的 (N, k) 整数数组，返回逐行结果数组；
+单注版本是批量版本的薄封装，结果完全一致。
 """
 
+from collections import Counter
 from typing import List, Tuple
 from itertools import combinations
 
+import numpy as np
+
+
+def as_rows(nums) -> np.ndarray:
+    """号码矩阵 (N, k)（int64）；单注号码列表视为一行"""
+    rows = np.asarray(nums, dtype=np.int64)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    return rows
+
+
+def compact_rows(nums) -> np.ndarray:
+    """号码矩阵 (N, k)，取值范围允许时转为 int16（差值、加一都不会溢出）以加快逐列运算"""
+    rows = np.asarray(nums)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    if np.issubdtype(rows.dtype, np.integer) and rows.size and -(1 << 13) <= rows.min() and rows.max() < (1 << 13):
+        return rows.astype(np.int16)
+    return as_rows(rows)
+
 
 class SequenceAnalyzer:
     """序列分析工具类"""
@@ -29,17 +53,7 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.max_consecutive_run([1, 3, 5, 7])
             1
         """
-        if not nums:
-            return 0
-        
-        run, best = 1, 1
-        for i in range(1, len(nums)):
-            if nums[i] == nums[i-1] + 1:
-                run += 1
-                best = max(best, run)
-            else:
-                run = 1
-        return best
+        return int(SequenceAnalyzer.max_consecutive_run_batch(as_rows(nums))[0])
     
     @staticmethod
     def is_arithmetic_progression(seq: List[int]) -> bool:
@@ -58,14 +72,7 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.is_arithmetic_progression([1, 2, 4, 8])
             False
         """
-        if len(seq) <= 2:
-            return True
-        
-        d = seq[1] - seq[0]
-        for i in range(2, len(seq)):
-            if seq[i] - seq[i-1] != d:
-                return False
-        return True
+        return bool(SequenceAnalyzer.is_arithmetic_progression_batch(as_rows(seq))[0])
     
     @staticmethod
     def has_ap_k_of_m(seq: List[int], k: int) -> bool:
@@ -74,23 +81,19 @@ class SequenceAnalyzer:
         
         Args:
             seq: 已排序的号码列表
-            k: 子序列最小长度
+            k: 子序列最小长度（非负整数）
             
         Returns:
             是否存在满足条件的等差子序列
             
+        Raises:
+            ValueError: k 为负数时
+            
         Examples:
             >>> SequenceAnalyzer.has_ap_k_of_m([1, 2, 3, 7, 9], 3)
             True  # [1, 2, 3]
         """
-        if len(seq) < k:
-            return False
-        
-        for comb in combinations(seq, k):
-            s = sorted(comb)
-            if SequenceAnalyzer.is_arithmetic_progression(s):
-                return True
-        return False
+        return bool(SequenceAnalyzer.has_ap_k_of_m_batch(as_rows(seq), k)[0])
     
     @staticmethod
     def zone_distribution(nums: List[int], zones: int, max_num: int) -> List[int]:
@@ -103,20 +106,16 @@ class SequenceAnalyzer:
             max_num: 最大号码值
             
         Returns:
-            各区间的号码数量列表
+            各区间的号码数量列表（大于 max_num 的号码计入最后一个区间）
+            
+        Raises:
+            ValueError: 区间数量不在 1 到 max_num 之间，或号码不是正整数时
             
         Examples:
             >>> SequenceAnalyzer.zone_distribution([1, 5, 12, 20, 25, 30], 3, 33)
             [2, 2, 2]  # SSQ三区分布：1-11, 12-22, 23-33
         """
-        zone_size = max_num // zones
-        distribution = [0] * zones
-        
-        for num in nums:
-            zone_idx = min((num - 1) // zone_size, zones - 1)
-            distribution[zone_idx] += 1
-        
-        return distribution
+        return SequenceAnalyzer.zone_distribution_batch(as_rows(nums), zones, max_num)[0].tolist()
     
     @staticmethod
     def overlap_count(a: List[int], b: List[int]) -> int:
@@ -134,7 +133,7 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.overlap_count([1, 2, 3], [2, 3, 4])
             2
         """
-        return len(set(a) & set(b))
+        return int(SequenceAnalyzer.overlap_count_batch(as_rows(a), as_rows(b))[0])
     
     @staticmethod
     def last_digit_distribution(nums: List[int]) -> dict:
@@ -151,8 +150,8 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.last_digit_distribution([11, 21, 13, 23])
             {1: 2, 3: 2}
         """
-        from collections import Counter
-        return Counter(x % 10 for x in nums)
+        counts = SequenceAnalyzer.last_digit_distribution_batch(as_rows(nums))[0]
+        return Counter({digit: int(count) for digit, count in enumerate(counts) if count})
     
     @staticmethod
     def count_multiples(nums: List[int], divisor: int) -> int:
@@ -166,11 +165,14 @@ class SequenceAnalyzer:
         Returns:
             倍数的数量
             
+        Raises:
+            ValueError: 除数为 0 时
+            
         Examples:
             >>> SequenceAnalyzer.count_multiples([5, 10, 15, 17, 20], 5)
             4
         """
-        return sum(1 for x in nums if x % divisor == 0)
+        return int(SequenceAnalyzer.count_multiples_batch(as_rows(nums), divisor)[0])
     
     @staticmethod
     def count_odd_even(nums: List[int]) -> Tuple[int, int]:
@@ -187,9 +189,8 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.count_odd_even([1, 2, 3, 4, 5])
             (3, 2)
         """
-        odd = sum(1 for x in nums if x % 2 == 1)
-        even = len(nums) - odd
-        return odd, even
+        odd, even = SequenceAnalyzer.count_odd_even_batch(as_rows(nums))
+        return int(odd[0]), int(even[0])
     
     @staticmethod
     def count_birthday_like(nums: List[int], threshold: int = 31) -> int:
@@ -207,7 +208,7 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.count_birthday_like([5, 12, 25, 32, 33])
             3
         """
-        return sum(1 for x in nums if x <= threshold)
+        return int(SequenceAnalyzer.count_birthday_like_batch(as_rows(nums), threshold)[0])
     
     @staticmethod
     def is_consecutive_pair(a: int, b: int) -> bool:
@@ -227,5 +228,109 @@ class SequenceAnalyzer:
             >>> SequenceAnalyzer.is_consecutive_pair(5, 7)
             False
         """
-        return abs(a - b) == 1
+        return bool(SequenceAnalyzer.is_consecutive_pair_batch(np.array([a]), np.array([b]))[0])
+
+    # ==================== 批量版本 ====================
+
+    @staticmethod
+    def max_consecutive_run_batch(nums: np.ndarray) -> np.ndarray:
+        """逐行计算最大连号长度（每行按给定顺序检查，空行为 0）"""
+        nums = compact_rows(nums)
+        if nums.shape[1] == 0:
+            return np.zeros(len(nums), dtype=np.int64)
+        run = np.ones(len(nums), dtype=np.int64)
+        best = run.copy()
+        for i in range(1, nums.shape[1]):
+            run = np.where(nums[:, i] == nums[:, i - 1] + 1, run + 1, 1)
+            best = np.maximum(best, run)
+        return best
+
+    @staticmethod
+    def is_arithmetic_progression_batch(seq: np.ndarray) -> np.ndarray:
+        """逐行判断是否为等差数列（按给定顺序，长度不超过 2 时为真）"""
+        seq = compact_rows(seq)
+        if seq.shape[1] <= 2:
+            return np.ones(len(seq), dtype=bool)
+        diffs = np.diff(seq, axis=1)
+        return np.all(diffs == diffs[:, :1], axis=1)
+
+    @staticmethod
+    def has_ap_k_of_m_batch(seq: np.ndarray, k: int) -> np.ndarray:
+        """逐行检查是否存在由 k 个号码构成的等差数列（号码先排序；k 须为非负整数）"""
+        if k < 0:
+            raise ValueError(f"等差子序列长度必须为非负整数: {k}")
+        seq = compact_rows(seq)
+        width = seq.shape[1]
+        if width < k:
+            return np.zeros(len(seq), dtype=bool)
+        if k <= 2:
+            return np.ones(len(seq), dtype=bool)
+        ordered = np.sort(seq, axis=1)
+        # 两两差值只计算一次，k 个位置构成等差数列即相邻位置的差值全部相等
+        diffs = {(i, j): ordered[:, j] - ordered[:, i] for i, j in combinations(range(width), 2)}
+        found = np.zeros(len(seq), dtype=bool)
+        for positions in combinations(range(width), k):
+            first = diffs[positions[0], positions[1]]
+            equal = np.ones(len(seq), dtype=bool)
+            for i in range(1, k - 1):
+                equal &= diffs[positions[i], positions[i + 1]] == first
+            found |= equal
+        return found
+
+    @staticmethod
+    def zone_distribution_batch(nums: np.ndarray, zones: int, max_num: int) -> np.ndarray:
+        """逐行计算各区间的号码数量，返回 (N, zones)
+
+        要求 1 <= zones <= max_num 且号码均为正整数；大于 max_num 的号码计入最后一个区间。
+        """
+        if not 1 <= zones <= max_num:
+            raise ValueError(f"区间数量必须在 1 到最大号码之间: zones={zones}, max_num={max_num}")
+        nums = as_rows(nums)
+        if nums.size and nums.min() < 1:
+            raise ValueError(f"号码必须为正整数: {int(nums.min())}")
+        zone_idx = np.minimum((nums - 1) // (max_num // zones), zones - 1)
+        keys = (np.arange(len(nums))[:, None] * zones + zone_idx).ravel()
+        return np.bincount(keys, minlength=len(nums) * zones).reshape(-1, zones)
+
+    @staticmethod
+    def overlap_count_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """逐行计算两组号码的重叠数量（按不同号码计数；单行的一方与另一方的每行比较）"""
+        a, b = as_rows(a), as_rows(b)
+        common = (a[:, :, None] == b[:, None, :]).any(axis=2)
+        # 重复号码只计一次
+        first = np.ones(a.shape, dtype=bool)
+        for i in range(1, a.shape[1]):
+            first[:, i] = ~(a[:, :i] == a[:, i:i + 1]).any(axis=1)
+        return (common & first).sum(axis=1)
 
+    @staticmethod
+    def last_digit_distribution_batch(nums: np.ndarray) -> np.ndarray:
+        """逐行统计尾数分布，返回 (N, 10)，第 d 列为尾数 d 的个数"""
+        digits = compact_rows(nums) % 10
+        keys = (np.arange(len(digits))[:, None] * 10 + digits).ravel()
+        return np.bincount(keys, minlength=len(digits) * 10).reshape(-1, 10)
+
+    @staticmethod
+    def count_multiples_batch(nums: np.ndarray, divisor: int) -> np.ndarray:
+        """逐行统计某个数的倍数数量（除数不能为 0）"""
+        if divisor == 0:
+            raise ValueError("除数不能为 0")
+        nums = as_rows(nums)
+        return (nums % divisor == 0).sum(axis=1)
+
+    @staticmethod
+    def count_odd_even_batch(nums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """逐行统计奇偶数数量，返回 (奇数数量, 偶数数量)"""
+        nums = compact_rows(nums)
+        odd = (nums % 2 == 1).sum(axis=1)
+        return odd, nums.shape[1] - odd
+
+    @staticmethod
+    def count_birthday_like_batch(nums: np.ndarray, threshold: int = 31) -> np.ndarray:
+        """逐行统计生日化号码数量（<=threshold 的号码）"""
+        return (compact_rows(nums) <= threshold).sum(axis=1)
+
+    @staticmethod
+    def is_consecutive_pair_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """逐个判断两个号码是否连续"""
+        return np.abs(np.asarray(a, dtype=np.int64) - np.asarray(b, dtype=np.int64)) == 1
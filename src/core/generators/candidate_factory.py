@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量候选号码工厂
+按冷热温配方一次生成成千上万注候选号码：各号码池用掩码表示，池内不放回抽样用
+Gumbel-top-k（随机键排序取前 k 个）对整批号码同时完成；双色球蓝球按增强多因子权重
+向量化抽取。结果为 int8 号码矩阵，每行一注（主区升序，其后为副区），供后续排名和过滤使用。
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models import DLTNumber, SSQNumber
+
+# 各彩票类型的布局: (主区最大号码, 主区个数, 副区最大号码, 副区个数)
+LAYOUTS: Dict[str, Tuple[int, int, int, int]] = {
+    'ssq': (33, 6, 16, 1),
+    'dlt': (35, 5, 12, 2),
+}
+
+# 号码池顺序（与配方 (热, 冷, 温) 对应）
+POOLS = ('hot', 'cold', 'normal')
+
+# 蓝球集成方法中各策略的权重
+ENSEMBLE_WEIGHTS = {'frequency': 0.3, 'enhanced': 0.4, 'missing': 0.2, 'random': 0.1}
+
+
+def pool_masks(pattern: Dict, max_number: int) -> np.ndarray:
+    """冷热温号码池的掩码 (3, max_number)，第 i 行对应 POOLS[i]，第 j 列对应号码 j+1"""
+    masks = np.zeros((len(POOLS), max_number), dtype=bool)
+    for row, name in enumerate(POOLS):
+        numbers = np.asarray(pattern.get(name, []), dtype=np.int64)
+        masks[row, numbers - 1] = True
+    return masks
+
+
+def gumbel_top_k(rng: np.random.Generator, mask: np.ndarray, k: np.ndarray,
+                 logits: Optional[np.ndarray] = None) -> np.ndarray:
+    """逐行在掩码允许的位置中不放回抽取 k 个（Gumbel-top-k）
+
+    每个位置的键为 logits 加 Gumbel 噪声，取键最大的 k 个；logits 为 None 时为等概率抽样。
+
+    Args:
+        rng: 随机数生成器
+        mask: 可选位置 (N, M)
+        k: 每行抽取个数 (N,)；可选位置不足时全部选中
+        logits: 位置的对数权重 (M,) 或 (N, M)
+
+    Returns:
+        选中位置 (N, M)
+    """
+    keys = rng.gumbel(size=mask.shape)
+    if logits is not None:
+        keys += logits
+    keys[~mask] = -np.inf
+    order = np.argsort(-keys, axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(mask.shape[1])[None, :], axis=1)
+    return mask & (ranks < np.asarray(k)[:, None])
+
+
+def sample_by_recipe(rng: np.random.Generator, masks: np.ndarray, recipes: np.ndarray) -> np.ndarray:
+    """按配方从冷热温号码池抽取号码
+
+    与逐注的选择规则一致：先取热号、再取冷号，温号补足配方总数，仍不足时从全部号码中补足。
+
+    Args:
+        rng: 随机数生成器
+        masks: 号码池掩码 (3, M)
+        recipes: 每行的配方 (N, 3)，依次为热、冷、温号个数
+
+    Returns:
+        升序号码矩阵 (N, 配方总数)，号码从 1 开始（各行配方总数须相同）
+    """
+    total = int(recipes[0].sum())
+    selected = np.zeros((len(recipes), masks.shape[1]), dtype=bool)
+    for row in range(len(POOLS)):
+        wanted = recipes[:, row] if row < len(POOLS) - 1 else total - selected.sum(axis=1)
+        selected |= gumbel_top_k(rng, masks[row] & ~selected, wanted)
+    selected |= gumbel_top_k(rng, ~selected, total - selected.sum(axis=1))
+    return np.nonzero(selected)[1].reshape(len(recipes), total) + 1
+
+
+def sample_rows(rng: np.random.Generator, probabilities: np.ndarray) -> np.ndarray:
+    """逐行按概率抽取一个位置（逆累积分布），返回 0 基位置 (N,)"""
+    cumulative = np.cumsum(probabilities, axis=1)
+    draws = rng.random(len(probabilities)) * cumulative[:, -1]
+    return np.minimum((cumulative <= draws[:, None]).sum(axis=1), probabilities.shape[1] - 1)
+
+
+def blue_probabilities(rng: np.random.Generator, blue_analysis: Dict, method: str,
+                       weights: Dict[str, float], count: int) -> np.ndarray:
+    """每注蓝球的抽取概率 (count, 16)，与逐注的蓝球选择算法分布一致
+
+    Args:
+        rng: 随机数生成器（增强方法每注有独立的随机性因子）
+        blue_analysis: 蓝球详细分析结果
+        method: 'simple'、'enhanced' 或 'ensemble'
+        weights: 增强方法的因子权重
+        count: 注数
+    """
+    uniform = np.full((count, 16), 1 / 16)
+    frequency_scores = blue_analysis.get('frequency_scores', {})
+    if not blue_analysis or not frequency_scores:
+        return uniform
+
+    def scores(name: str) -> np.ndarray:
+        values = blue_analysis.get(name, {})
+        return np.array([values.get(num, 0.5) for num in range(1, 17)], dtype=np.float64)
+
+    simple = np.array([frequency_scores.get(num, 0.0) for num in range(1, 17)], dtype=np.float64)
+    simple = np.broadcast_to(simple / simple.sum(), (count, 16)) if simple.sum() > 0 else uniform
+    if method == 'simple':
+        return simple
+
+    base = (weights['frequency'] * scores('frequency_scores') + weights['missing'] * scores('missing_scores') +
+            weights['trend'] * scores('trend_scores') + weights['pattern'] * scores('pattern_scores'))
+    enhanced = base + weights['random'] * rng.random((count, 16))
+    enhanced = enhanced - enhanced.min(axis=1, keepdims=True) + 0.1
+    enhanced /= enhanced.sum(axis=1, keepdims=True)
+    if method != 'ensemble':
+        return enhanced
+
+    # 集成方法：按策略权重为每注选择一种策略
+    strategies = [('frequency', simple), ('enhanced', enhanced)]
+    missing_scores = blue_analysis.get('missing_scores', {})
+    if missing_scores:
+        best = max(missing_scores.items(), key=lambda x: x[1])[0]
+        strategies.append(('missing', np.broadcast_to(np.eye(16)[best - 1], (count, 16))))
+    strategies.append(('random', uniform))
+    strategy_weights = np.array([ENSEMBLE_WEIGHTS[name] for name, _ in strategies])
+    chosen = sample_rows(rng, np.broadcast_to(strategy_weights, (count, len(strategies))))
+    return np.stack([table for _, table in strategies])[chosen, np.arange(count)]
+
+
+class CandidateFactory:
+    """批量候选号码工厂
+
+    Examples:
+        >>> factory = CandidateFactory('ssq', hot_cold_numbers, recipes)
+        >>> tickets = factory.draw(10000)          # (10000, 7) int8
+        >>> candidates = factory.to_numbers(tickets[:30])
+    """
+
+    def __init__(self, lottery_type: str, hot_cold_numbers: Dict, recipes: Sequence[Tuple[int, int, int]],
+                 back_recipe: Tuple[int, int, int] = (1, 1, 0), blue_method: str = 'enhanced',
+                 blue_weights: Optional[Dict[str, float]] = None,
+                 rng: Optional[np.random.Generator] = None):
+        """初始化候选工厂
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+            hot_cold_numbers: 冷热号分析结果（SmartNumberGenerator._analyze_hot_cold_numbers 的返回值）
+            recipes: 主区配方列表 (热, 冷, 温)
+            back_recipe: 大乐透后区配方
+            blue_method: 双色球蓝球选择方法
+            blue_weights: 蓝球增强方法的因子权重
+            rng: 随机数生成器（None 表示新建）
+        """
+        if lottery_type not in LAYOUTS:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        self.lottery_type = lottery_type
+        self.main_max, self.main_count, self.extra_max, self.extra_count = LAYOUTS[lottery_type]
+        self.recipes = np.array(recipes, dtype=np.int64).reshape(-1, len(POOLS))
+        if np.any(self.recipes.sum(axis=1) != self.main_count):
+            raise ValueError(f"配方号码总数应为 {self.main_count}: {recipes}")
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        main_pattern = hot_cold_numbers['red' if lottery_type == 'ssq' else 'front']
+        self.main_masks = pool_masks(main_pattern, self.main_max)
+        if lottery_type == 'dlt':
+            self.back_masks = pool_masks(hot_cold_numbers['back'], self.extra_max)
+            self.back_recipe = np.array(back_recipe, dtype=np.int64)
+        self.blue_analysis = hot_cold_numbers.get('blue_analysis', {})
+        self.blue_method = blue_method
+        self.blue_weights = blue_weights or {}
+
+    def draw(self, count: int, recipe_index: Optional[np.ndarray] = None) -> np.ndarray:
+        """生成候选号码矩阵
+
+        Args:
+            count: 注数
+            recipe_index: 每注使用的配方下标（None 表示依次轮换配方）
+
+        Returns:
+            int8 号码矩阵 (count, 主区个数 + 副区个数)
+        """
+        if recipe_index is None:
+            recipe_index = np.arange(count) % len(self.recipes)
+        mains = sample_by_recipe(self.rng, self.main_masks, self.recipes[recipe_index])
+        if self.lottery_type == 'ssq':
+            probabilities = blue_probabilities(self.rng, self.blue_analysis, self.blue_method,
+                                               self.blue_weights, count)
+            extras = sample_rows(self.rng, probabilities)[:, None] + 1
+        else:
+            extras = sample_by_recipe(self.rng, self.back_masks, np.tile(self.back_recipe, (count, 1)))
+        return np.hstack([mains, extras]).astype(np.int8)
+
+    def to_numbers(self, tickets: np.ndarray) -> List[Union[SSQNumber, DLTNumber]]:
+        """把号码矩阵转换为号码对象"""
+        rows = np.asarray(tickets, dtype=np.int64).tolist()
+        if self.lottery_type == 'ssq':
+            return [SSQNumber(red=row[:self.main_count], blue=row[self.main_count]) for row in rows]
+        return [DLTNumber(front=row[:self.main_count], back=row[self.main_count:]) for row in rows]
@@ -10,6 +10,8 @@ from typing import Dict, List, Tuple
 from collections import Counter
 import math
 
+from ..storage import OccurrenceTable, history_occurrence_tables
+
 
 class ImprovedBlueSelector:
     """改进的蓝球选择器"""
@@ -36,13 +38,24 @@ class ImprovedBlueSelector:
         if history_data.empty or len(history_data) < 10:
             return np.random.randint(1, 17)
             
-        recent_data = history_data.head(periods)
-        blue_numbers = recent_data['blue_number'].tolist()
-        
+        # 全部历史的出现次数表（按数据版本共享），只查询最近 periods 期
+        table = history_occurrence_tables('ssq', history_data)['blue']
+        return self._select_from_table(table, periods)
+
+    def _select_from_table(self, table: OccurrenceTable, periods: int, offset: int = 0) -> int:
+        """由蓝球出现次数表选择号码
+
+        Args:
+            table: 蓝球出现次数前缀和表（最新在前）
+            periods: 分析期数
+            offset: 跳过最新的期数（回测时截至的时点）
+        """
+        total = min(periods, len(table) - offset)
+
         # 计算各种评分
-        frequency_scores = self._calculate_frequency_scores(blue_numbers)
-        missing_scores = self._calculate_missing_scores(blue_numbers)
-        trend_scores = self._calculate_trend_scores(blue_numbers)
+        frequency_scores = self._calculate_frequency_scores(table, total, offset)
+        missing_scores = self._calculate_missing_scores(table, total, offset)
+        trend_scores = self._calculate_trend_scores(table, total, offset)
         
         # 综合加权评分
         final_scores = {}
@@ -64,17 +77,16 @@ class ImprovedBlueSelector:
         # 按概率选择
         return int(np.random.choice(list(range(1, 17)), p=probabilities))
     
-    def _calculate_frequency_scores(self, blue_numbers: List[int]) -> Dict[int, float]:
+    def _calculate_frequency_scores(self, table: OccurrenceTable, total: int, offset: int = 0) -> Dict[int, float]:
         """计算频率评分"""
-        counter = Counter(blue_numbers)
-        total = len(blue_numbers)
+        counts = table.frequency(total, offset).tolist()
         
         # 理论频率
         expected_freq = total / 16
         
         scores = {}
         for num in range(1, 17):
-            actual_freq = counter.get(num, 0)
+            actual_freq = counts[num]
             # 使用调和平均避免极端值
             if actual_freq == 0:
                 scores[num] = 0.1
@@ -85,45 +97,28 @@ class ImprovedBlueSelector:
         
         return scores
     
-    def _calculate_missing_scores(self, blue_numbers: List[int]) -> Dict[int, float]:
+    def _calculate_missing_scores(self, table: OccurrenceTable, total: int, offset: int = 0) -> Dict[int, float]:
         """计算遗漏评分"""
-        scores = {}
-        
-        for num in range(1, 17):
-            # 计算最近一次出现的位置
-            last_position = -1
-            for i, blue in enumerate(blue_numbers):
-                if blue == num:
-                    last_position = i
-                    break
-            
-            if last_position == -1:
-                # 从未出现，给予高分
-                missing_periods = len(blue_numbers)
-            else:
-                missing_periods = last_position
-            
-            # 遗漏期数越长，得分越高（但有上限）
-            scores[num] = min(missing_periods / 10.0, 1.0)
-        
-        return scores
+        # 分析期内从未出现的号码，遗漏期数记为分析期数
+        missing = np.minimum(table.missing(offset, default=total), total).tolist()
+
+        # 遗漏期数越长，得分越高（但有上限）
+        return {num: min(missing[num] / 10.0, 1.0) for num in range(1, 17)}
     
-    def _calculate_trend_scores(self, blue_numbers: List[int]) -> Dict[int, float]:
+    def _calculate_trend_scores(self, table: OccurrenceTable, total: int, offset: int = 0) -> Dict[int, float]:
         """计算趋势评分"""
-        if len(blue_numbers) < 10:
+        if total < 10:
             return {num: 0.5 for num in range(1, 17)}
         
         scores = {}
-        window_size = min(10, len(blue_numbers) // 2)
+        window_size = min(10, total // 2)
+        # 计算近期和远期的出现次数
+        recent_counts = table.frequency(window_size, offset).tolist()
+        older_counts = table.frequency(min(window_size, total - window_size), offset + window_size).tolist()
         
         for num in range(1, 17):
-            # 计算近期和远期的出现频率
-            recent_count = sum(1 for i in range(window_size) if blue_numbers[i] == num)
-            older_count = sum(1 for i in range(window_size, min(window_size * 2, len(blue_numbers))) 
-                            if blue_numbers[i] == num)
-            
-            recent_freq = recent_count / window_size
-            older_freq = older_count / window_size if window_size * 2 <= len(blue_numbers) else recent_freq
+            recent_freq = recent_counts[num] / window_size
+            older_freq = older_counts[num] / window_size if window_size * 2 <= total else recent_freq
             
             # 趋势评分：上升趋势得高分
             if older_freq == 0:
@@ -167,9 +162,10 @@ class ImprovedBlueSelector:
         if len(history_data) < test_periods + 50:
             return {'error': '数据不足，无法进行比较'}
         
-        # 分离训练和测试数据
+        # 分离训练和测试数据；训练数据即跳过最新 test_periods 期后的出现次数表
         test_data = history_data.head(test_periods)
         train_data = history_data.iloc[test_periods:]
+        table = history_occurrence_tables('ssq', history_data)['blue']
         
         results = {
             'original_algorithm': {'hits': 0, 'predictions': []},
@@ -191,7 +187,7 @@ class ImprovedBlueSelector:
                 original_pred = np.random.randint(1, 17)
             
             # 改进算法预测
-            improved_pred = self.select_blue_number(train_data, 50)
+            improved_pred = self._select_from_table(table, 50, offset=test_periods)
             
             # 记录结果
             results['original_algorithm']['predictions'].append(original_pred)
@@ -7,9 +7,12 @@ import math
 from .random_generator import RandomGenerator
 from ..models import LotteryNumber, SSQNumber, DLTNumber
 from ..ranking import rank_and_select_best, rank_and_select_best_dlt
+from ..config_manager import get_config_manager
 from ..data_manager import LotteryDataManager
-from .anti_popular import PopularityDetector, CorrelationChecker, SequenceAnalyzer
+from .anti_popular import AntiPopularSampler, CorrelationChecker, SequenceAnalyzer, TicketPortfolio
 from ..filters import HistoryDuplicateFilter
+from ..storage import MemoCache, data_version, history_occurrence_tables
+from .candidate_factory import CandidateFactory
 
 class SmartNumberGenerator:
     """智能号码推荐生成器 - 支持双色球(SSQ)和大乐透(DLT)的精英选拔版"""
@@ -18,6 +21,12 @@ class SmartNumberGenerator:
         self.lottery_type = lottery_type
         self.random_generator = RandomGenerator(lottery_type)
         self.data_manager = LotteryDataManager()
+        # 批量生成候选号码使用的随机数生成器
+        self.rng = np.random.default_rng()
+        # 冷热号分析结果缓存（历史数据更新后失效）
+        self._analysis_cache = MemoCache(type(self).__name__,
+                                         get_config_manager().get('analysis.memo_cache_size', 256),
+                                         source=self.data_manager.data_files.get(lottery_type))
 
         # 蓝球选择算法配置
         self.blue_algorithm_config = {
@@ -83,7 +92,7 @@ class SmartNumberGenerator:
                 'sum_bounds': (70, 140),     # 和值范围
                 'max_red_overlap': 2,        # 多注间红球最大重叠
                 'max_blue_dup': 1,           # 蓝球重复次数限制
-                'tries_per_ticket': 60       # 每注最大尝试次数
+                'weighting': 'uniform'       # 抽样方式：'uniform'(均匀) 或 'score'(热门度越低权重越高)
             },
 
             # DLT配置
@@ -96,7 +105,7 @@ class SmartNumberGenerator:
                 'max_front_overlap': 2,
                 'max_back_overlap': 1,
                 'avoid_back_consecutive': False,
-                'tries_per_ticket': 60
+                'weighting': 'uniform'
             }
         }
 
@@ -123,17 +132,23 @@ class SmartNumberGenerator:
         if history_data is None or history_data.empty or len(history_data) < conf['analysis_periods']:
             return self.random_generator.generate(count)
 
-        hot_cold_numbers = self._analyze_hot_cold_numbers(history_data)
+        self._analysis_cache.set_version(data_version(history_data))
+        cache_key = ('hot_cold', conf['analysis_periods'], self.blue_algorithm_config['analysis_periods'],
+                     self.blue_algorithm_config['trend_window'])
+        hot_cold_numbers = self._analysis_cache.get_or_compute(
+            cache_key, lambda: self._analyze_hot_cold_numbers(history_data))
 
         recipes = conf.get('recipes') or conf.get('front_recipes')
         random.shuffle(recipes)
 
         ranking_function = rank_and_select_best if self.lottery_type == 'ssq' else rank_and_select_best_dlt
+        factory = self._candidate_factory(hot_cold_numbers, recipes)
 
         # 判断是否启用历史过滤
         use_history_filter = enable_history_filter if enable_history_filter is not None else self.history_filter_config['enabled']
 
         elite_numbers = []
+        portfolio = TicketPortfolio(self.lottery_type, capacity=count)  # 已选号码的重叠统计
         filtered_count = 0  # 统计被过滤的数量
         retry_count = 0  # 统计重试次数
 
@@ -143,27 +158,32 @@ class SmartNumberGenerator:
         else:
             max_overlap_threshold = self.history_filter_config.get('dlt', {}).get('max_front_overlap', 3)
 
+        # 根据阈值严格程度动态调整候选数量
+        # 阈值越低，需要生成越多候选
+        if use_history_filter:
+            strictness_factor = max(1, 5 - max_overlap_threshold)  # 阈值2->3倍, 阈值3->2倍, 阈值4->1倍
+            batch_multiplier = 3 * strictness_factor
+        else:
+            batch_multiplier = 1
+        batch_size = conf['batch_size_per_elite'] * batch_multiplier
+        max_retries = 5  # 最大重试次数
+
+        # 一次生成全部精英号码首轮所需的候选（每注内依次轮换配方），重试时再按批补充
+        recipe_index = np.tile(np.arange(batch_size) % len(recipes), count)
+        tickets = factory.draw(count * batch_size, recipe_index)
+
         for i in range(count):
             print(f"正在为[{self.lottery_type.upper()}]进行第 {i+1}/{count} 注精英号码的选拔...")
 
-            # 根据阈值严格程度动态调整候选数量
-            # 阈值越低，需要生成越多候选
-            if use_history_filter:
-                strictness_factor = max(1, 5 - max_overlap_threshold)  # 阈值2->3倍, 阈值3->2倍, 阈值4->1倍
-                batch_multiplier = 3 * strictness_factor
-            else:
-                batch_multiplier = 1
-
             candidates = []
-            batch_size = conf['batch_size_per_elite'] * batch_multiplier
-            max_retries = 5  # 最大重试次数
 
             for attempt in range(max_retries):
                 # 生成候选号码
-                for j in range(batch_size):
-                    recipe = recipes[j % len(recipes)]
-                    candidate = self._generate_one_candidate(hot_cold_numbers, recipe)
-                    candidates.append(candidate)
+                if attempt == 0:
+                    batch = tickets[i * batch_size:(i + 1) * batch_size]
+                else:
+                    batch = factory.draw(batch_size, recipe_index[:batch_size])
+                candidates.extend(factory.to_numbers(batch))
 
                 # 先通过 ranking 筛选
                 ranked_candidates = self._rank_candidates(candidates, ranking_function)
@@ -171,7 +191,7 @@ class SmartNumberGenerator:
                 # 再通过历史过滤
                 if use_history_filter:
                     elite_number = self._select_with_history_filter(
-                        ranked_candidates, history_data, elite_numbers
+                        ranked_candidates, history_data, portfolio
                     )
                     if elite_number is not None:
                         break  # 找到合格的号码，跳出重试循环
@@ -201,6 +221,11 @@ class SmartNumberGenerator:
                 elite_numbers.append(elite_number)
             else:
                 elite_numbers.append(random.choice(candidates) if candidates else self._generate_one_candidate(hot_cold_numbers, recipes[0]))
+            selected = elite_numbers[-1]
+            if self.lottery_type == 'ssq':
+                portfolio.add(selected.red, selected.blue)
+            else:
+                portfolio.add(selected.front, selected.back)
 
         if filtered_count > 0:
             print(f"📊 历史过滤统计: {filtered_count}/{count} 注无法满足设定阈值({max_overlap_threshold})")
@@ -227,14 +252,13 @@ class SmartNumberGenerator:
 
     def _select_with_history_filter(self, candidates: List[Union[SSQNumber, DLTNumber]],
                                     history_data: pd.DataFrame,
-                                    already_selected: List[Union[SSQNumber, DLTNumber]]) -> Optional[Union[SSQNumber, DLTNumber]]:
+                                    already_selected: TicketPortfolio) -> Optional[Union[SSQNumber, DLTNumber]]:
         """使用历史过滤选择号码"""
         check_periods = self.history_filter_config.get('check_periods', 100)
 
-        for candidate in candidates:
-            # 检查与历史数据的重复
-            result = self.history_filter.filter(candidate, history_data, check_periods)
-
+        # 一次算出全部候选与历史数据的重复（结果被缓存，随后的最低重复选择直接复用）
+        results = self.history_filter.evaluate(candidates, history_data, check_periods)
+        for candidate, result in zip(candidates, results):
             if result.is_valid:
                 # 额外检查：与已选号码的重复度
                 if self._check_internal_overlap(candidate, already_selected):
@@ -243,23 +267,12 @@ class SmartNumberGenerator:
         return None
 
     def _check_internal_overlap(self, candidate: Union[SSQNumber, DLTNumber],
-                                 already_selected: List[Union[SSQNumber, DLTNumber]]) -> bool:
+                                 already_selected: TicketPortfolio) -> bool:
         """检查与已选号码的重复度"""
-        if not already_selected:
-            return True
-
         max_internal_overlap = 3  # 允许的最大内部重复
 
-        for selected in already_selected:
-            if self.lottery_type == 'ssq':
-                overlap = len(set(candidate.red) & set(selected.red))
-            else:
-                overlap = len(set(candidate.front) & set(selected.front))
-
-            if overlap > max_internal_overlap:
-                return False
-
-        return True
+        main = candidate.red if self.lottery_type == 'ssq' else candidate.front
+        return already_selected.can_add(main, max_internal_overlap)
 
     def _select_lowest_overlap(self, candidates: List[Union[SSQNumber, DLTNumber]],
                                history_data: pd.DataFrame) -> Optional[Union[SSQNumber, DLTNumber]]:
@@ -318,6 +331,14 @@ class SmartNumberGenerator:
               f"max_overlap={lottery_config.get('max_red_overlap') or lottery_config.get('max_front_overlap')}, "
               f"recent_max={lottery_config.get('recent_max_overlap')}")
     
+    def _candidate_factory(self, hot_cold_numbers: Dict, recipes: List[Tuple[int, int, int]]) -> CandidateFactory:
+        """按当前配置创建批量候选工厂"""
+        return CandidateFactory(self.lottery_type, hot_cold_numbers, recipes,
+                                back_recipe=self.config['dlt']['back_recipe'],
+                                blue_method=self.blue_algorithm_config['method'],
+                                blue_weights=self.blue_algorithm_config['weights'],
+                                rng=self.rng)
+
     def _generate_one_candidate(self, hot_cold_numbers: Dict, recipe: Tuple[int, int, int]) -> Union[SSQNumber, DLTNumber]:
         """根据分析结果和指定配方生成一个候选号码"""
         if self.lottery_type == 'ssq':
@@ -336,22 +357,24 @@ class SmartNumberGenerator:
         conf = self.config[self.lottery_type]
         analysis_periods = conf['analysis_periods']
         recent_data = data.head(analysis_periods)
+        tables = history_occurrence_tables(self.lottery_type, data)
 
-        def get_hybrid_pools(numbers_data, num_total, p_ratio, hot_count, cold_count):
+        def get_hybrid_pools(table, num_total, p_ratio, hot_count, cold_count):
             all_numbers = list(range(1, num_total + 1))
             n = analysis_periods
             mu = n * p_ratio
             sigma = np.sqrt(n * p_ratio * (1 - p_ratio)) if n > 0 else 1
             if sigma == 0: sigma = 1
 
-            counts = Counter(np.concatenate(numbers_data.values))
-            z_scores = {num: (counts.get(num, 0) - mu) / sigma for num in all_numbers}
+            counts = table.frequency(analysis_periods).tolist()
+            z_scores = {num: (counts[num] - mu) / sigma for num in all_numbers}
 
-            s = pd.DataFrame(0, index=recent_data.index, columns=all_numbers)
-            for index, row_nums in numbers_data.items():
-                if isinstance(row_nums, list):
-                    s.loc[index, row_nums] = 1
-            ewma_scores = s.iloc[::-1].ewm(alpha=0.1, adjust=False).mean().iloc[-1].to_dict()
+            # 各期号码出现指示按时间顺序（最早在前）的 EWMA，与 ewm(alpha=0.1, adjust=False) 一致
+            indicators = (table.occurrences(analysis_periods)[::-1, 1:] > 0).astype(np.float64)
+            ewma = indicators[0] if len(indicators) else np.zeros(num_total)
+            for row in indicators[1:]:
+                ewma = 0.9 * ewma + 0.1 * row
+            ewma_scores = dict(zip(all_numbers, ewma.tolist()))
 
             z_values = np.array(list(z_scores.values()))
             norm_z = {num: (score - z_values.min()) / (z_values.max() - z_values.min()) if (z_values.max() - z_values.min()) > 0 else 0.5 for num, score in z_scores.items()}
@@ -369,7 +392,7 @@ class SmartNumberGenerator:
             }
 
         if self.lottery_type == 'ssq':
-            red_pools = get_hybrid_pools(recent_data['red_numbers'], 33, 6/33, 7, 7)
+            red_pools = get_hybrid_pools(tables['red'], 33, 6/33, 7, 7)
             blue_freq = Counter(recent_data['blue_number'].tolist())
             # 添加蓝球的详细分析数据
             blue_analysis = self._analyze_blue_numbers_detailed(recent_data['blue_number'].tolist())
@@ -380,8 +403,8 @@ class SmartNumberGenerator:
             }
 
         elif self.lottery_type == 'dlt':
-            front_pools = get_hybrid_pools(recent_data['front_numbers'], 35, 5/35, 7, 7) # 前区7热7冷
-            back_pools = get_hybrid_pools(recent_data['back_numbers'], 12, 2/12, 3, 3) # 后区3热3冷
+            front_pools = get_hybrid_pools(tables['front'], 35, 5/35, 7, 7) # 前区7热7冷
+            back_pools = get_hybrid_pools(tables['back'], 12, 2/12, 3, 3) # 后区3热3冷
             return {'front': front_pools, 'back': back_pools}
         
         return {}
@@ -758,7 +781,7 @@ class SmartNumberGenerator:
                 enabled=True,
                 mode='moderate',
                 max_score=1,
-                max_run=1
+                max_red_overlap=1
             )
         """
         self.anti_popular_config['enabled'] = enabled
@@ -768,22 +791,24 @@ class SmartNumberGenerator:
         if mode == 'strict':
             # 严格模式：最大程度避免热门
             if self.lottery_type == 'ssq':
+                # 红球不含连号时至多有一个号码大于 31，生日化规则至少计 2 分，
+                # 热门度阈值取可达到的最低值 2
                 self.anti_popular_config['ssq'].update({
-                    'max_score': 1,
+                    'max_score': 2,
                     'max_run': 1,
                     'max_same_last_digit': 2,
                     'max_red_overlap': 1,
-                    'max_blue_dup': 1,
-                    'tries_per_ticket': 80
+                    'max_blue_dup': 1
                 })
             elif self.lottery_type == 'dlt':
+                # 前区热门度为 0 的组合须含两个以上大于 31 的号码，前区两两最多重叠 1 个时
+                # 每轮只能选出约 3 注，热门度阈值取 2（通过硬性规则的前区组合分数均为偶数，阈值 1 与 0 相同）
                 self.anti_popular_config['dlt'].update({
-                    'max_score': 1,
+                    'max_score': 2,
                     'max_run': 1,
                     'max_same_last_digit': 2,
                     'max_front_overlap': 1,
-                    'max_back_overlap': 0,
-                    'tries_per_ticket': 80
+                    'max_back_overlap': 0
                 })
 
         elif mode == 'moderate':
@@ -794,8 +819,7 @@ class SmartNumberGenerator:
                     'max_run': 2,
                     'max_same_last_digit': 2,
                     'max_red_overlap': 2,
-                    'max_blue_dup': 1,
-                    'tries_per_ticket': 60
+                    'max_blue_dup': 1
                 })
             elif self.lottery_type == 'dlt':
                 self.anti_popular_config['dlt'].update({
@@ -803,8 +827,7 @@ class SmartNumberGenerator:
                     'max_run': 2,
                     'max_same_last_digit': 2,
                     'max_front_overlap': 2,
-                    'max_back_overlap': 1,
-                    'tries_per_ticket': 60
+                    'max_back_overlap': 1
                 })
 
         elif mode == 'light':
@@ -815,8 +838,7 @@ class SmartNumberGenerator:
                     'max_run': 3,
                     'max_same_last_digit': 3,
                     'max_red_overlap': 3,
-                    'max_blue_dup': 2,
-                    'tries_per_ticket': 40
+                    'max_blue_dup': 2
                 })
             elif self.lottery_type == 'dlt':
                 self.anti_popular_config['dlt'].update({
@@ -824,8 +846,7 @@ class SmartNumberGenerator:
                     'max_run': 3,
                     'max_same_last_digit': 2,
                     'max_front_overlap': 3,
-                    'max_back_overlap': 1,
-                    'tries_per_ticket': 40
+                    'max_back_overlap': 1
                 })
 
         # 应用自定义参数
@@ -856,7 +877,10 @@ class SmartNumberGenerator:
             count: 生成数量
 
         Returns:
-            号码列表
+            count 注号码（多注之间的重叠约束按轮生效，见 AntiPopularSampler）
+
+        Raises:
+            ValueError: 当前配置下没有满足去热门条件的号码（如严格模式的热门度阈值无法达到）
 
         Examples:
             generator = SmartNumberGenerator('ssq')
@@ -874,69 +898,34 @@ class SmartNumberGenerator:
         else:
             return self.generate_recommended(count)
 
+    def _sample_anti_popular(self, count: int) -> List[Tuple]:
+        """从去热门接受表中抽取 count 注号码
+
+        Raises:
+            ValueError: 当前配置下没有满足去热门条件的号码
+        """
+        config = self.anti_popular_config[self.lottery_type]
+        sampler = AntiPopularSampler(self.lottery_type, config, config.get('weighting', 'uniform'), self.rng)
+        picks = sampler.sample(count)
+        if sampler.main_rounds > 1 or sampler.extra_rounds > 1:
+            main_name, extra_name = ('红球', '蓝球') if self.lottery_type == 'ssq' else ('前区', '后区')
+            print(f"  提示：注数超过重叠约束的容量，{main_name}分 {sampler.main_rounds} 轮、"
+                  f"{extra_name}分 {sampler.extra_rounds} 轮满足约束（每轮内的号码两两满足重叠约束）")
+        return picks
+
     def _generate_anti_popular_ssq(self, count: int) -> List[SSQNumber]:
         """生成去热门SSQ号码"""
-        config = self.anti_popular_config['ssq']
-        picks = []
-        blue_usage = Counter()
-
         print(f"🎯 使用去热门模式生成 {count} 注双色球号码（{self.anti_popular_config['mode']}模式）")
 
-        for i in range(count):
-            best_candidate = None
-            best_score = float('inf')
-
-            for attempt in range(config['tries_per_ticket']):
-                # 1. 生成候选号码
-                red = sorted(random.sample(range(1, 34), 6))
-                blue = random.randint(1, 16)
-
-                # 2. 硬性规则检查
-                if PopularityDetector.check_hard_reject_ssq(red, blue, config):
-                    continue
-
-                # 3. 相关性检查
-                if not CorrelationChecker.check_ssq_correlation(red, blue, picks, config):
-                    continue
-
-                # 4. 蓝球使用次数检查
-                if not CorrelationChecker.check_blue_usage(blue, blue_usage, config):
-                    continue
-
-                # 5. 计算热门度分数
-                score = PopularityDetector.calculate_ssq_score(red, blue, config['sum_bounds'])
-
-                # 6. 如果满足阈值，直接接受
-                if score <= config['max_score']:
-                    picks.append((red, blue, score))
-                    blue_usage[blue] += 1
-                    print(f"  [{i+1}/{count}] 红球: {' '.join(f'{x:02d}' for x in red)} | 蓝球: {blue:02d} | 热门度: {score}")
-                    break
-
-                # 7. 记录最佳候选
-                if score < best_score:
-                    best_candidate = (red, blue, score)
-                    best_score = score
-            else:
-                # 达到最大尝试次数，接受最佳候选
-                if best_candidate:
-                    red, blue, score = best_candidate
-                    picks.append(best_candidate)
-                    blue_usage[blue] += 1
-                    print(f"  [{i+1}/{count}] 红球: {' '.join(f'{x:02d}' for x in red)} | 蓝球: {blue:02d} | 热门度: {score} (降级接受)")
-                else:
-                    # 极端兜底
-                    red = sorted(random.sample(range(1, 34), 6))
-                    blue = random.randint(1, 16)
-                    picks.append((red, blue, 99))
-                    blue_usage[blue] += 1
-                    print(f"  [{i+1}/{count}] 红球: {' '.join(f'{x:02d}' for x in red)} | 蓝球: {blue:02d} | 热门度: 99 (兜底)")
+        picks = self._sample_anti_popular(count)
+        for i, (red, blue, score) in enumerate(picks):
+            print(f"  [{i+1}/{count}] 红球: {' '.join(f'{x:02d}' for x in red)} | 蓝球: {blue:02d} | 热门度: {score}")
 
         # 生成报告
         report = CorrelationChecker.get_correlation_report(picks, 'ssq')
         print(f"\n📊 生成报告：")
         print(f"  多样性分数: {report['diversity_score']:.2f}")
-        print(f"  独立蓝球数: {report['unique_blues']}/{count}")
+        print(f"  独立蓝球数: {report['unique_blues']}/{len(picks)}")
         print(f"  平均红球重叠: {report.get('avg_red_overlap', 0):.2f}")
 
         # 转换为SSQNumber对象
@@ -944,53 +933,11 @@ class SmartNumberGenerator:
 
     def _generate_anti_popular_dlt(self, count: int) -> List[DLTNumber]:
         """生成去热门DLT号码"""
-        config = self.anti_popular_config['dlt']
-        picks = []
-
         print(f"🎯 使用去热门模式生成 {count} 注大乐透号码（{self.anti_popular_config['mode']}模式）")
 
-        for i in range(count):
-            best_candidate = None
-            best_score = float('inf')
-
-            for attempt in range(config['tries_per_ticket']):
-                # 1. 生成候选号码
-                front = sorted(random.sample(range(1, 36), 5))
-                back = sorted(random.sample(range(1, 13), 2))
-
-                # 2. 硬性规则检查
-                if PopularityDetector.check_hard_reject_dlt(front, back, config):
-                    continue
-
-                # 3. 相关性检查
-                if not CorrelationChecker.check_dlt_correlation(front, back, picks, config):
-                    continue
-
-                # 4. 计算热门度分数
-                score = PopularityDetector.calculate_dlt_score(front, back)
-
-                # 5. 如果满足阈值，直接接受
-                if score <= config['max_score']:
-                    picks.append((front, back, score))
-                    print(f"  [{i+1}/{count}] 前区: {' '.join(f'{x:02d}' for x in front)} | 后区: {' '.join(f'{x:02d}' for x in back)} | 热门度: {score}")
-                    break
-
-                # 6. 记录最佳候选
-                if score < best_score:
-                    best_candidate = (front, back, score)
-                    best_score = score
-            else:
-                # 达到最大尝试次数，接受最佳候选
-                if best_candidate:
-                    front, back, score = best_candidate
-                    picks.append(best_candidate)
-                    print(f"  [{i+1}/{count}] 前区: {' '.join(f'{x:02d}' for x in front)} | 后区: {' '.join(f'{x:02d}' for x in back)} | 热门度: {score} (降级接受)")
-                else:
-                    # 极端兜底
-                    front = sorted(random.sample(range(1, 36), 5))
-                    back = sorted(random.sample(range(1, 13), 2))
-                    picks.append((front, back, 99))
-                    print(f"  [{i+1}/{count}] 前区: {' '.join(f'{x:02d}' for x in front)} | 后区: {' '.join(f'{x:02d}' for x in back)} | 热门度: 99 (兜底)")
+        picks = self._sample_anti_popular(count)
+        for i, (front, back, score) in enumerate(picks):
+            print(f"  [{i+1}/{count}] 前区: {' '.join(f'{x:02d}' for x in front)} | 后区: {' '.join(f'{x:02d}' for x in back)} | 热门度: {score}")
 
         # 生成报告
         report = CorrelationChecker.get_correlation_report(picks, 'dlt')
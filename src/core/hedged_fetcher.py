@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对冲式多源获取
+同时（或间隔一个对冲延迟依次）向多个备选数据源发起请求，第一个通过校验的结果胜出，
+其余请求被取消；各数据源的延迟和成功率被记录下来，下次优先尝试最快的健康数据源
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .storage import write_json_atomic
+
+# 数据源获取函数：接收取消事件，返回获取结果
+SourceFunc = Callable[[threading.Event], Any]
+
+FETCH_MODES = ('sequential', 'hedged', 'parallel')
+
+
+@dataclass
+class SourceStats:
+    """单个数据源的统计信息"""
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    cancelled: int = 0
+    consecutive_failures: int = 0
+    latency: Optional[float] = None  # 成功请求延迟的指数移动平均（秒）
+    last_error: str = ''
+
+    def healthy(self, max_failures: int) -> bool:
+        """连续失败次数未达到上限即视为健康"""
+        return self.consecutive_failures < max_failures
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        finished = self.successes + self.failures
+        return self.successes / finished if finished else None
+
+
+@dataclass
+class HedgedResult:
+    """对冲获取结果"""
+    source: str
+    value: Any
+    elapsed: float
+
+
+class SourceStatsRegistry:
+    """数据源统计登记表（线程安全，可持久化到 JSON 文件）"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None,
+                 smoothing: float = 0.3, max_failures: int = 3):
+        """初始化统计登记表
+
+        Args:
+            path: 统计文件路径，为 None 时只保存在内存中
+            smoothing: 延迟移动平均的平滑系数
+            max_failures: 连续失败多少次后视为不健康
+        """
+        self.path = Path(path) if path is not None else None
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, SourceStats] = self._load()
+
+    def _load(self) -> Dict[str, SourceStats]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            return {name: SourceStats(**values) for name, values in raw.get('sources', {}).items()}
+        except Exception as e:
+            self.logger.warning(f"读取数据源统计失败，将重新统计: {e}")
+            return {}
+
+    def save(self) -> None:
+        """保存统计信息（未配置路径时忽略）"""
+        if self.path is None:
+            return
+        with self._lock:
+            payload = {'sources': {name: asdict(stats) for name, stats in self._stats.items()}}
+        try:
+            write_json_atomic(self.path, payload)
+        except Exception as e:
+            self.logger.warning(f"保存数据源统计失败: {e}")
+
+    def get(self, name: str) -> SourceStats:
+        """获取数据源统计的副本"""
+        with self._lock:
+            return SourceStats(**asdict(self._stats.get(name, SourceStats())))
+
+    def snapshot(self) -> Dict[str, SourceStats]:
+        """获取全部数据源统计的副本"""
+        with self._lock:
+            return {name: SourceStats(**asdict(stats)) for name, stats in self._stats.items()}
+
+    def _entry(self, name: str) -> SourceStats:
+        return self._stats.setdefault(name, SourceStats())
+
+    def _smooth(self, current: Optional[float], elapsed: float) -> float:
+        if current is None:
+            return elapsed
+        return self.smoothing * elapsed + (1 - self.smoothing) * current
+
+    def record_success(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            stats = self._entry(name)
+            stats.attempts += 1
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.latency = self._smooth(stats.latency, elapsed)
+
+    def record_failure(self, name: str, elapsed: float, error: str) -> None:
+        with self._lock:
+            stats = self._entry(name)
+            stats.attempts += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_error = error
+
+    def record_cancelled(self, name: str, elapsed: float) -> None:
+        """记录被取消的请求：已等待的时间是延迟的下限，只在更慢时计入"""
+        with self._lock:
+            stats = self._entry(name)
+            stats.attempts += 1
+            stats.cancelled += 1
+            if stats.latency is None or elapsed > stats.latency:
+                stats.latency = self._smooth(stats.latency, elapsed)
+
+    def rank(self, names: Sequence[str]) -> List[str]:
+        """按优先级排序数据源
+
+        健康的数据源在前，其中有延迟记录的按延迟从快到慢，其余保持配置顺序。
+        """
+        with self._lock:
+            def key(item: Tuple[int, str]):
+                index, name = item
+                stats = self._stats.get(name)
+                if stats is None:
+                    return (0, float('inf'), index)
+                latency = stats.latency if stats.latency is not None else float('inf')
+                return (0 if stats.healthy(self.max_failures) else 1, latency, index)
+            return [name for _, name in sorted(enumerate(names), key=key)]
+
+
+class HedgedFetcher:
+    """对冲式多源获取器
+
+    mode:
+        sequential: 前一个数据源失败后才尝试下一个
+        hedged: 先请求最优数据源，每隔 hedge_delay 秒未获得结果就再启动下一个
+        parallel: 同时请求所有数据源
+    """
+
+    def __init__(self, stats: Optional[SourceStatsRegistry] = None, mode: str = 'hedged',
+                 hedge_delay: float = 2.0, max_workers: int = 4):
+        """初始化获取器
+
+        Args:
+            stats: 数据源统计登记表
+            mode: 获取模式
+            hedge_delay: 对冲延迟（秒），仅 hedged 模式使用
+            max_workers: 最大并发请求数
+        """
+        if mode not in FETCH_MODES:
+            raise ValueError(f"不支持的获取模式: {mode}")
+        self.stats = stats if stats is not None else SourceStatsRegistry()
+        self.mode = mode
+        self.hedge_delay = max(0.0, hedge_delay)
+        self.max_workers = max(1, max_workers)
+        self.logger = logging.getLogger(__name__)
+
+    def fetch(self, sources: Sequence[Tuple[str, SourceFunc]],
+              validate: Callable[[Any], bool] = bool) -> Optional[HedgedResult]:
+        """从多个数据源获取数据
+
+        Args:
+            sources: (数据源名称, 获取函数) 列表，获取函数接收一个取消事件，
+                长时间运行的函数应在该事件被设置后尽快返回
+            validate: 结果校验函数，返回 False 的结果视为该数据源失败
+
+        Returns:
+            第一个通过校验的结果，全部失败时返回 None
+        """
+        if not sources:
+            return None
+
+        funcs = dict(sources)
+        queue = self.stats.rank([name for name, _ in sources])
+        cancel_event = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(queue)),
+                                      thread_name_prefix='hedged-fetch')
+        pending: Dict[Future, Tuple[str, float]] = {}
+        winner: Optional[HedgedResult] = None
+
+        def launch() -> None:
+            name = queue.pop(0)
+            self.logger.info(f"请求数据源 {name}")
+            pending[executor.submit(funcs[name], cancel_event)] = (name, time.monotonic())
+
+        try:
+            launch()
+            if self.mode == 'parallel':
+                while queue:
+                    launch()
+            next_launch = time.monotonic() + self.hedge_delay
+
+            while pending:
+                timeout = None
+                if queue and self.mode == 'hedged':
+                    timeout = max(0.0, next_launch - time.monotonic())
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # 对冲延迟已到仍无结果，再启动一个数据源
+                    launch()
+                    next_launch = time.monotonic() + self.hedge_delay
+                    continue
+
+                # 同一轮完成的请求都要结算（按启动顺序），否则会被当作取消记录
+                for future in sorted(done, key=lambda f: pending[f][1]):
+                    name, started = pending.pop(future)
+                    elapsed = time.monotonic() - started
+                    result = self._settle(future, name, elapsed, validate)
+                    if winner is None:
+                        winner = result
+                if winner is not None:
+                    break
+
+                # 有数据源失败，立即补上下一个
+                if queue and len(pending) < self.max_workers:
+                    launch()
+                    next_launch = time.monotonic() + self.hedge_delay
+        finally:
+            cancel_event.set()
+            now = time.monotonic()
+            for future, (name, started) in pending.items():
+                if not future.cancel():
+                    self.stats.record_cancelled(name, now - started)
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.stats.save()
+
+        if winner is None:
+            self.logger.error("所有数据源都无法获取有效数据")
+        return winner
+
+    def _settle(self, future: Future, name: str, elapsed: float,
+                validate: Callable[[Any], bool]) -> Optional[HedgedResult]:
+        """处理一个已完成的请求，通过校验时返回结果"""
+        try:
+            value = future.result()
+        except Exception as e:
+            self.logger.error(f"数据源 {name} 请求失败: {e}")
+            self.stats.record_failure(name, elapsed, str(e))
+            return None
+
+        try:
+            valid = validate(value)
+        except Exception as e:
+            self.logger.error(f"数据源 {name} 结果校验失败: {e}")
+            valid = False
+        if not valid:
+            self.logger.warning(f"数据源 {name} 返回无效数据")
+            self.stats.record_failure(name, elapsed, '返回数据无效')
+            return None
+
+        self.logger.info(f"数据源 {name} 在 {elapsed:.2f} 秒内返回有效数据")
+        self.stats.record_success(name, elapsed)
+        return HedgedResult(source=name, value=value, elapsed=elapsed)
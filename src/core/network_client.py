@@ -8,10 +8,13 @@
 
 import requests
 import logging
-from typing import Dict, Any, Optional
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from .config_manager import get_config_manager
+from .response_cache import ResponseCache, body_digest
 
 class NetworkError(Exception):
     """网络错误基类"""
@@ -39,6 +42,17 @@ class NetworkClient:
         self.config_manager = get_config_manager()
         self.logger = logging.getLogger(__name__)
         self.session = self._create_session()
+        self.cache = self._create_cache()
+
+    def _create_cache(self) -> Optional[ResponseCache]:
+        """创建响应缓存（配置关闭时返回 None）"""
+        if not self.config_manager.get('network.response_cache', True):
+            return None
+        cache_dir = self.config_manager.get('network.cache_dir')
+        if not cache_dir:
+            cache_dir = Path(self.config_manager.get_data_path()) / 'http_cache'
+        max_mb = self.config_manager.get('network.cache_max_mb', 50)
+        return ResponseCache(cache_dir, int(max_mb * 1024 * 1024))
     
     def _create_session(self) -> requests.Session:
         """创建配置好的会话"""
@@ -130,7 +144,20 @@ class NetworkClient:
         # 获取超时配置
         if 'timeout' not in kwargs or kwargs['timeout'] is None:
             kwargs['timeout'] = self.config_manager.get('network.timeout', 30)
-        
+
+        # 查找响应缓存：新鲜的缓存直接返回，否则带上验证器发送条件请求
+        cache_url = entry = None
+        if self.cache is not None and method == 'GET' and not kwargs.get('stream'):
+            cache_url = requests.Request(method, url, params=kwargs.get('params')).prepare().url
+            entry = self.cache.lookup(cache_url)
+            if entry is not None and entry.fresh(time.time()):
+                cached = self.cache.hit(cache_url, entry)
+                if cached is not None:
+                    self.logger.debug(f"命中响应缓存: {cache_url}")
+                    return cached
+            if entry is not None:
+                kwargs['headers'] = dict(kwargs.get('headers') or {}, **entry.validators())
+
         # 合并请求头
         if 'headers' in kwargs and kwargs['headers']:
             headers = self.session.headers.copy()
@@ -143,7 +170,23 @@ class NetworkClient:
         try:
             self.logger.debug(f"发送 {method} 请求到: {url}")
             response = self.session.request(method, url, **kwargs)
+
+            if response.status_code == 304 and entry is not None:
+                cached = self.cache.hit(cache_url, entry, revalidated=True, headers=response.headers)
+                if cached is not None:
+                    self.logger.debug(f"响应未变化，使用缓存: {cache_url}")
+                    return cached
+                # 缓存的响应体已丢失，去掉验证器重新请求
+                for name in entry.validators():
+                    kwargs['headers'].pop(name, None)
+                response = self.session.request(method, url, **kwargs)
+
             response.raise_for_status()
+            if not kwargs.get('stream'):
+                response.body_digest = body_digest(response.content)
+            if cache_url is not None:
+                self.cache.miss()
+                self.cache.store(cache_url, response)
             
             self.logger.debug(f"请求成功: {response.status_code}")
             return response
@@ -186,13 +229,43 @@ class NetworkClient:
             NetworkError: 网络相关错误
         """
         response = self.get(url, params=params, headers=headers, timeout=timeout)
-        
+        return self._decode_json(response, url)
+
+    def get_json_with_digest(self, url: str, params: Optional[Dict[str, Any]] = None,
+                             headers: Optional[Dict[str, str]] = None,
+                             timeout: Optional[float] = None) -> Tuple[Any, str]:
+        """发送GET请求并返回JSON数据和响应体摘要
+
+        解析器可以根据摘要跳过已经解析过的响应。
+
+        Args:
+            url: 请求URL
+            params: 请求参数
+            headers: 请求头
+            timeout: 超时时间
+
+        Returns:
+            (JSON数据, 响应体摘要)
+
+        Raises:
+            NetworkError: 网络相关错误
+        """
+        response = self.get(url, params=params, headers=headers, timeout=timeout)
+        return self._decode_json(response, url), response.body_digest
+
+    def _decode_json(self, response: requests.Response, url: str) -> Any:
         try:
             return response.json()
         except ValueError as e:
             error_msg = f"JSON解析失败: {url}"
             self.logger.error(error_msg)
             raise NetworkError(error_msg) from e
+
+    def cache_metrics(self) -> Dict[str, Any]:
+        """响应缓存统计（命中率、节省的字节数等），未启用缓存时返回空字典"""
+        if self.cache is None:
+            return {}
+        return self.cache.metrics.to_dict()
     
     def download_file(self, url: str, file_path: str,
                       chunk_size: int = 8192,
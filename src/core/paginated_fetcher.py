@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并发分页获取
+在有界并发窗口内按页获取开奖历史，每个主机使用令牌桶限速；
+遇到本地已有的期号时提前停止，中断的回填进度保存为游标，下次从断点继续
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Optional, Union
+
+import pandas as pd
+
+from .storage import write_json_atomic
+
+
+@dataclass
+class Page:
+    """一页解析后的数据"""
+    number: int
+    items: List[Dict]
+    total_pages: Optional[int] = None  # 响应中给出的总页数
+    last: bool = False                 # 响应表明这是最后一页
+
+
+# 分页获取函数：接收页码，返回解析后的页面，失败时抛出异常
+PageFunc = Callable[[int], Page]
+
+
+class TokenBucket:
+    """令牌桶限速器（线程安全）"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数，不大于 0 时不限速
+            capacity: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None) -> bool:
+        """获取一个令牌，令牌不足时等待
+
+        Args:
+            cancel_event: 取消事件，等待期间被设置时放弃获取
+
+        Returns:
+            是否获取到令牌
+        """
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_time = (1 - self._tokens) / self.rate
+            if cancel_event is not None:
+                if cancel_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+
+_host_buckets: Dict[str, TokenBucket] = {}
+_host_buckets_lock = threading.Lock()
+
+
+def get_host_bucket(host: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """获取主机共享的令牌桶（同一主机的所有分页获取共用一个限速器）"""
+    with _host_buckets_lock:
+        bucket = _host_buckets.get(host)
+        if bucket is None or bucket.rate != rate or bucket.capacity != max(1.0, capacity):
+            bucket = _host_buckets[host] = TokenBucket(rate, capacity)
+        return bucket
+
+
+class PageCursorStore:
+    """回填游标存储：记录未完成的分页回填下次应从哪一页继续"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """初始化游标存储
+
+        Args:
+            path: 游标文件路径，为 None 时只保存在内存中
+        """
+        self.path = Path(path) if path is not None else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('cursors', {})
+        except Exception as e:
+            self.logger.warning(f"读取回填游标失败，将从头回填: {e}")
+            return {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            write_json_atomic(self.path, {'cursors': self._cursors})
+        except Exception as e:
+            self.logger.warning(f"保存回填游标失败: {e}")
+
+    def get(self, key: str) -> Optional[int]:
+        """获取下次应继续的页码，没有未完成的回填时返回 None"""
+        with self._lock:
+            cursor = self._cursors.get(key)
+            return cursor['next_page'] if cursor else None
+
+    def set(self, key: str, next_page: int) -> None:
+        with self._lock:
+            self._cursors[key] = {'next_page': next_page,
+                                  'updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            self._save()
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            if self._cursors.pop(key, None) is not None:
+                self._save()
+
+
+class PaginatedFetcher:
+    """并发分页获取器
+
+    先单独获取第一页（多数增量更新到此即可停止），需要继续时在有界窗口内并发获取
+    后续页面，结果按页码顺序合并。停止条件与逐页获取一致：空页、获取失败、到达总页数
+    或最后一页、最后一条记录早于日期下限；另外遇到已知期号时也停止。
+    """
+
+    def __init__(self, concurrency: int = 4, bucket: Optional[TokenBucket] = None,
+                 cursors: Optional[PageCursorStore] = None, max_pages: int = 100):
+        """初始化分页获取器
+
+        Args:
+            concurrency: 同时进行的页面请求数
+            bucket: 限速令牌桶，为 None 时不限速
+            cursors: 回填游标存储，为 None 时不支持断点续取
+            max_pages: 最多获取的页数
+        """
+        self.concurrency = max(1, concurrency)
+        self.bucket = bucket
+        self.cursors = cursors
+        self.max_pages = max_pages
+        self.logger = logging.getLogger(__name__)
+
+    def fetch(self, fetch_page: PageFunc, cursor_key: Optional[str] = None,
+              known_draw_nums: Collection[str] = (), date_limit: Optional[pd.Timestamp] = None,
+              cancel_event: Optional[threading.Event] = None) -> Optional[List[Dict]]:
+        """分页获取数据
+
+        Args:
+            fetch_page: 分页获取函数
+            cursor_key: 回填游标键
+            known_draw_nums: 本地已有的期号，遇到时停止向后翻页
+            date_limit: 日期下限，某页最后一条记录早于该日期时停止
+            cancel_event: 取消事件
+
+        Returns:
+            按页码顺序合并的记录列表，第一页失败或为空时返回 None
+        """
+        cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        known = set(known_draw_nums)
+        items: List[Dict] = []
+
+        # 从第一页开始获取最新数据，遇到已知期号停止
+        next_page, finished = self._walk(fetch_page, 1, items, known, date_limit, cancel_event)
+        if not items:
+            return None
+
+        if finished and cursor_key is not None and self.cursors is not None:
+            # 之前中断的回填从游标处继续（期间新开奖只会让页面后移，不会漏掉记录）
+            resume_page = self.cursors.get(cursor_key)
+            if resume_page is not None and resume_page > next_page:
+                self.logger.info(f"从第 {resume_page} 页继续未完成的回填")
+                next_page, finished = self._walk(fetch_page, resume_page, items, set(), date_limit, cancel_event)
+
+        if cursor_key is not None and self.cursors is not None:
+            if finished:
+                self.cursors.clear(cursor_key)
+            else:
+                self.cursors.set(cursor_key, next_page)
+        return items
+
+    def _walk(self, fetch_page: PageFunc, start_page: int, items: List[Dict], known: set,
+              date_limit: Optional[pd.Timestamp], cancel_event: threading.Event):
+        """从 start_page 开始获取页面，追加到 items
+
+        Returns:
+            (下一个未获取的页码, 是否正常结束)，因失败或取消中断时第二项为 False
+        """
+        limit = self.max_pages
+        page_no = start_page
+        if page_no > limit:
+            return page_no, True
+
+        # 起始页单独获取，以便获知总页数并尽早停止
+        page = self._fetch_one(fetch_page, page_no, cancel_event)
+        if page is None:
+            return page_no, False
+        if not page.items:
+            return page_no, True
+        items.extend(page.items)
+        if self._should_stop(page, known, date_limit):
+            return page_no + 1, True
+        if page.total_pages:
+            limit = min(limit, page.total_pages)
+        page_no += 1
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='page-fetch')
+        inflight: Dict[int, Future] = {}
+        next_submit = page_no
+        try:
+            while page_no <= limit:
+                while next_submit <= limit and len(inflight) < self.concurrency:
+                    inflight[next_submit] = executor.submit(self._fetch_one, fetch_page, next_submit, cancel_event)
+                    next_submit += 1
+
+                page = inflight.pop(page_no).result()
+                if page is None:
+                    return page_no, False
+                if not page.items:
+                    return page_no, True
+                items.extend(page.items)
+                if self._should_stop(page, known, date_limit):
+                    return page_no + 1, True
+                if page.total_pages:
+                    limit = min(limit, page.total_pages)
+                page_no += 1
+            return page_no, True
+        finally:
+            for future in inflight.values():
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_one(self, fetch_page: PageFunc, page_no: int,
+                   cancel_event: threading.Event) -> Optional[Page]:
+        """获取一页，失败或被取消时返回 None"""
+        if cancel_event.is_set():
+            return None
+        if self.bucket is not None and not self.bucket.acquire(cancel_event):
+            return None
+        try:
+            return fetch_page(page_no)
+        except Exception as e:
+            self.logger.error(f"获取第 {page_no} 页数据失败: {str(e)}")
+            return None
+
+    @staticmethod
+    def _should_stop(page: Page, known: set, date_limit: Optional[pd.Timestamp]) -> bool:
+        """当前页之后是否不需要再获取"""
+        if page.last or (page.total_pages and page.number >= page.total_pages):
+            return True
+        if known and any(item.get('draw_num') in known for item in page.items):
+            return True
+        if date_limit is not None:
+            try:
+                if pd.to_datetime(page.items[-1].get('draw_date', '')) < date_limit:
+                    return True
+            except (ValueError, TypeError):
+                pass
+        return False
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 响应缓存
+按 ETag/Last-Modified 和 Cache-Control 缓存 GET 响应，响应体保存在磁盘上，
+超过容量时按最近最少使用淘汰；未变化的页面直接命中缓存或通过 304 复用
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .storage import write_json_atomic
+
+# 需要随缓存一起保存的响应头
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+
+def body_digest(content: bytes) -> str:
+    """响应体摘要（解析器用它识别已解析过的响应）"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """解析 Cache-Control 头
+
+    Returns:
+        指令名（小写）到参数值的映射，无参数的指令值为 None
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition('=')
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else None
+    return directives
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目元数据（响应体单独保存为文件）"""
+    url: str
+    digest: str
+    size: int
+    stored_at: float
+    last_access: float
+    expires_at: Optional[float] = None   # 新鲜期截止时间，None 表示每次都需要验证
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    encoding: Optional[str] = None
+    headers: Optional[Dict[str, str]] = None
+
+    def fresh(self, now: float) -> bool:
+        return self.expires_at is not None and now < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheMetrics:
+    """缓存统计"""
+    requests: int = 0
+    hits: int = 0          # 新鲜命中，未发请求
+    revalidated: int = 0   # 条件请求返回 304
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    bytes_saved: int = 0   # 未重新下载的响应体字节数
+
+    @property
+    def hit_ratio(self) -> float:
+        return (self.hits + self.revalidated) / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result['hit_ratio'] = self.hit_ratio
+        return result
+
+
+class ResponseCache:
+    """磁盘响应缓存（线程安全，容量有界，LRU 淘汰）"""
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 50 * 1024 * 1024):
+        """初始化响应缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 响应体总大小上限（字节）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.metrics = CacheMetrics()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CacheEntry] = self._load_index()
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """缓存键（完整 URL 的摘要）"""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}.body'
+
+    def _load_index(self) -> Dict[str, CacheEntry]:
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            entries = {key: CacheEntry(**value) for key, value in raw.get('entries', {}).items()}
+        except Exception as e:
+            self.logger.warning(f"读取响应缓存索引失败，将清空缓存: {e}")
+            return {}
+        # 丢弃响应体文件缺失的条目
+        return {key: entry for key, entry in entries.items() if self._body_path(key).exists()}
+
+    def _save_index(self) -> None:
+        try:
+            write_json_atomic(self.cache_dir / self.INDEX_FILE,
+                              {'entries': {key: asdict(entry) for key, entry in self._entries.items()}})
+        except Exception as e:
+            self.logger.warning(f"保存响应缓存索引失败: {e}")
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """查找缓存条目"""
+        with self._lock:
+            self.metrics.requests += 1
+            return self._entries.get(self.cache_key(url))
+
+    def hit(self, url: str, entry: CacheEntry, revalidated: bool = False,
+            headers: Optional[Mapping[str, str]] = None) -> Optional[requests.Response]:
+        """使用缓存条目构造响应
+
+        Args:
+            url: 请求 URL
+            entry: 缓存条目
+            revalidated: 是否为 304 验证通过（此时用新的响应头更新新鲜期）
+            headers: 304 响应的响应头
+
+        Returns:
+            缓存的响应，响应体文件读取失败时返回 None
+        """
+        key = self.cache_key(url)
+        try:
+            content = self._body_path(key).read_bytes()
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry.last_access = now
+            if revalidated:
+                self.metrics.revalidated += 1
+                if headers is not None:
+                    entry.expires_at = self._expires_at(headers, now)
+                    entry.etag = headers.get('ETag', entry.etag)
+                    entry.last_modified = headers.get('Last-Modified', entry.last_modified)
+                self._save_index()
+            else:
+                self.metrics.hits += 1
+            self.metrics.bytes_saved += entry.size
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content
+        response.headers = CaseInsensitiveDict(entry.headers or {})
+        response.url = entry.url
+        response.encoding = entry.encoding
+        response.from_cache = True
+        response.body_digest = entry.digest
+        return response
+
+    def miss(self) -> None:
+        with self._lock:
+            self.metrics.misses += 1
+
+    def store(self, url: str, response: requests.Response) -> bool:
+        """保存响应
+
+        Returns:
+            是否保存（no-store、无验证器且无新鲜期的响应不保存）
+        """
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if 'no-store' in directives or response.status_code != 200:
+            return False
+
+        now = time.time()
+        expires_at = self._expires_at(response.headers, now)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if expires_at is None and not etag and not last_modified:
+            return False
+
+        content = response.content
+        if len(content) > self.max_bytes:
+            return False
+
+        key = self.cache_key(url)
+        entry = CacheEntry(
+            url=url,
+            digest=getattr(response, 'body_digest', None) or body_digest(content),
+            size=len(content),
+            stored_at=now,
+            last_access=now,
+            expires_at=expires_at,
+            etag=etag,
+            last_modified=last_modified,
+            encoding=response.encoding,
+            headers={name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+        )
+
+        body_path = self._body_path(key)
+        temp_path = body_path.with_name(f'{body_path.name}.{threading.get_ident()}.tmp')
+        with self._lock:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                temp_path.write_bytes(content)
+                os.replace(temp_path, body_path)
+            except OSError as e:
+                self.logger.warning(f"写入响应缓存失败: {e}")
+                temp_path.unlink(missing_ok=True)
+                return False
+            self._entries[key] = entry
+            self.metrics.stored += 1
+            self._evict()
+            self._save_index()
+        return True
+
+    def _evict(self) -> None:
+        """超过容量时淘汰最近最少使用的条目（调用方持有锁）"""
+        total = sum(entry.size for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1].last_access):
+            if total <= self.max_bytes:
+                break
+            self._body_path(key).unlink(missing_ok=True)
+            del self._entries[key]
+            total -= entry.size
+            self.metrics.evicted += 1
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            for key in list(self._entries):
+                self._body_path(key).unlink(missing_ok=True)
+            self._entries.clear()
+            self._save_index()
+
+    @staticmethod
+    def _expires_at(headers: Mapping[str, str], now: float) -> Optional[float]:
+        """根据 Cache-Control 计算新鲜期截止时间（no-cache 或无 max-age 时为 None）"""
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-cache' in directives:
+            return None
+        max_age = directives.get('max-age')
+        if max_age is None or not re.fullmatch(r'\d+', max_age):
+            return None
+        return now + int(max_age)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+数据存储模块
+提供历史开奖数据的列式二进制存储、追加日志、进程级共享缓存、号码位图索引、出现次数前缀和表、计算结果缓存和号码组合属性表
+"""
+
+from .columnar_store import ColumnarDrawStore, DrawArrays
+from .combination_table import CombinationTable, get_combination_table
+from .history_journal import (
+    HistoryJournal, record_digests, sort_records, source_signature, write_json_atomic
+)
+from .memo_cache import MemoCache, data_version, invalidate_memo_caches, next_data_version
+from .history_cache import HistoryCache, ReadOnlyDict, ReadOnlyList, get_history_cache
+from .overlap_index import OverlapIndex
+from .occurrence_table import (
+    OccurrenceTable, get_occurrence_tables, history_occurrence_tables, occurrence_tables
+)
+
+__all__ = [
+    'ColumnarDrawStore',
+    'CombinationTable',
+    'DrawArrays',
+    'HistoryCache',
+    'HistoryJournal',
+    'MemoCache',
+    'OccurrenceTable',
+    'OverlapIndex',
+    'ReadOnlyDict',
+    'ReadOnlyList',
+    'data_version',
+    'get_combination_table',
+    'get_history_cache',
+    'get_occurrence_tables',
+    'history_occurrence_tables',
+    'invalidate_memo_caches',
+    'next_data_version',
+    'occurrence_tables',
+    'record_digests',
+    'sort_records',
+    'source_signature',
+    'write_json_atomic',
+]
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+列式开奖数据存储
+将清洗后的历史数据保存为定长 .npy 列文件，支持内存映射读取，避免重复解析 JSON
+"""
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .history_journal import same_size, source_content_hash, source_signature
+
+# 存储格式版本，格式或清洗规则变化时递增
+STORE_VERSION = 1
+
+# 各彩票类型的号码区定义: (列表列名, 区名, 号码个数, 是否为单个号码)
+NUMBER_ZONES: Dict[str, List[Tuple[str, str, int, bool]]] = {
+    'ssq': [('red_numbers', 'red', 6, False), ('blue_number', 'blue', 1, True)],
+    'dlt': [('front_numbers', 'front', 5, False), ('back_numbers', 'back', 2, False)],
+}
+
+# 展开列前缀，与 LotteryDataManager._expand_number_columns 保持一致
+EXPANDED_PREFIX = {'red': 'red', 'blue': 'blue', 'front': 'front', 'back': 'back'}
+
+META_FILE = 'meta.json'
+
+
+def _json_default(value: Any) -> Any:
+    """JSON 序列化 numpy/pandas 标量"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+@dataclass
+class DrawArrays:
+    """列式开奖数据（原始数组视图）
+
+    Attributes:
+        lottery_type: 彩票类型
+        draw_num: 期号 (int32)
+        draw_date: 开奖日期 (datetime64[D])
+        numbers: 各号码区矩阵，如 {'red': uint8[N, 6], 'blue': uint8[N, 1]}
+        values: 数值列的存储值 (int64 或 float64)
+        scales: 数值列的缩放系数，实际值 = 存储值 / 缩放系数
+    """
+    lottery_type: str
+    draw_num: np.ndarray
+    draw_date: np.ndarray
+    numbers: Dict[str, np.ndarray]
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+    scales: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.draw_num)
+
+    def head(self, count: int) -> 'DrawArrays':
+        """最新的 count 行（数组切片视图）"""
+        return DrawArrays(
+            lottery_type=self.lottery_type,
+            draw_num=self.draw_num[:count],
+            draw_date=self.draw_date[:count],
+            numbers={zone: matrix[:count] for zone, matrix in self.numbers.items()},
+            values={name: raw[:count] for name, raw in self.values.items()},
+            scales=dict(self.scales),
+        )
+
+    def get_value(self, name: str) -> np.ndarray:
+        """获取解码后的数值列"""
+        raw = self.values[name]
+        scale = self.scales.get(name, 1)
+        if scale == 1:
+            return raw
+        return raw / scale
+
+
+class ColumnarDrawStore:
+    """列式开奖数据存储
+
+    目录结构::
+
+        <store_dir>/
+            meta.json          # 源文件签名、列顺序、dtype 等元信息（最后写入）
+            index.npy          # DataFrame 索引
+            draw_num.npy       # int32 期号
+            draw_num_width.npy # uint8 期号位数（用于还原前导零）
+            draw_date.npy      # datetime64[D]
+            red.npy / blue.npy / front.npy / back.npy  # uint8 号码矩阵
+            <value>.npy        # int64/float64 数值列
+    """
+
+    def __init__(self, store_dir: Union[str, Path], lottery_type: str):
+        """初始化列式存储
+
+        Args:
+            store_dir: 存储目录
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+        """
+        if lottery_type not in NUMBER_ZONES:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        self.store_dir = Path(store_dir)
+        self.lottery_type = lottery_type
+        self.logger = logging.getLogger(__name__)
+        self._meta: Optional[Dict] = None
+
+    # ==================== 元信息 ====================
+
+    def read_meta(self) -> Optional[Dict]:
+        """读取元信息（不检查是否与源文件同步）"""
+        return self._read_meta()
+
+    def _read_meta(self) -> Optional[Dict]:
+        meta_path = self.store_dir / META_FILE
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get('version') != STORE_VERSION or meta.get('lottery_type') != self.lottery_type:
+            return None
+        return meta
+
+    def is_fresh(self, source_path: Union[str, Path], build_key: str = '') -> bool:
+        """检查存储是否与源 JSON 文件同步
+
+        先比较文件大小和修改时间（含追加日志）；不一致时再比较内容哈希，
+        内容未变（例如仅 touch）则刷新签名并视为同步。
+
+        Args:
+            source_path: 源 JSON 文件路径
+            build_key: 构建参数标识（如日期过滤条件），变化时存储失效
+
+        Returns:
+            是否同步
+        """
+        meta = self._read_meta()
+        if meta is None or meta.get('build_key') != build_key:
+            return False
+        try:
+            signature = source_signature(source_path)
+        except OSError:
+            return False
+        if signature == meta.get('source_signature'):
+            self._meta = meta
+            return True
+        if not same_size(signature, meta.get('source_signature') or {}):
+            return False
+        if source_content_hash(source_path) != meta.get('source_hash'):
+            return False
+        # 内容一致，仅刷新签名
+        meta['source_signature'] = signature
+        self._write_meta(meta)
+        self._meta = meta
+        return True
+
+    def invalidate(self) -> None:
+        """使存储失效
+
+        清除元信息中的源文件签名，使 is_fresh 必然返回 False；
+        数组和附加信息保留，可作为增量重建的基础。
+        """
+        self._meta = None
+        meta = self._read_meta()
+        if meta is None:
+            return
+        meta['source_signature'] = None
+        meta['source_hash'] = None
+        try:
+            self._write_meta(meta)
+        except OSError:
+            self._remove_meta()
+
+    def _remove_meta(self) -> None:
+        self._meta = None
+        try:
+            (self.store_dir / META_FILE).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _write_meta(self, meta: Dict) -> None:
+        tmp_path = self.store_dir / (META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, self.store_dir / META_FILE)
+
+    # ==================== 写入 ====================
+
+    def write(self, df: pd.DataFrame, source_path: Union[str, Path], build_key: str = '',
+              attachments: Optional[Dict[str, Any]] = None,
+              extra_arrays: Optional[Dict[str, np.ndarray]] = None) -> bool:
+        """将清洗并展开后的数据写入列式存储
+
+        Args:
+            df: get_history_data 管线输出的 DataFrame（已清洗、已展开）
+            source_path: 源 JSON 文件路径
+            build_key: 构建参数标识
+            attachments: 随数据保存的附加信息（需可 JSON 序列化，如清洗报告）
+            extra_arrays: 随数据保存的附加数组（如原始记录摘要）
+
+        Returns:
+            是否写入成功；数据不符合定长格式时返回 False
+        """
+        try:
+            columns = self._encode(df)
+        except (ValueError, TypeError, OverflowError) as e:
+            self.logger.debug(f"{self.lottery_type} 数据不适合列式存储: {e}")
+            return False
+
+        try:
+            signature = source_signature(source_path)
+            source_hash = source_content_hash(source_path)
+        except OSError as e:
+            self.logger.debug(f"读取源文件签名失败: {e}")
+            return False
+
+        meta = {
+            'version': STORE_VERSION,
+            'lottery_type': self.lottery_type,
+            'build_key': build_key,
+            'source_signature': signature,
+            'source_hash': source_hash,
+            'rows': len(df),
+            'columns': list(df.columns),
+            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+            'scales': columns.pop('__scales__'),
+            'attachments': attachments or {},
+            'extra_arrays': sorted(extra_arrays or {}),
+        }
+        for name, array in (extra_arrays or {}).items():
+            columns[f'extra_{name}'] = np.asarray(array)
+
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            # 先删除元信息，保证中途失败时存储处于失效状态
+            self._remove_meta()
+            for name, array in columns.items():
+                tmp_path = self.store_dir / f'{name}.tmp.npy'
+                np.save(tmp_path, array, allow_pickle=False)
+                os.replace(tmp_path, self.store_dir / f'{name}.npy')
+            self._write_meta(meta)
+        except OSError as e:
+            self.logger.warning(f"写入列式存储失败: {e}")
+            return False
+
+        self._meta = meta
+        self.logger.debug(f"{self.lottery_type} 列式存储已更新: {len(df)} 条记录")
+        return True
+
+    def _encode(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """将 DataFrame 编码为定长列数组"""
+        zones = NUMBER_ZONES[self.lottery_type]
+        known = {'draw_num', 'draw_date'}
+        columns: Dict[str, np.ndarray] = {}
+
+        for list_col, zone, count, scalar in zones:
+            known.add(list_col)
+            known.update(f'{EXPANDED_PREFIX[zone]}_{i + 1}' for i in range(count))
+            if list_col not in df.columns:
+                raise ValueError(f"缺少号码列 {list_col}")
+            if scalar:
+                matrix = df[list_col].to_numpy(dtype=np.int64).reshape(-1, 1)
+            else:
+                values = df[list_col].tolist()
+                if any(not isinstance(v, (list, tuple)) or len(v) != count for v in values):
+                    raise ValueError(f"{list_col} 号码个数不是 {count}")
+                matrix = np.array(values, dtype=np.int64).reshape(-1, count)
+            if matrix.size and (matrix.min() < 0 or matrix.max() > 255):
+                raise ValueError(f"{list_col} 号码超出 uint8 范围")
+            columns[zone] = matrix.astype(np.uint8)
+
+        # 期号：int32 + 位数
+        draw_nums = df['draw_num'].astype(str)
+        if not draw_nums.str.fullmatch(r'\d{1,9}').all():
+            raise ValueError("期号包含非数字字符")
+        columns['draw_num'] = draw_nums.astype(np.int64).to_numpy().astype(np.int32)
+        columns['draw_num_width'] = draw_nums.str.len().to_numpy().astype(np.uint8)
+
+        # 日期：datetime64[D]
+        dates = pd.to_datetime(df['draw_date'])
+        if dates.isna().any():
+            raise ValueError("开奖日期存在空值")
+        day_dates = dates.to_numpy().astype('datetime64[D]')
+        if not (day_dates == dates.to_numpy()).all():
+            raise ValueError("开奖日期包含时间部分")
+        columns['draw_date'] = day_dates
+
+        # 索引
+        index = df.index.to_numpy()
+        if index.dtype.kind not in 'iu':
+            raise ValueError("索引不是整数类型")
+        columns['index'] = index.astype(np.int64)
+
+        # 数值列：整数存为 int64，两位小数存为 int64（分），其余存为 float64
+        scales: Dict[str, int] = {}
+        for col in df.columns:
+            if col in known:
+                continue
+            series = df[col]
+            if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                raise ValueError(f"不支持的列 {col} ({series.dtype})")
+            raw = series.to_numpy()
+            if raw.dtype.kind in 'iu':
+                columns[f'value_{col}'] = raw.astype(np.int64)
+                scales[col] = 1
+                continue
+            raw = raw.astype(np.float64)
+            if np.isfinite(raw).all():
+                cents = np.round(raw * 100)
+                if np.abs(cents).max(initial=0) < 2 ** 53 and ((cents / 100) == raw).all():
+                    columns[f'value_{col}'] = cents.astype(np.int64)
+                    scales[col] = 100
+                    continue
+            columns[f'value_{col}'] = raw
+            scales[col] = 0  # 0 表示原样存储的 float64
+
+        columns['__scales__'] = scales
+        return columns
+
+    # ==================== 读取 ====================
+
+    def load_arrays(self, mmap: bool = True) -> Optional[DrawArrays]:
+        """读取原始列数组（不做任何解析）
+
+        Args:
+            mmap: 是否以只读内存映射方式打开
+
+        Returns:
+            DrawArrays，存储不存在时返回 None
+        """
+        meta = self._meta or self._read_meta()
+        if meta is None:
+            return None
+        mode = 'r' if mmap else None
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.store_dir / f'{name}.npy', mmap_mode=mode, allow_pickle=False)
+
+        try:
+            numbers = {zone: load(zone) for _, zone, _, _ in NUMBER_ZONES[self.lottery_type]}
+            values, scales = {}, {}
+            for col, scale in meta['scales'].items():
+                values[col] = load(f'value_{col}')
+                scales[col] = scale if scale else 1
+            return DrawArrays(
+                lottery_type=self.lottery_type,
+                draw_num=load('draw_num'),
+                draw_date=load('draw_date'),
+                numbers=numbers,
+                values=values,
+                scales=scales,
+            )
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取列式存储失败: {e}")
+            return None
+
+    def load_extra_array(self, name: str) -> Optional[np.ndarray]:
+        """读取附加数组，不存在时返回 None"""
+        meta = self._meta or self._read_meta()
+        if meta is None or name not in meta.get('extra_arrays', []):
+            return None
+        try:
+            return np.load(self.store_dir / f'extra_{name}.npy', allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def load_frame(self, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """从列式存储还原已展开的历史数据 DataFrame
+
+        Args:
+            limit: 只读取最新的 limit 行（存储按最新在前排列，内存映射只读取对应的前缀），None 表示全部
+
+        Returns:
+            与 JSON 管线输出一致的 DataFrame（或其前 limit 行），存储不存在时返回 None
+        """
+        meta = self._meta or self._read_meta()
+        if meta is None:
+            return None
+        arrays = self.load_arrays(mmap=True)
+        if arrays is None:
+            return None
+
+        try:
+            width = np.load(self.store_dir / 'draw_num_width.npy', mmap_mode='r', allow_pickle=False)
+            index = np.load(self.store_dir / 'index.npy', mmap_mode='r', allow_pickle=False)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取列式存储失败: {e}")
+            return None
+        if limit is not None:
+            arrays = arrays.head(limit)
+            width = width[:limit]
+            index = index[:limit]
+        index = pd.Index(np.asarray(index))
+
+        dtypes = meta['dtypes']
+        data = {}
+        draw_num = np.char.zfill(np.asarray(arrays.draw_num).astype(str), width.astype(np.int64))
+        data['draw_num'] = pd.Series(draw_num, index=index).astype(dtypes['draw_num'])
+        data['draw_date'] = pd.Series(np.asarray(arrays.draw_date), index=index).astype(dtypes['draw_date'])
+
+        for list_col, zone, count, scalar in NUMBER_ZONES[self.lottery_type]:
+            matrix = np.asarray(arrays.numbers[zone]).astype(np.int64)
+            if scalar:
+                data[list_col] = pd.Series(matrix[:, 0], index=index).astype(dtypes[list_col])
+            else:
+                data[list_col] = pd.Series(matrix.tolist(), index=index, dtype=object)
+            for i in range(count):
+                name = f'{EXPANDED_PREFIX[zone]}_{i + 1}'
+                if name in dtypes:
+                    data[name] = pd.Series(matrix[:, i], index=index).astype(dtypes[name])
+
+        for col in meta['scales']:
+            data[col] = pd.Series(arrays.get_value(col), index=index).astype(dtypes[col])
+
+        return pd.DataFrame({col: data[col] for col in meta['columns']}, index=index)
+
+    def clear(self) -> None:
+        """删除整个存储目录"""
+        self._meta = None
+        shutil.rmtree(self.store_dir, ignore_errors=True)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+号码组合属性表
+把全部 C(33,6)（双色球红球）或 C(35,5)（大乐透前区）组合按组合序（colex）编号，
+逐编号保存和值、奇数个数、大号个数、各区个数、跨度、AC 值、最长连号、尾数分布等属性列。
+表只构建一次并保存为 .npy 文件，之后以内存映射方式读取；模式过滤可写成对全部组合的
+布尔掩码表达式，再按编号查询单注号码。
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+from math import comb
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..config_manager import get_config_manager
+from .overlap_index import popcount
+
+# 表格式版本，列或计算规则变化时递增
+TABLE_VERSION = 1
+
+# 各彩票类型主区的布局: (最大号码, 号码个数, 三个分区, 大号下限)
+LAYOUTS: Dict[str, Tuple[int, int, Tuple[Tuple[int, int], ...], int]] = {
+    'ssq': (33, 6, ((1, 11), (12, 22), (23, 33)), 18),
+    'dlt': (35, 5, ((1, 12), (13, 24), (25, 35)), 18),
+}
+
+# 属性列（均为 uint8）；numbers 为号码矩阵 (N, 号码个数)，tails 为尾数分布 (N, 10)
+COLUMNS = ('sum', 'odd', 'big', 'zone1', 'zone2', 'zone3', 'zones', 'span', 'ac', 'max_run')
+MATRICES = ('numbers', 'tails')
+
+META_FILE = 'meta.json'
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir() -> Path:
+    """默认缓存目录：配置的数据目录下的 cache/combinations
+
+    数据目录为相对路径时按项目根目录（配置目录的上一级）解析，
+    与进程的当前工作目录无关。
+
+    Returns:
+        缓存目录路径
+    """
+    config_manager = get_config_manager()
+    data_path = Path(config_manager.get_data_path())
+    if not data_path.is_absolute():
+        data_path = config_manager.config_file.resolve().parent.parent / data_path
+    return data_path / 'cache' / 'combinations'
+
+
+def binomial_table(max_number: int, max_size: int) -> np.ndarray:
+    """组合数表 table[n, k] = C(n, k)（0 <= n <= max_number，0 <= k <= max_size）"""
+    return np.array([[comb(n, k) for k in range(max_size + 1)] for n in range(max_number + 1)], dtype=np.int64)
+
+
+def colex_unrank(ranks: np.ndarray, size: int, max_number: int) -> np.ndarray:
+    """按组合序（colex）编号还原 0 基号码组合
+
+    Args:
+        ranks: 编号数组，取值 0..C(max_number, size)-1
+        size: 每个组合的元素个数
+        max_number: 元素取值 0..max_number-1
+
+    Returns:
+        升序排列的组合，形状 (N, size)
+    """
+    binomial = binomial_table(max_number, size)
+    remaining = np.asarray(ranks, dtype=np.int64).copy()
+    combos = np.empty((len(remaining), size), dtype=np.int64)
+    for i in range(size, 0, -1):
+        # 第 i 个元素为满足 C(c, i) <= 剩余编号的最大 c
+        column = binomial[:, i]
+        element = np.searchsorted(column, remaining, side='right') - 1
+        combos[:, i - 1] = element
+        remaining -= column[element]
+    return combos
+
+
+def ac_values(sorted_numbers: np.ndarray) -> np.ndarray:
+    """逐行计算 AC 值（不同差值个数减去号码数减一）"""
+    width = sorted_numbers.shape[1]
+    seen = np.zeros(sorted_numbers.shape[0], dtype=np.uint64)
+    for i, j in itertools.combinations(range(width), 2):
+        diff = (sorted_numbers[:, j] - sorted_numbers[:, i]).astype(np.uint64)
+        seen |= np.left_shift(np.uint64(1), diff)
+    return popcount(seen) - (width - 1)
+
+
+def max_runs(sorted_numbers: np.ndarray) -> np.ndarray:
+    """逐行计算最长连号长度"""
+    best = np.ones(len(sorted_numbers), dtype=np.int64)
+    run = best.copy()
+    for column in range(1, sorted_numbers.shape[1]):
+        run = np.where(sorted_numbers[:, column] == sorted_numbers[:, column - 1] + 1, run + 1, 1)
+        best = np.maximum(best, run)
+    return best
+
+
+class CombinationTable:
+    """号码组合属性表
+
+    第 r 行为组合序编号 r 的组合，columns 中各列按编号索引（内存映射时为只读数组）。
+    """
+
+    def __init__(self, lottery_type: str, columns: Dict[str, np.ndarray]):
+        """初始化属性表
+
+        Args:
+            lottery_type: 彩票类型 ('ssq'/'dlt')
+            columns: 属性列和矩阵（键见 COLUMNS、MATRICES）
+        """
+        if lottery_type not in LAYOUTS:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        self.lottery_type = lottery_type
+        self.max_number, self.size, self.zone_ranges, self.big_from = LAYOUTS[lottery_type]
+        self.columns = columns
+        self._binomial = binomial_table(self.max_number, self.size)
+
+    def __len__(self) -> int:
+        return len(self.columns['numbers'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def numbers(self) -> np.ndarray:
+        """号码矩阵 (N, 号码个数)，每行升序"""
+        return self.columns['numbers']
+
+    # ==================== 构建与读写 ====================
+
+    @classmethod
+    def build(cls, lottery_type: str) -> 'CombinationTable':
+        """计算全部组合的属性列"""
+        if lottery_type not in LAYOUTS:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        max_number, size, zone_ranges, big_from = LAYOUTS[lottery_type]
+        numbers = colex_unrank(np.arange(comb(max_number, size), dtype=np.int64), size, max_number) + 1
+
+        zone_counts = [((numbers >= low) & (numbers <= high)).sum(axis=1) for low, high in zone_ranges]
+        tails = np.zeros((len(numbers), 10), dtype=np.uint8)
+        rows = np.arange(len(numbers))
+        for column in range(size):
+            np.add.at(tails, (rows, numbers[:, column] % 10), 1)
+        values = {
+            'sum': numbers.sum(axis=1),
+            'odd': (numbers % 2 == 1).sum(axis=1),
+            'big': (numbers >= big_from).sum(axis=1),
+            'zone1': zone_counts[0],
+            'zone2': zone_counts[1],
+            'zone3': zone_counts[2],
+            'zones': sum((count > 0).astype(np.int64) for count in zone_counts),
+            'span': numbers[:, -1] - numbers[:, 0],
+            'ac': ac_values(numbers),
+            'max_run': max_runs(numbers),
+        }
+        columns = {name: values[name].astype(np.uint8) for name in COLUMNS}
+        columns['numbers'] = numbers.astype(np.uint8)
+        columns['tails'] = tails
+        return cls(lottery_type, columns)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], lottery_type: str) -> Optional['CombinationTable']:
+        """以内存映射方式读取属性表，文件不存在或版本不符时返回 None"""
+        directory = Path(directory)
+        try:
+            with open(directory / META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        max_number, size = LAYOUTS[lottery_type][:2]
+        if (meta.get('version') != TABLE_VERSION or meta.get('lottery_type') != lottery_type
+                or meta.get('count') != comb(max_number, size)):
+            return None
+        try:
+            columns = {name: np.load(directory / f'{name}.npy', mmap_mode='r') for name in COLUMNS + MATRICES}
+        except (OSError, ValueError):
+            return None
+        if any(len(array) != meta['count'] for array in columns.values()):
+            return None
+        return cls(lottery_type, columns)
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """保存为 .npy 文件（先写临时文件再替换，元信息最后写入；多个进程同时保存时互不影响）"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = f'{os.getpid()}.{threading.get_ident()}.tmp'
+        for name in COLUMNS + MATRICES:
+            tmp_path = directory / f'{name}.{suffix}.npy'
+            np.save(tmp_path, np.ascontiguousarray(self.columns[name]))
+            os.replace(tmp_path, directory / f'{name}.npy')
+        meta = {'version': TABLE_VERSION, 'lottery_type': self.lottery_type, 'count': len(self),
+                'columns': list(COLUMNS + MATRICES)}
+        tmp_path = directory / f'{META_FILE}.{suffix}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, directory / META_FILE)
+
+    # ==================== 查询 ====================
+
+    def ranks(self, numbers: Union[np.ndarray, Sequence[Sequence[int]]]) -> np.ndarray:
+        """号码组合（每行一注，1 基，顺序不限）的组合序编号"""
+        zero_based = np.sort(np.asarray(numbers, dtype=np.int64).reshape(-1, self.size), axis=1) - 1
+        rank = np.zeros(len(zero_based), dtype=np.int64)
+        for i in range(self.size):
+            rank += self._binomial[zero_based[:, i], i + 1]
+        return rank
+
+    def rank(self, numbers: Iterable[int]) -> int:
+        """单注号码的组合序编号"""
+        return int(self.ranks([list(numbers)])[0])
+
+    def row(self, numbers: Iterable[int]) -> Dict[str, Any]:
+        """单注号码的属性（tails 为尾数到个数的字典）"""
+        rank = self.rank(numbers)
+        values: Dict[str, Any] = {name: int(self.columns[name][rank]) for name in COLUMNS}
+        values['tails'] = {digit: int(count) for digit, count in enumerate(self.columns['tails'][rank]) if count}
+        return values
+
+    def mask(self, **conditions: Any) -> np.ndarray:
+        """按属性条件筛选全部组合
+
+        条件值为整数时要求相等，为 (low, high) 元组时要求在闭区间内，为列表或集合时要求属于其中，
+        也可以是按编号索引的布尔数组。
+
+        Examples:
+            >>> table.mask(odd=3, zones=3, sum=(90, 130), ac=(6, 10))
+
+        Returns:
+            长度为组合数的布尔掩码
+        """
+        result = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            column = self.columns[name]
+            if isinstance(condition, tuple):
+                low, high = condition
+                result &= (column >= low) & (column <= high)
+            elif isinstance(condition, (list, set, frozenset)):
+                result &= np.isin(column, list(condition))
+            else:
+                result &= column == condition
+        return result
+
+    def count_in(self, low: int, high: int) -> np.ndarray:
+        """每个组合中号码在 [low, high] 内的个数（用于自定义的大小号、分区划分）"""
+        numbers = self.numbers
+        return ((numbers >= low) & (numbers <= high)).sum(axis=1, dtype=np.uint8)
+
+    def contains(self, allowed: np.ndarray, numbers: Union[np.ndarray, Sequence[Sequence[int]]]) -> np.ndarray:
+        """号码组合（每行一注）是否在掩码允许的组合中"""
+        return np.asarray(allowed)[self.ranks(numbers)]
+
+    def combinations(self, allowed: np.ndarray) -> np.ndarray:
+        """掩码允许的全部组合 (M, 号码个数)，按组合序排列"""
+        return np.asarray(self.numbers[np.flatnonzero(allowed)], dtype=np.int64)
+
+
+_tables: Dict[Tuple[str, str], CombinationTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_combination_table(lottery_type: str, cache_dir: Optional[Union[str, Path]] = None) -> CombinationTable:
+    """获取组合属性表（进程级共享；缓存目录中没有时构建并保存）
+
+    Args:
+        lottery_type: 彩票类型 ('ssq'/'dlt')
+        cache_dir: 缓存目录（None 表示 default_cache_dir()）
+
+    Returns:
+        组合属性表（只读）
+    """
+    if lottery_type not in LAYOUTS:
+        raise ValueError(f"不支持的彩票类型: {lottery_type}")
+    directory = Path(cache_dir if cache_dir is not None else default_cache_dir()) / lottery_type
+    key = (lottery_type, str(directory.resolve()))
+    table = _tables.get(key)
+    if table is not None:
+        return table
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = CombinationTable.load(directory, lottery_type)
+            if table is None:
+                table = CombinationTable.build(lottery_type)
+                try:
+                    table.save(directory)
+                    table = CombinationTable.load(directory, lottery_type) or table
+                except OSError as e:
+                    logger.warning(f"保存组合属性表失败，仅在内存中使用: {e}")
+                for array in table.columns.values():
+                    if not isinstance(array, np.memmap):
+                        array.flags.writeable = False
+            _tables[key] = table
+    return table
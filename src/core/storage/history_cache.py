@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程级历史数据缓存
+同一进程内的生成器、评价器、界面共享一份解析后的历史数据，
+数据文件变化（大小/修改时间/内容哈希）时自动失效
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+import pandas as pd
+
+from .history_journal import HistoryJournal, same_size, source_content_hash, source_signature
+from .memo_cache import invalidate_memo_caches, next_data_version
+
+
+def _copy_on_write_enabled() -> bool:
+    """pandas 是否启用了写时复制（pandas 3 默认启用）"""
+    try:
+        if int(pd.__version__.split('.')[0]) >= 3:
+            return True
+        return pd.get_option('mode.copy_on_write') is True
+    except Exception:
+        return False
+
+
+def _readonly(*_args, **_kwargs):
+    raise TypeError("共享的历史数据为只读，请先复制后再修改")
+
+
+class ReadOnlyList(list):
+    """只读列表（仍是 list 子类，兼容 json 序列化和比较）"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        import copy
+        return [copy.deepcopy(item, memo) for item in self]
+
+
+class ReadOnlyDict(dict):
+    """只读字典（仍是 dict 子类，兼容 json 序列化和比较）"""
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    pop = popitem = clear = update = setdefault = _readonly
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        import copy
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+
+def freeze(value: Any) -> Any:
+    """将 JSON 结构递归转换为只读结构"""
+    if isinstance(value, dict):
+        return ReadOnlyDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return ReadOnlyList(freeze(v) for v in value)
+    return value
+
+
+@dataclass
+class _CacheEntry:
+    """缓存条目"""
+    signature: Dict[str, int]
+    content_hash: Optional[str]
+    value: Any
+
+
+class HistoryCache:
+    """线程安全的进程级历史数据缓存
+
+    缓存键为 (类别, 文件绝对路径, 附加键)，版本由文件（含追加日志）大小、修改时间和内容哈希确定。
+    每次读取只做一次 stat；签名变化但内容哈希相同（例如仅 touch）时沿用缓存。
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple, _CacheEntry] = {}
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @staticmethod
+    def _normalize_path(path: Union[str, Path]) -> str:
+        return str(Path(path).resolve())
+
+    def _key_lock(self, key: Tuple) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _lookup(self, key: Tuple, signature: Dict[str, int], path: str) -> Optional[_CacheEntry]:
+        """查找仍然有效的缓存条目"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.signature == signature:
+            return entry
+        if same_size(entry.signature, signature) and entry.content_hash:
+            if source_content_hash(path) == entry.content_hash:
+                entry.signature = signature
+                return entry
+        return None
+
+    def get_or_load(self, kind: str, path: Union[str, Path], loader: Callable[[], Any],
+                    extra_key: Hashable = None) -> Any:
+        """获取缓存值，不存在或已失效时调用 loader 加载
+
+        Args:
+            kind: 缓存类别（如 'records'、'frame:ssq'）
+            path: 数据文件路径
+            loader: 加载函数，返回要缓存的对象
+            extra_key: 附加键（如构建参数）
+
+        Returns:
+            缓存的对象（调用方不得修改）
+        """
+        norm_path = self._normalize_path(path)
+        key = (kind, norm_path, extra_key)
+        signature = source_signature(norm_path)
+
+        entry = self._lookup(key, signature, norm_path)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry.value
+
+        # 同一个键只允许一个线程加载，其余线程等待后复用结果
+        with self._key_lock(key):
+            signature = source_signature(norm_path)
+            entry = self._lookup(key, signature, norm_path)
+            if entry is not None:
+                self.stats['hits'] += 1
+                return entry.value
+
+            self.stats['misses'] += 1
+            value = loader()
+            try:
+                content_hash = source_content_hash(norm_path)
+                # 加载期间文件被改写时不缓存，避免缓存与签名不一致
+                if source_signature(norm_path) != signature:
+                    return value
+            except OSError:
+                return value
+            with self._lock:
+                self._entries[key] = _CacheEntry(signature, content_hash, value)
+            return value
+
+    def get_records(self, path: Union[str, Path]) -> ReadOnlyList:
+        """获取历史数据文件中 'data' 键下的记录列表（只读，已合并追加日志）
+
+        Args:
+            path: 历史数据 JSON 文件路径
+
+        Returns:
+            只读记录列表
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 文件格式错误
+        """
+        def load():
+            try:
+                records = freeze(HistoryJournal(path).read_records())
+            except json.JSONDecodeError:
+                raise ValueError(f"历史数据文件格式错误: {path}")
+            # 每次加载分配新的数据版本，依赖这份数据的计算缓存据此失效
+            records.data_version = next_data_version()
+            return records
+
+        try:
+            return self.get_or_load('records', path, load)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"历史数据文件不存在: {path}")
+
+    def get_frame(self, kind: str, path: Union[str, Path], loader: Callable[[], pd.DataFrame],
+                  extra_key: Hashable = None) -> pd.DataFrame:
+        """获取共享的 DataFrame 视图
+
+        启用写时复制时返回浅拷贝，修改返回值不会影响缓存；
+        否则返回深拷贝以保证缓存不被修改。
+
+        Args:
+            kind: 缓存类别
+            path: 数据文件路径
+            loader: 加载函数，返回 DataFrame
+            extra_key: 附加键
+
+        Returns:
+            DataFrame 视图
+        """
+        def load():
+            return _freeze_frame(loader())
+
+        return frame_view(self.get_or_load(kind, path, load, extra_key))
+
+    def peek(self, kind: str, path: Union[str, Path], extra_key: Hashable = None) -> Any:
+        """获取仍然有效的缓存值，不触发加载
+
+        Args:
+            kind: 缓存类别
+            path: 数据文件路径
+            extra_key: 附加键
+
+        Returns:
+            缓存的对象，不存在或已失效时返回 None
+        """
+        norm_path = self._normalize_path(path)
+        try:
+            signature = source_signature(norm_path)
+        except OSError:
+            return None
+        entry = self._lookup((kind, norm_path, extra_key), signature, norm_path)
+        if entry is None:
+            return None
+        self.stats['hits'] += 1
+        return entry.value
+
+    def peek_frame(self, kind: str, path: Union[str, Path], extra_key: Hashable = None) -> Optional[pd.DataFrame]:
+        """获取仍然有效的 DataFrame 缓存视图，不触发加载"""
+        df = self.peek(kind, path, extra_key)
+        return None if df is None else frame_view(df)
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> None:
+        """使缓存失效（依赖该文件的计算缓存同时失效）
+
+        Args:
+            path: 数据文件路径，None 表示清空全部缓存
+        """
+        invalidate_memo_caches(path)
+        with self._lock:
+            if path is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                norm_path = self._normalize_path(path)
+                keys = [key for key in self._entries if key[1] == norm_path]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self.stats['invalidations'] += removed
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        self.invalidate()
+        with self._lock:
+            self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """将 DataFrame 中的号码列表替换为只读列表"""
+    if df is None or df.empty:
+        return df
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object and len(series) and isinstance(series.iloc[0], list):
+            df[col] = pd.Series([ReadOnlyList(v) if isinstance(v, list) else v for v in series],
+                                index=df.index, dtype=object)
+    return df
+
+
+def frame_view(df: pd.DataFrame) -> pd.DataFrame:
+    """返回共享 DataFrame 的安全视图"""
+    if df is None:
+        return df
+    if _copy_on_write_enabled():
+        return df.copy(deep=False)
+    return df.copy()
+
+
+# 全局缓存实例
+_history_cache = None
+_history_cache_lock = threading.Lock()
+
+
+def get_history_cache() -> HistoryCache:
+    """获取全局历史数据缓存实例"""
+    global _history_cache
+    if _history_cache is None:
+        with _history_cache_lock:
+            if _history_cache is None:
+                _history_cache = HistoryCache()
+    return _history_cache
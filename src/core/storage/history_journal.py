@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+历史数据追加日志
+新开奖记录追加写入 <name>.journal.jsonl，读取时与基础 JSON 文件透明合并，
+按需或达到阈值时压缩回基础文件；所有整文件写入均为原子替换
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+import numpy as np
+
+JOURNAL_SUFFIX = '.journal.jsonl'
+KEYS_SUFFIX = '.keys.json'
+
+logger = logging.getLogger(__name__)
+
+# 同一日志文件的写入/压缩互斥
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    key = str(Path(path).resolve())
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.Lock()
+        return lock
+
+
+def journal_path_for(path: Union[str, Path]) -> Path:
+    """获取基础数据文件对应的追加日志路径"""
+    path = Path(path)
+    return path.with_name(path.stem + JOURNAL_SUFFIX)
+
+
+def file_signature(path: Union[str, Path]) -> Dict[str, int]:
+    """获取文件快速签名（大小 + 修改时间）"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_content_hash(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """计算文件内容哈希（blake2b）"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_signature(path: Union[str, Path]) -> Dict[str, int]:
+    """获取历史数据源签名（基础文件 + 追加日志）"""
+    signature = file_signature(path)
+    journal = journal_path_for(path)
+    if journal.exists():
+        journal_sig = file_signature(journal)
+        signature['journal_size'] = journal_sig['size']
+        signature['journal_mtime_ns'] = journal_sig['mtime_ns']
+    return signature
+
+
+def source_content_hash(path: Union[str, Path]) -> str:
+    """计算历史数据源内容哈希（基础文件 + 追加日志）"""
+    content_hash = file_content_hash(path)
+    journal = journal_path_for(path)
+    if journal.exists():
+        content_hash += ':' + file_content_hash(journal)
+    return content_hash
+
+
+def record_digests(records: List[Dict]) -> np.ndarray:
+    """计算每条原始记录的 64 位内容摘要（键排序后的 JSON）
+
+    Args:
+        records: 原始记录列表
+
+    Returns:
+        uint64 数组
+    """
+    digests = np.empty(len(records), dtype=np.uint64)
+    for i, record in enumerate(records):
+        payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        digests[i] = int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'little')
+    return digests
+
+
+def same_size(a: Dict[str, int], b: Dict[str, int]) -> bool:
+    """比较两个数据源签名的文件大小部分是否一致"""
+    return a.get('size') == b.get('size') and a.get('journal_size') == b.get('journal_size')
+
+
+def sort_records(records: List[Dict]) -> List[Dict]:
+    """按期号降序排序（期号无法转为整数时按字符串排序）"""
+    try:
+        return sorted(records, key=lambda x: int(x['draw_num']), reverse=True)
+    except (ValueError, TypeError, KeyError):
+        logger.warning("部分期号无法转换为整数进行排序，将按字符串排序。")
+        return sorted(records, key=lambda x: str(x.get('draw_num', '0')), reverse=True)
+
+
+def _fsync_dir(path: Path) -> None:
+    """同步目录项（部分平台不支持，忽略错误）"""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path: Union[str, Path], obj: Any, indent: int = 2) -> None:
+    """原子写入 JSON 文件（临时文件 + fsync + 替换），中途崩溃不会破坏原文件
+
+    Args:
+        path: 目标文件路径
+        obj: 要写入的对象
+        indent: 缩进
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    _fsync_dir(path.parent)
+
+
+class HistoryJournal:
+    """历史数据追加日志
+
+    日志每行一个 JSON 对象: {"fetch_time": ..., "record": {...}}。
+    合并规则与原 update_data 一致：同一期号以先出现者为准（基础文件优先）。
+    追加写入中途崩溃只会留下不完整的最后一行，读取时忽略，下次追加前截断。
+    基础文件中的唯一键保存在 <name>.keys.json（按基础文件签名校验），
+    判断新记录是否已存在时不需要解析基础文件。
+    """
+
+    def __init__(self, base_path: Union[str, Path], key: str = 'draw_num'):
+        """初始化追加日志
+
+        Args:
+            base_path: 基础 JSON 文件路径
+            key: 记录唯一键
+        """
+        self.base_path = Path(base_path)
+        self.journal_path = journal_path_for(self.base_path)
+        self.keys_path = self.base_path.with_name(self.base_path.stem + KEYS_SUFFIX)
+        self.key = key
+        # 日志中的记录数（读取日志或追加后更新，None 表示未知）
+        self._pending: Optional[int] = None
+
+    # ==================== 读取 ====================
+
+    def read_journal(self) -> List[Dict]:
+        """读取日志中的完整行
+
+        Returns:
+            日志条目列表，每项包含 fetch_time 和 record
+        """
+        if not self.journal_path.exists():
+            self._pending = 0
+            return []
+        entries = []
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # 不完整的最后一行（写入中途崩溃）
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    logger.warning(f"跳过损坏的日志行: {self.journal_path}")
+                    continue
+                if isinstance(entry, dict) and isinstance(entry.get('record'), dict):
+                    entries.append(entry)
+        self._pending = len(entries)
+        return entries
+
+    def pending_count(self) -> int:
+        """日志中待压缩的记录数（读取过日志后按追加的记录数累加，不再重新读取）"""
+        if self._pending is None:
+            self.read_journal()
+        return self._pending
+
+    def known_keys(self) -> Set[Any]:
+        """基础文件和日志中全部记录的唯一键
+
+        基础文件的键从 keys.json 读取（基础文件变化后重新解析一次并保存），
+        只需读取日志本身（不超过压缩阈值的行数）。
+
+        Raises:
+            json.JSONDecodeError: 基础文件格式错误
+        """
+        keys = set(self._base_keys())
+        keys.update(entry['record'].get(self.key) for entry in self.read_journal())
+        return keys
+
+    def _base_keys(self) -> List[Any]:
+        """基础文件中记录的唯一键"""
+        if not self.base_path.exists():
+            return []
+        signature = file_signature(self.base_path)
+        try:
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('signature') == signature:
+                return saved['keys']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        with open(self.base_path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        records = raw if isinstance(raw, list) else raw.get('data', [])
+        keys = [item.get(self.key) for item in records]
+        self._save_base_keys(signature, keys)
+        return keys
+
+    def _save_base_keys(self, signature: Dict[str, int], keys: List[Any]) -> None:
+        try:
+            write_json_atomic(self.keys_path, {'signature': signature, 'keys': keys}, indent=None)
+        except OSError as e:
+            logger.warning(f"保存历史数据期号索引失败: {self.keys_path}: {e}")
+
+    def remember_base(self, records: List[Dict]) -> None:
+        """基础文件整体写入后保存其中记录的唯一键"""
+        self._save_base_keys(file_signature(self.base_path), [item.get(self.key) for item in records])
+
+    def read_raw(self) -> Dict:
+        """读取合并后的历史数据
+
+        日志为空时原样返回基础文件内容；否则合并后按期号降序排序。
+
+        Returns:
+            {'fetch_time': ..., 'total_periods': ..., 'data': [...]}
+
+        Raises:
+            FileNotFoundError: 基础文件和日志都不存在
+            json.JSONDecodeError: 基础文件格式错误
+        """
+        entries = self.read_journal()
+        if self.base_path.exists():
+            with open(self.base_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            if isinstance(raw, list):
+                raw = {'data': raw}
+        elif entries:
+            raw = {'data': []}
+        else:
+            raise FileNotFoundError(str(self.base_path))
+
+        if not entries:
+            return raw
+
+        merged = self._merge(raw.get('data', []), (entry['record'] for entry in entries))
+        result = dict(raw)
+        result['fetch_time'] = entries[-1].get('fetch_time', raw.get('fetch_time'))
+        result['total_periods'] = len(merged)
+        result['data'] = sort_records(merged)
+        return result
+
+    def read_records(self) -> List[Dict]:
+        """读取合并后的记录列表"""
+        return self.read_raw().get('data', [])
+
+    def _merge(self, base: Iterable[Dict], extra: Iterable[Dict]) -> List[Dict]:
+        combined = {}
+        for item in base:
+            combined.setdefault(item.get(self.key), item)
+        for item in extra:
+            combined.setdefault(item.get(self.key), item)
+        return list(combined.values())
+
+    # ==================== 写入 ====================
+
+    def append(self, records: List[Dict], fetch_time: str = None) -> int:
+        """追加新记录（只写入新增部分，不改写基础文件）
+
+        Args:
+            records: 新记录列表
+            fetch_time: 获取时间
+
+        Returns:
+            追加的记录数
+        """
+        if not records:
+            return 0
+        fetch_time = fetch_time or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        payload = b''.join(
+            json.dumps({'fetch_time': fetch_time, 'record': record}, ensure_ascii=False).encode('utf-8') + b'\n'
+            for record in records
+        )
+        with _lock_for(self.journal_path):
+            self._repair_tail()
+            with open(self.journal_path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        if self._pending is not None:
+            self._pending += len(records)
+        return len(records)
+
+    def _repair_tail(self) -> None:
+        """截断不完整的最后一行"""
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # 向前查找最后一个换行符
+            pos = size - 1
+            block = 4096
+            while pos > 0:
+                start = max(0, pos - block)
+                f.seek(start)
+                chunk = f.read(pos - start)
+                idx = chunk.rfind(b'\n')
+                if idx >= 0:
+                    pos = start + idx + 1
+                    break
+                pos = start
+            f.truncate(pos)
+            logger.warning(f"已截断不完整的日志行: {self.journal_path}")
+
+    def compact(self) -> bool:
+        """将日志压缩回基础文件
+
+        先原子替换基础文件再删除日志；两步之间崩溃只会留下重复记录，读取时自动去重。
+
+        Returns:
+            是否执行了压缩
+        """
+        with _lock_for(self.journal_path):
+            if not self.journal_path.exists():
+                return False
+            raw = self.read_raw()
+            output = {
+                'fetch_time': raw.get('fetch_time') or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'total_periods': len(raw.get('data', [])),
+                'data': raw.get('data', [])
+            }
+            write_json_atomic(self.base_path, output)
+            self.remember_base(output['data'])
+            self.journal_path.unlink()
+            _fsync_dir(self.journal_path.parent)
+            self._pending = 0
+        logger.info(f"历史数据日志已压缩: {self.base_path}，共 {output['total_periods']} 条记录")
+        return True
+
+    def discard(self) -> None:
+        """删除日志（基础文件已包含全部记录时调用）"""
+        with _lock_for(self.journal_path):
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._pending = 0
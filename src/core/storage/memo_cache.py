@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+计算结果缓存
+评价器、分析器、生成器共用的有界缓存：条目数上限（近似 LRU 淘汰）、键中包含历史数据版本、
+读操作不加锁、命中/未命中统计，以及开奖数据更新时的显式失效
+"""
+
+import hashlib
+import itertools
+import pickle
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+# 缓存条目数默认上限
+DEFAULT_MAX_ENTRIES = 256
+
+_versions = itertools.count(1)
+_CURRENT = object()
+_registry: 'weakref.WeakSet[MemoCache]' = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def next_data_version() -> int:
+    """分配新的进程内数据版本号"""
+    return next(_versions)
+
+
+def content_digest(data: Any) -> Optional[str]:
+    """数据内容的摘要（进程内使用；内容相同的数据摘要相同）
+
+    Args:
+        data: 可被 pickle 序列化的数据（如记录列表、DataFrame）
+
+    Returns:
+        十六进制摘要；数据无法序列化时为 None
+    """
+    try:
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+        return None
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def data_version(data: Any) -> Hashable:
+    """历史数据的版本
+
+    进程级历史缓存加载的记录带有版本号（同一次加载的数据版本相同）；
+    其他数据（如 DataFrame、普通列表）以内容摘要作为版本，内容变化（包括原地修改）后版本随之变化。
+    无法计算摘要的数据每次返回新的版本，不会命中缓存。
+
+    Args:
+        data: 历史数据（最新在前）
+
+    Returns:
+        可哈希的版本标识
+    """
+    version = getattr(data, 'data_version', None)
+    if version is not None:
+        return version
+    if data is None:
+        return None
+    digest = content_digest(data)
+    if digest is None:
+        return ('uncached', next_data_version())
+    return ('content', digest)
+
+
+def _normalize_source(source: Optional[Union[str, Path]]) -> Optional[str]:
+    return None if source is None else str(Path(source).resolve())
+
+
+def invalidate_memo_caches(source: Optional[Union[str, Path]] = None) -> int:
+    """使依赖指定数据文件的计算缓存失效（有新的开奖数据时调用）
+
+    Args:
+        source: 数据文件路径，None 表示全部缓存
+
+    Returns:
+        失效的缓存个数
+    """
+    norm_source = _normalize_source(source)
+    with _registry_lock:
+        caches = list(_registry)
+    count = 0
+    for cache in caches:
+        if norm_source is None or cache.source == norm_source:
+            cache.invalidate()
+            count += 1
+    return count
+
+
+class _Entry:
+    """缓存条目（referenced 为最近是否被读取，淘汰时给予一次保留机会）"""
+
+    __slots__ = ('value', 'referenced')
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.referenced = False
+
+
+class MemoCache:
+    """线程安全的有界计算结果缓存
+
+    实际键为 (数据版本, 键)，数据版本变化后旧条目不再命中并被清除；
+    在旧版本下开始的计算即使晚于版本切换写入，也不会被新版本读到。
+    读操作不加锁（只做一次字典查找并标记访问），写入和淘汰在锁内进行。
+    超出上限时按插入顺序淘汰，最近被读取过的条目获得一次保留机会（近似 LRU）。
+    命中统计不加锁，并发时为近似值。
+    """
+
+    def __init__(self, name: str = '', max_entries: int = DEFAULT_MAX_ENTRIES,
+                 source: Optional[Union[str, Path]] = None):
+        """初始化缓存
+
+        Args:
+            name: 缓存名称（用于统计信息）
+            max_entries: 条目数上限（0 或负数表示不缓存）
+            source: 依赖的数据文件路径；invalidate_memo_caches(source) 时失效
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.source = _normalize_source(source)
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        self._version: Hashable = None
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        with _registry_lock:
+            _registry.add(self)
+
+    @property
+    def version(self) -> Hashable:
+        """当前数据版本"""
+        return self._version
+
+    def set_version(self, version: Hashable) -> bool:
+        """切换数据版本
+
+        Args:
+            version: 新的数据版本
+
+        Returns:
+            版本是否发生变化（变化时清除旧条目）
+        """
+        if version == self._version:
+            return False
+        with self._lock:
+            self._version = version
+            self._drop_entries()
+        return True
+
+    def invalidate(self) -> None:
+        """使全部条目失效（切换到新的内部版本，正在进行的旧版本计算结果不会被读到）"""
+        with self._lock:
+            self._version = ('invalidated', next_data_version())
+            self._drop_entries()
+
+    def clear(self) -> None:
+        """清空条目（保留当前版本）"""
+        with self._lock:
+            self._drop_entries()
+
+    def _drop_entries(self) -> None:
+        if self._entries:
+            self.stats['invalidations'] += len(self._entries)
+            self._entries = {}
+
+    def _lookup(self, key: Hashable, version: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get((version, key))
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        entry.referenced = True
+        self.stats['hits'] += 1
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取当前版本下的缓存值
+
+        Args:
+            key: 键
+            default: 不存在时的返回值
+        """
+        entry = self._lookup(key, self._version)
+        return default if entry is None else entry.value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return (self._version, key) in self._entries
+
+    def __getitem__(self, key: Hashable) -> Any:
+        entry = self._lookup(key, self._version)
+        if entry is None:
+            raise KeyError(key)
+        return entry.value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.put(key, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: Hashable, value: Any, version: Hashable = _CURRENT) -> None:
+        """写入缓存值
+
+        Args:
+            key: 键
+            value: 值
+            version: 计算该值时的数据版本（默认为当前版本）；已过期的版本不写入
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if version is _CURRENT:
+                version = self._version
+            elif version != self._version:
+                return
+            entries = self._entries
+            entries[(version, key)] = _Entry(value)
+            while len(entries) > self.max_entries:
+                oldest = next(iter(entries))
+                entry = entries.pop(oldest)
+                if entry.referenced:
+                    # 最近读取过：清除标记后移到队尾
+                    entry.referenced = False
+                    entries[oldest] = entry
+                    continue
+                self.stats['evictions'] += 1
+
+    def get_or_compute(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """读取缓存值，不存在时计算并写入
+
+        计算在锁外进行，多个线程可能同时计算同一个键，结果以最后写入的为准。
+
+        Args:
+            key: 键
+            factory: 计算函数
+
+        Returns:
+            缓存值
+        """
+        version = self._version
+        entry = self._lookup(key, version)
+        if entry is not None:
+            return entry.value
+        value = factory()
+        self.put(key, value, version)
+        return value
+
+    def info(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        return dict(self.stats, name=self.name, size=len(self._entries),
+                    max_entries=self.max_entries, version=self._version)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+号码出现次数前缀和表
+按时间顺序累计每个号码的出现次数和最近出现位置，任意连续期数窗口的频率、
+任意历史时点的遗漏值都只需 O(号码个数) 的查询，不再逐期扫描历史
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .history_cache import get_history_cache
+from .memo_cache import MemoCache, data_version
+from .overlap_index import as_number_list
+
+# 各彩票类型的号码区: 区名 -> (号码字段, 最大号码)
+ZONE_FIELDS: Dict[str, Dict[str, Tuple[str, int]]] = {
+    'ssq': {'red': ('red_numbers', 33), 'blue': ('blue_number', 16)},
+    'dlt': {'front': ('front_numbers', 35), 'back': ('back_numbers', 12)},
+}
+
+
+class OccurrenceTable:
+    """单个号码区的出现次数前缀和表
+
+    内部按时间顺序（最早在前）保存，第 t 行为最早 t 期的累计值；对外的期位置与
+    历史记录列表一致（0 为最新一期），offset 表示跳过最新的若干期（回测时的"截至"时点）。
+    返回数组的下标即号码（下标 0 不使用）。
+    """
+
+    def __init__(self, max_number: int):
+        """初始化空表
+
+        Args:
+            max_number: 最大号码（号码取值 1..max_number，其他值不计入）
+        """
+        self.max_number = max_number
+        self._cumulative = np.zeros((64, max_number + 1), dtype=np.int32)
+        self._last_seen = np.full((64, max_number + 1), -1, dtype=np.int32)
+        self._size = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_draws(cls, draws: Iterable[Any], max_number: int, newest_first: bool = True) -> 'OccurrenceTable':
+        """由各期号码构建
+
+        Args:
+            draws: 各期号码（列表、逗号分隔的字符串或单个号码）
+            max_number: 最大号码
+            newest_first: draws 是否最新在前
+        """
+        table = cls(max_number)
+        draws = list(draws)
+        table.extend(draws[::-1] if newest_first else draws)
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _valid(self, number: Any) -> bool:
+        try:
+            return int(number) == number and 1 <= number <= self.max_number
+        except (TypeError, ValueError):
+            return False
+
+    def _reserve(self, count: int) -> None:
+        needed = self._size + count + 1
+        if needed <= len(self._cumulative):
+            return
+        capacity = max(needed, 2 * len(self._cumulative))
+        for name in ('_cumulative', '_last_seen'):
+            old = getattr(self, name)
+            new = np.empty((capacity, old.shape[1]), dtype=old.dtype)
+            new[:self._size + 1] = old[:self._size + 1]
+            setattr(self, name, new)
+
+    def append(self, numbers: Any) -> None:
+        """追加最新一期"""
+        self.extend([numbers])
+
+    def extend(self, draws: Iterable[Any]) -> None:
+        """按时间顺序（最早在前）追加多期"""
+        rows, numbers = [], []
+        count = 0
+        for row, draw in enumerate(draws):
+            count += 1
+            for number in as_number_list(draw):
+                if self._valid(number):
+                    rows.append(row)
+                    numbers.append(int(number))
+        if not count:
+            return
+
+        occurrences = np.zeros((count, self.max_number + 1), dtype=np.int32)
+        np.add.at(occurrences, (np.array(rows, dtype=np.int64), np.array(numbers, dtype=np.int64)), 1)
+        with self._lock:
+            self._reserve(count)
+            start = self._size
+            self._cumulative[start + 1:start + count + 1] = self._cumulative[start] + np.cumsum(occurrences, axis=0)
+            seen = np.where(occurrences > 0, np.arange(start, start + count, dtype=np.int32)[:, None], -1)
+            self._last_seen[start + 1:start + count + 1] = np.maximum(
+                np.maximum.accumulate(seen, axis=0), self._last_seen[start])
+            self._size += count
+
+    def _snapshot(self, periods: Optional[int], offset: int) -> Tuple[np.ndarray, np.ndarray, int, int]:
+        """(累计表, 最近出现表, 窗口起点, 窗口终点)，窗口为按时间顺序的 [起点, 终点)"""
+        with self._lock:
+            cumulative, last_seen, size = self._cumulative, self._last_seen, self._size
+        stop = size - max(0, min(offset, size))
+        start = 0 if periods is None else stop - max(0, min(periods, stop))
+        return cumulative, last_seen, start, stop
+
+    def frequency(self, periods: Optional[int] = None, offset: int = 0) -> np.ndarray:
+        """从第 offset 期（0 为最新）起往前 periods 期内各号码的出现次数
+
+        Args:
+            periods: 统计期数（None 表示到最早一期）
+            offset: 跳过最新的期数
+
+        Returns:
+            出现次数数组，下标为号码
+        """
+        cumulative, _, start, stop = self._snapshot(periods, offset)
+        return (cumulative[stop] - cumulative[start]).astype(np.int64)
+
+    def missing(self, offset: int = 0, default: int = -1) -> np.ndarray:
+        """截至第 offset 期（不含更新的期）各号码的遗漏期数
+
+        Args:
+            offset: 跳过最新的期数
+            default: 从未出现的号码的遗漏值
+
+        Returns:
+            遗漏期数数组，下标为号码
+        """
+        _, last_seen, _, stop = self._snapshot(None, offset)
+        last = last_seen[stop].astype(np.int64)
+        return np.where(last >= 0, stop - 1 - last, default)
+
+    def occurrences(self, periods: Optional[int] = None, offset: int = 0) -> np.ndarray:
+        """从第 offset 期起往前 periods 期各期各号码的出现次数矩阵（最新一期在前）"""
+        cumulative, _, start, stop = self._snapshot(periods, offset)
+        return np.diff(cumulative[start:stop + 1], axis=0)[::-1].astype(np.int64)
+
+
+def _zone_draws(records: Any, field: str) -> List[Any]:
+    """各期某一号码字段的取值（支持记录列表和 DataFrame）"""
+    if hasattr(records, 'columns'):
+        return records[field].tolist() if field in records.columns else [None] * len(records)
+    return [record.get(field) for record in records]
+
+
+def occurrence_tables(lottery_type: str, records: Any, newest_first: bool = True) -> Dict[str, OccurrenceTable]:
+    """按号码区构建历史出现次数表
+
+    Args:
+        lottery_type: 彩票类型 ('ssq' 或 'dlt')
+        records: 历史记录列表或 DataFrame
+        newest_first: records 是否最新在前
+
+    Returns:
+        区名到出现次数表的字典，如 {'red': ..., 'blue': ...}
+    """
+    if lottery_type not in ZONE_FIELDS:
+        raise ValueError(f"不支持的彩票类型: {lottery_type}")
+    return {zone: OccurrenceTable.from_draws(_zone_draws(records, field), max_number, newest_first)
+            for zone, (field, max_number) in ZONE_FIELDS[lottery_type].items()}
+
+
+# 按历史数据版本缓存的出现次数表（分析器、生成器共用）
+_history_tables = MemoCache('occurrence_tables', 32)
+
+
+def history_occurrence_tables(lottery_type: str, history_data: Any,
+                              newest_first: bool = True) -> Dict[str, OccurrenceTable]:
+    """获取历史数据的出现次数表（进程级共享，按数据版本缓存）
+
+    同一份历史数据（及其任意前缀窗口）的频率、遗漏查询共用一份表。进程级历史缓存的记录按其
+    版本号区分，其他数据（如 DataFrame）按号码字段内容的摘要区分。
+
+    Args:
+        lottery_type: 彩票类型
+        history_data: 历史记录列表或 DataFrame
+        newest_first: history_data 是否最新在前
+
+    Returns:
+        区名到出现次数表的字典（调用方不得追加）
+    """
+    if lottery_type not in ZONE_FIELDS:
+        raise ValueError(f"不支持的彩票类型: {lottery_type}")
+    version = getattr(history_data, 'data_version', None)
+    draws = None
+    if version is None:
+        draws = {zone: _zone_draws(history_data, field) for zone, (field, _) in ZONE_FIELDS[lottery_type].items()}
+        version = data_version(draws)
+
+    def build() -> Dict[str, OccurrenceTable]:
+        if draws is None:
+            return occurrence_tables(lottery_type, history_data, newest_first)
+        return {zone: OccurrenceTable.from_draws(draws[zone], max_number, newest_first)
+                for zone, (_, max_number) in ZONE_FIELDS[lottery_type].items()}
+
+    return _history_tables.get_or_compute((lottery_type, newest_first, version), build)
+
+
+def get_occurrence_tables(lottery_type: str, history_file: Union[str, Path]) -> Dict[str, OccurrenceTable]:
+    """获取历史数据文件的出现次数表（进程级共享，文件变化后自动重建）
+
+    Args:
+        lottery_type: 彩票类型
+        history_file: 历史数据 JSON 文件路径
+
+    Returns:
+        区名到出现次数表的字典（调用方不得追加）
+    """
+    history_cache = get_history_cache()
+    return history_cache.get_or_load(
+        f'occurrence:{lottery_type}', history_file,
+        lambda: occurrence_tables(lottery_type, history_cache.get_records(history_file)))
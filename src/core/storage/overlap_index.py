@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+历史号码位图索引
+每期主区（红球/前区）和副区（蓝球/后区）号码各存为一个 uint64 位图（第 n 位表示号码 n），
+一注号码与历史各期的重合数即两个位图按位与后的置位数，可对单注或批量号码一次算出
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 各彩票类型的号码字段: (主区, 副区)
+NUMBER_FIELDS: Dict[str, Tuple[str, str]] = {
+    'ssq': ('red_numbers', 'blue_number'),
+    'dlt': ('front_numbers', 'back_numbers'),
+}
+
+# 位图可表示的最大号码
+MAX_NUMBER = 63
+
+# 批量查询时每块的最大 (注数 x 期数)
+_BLOCK_ELEMENTS = 1 << 22
+
+_ONE = np.uint64(1)
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """按元素统计整数数组中置位的个数"""
+    values = np.ascontiguousarray(values)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    as_bytes = values.view(np.uint8).reshape(values.shape + (values.dtype.itemsize,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def as_number_list(numbers: Any) -> List:
+    """号码字段转为列表（支持列表、逗号分隔的字符串和单个号码）"""
+    if numbers is None:
+        return []
+    if isinstance(numbers, str):
+        return [int(x) for x in numbers.split(',') if x.strip()]
+    if isinstance(numbers, (list, tuple, np.ndarray)):
+        return list(numbers)
+    return [numbers]
+
+
+def _parse_mask(numbers: Any) -> Tuple[int, int, int]:
+    """解析号码位图，返回 (位图, 号码个数, 无法表示的号码个数)"""
+    mask = 0
+    values = as_number_list(numbers)
+    invalid = 0
+    for number in values:
+        try:
+            value = int(number)
+            valid = value == number and 0 <= value <= MAX_NUMBER
+        except (TypeError, ValueError):
+            valid = False
+        if valid:
+            mask |= 1 << value
+        else:
+            invalid += 1
+    return mask, len(values), invalid
+
+
+def numbers_mask(numbers: Any) -> Tuple[int, bool]:
+    """号码位图
+
+    Args:
+        numbers: 号码列表（或逗号分隔的字符串、单个号码）
+
+    Returns:
+        (位图, 是否规整)；不规整指含重复号码或无法用位图表示的号码（后者不计入位图）
+    """
+    mask, count, invalid = _parse_mask(numbers)
+    return mask, invalid == 0 and bin(mask).count('1') == count
+
+
+def masks_of(numbers: np.ndarray) -> np.ndarray:
+    """批量计算号码位图（每行一注，一维数组视为每注一个号码）
+
+    Raises:
+        ValueError: 号码超出位图可表示的范围
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if numbers.ndim == 1:
+        numbers = numbers[:, None]
+    if numbers.size and (numbers.min() < 0 or numbers.max() > MAX_NUMBER):
+        raise ValueError(f"号码超出位图可表示的范围 0..{MAX_NUMBER}")
+    masks = np.zeros(len(numbers), dtype=np.uint64)
+    for column in range(numbers.shape[1]):
+        masks |= np.left_shift(_ONE, numbers[:, column].astype(np.uint64))
+    return masks
+
+
+def _ticket_mask(numbers: Any) -> np.uint64:
+    """单注号码的位图（重复号码按集合处理）"""
+    mask, _, invalid = _parse_mask(numbers)
+    if invalid:
+        raise ValueError(f"号码超出位图可表示的范围 0..{MAX_NUMBER}: {numbers}")
+    return np.uint64(mask)
+
+
+class OverlapIndex:
+    """历史号码位图索引
+
+    内部按时间顺序（最早在前）保存，对外的期位置与历史记录列表一致（0 为最新一期）。
+    追加新一期只需写入两个位图；periods 参数表示只统计最近若干期。
+    """
+
+    def __init__(self, main_field: str = 'red_numbers', extra_field: Optional[str] = 'blue_number',
+                 label_field: str = 'draw_num'):
+        """初始化索引
+
+        Args:
+            main_field: 主区号码字段
+            extra_field: 副区号码字段（None 表示只索引主区）
+            label_field: 期号字段
+        """
+        self.main_field = main_field
+        self.extra_field = extra_field
+        self.label_field = label_field
+        self._main = np.zeros(64, dtype=np.uint64)
+        self._extra = np.zeros(64, dtype=np.uint64)
+        self._regular = np.zeros(64, dtype=bool)
+        self._labels: List[Any] = []
+        self._size = 0
+        self._source = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_lottery(cls, lottery_type: str, records: Optional[Sequence[Dict]] = None) -> 'OverlapIndex':
+        """按彩票类型创建索引
+
+        Args:
+            lottery_type: 彩票类型 ('ssq' 或 'dlt')
+            records: 历史记录（最新在前），None 表示创建空索引
+        """
+        if lottery_type not in NUMBER_FIELDS:
+            raise ValueError(f"不支持的彩票类型: {lottery_type}")
+        index = cls(*NUMBER_FIELDS[lottery_type])
+        if records is not None:
+            index.sync(records)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, count: int) -> None:
+        needed = self._size + count
+        if needed <= len(self._main):
+            return
+        capacity = max(needed, 2 * len(self._main))
+        for name in ('_main', '_extra', '_regular'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _record_masks(self, record: Dict) -> Tuple[int, int, bool]:
+        main, main_regular = numbers_mask(record.get(self.main_field))
+        if self.extra_field is None:
+            return main, 0, main_regular
+        extra, extra_regular = numbers_mask(record.get(self.extra_field))
+        return main, extra, main_regular and extra_regular
+
+    def append(self, record: Dict) -> None:
+        """追加最新一期"""
+        self.extend([record])
+
+    def extend(self, records: Iterable[Dict]) -> None:
+        """按时间顺序（最早在前）追加多期"""
+        records = list(records)
+        with self._lock:
+            self._reserve(len(records))
+            for record in records:
+                main, extra, regular = self._record_masks(record)
+                self._main[self._size] = main
+                self._extra[self._size] = extra
+                self._regular[self._size] = regular
+                self._labels.append(record.get(self.label_field))
+                self._size += 1
+            self._source = None
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock:
+            self._size = 0
+            self._labels = []
+            self._source = None
+
+    def _same_draw(self, record: Dict, position: int) -> bool:
+        main, extra, regular = self._record_masks(record)
+        return (self._labels[position] == record.get(self.label_field) and self._main[position] == main
+                and self._extra[position] == extra and self._regular[position] == regular)
+
+    def sync(self, records: Sequence[Dict]) -> int:
+        """与历史记录列表（最新在前）同步
+
+        同一个列表对象直接复用；记录变多且原有最早、最新两期位置不变时视为追加了新的期，
+        只写入新增各期；其他情况重建索引。
+
+        Returns:
+            写入的期数
+        """
+        with self._lock:
+            if records is self._source:
+                return 0
+            total = len(records)
+            size = self._size
+            if 0 < size < total and self._same_draw(records[-1], 0) and \
+                    self._same_draw(records[total - size], size - 1):
+                added = total - size
+                self.extend(records[added - 1::-1])
+            else:
+                self.clear()
+                added = total
+                self.extend(records[::-1])
+            self._source = records
+            return added
+
+    def _view(self, periods: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """最近 periods 期的位图（最新在前）"""
+        with self._lock:
+            size = self._size
+            main, extra, regular = self._main, self._extra, self._regular
+        count = size if periods is None else max(0, min(periods, size))
+        start = size - count
+        return main[start:size][::-1], extra[start:size][::-1], regular[start:size][::-1]
+
+    def labels(self, positions: Iterable[int]) -> List[Any]:
+        """期位置（0 为最新）对应的期号"""
+        return [self._labels[self._size - 1 - int(position)] for position in positions]
+
+    def label(self, position: Optional[int]) -> Any:
+        """单个期位置对应的期号（None 返回 None）"""
+        return None if position is None else self.labels([position])[0]
+
+    def overlap_counts(self, main: Iterable, periods: Optional[int] = None) -> np.ndarray:
+        """单注主区号码与各期（最新在前）的重合数"""
+        masks, _, _ = self._view(periods)
+        return popcount(masks & _ticket_mask(main))
+
+    def extra_overlap_counts(self, extra: Iterable, periods: Optional[int] = None) -> np.ndarray:
+        """单注副区号码与各期（最新在前）的重合数"""
+        _, masks, _ = self._view(periods)
+        return popcount(masks & _ticket_mask(extra))
+
+    def extra_equal(self, extra: Iterable, periods: Optional[int] = None) -> np.ndarray:
+        """各期（最新在前）副区号码集合是否与给定号码相同"""
+        _, masks, _ = self._view(periods)
+        return masks == _ticket_mask(extra)
+
+    def exact_position(self, main: Iterable, extra: Optional[Iterable] = None,
+                       periods: Optional[int] = None) -> Optional[int]:
+        """与单注号码完全相同（主区、副区集合都相同）的最新一期位置，没有时返回 None"""
+        mains, extras, regular = self._view(periods)
+        matched = regular & (mains == _ticket_mask(main))
+        if extra is not None:
+            matched &= extras == _ticket_mask(extra)
+        hits = np.flatnonzero(matched)
+        return int(hits[0]) if len(hits) else None
+
+    def histogram(self, main: Iterable, periods: Optional[int] = None) -> np.ndarray:
+        """单注主区号码与各期重合数的分布（下标为重合数）"""
+        main = as_number_list(main)
+        return np.bincount(self.overlap_counts(main, periods), minlength=len(main) + 1)
+
+    def overlap_matrix(self, mains: np.ndarray, periods: Optional[int] = None) -> np.ndarray:
+        """批量计算主区号码与各期（最新在前）的重合数
+
+        Args:
+            mains: 主区号码数组，形状 (N, k)
+            periods: 只统计最近若干期
+
+        Returns:
+            重合数矩阵，形状 (N, 期数)
+        """
+        masks, _, _ = self._view(periods)
+        return popcount(masks_of(mains)[:, None] & masks[None, :])
+
+    def max_overlap(self, mains: np.ndarray, periods: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """批量计算主区最大重合数
+
+        Args:
+            mains: 主区号码数组，形状 (N, k)
+            periods: 只统计最近若干期
+
+        Returns:
+            (最大重合数, 取得最大值的最新一期位置)；没有历史数据时位置为 -1
+        """
+        tickets = masks_of(mains)
+        masks, _, _ = self._view(periods)
+        best = np.zeros(len(tickets), dtype=np.int64)
+        position = np.full(len(tickets), -1, dtype=np.int64)
+        if not len(masks):
+            return best, position
+        block = max(1, _BLOCK_ELEMENTS // len(masks))
+        for start in range(0, len(tickets), block):
+            counts = popcount(tickets[start:start + block, None] & masks[None, :])
+            position[start:start + block] = counts.argmax(axis=1)
+            best[start:start + block] = counts.max(axis=1)
+        return best, position
+
+    def exact_positions(self, mains: np.ndarray, extras: Optional[np.ndarray] = None,
+                        periods: Optional[int] = None) -> np.ndarray:
+        """批量查找完全相同（主区、副区集合都相同）的最新一期位置（没有时为 -1）"""
+        main_masks, extra_masks, regular = self._view(periods)
+        if extras is None:
+            extra_masks = np.zeros(len(main_masks), dtype=np.uint64)
+        # 按从早到晚的顺序建表，同一号码保留最新一期的位置
+        positions = np.flatnonzero(regular)[::-1]
+        lookup = dict(zip(zip(main_masks[positions].tolist(), extra_masks[positions].tolist()),
+                          positions.tolist()))
+        keys = masks_of(mains)
+        extra_keys = masks_of(extras) if extras is not None else np.zeros(len(keys), dtype=np.uint64)
+        return np.array([lookup.get(key, -1) for key in zip(keys.tolist(), extra_keys.tolist())],
+                        dtype=np.int64)
@@ -12,6 +12,7 @@ from typing import Dict, List, Optional, Any, Tuple
 import json
 import re
 
+from . import vectorized
 from .data_validator import DataValidator
 from ..config_manager import get_config_manager
 from ..exceptions import DataCleaningError
@@ -20,16 +21,33 @@ from ..logging_config import get_logger
 class DataCleaner:
     """增强的数据清洗器"""
     
-    def __init__(self, lottery_type: str):
+    # 清洗规则版本，清洗逻辑变化时递增（持久化的清洗结果随之失效）
+    RULES_VERSION = 1
+    
+    # 日期解析尝试的格式（按顺序）
+    DATE_FORMATS = [
+        '%Y-%m-%d',
+        '%Y/%m/%d', 
+        '%Y.%m.%d',
+        '%Y年%m月%d日',
+        '%m/%d/%Y',
+        '%d/%m/%Y'
+    ]
+    
+    def __init__(self, lottery_type: str, use_vectorized: Optional[bool] = None):
         """初始化数据清洗器
         
         Args:
             lottery_type: 彩票类型 ('ssq' 或 'dlt')
+            use_vectorized: 是否使用向量化清洗，默认读取配置 data.vectorized_cleaning
         """
         self.lottery_type = lottery_type
         self.config_manager = get_config_manager()
         self.logger = get_logger(__name__)
         self.validator = DataValidator(lottery_type)
+        if use_vectorized is None:
+            use_vectorized = self.config_manager.get('data.vectorized_cleaning', True)
+        self.use_vectorized = bool(use_vectorized)
         
         # 清洗统计
         self.cleaning_stats = {
@@ -142,34 +160,11 @@ class DataCleaner:
     
     def _standardize_dates(self, data: pd.DataFrame) -> pd.DataFrame:
         """标准化日期格式"""
-        def parse_date(date_str):
-            if pd.isna(date_str):
-                return None
-            
-            # 尝试多种日期格式
-            date_formats = [
-                '%Y-%m-%d',
-                '%Y/%m/%d', 
-                '%Y.%m.%d',
-                '%Y年%m月%d日',
-                '%m/%d/%Y',
-                '%d/%m/%Y'
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    return pd.to_datetime(date_str, format=fmt)
-                except ValueError:
-                    continue
-            
-            # 如果都失败，尝试自动解析
-            try:
-                return pd.to_datetime(date_str)
-            except ValueError:
-                return None
-        
         original_count = data['draw_date'].notna().sum()
-        data['draw_date'] = data['draw_date'].apply(parse_date)
+        if self.use_vectorized:
+            data['draw_date'] = vectorized.standardize_dates(data['draw_date'], self.DATE_FORMATS, self._parse_date)
+        else:
+            data['draw_date'] = data['draw_date'].apply(self._parse_date)
         parsed_count = data['draw_date'].notna().sum()
         
         if parsed_count < original_count:
@@ -178,42 +173,34 @@ class DataCleaner:
         
         return data
     
-    def _standardize_issue_numbers(self, data: pd.DataFrame) -> pd.DataFrame:
-        """标准化期号格式"""
-        def clean_issue_number(issue):
-            if pd.isna(issue):
-                return None
-            
-            # 转换为字符串并清理
-            issue_str = str(issue).strip()
-            
-            # 移除非数字字符
-            issue_clean = re.sub(r'[^\d]', '', issue_str)
-            
-            # 根据彩票类型验证期号格式
-            if self.lottery_type == 'ssq':
-                # 双色球期号通常是8位数字 (YYYYNNN)
-                if len(issue_clean) == 8 and issue_clean.isdigit():
-                    return issue_clean
-                elif len(issue_clean) >= 6:
-                    # 尝试补零到8位
-                    return issue_clean.zfill(8)
-            elif self.lottery_type == 'dlt':
-                # 大乐透期号通常是5位数字 (YYNNN)
-                if len(issue_clean) == 5 and issue_clean.isdigit():
-                    return issue_clean
-                elif len(issue_clean) >= 4:
-                    # 尝试补零到5位
-                    return issue_clean.zfill(5)
-            else:
-                # 其他彩票类型，保持原有逻辑
-                if len(issue_clean) >= 4 and issue_clean.isdigit():
-                    return issue_clean
-            
+    @classmethod
+    def _parse_date(cls, date_str):
+        """解析单个日期值"""
+        if pd.isna(date_str):
             return None
         
+        # 尝试多种日期格式
+        for fmt in cls.DATE_FORMATS:
+            try:
+                return pd.to_datetime(date_str, format=fmt)
+            except ValueError:
+                continue
+        
+        # 如果都失败，尝试自动解析
+        try:
+            return pd.to_datetime(date_str)
+        except ValueError:
+            return None
+    
+    def _standardize_issue_numbers(self, data: pd.DataFrame) -> pd.DataFrame:
+        """标准化期号格式"""
         original_count = data['draw_num'].notna().sum()
-        data['draw_num'] = data['draw_num'].apply(clean_issue_number)
+        if self.use_vectorized:
+            data['draw_num'] = vectorized.clean_issue_numbers(
+                data['draw_num'], self.lottery_type, self._clean_issue_number
+            )
+        else:
+            data['draw_num'] = data['draw_num'].apply(self._clean_issue_number)
         cleaned_count = data['draw_num'].notna().sum()
         
         if cleaned_count < original_count:
@@ -222,53 +209,54 @@ class DataCleaner:
         
         return data
     
+    def _clean_issue_number(self, issue):
+        """清理单个期号"""
+        if pd.isna(issue):
+            return None
+        
+        # 转换为字符串并清理
+        issue_str = str(issue).strip()
+        
+        # 移除非数字字符
+        issue_clean = re.sub(r'[^\d]', '', issue_str)
+        
+        # 根据彩票类型验证期号格式
+        if self.lottery_type == 'ssq':
+            # 双色球期号通常是8位数字 (YYYYNNN)
+            if len(issue_clean) == 8 and issue_clean.isdigit():
+                return issue_clean
+            elif len(issue_clean) >= 6:
+                # 尝试补零到8位
+                return issue_clean.zfill(8)
+        elif self.lottery_type == 'dlt':
+            # 大乐透期号通常是5位数字 (YYNNN)
+            if len(issue_clean) == 5 and issue_clean.isdigit():
+                return issue_clean
+            elif len(issue_clean) >= 4:
+                # 尝试补零到5位
+                return issue_clean.zfill(5)
+        else:
+            # 其他彩票类型，保持原有逻辑
+            if len(issue_clean) >= 4 and issue_clean.isdigit():
+                return issue_clean
+        
+        return None
+    
     def _standardize_ssq_numbers(self, data: pd.DataFrame) -> pd.DataFrame:
         """标准化双色球号码格式"""
         # 标准化红球
         if 'red_numbers' in data.columns:
-            data['red_numbers'] = data['red_numbers'].apply(self._parse_number_list)
-            
-            # 验证和修复红球
-            def fix_red_numbers(numbers):
-                if not isinstance(numbers, list) or len(numbers) != 6:
-                    return None
-                
-                # 确保都是整数且在有效范围内
-                try:
-                    fixed_numbers = []
-                    for n in numbers:
-                        n = int(n)
-                        if 1 <= n <= 33:
-                            fixed_numbers.append(n)
-                    
-                    if len(fixed_numbers) == 6 and len(set(fixed_numbers)) == 6:
-                        return sorted(fixed_numbers)
-                except Exception:
-                    pass
-                
-                return None
-            
-            original_count = data['red_numbers'].notna().sum()
-            data['red_numbers'] = data['red_numbers'].apply(fix_red_numbers)
-            fixed_count = data['red_numbers'].notna().sum()
-            
-            if fixed_count < original_count:
-                failed = original_count - fixed_count
-                self.cleaning_stats['issues_found'].append(f"有 {failed} 条记录的红球号码无法修复")
+            self._standardize_number_list(data, 'red_numbers', 6, 33, '红球号码')
         
         # 标准化蓝球
         if 'blue_number' in data.columns:
-            def fix_blue_number(number):
-                try:
-                    n = int(number)
-                    if 1 <= n <= 16:
-                        return n
-                except ValueError:
-                    pass
-                return None
-            
             original_count = data['blue_number'].notna().sum()
-            data['blue_number'] = data['blue_number'].apply(fix_blue_number)
+            if self.use_vectorized:
+                data['blue_number'] = vectorized.fix_scalar_numbers(
+                    data['blue_number'], 16, self._fix_blue_number
+                )
+            else:
+                data['blue_number'] = data['blue_number'].apply(self._fix_blue_number)
             fixed_count = data['blue_number'].notna().sum()
             
             if fixed_count < original_count:
@@ -281,66 +269,74 @@ class DataCleaner:
         """标准化大乐透号码格式"""
         # 标准化前区
         if 'front_numbers' in data.columns:
-            data['front_numbers'] = data['front_numbers'].apply(self._parse_number_list)
-            
-            def fix_front_numbers(numbers):
-                if not isinstance(numbers, list) or len(numbers) != 5:
-                    return None
-                
-                try:
-                    fixed_numbers = []
-                    for n in numbers:
-                        n = int(n)
-                        if 1 <= n <= 35:
-                            fixed_numbers.append(n)
-                    
-                    if len(fixed_numbers) == 5 and len(set(fixed_numbers)) == 5:
-                        return sorted(fixed_numbers)
-                except Exception:
-                    pass
-                
-                return None
-            
-            original_count = data['front_numbers'].notna().sum()
-            data['front_numbers'] = data['front_numbers'].apply(fix_front_numbers)
-            fixed_count = data['front_numbers'].notna().sum()
-            
-            if fixed_count < original_count:
-                failed = original_count - fixed_count
-                self.cleaning_stats['issues_found'].append(f"有 {failed} 条记录的前区号码无法修复")
+            self._standardize_number_list(data, 'front_numbers', 5, 35, '前区号码')
         
         # 标准化后区
         if 'back_numbers' in data.columns:
-            data['back_numbers'] = data['back_numbers'].apply(self._parse_number_list)
-            
-            def fix_back_numbers(numbers):
-                if not isinstance(numbers, list) or len(numbers) != 2:
-                    return None
-                
-                try:
-                    fixed_numbers = []
-                    for n in numbers:
-                        n = int(n)
-                        if 1 <= n <= 12:
-                            fixed_numbers.append(n)
-                    
-                    if len(fixed_numbers) == 2 and len(set(fixed_numbers)) == 2:
-                        return sorted(fixed_numbers)
-                except Exception:
-                    pass
-                
-                return None
-            
-            original_count = data['back_numbers'].notna().sum()
-            data['back_numbers'] = data['back_numbers'].apply(fix_back_numbers)
-            fixed_count = data['back_numbers'].notna().sum()
-            
-            if fixed_count < original_count:
-                failed = original_count - fixed_count
-                self.cleaning_stats['issues_found'].append(f"有 {failed} 条记录的后区号码无法修复")
+            self._standardize_number_list(data, 'back_numbers', 2, 12, '后区号码')
         
         return data
     
+    def _standardize_number_list(self, data: pd.DataFrame, field: str,
+                                 count: int, max_value: int, label: str) -> None:
+        """解析并修复号码列表字段
+        
+        Args:
+            data: 数据（原地修改）
+            field: 字段名
+            count: 号码个数
+            max_value: 号码最大值
+            label: 问题描述中的字段名称
+        """
+        def fix_numbers(numbers):
+            return self._fix_number_list(numbers, count, max_value)
+        
+        if self.use_vectorized:
+            data[field], original_count = vectorized.fix_number_lists(
+                data[field], count, max_value, self._parse_number_list, fix_numbers
+            )
+        else:
+            data[field] = data[field].apply(self._parse_number_list)
+            original_count = data[field].notna().sum()
+            data[field] = data[field].apply(fix_numbers)
+        fixed_count = data[field].notna().sum()
+        
+        if fixed_count < original_count:
+            failed = original_count - fixed_count
+            self.cleaning_stats['issues_found'].append(f"有 {failed} 条记录的{label}无法修复")
+    
+    @staticmethod
+    def _fix_number_list(numbers, count: int, max_value: int) -> Optional[List[int]]:
+        """修复单条号码列表：数量正确、都在 [1, max_value] 内且不重复时返回升序列表"""
+        if not isinstance(numbers, list) or len(numbers) != count:
+            return None
+        
+        # 确保都是整数且在有效范围内
+        try:
+            fixed_numbers = []
+            for n in numbers:
+                n = int(n)
+                if 1 <= n <= max_value:
+                    fixed_numbers.append(n)
+            
+            if len(fixed_numbers) == count and len(set(fixed_numbers)) == count:
+                return sorted(fixed_numbers)
+        except Exception:
+            pass
+        
+        return None
+    
+    @staticmethod
+    def _fix_blue_number(number) -> Optional[int]:
+        """修复单个蓝球号码"""
+        try:
+            n = int(number)
+            if 1 <= n <= 16:
+                return n
+        except ValueError:
+            pass
+        return None
+    
     def _parse_number_list(self, numbers) -> Optional[List[int]]:
         """解析号码列表"""
         # 处理各种类型的空值检查
@@ -502,25 +498,14 @@ class DataCleaner:
     
     def _fix_numeric_field(self, data: pd.DataFrame, field: str) -> int:
         """修复数值字段"""
-        fixed_count = 0
+        if self.use_vectorized:
+            data[field], fixed_count = vectorized.clean_numeric_values(data[field], self._clean_numeric_value)
+            return fixed_count
         
-        def clean_numeric(value):
-            if pd.isna(value):
-                return None
-            
-            # 转换为字符串并清理
-            value_str = str(value).strip()
-            
-            # 移除非数字字符（保留小数点）
-            cleaned = re.sub(r'[^\d.]', '', value_str)
-            
-            try:
-                return float(cleaned) if '.' in cleaned else int(cleaned)
-            except ValueError:
-                return None
+        fixed_count = 0
         
         original_values = data[field].copy()
-        data[field] = data[field].apply(clean_numeric)
+        data[field] = data[field].apply(self._clean_numeric_value)
         
         # 统计修复的数量
         for i in range(len(data)):
@@ -530,6 +515,45 @@ class DataCleaner:
         
         return fixed_count
     
+    @staticmethod
+    def _clean_numeric_value(value):
+        """清理单个数值字段值"""
+        if pd.isna(value):
+            return None
+        
+        # 转换为字符串并清理
+        value_str = str(value).strip()
+        
+        # 移除非数字字符（保留小数点）
+        cleaned = re.sub(r'[^\d.]', '', value_str)
+        
+        try:
+            return float(cleaned) if '.' in cleaned else int(cleaned)
+        except ValueError:
+            return None
+    
+    def infer_numeric_dtypes(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """推断自动修复后各数值字段的 dtype
+        
+        数值字段的 dtype 由全部取值共同决定（出现小数或空值即为 float64），
+        只清洗部分记录时用它把结果对齐到全量清洗的 dtype。
+        
+        Args:
+            data: 待清洗的完整数据
+            
+        Returns:
+            {字段名: dtype}
+        """
+        dtypes = {}
+        for field in ['prize_pool', 'sales', 'first_prize_num', 'first_prize_amount']:
+            if field in data.columns:
+                if self.use_vectorized:
+                    cleaned, _ = vectorized.clean_numeric_values(data[field], self._clean_numeric_value)
+                else:
+                    cleaned = data[field].apply(self._clean_numeric_value)
+                dtypes[field] = cleaned.dtype
+        return dtypes
+    
     def _remove_invalid_records(self, data: pd.DataFrame) -> pd.DataFrame:
         """移除无效记录"""
         self.logger.debug("移除无效记录")
@@ -8,11 +8,14 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Callable, Union
-import json
+from typing import Dict, List, Any, Callable, Optional, Union
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 
+from . import vectorized
 from ..config_manager import get_config_manager
 from ..exceptions import DataValidationError
 from ..logging_config import get_logger
@@ -51,15 +54,31 @@ class ValidationResult:
 class DataValidator:
     """统一数据验证器"""
     
-    def __init__(self, lottery_type: str = None):
+    # 验证规则版本，规则变化时递增（持久化的验证结果随之失效）
+    RULES_VERSION = 2
+    
+    # 验证结果 details['rows'] 中最多列出的问题行数
+    MAX_REPORTED_ROWS = 1000
+    
+    def __init__(self, lottery_type: str = None,
+                 vectorized: Optional[bool] = None,
+                 parallel: Optional[bool] = None):
         """初始化验证器
         
         Args:
             lottery_type: 彩票类型，如果指定则加载对应的验证规则
+            vectorized: 是否在号码矩阵上向量化执行号码规则，默认读取配置 data.vectorized_validation
+            parallel: 是否并行执行相互独立的规则，默认读取配置 data.parallel_validation
         """
         self.config_manager = get_config_manager()
         self.logger = get_logger(__name__)
         self.lottery_type = lottery_type
+        if vectorized is None:
+            vectorized = self.config_manager.get('data.vectorized_validation', True)
+        if parallel is None:
+            parallel = self.config_manager.get('data.parallel_validation', False)
+        self.vectorized = bool(vectorized)
+        self.parallel = bool(parallel)
         
         # 验证规则集合
         self.rules: List[ValidationRule] = []
@@ -67,6 +86,14 @@ class DataValidator:
         # 验证结果
         self.results: List[ValidationResult] = []
         
+        # 规则执行期间的结果缓冲（并行执行时每个线程独立）
+        self._local = threading.local()
+        
+        # 单次 validate 内共享的号码矩阵
+        self._arrays_data = None
+        self._arrays: Dict[str, vectorized.NumberListArrays] = {}
+        self._arrays_lock = threading.Lock()
+        
         # 初始化基础规则
         self._init_base_rules()
         
@@ -247,17 +274,20 @@ class DataValidator:
             elif isinstance(data, list):
                 data = pd.DataFrame(data)
             
-            # 执行所有验证规则
-            for rule in self.rules:
-                try:
-                    rule.validator(data, rule.params)
-                except Exception as e:
-                    self.results.append(ValidationResult(
-                        rule_name=rule.name,
-                        level=ValidationLevel.ERROR,
-                        message=f"验证规则执行失败: {str(e)}",
-                        details={"exception": str(e)}
-                    ))
+            # 执行所有验证规则（并行时结果仍按规则顺序合并）
+            self._arrays_data, self._arrays = data, {}
+            try:
+                if self.parallel and len(self.rules) > 1:
+                    workers = min(len(self.rules), os.cpu_count() or 1)
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        rule_results = list(executor.map(lambda rule: self._run_rule(rule, data), self.rules))
+                else:
+                    rule_results = [self._run_rule(rule, data) for rule in self.rules]
+            finally:
+                self._arrays_data, self._arrays = None, {}
+            
+            for results in rule_results:
+                self.results.extend(results)
             
             # 生成验证报告
             return self._generate_report()
@@ -266,6 +296,22 @@ class DataValidator:
             self.logger.error(f"数据验证失败: {str(e)}", exc_info=True)
             raise DataValidationError(f"数据验证失败: {str(e)}")
     
+    def _run_rule(self, rule: ValidationRule, data: pd.DataFrame) -> List[ValidationResult]:
+        """执行单条规则，返回该规则产生的结果"""
+        self._local.results = []
+        try:
+            rule.validator(data, rule.params)
+        except Exception as e:
+            self._local.results.append(ValidationResult(
+                rule_name=rule.name,
+                level=ValidationLevel.ERROR,
+                message=f"验证规则执行失败: {str(e)}",
+                details={"exception": str(e)}
+            ))
+        finally:
+            results, self._local.results = self._local.results, None
+        return results
+    
     def _generate_report(self) -> Dict[str, Any]:
         """生成验证报告"""
         errors = [r for r in self.results if r.level == ValidationLevel.ERROR]
@@ -287,12 +333,68 @@ class DataValidator:
     
     def _add_result(self, rule_name: str, level: ValidationLevel, message: str, details: Dict = None):
         """添加验证结果"""
-        self.results.append(ValidationResult(
+        result = ValidationResult(
             rule_name=rule_name,
             level=level,
             message=message,
             details=details or {}
-        ))
+        )
+        buffer = getattr(self._local, 'results', None)
+        (buffer if buffer is not None else self.results).append(result)
+    
+    def _add_row_result(self, rule_name: str, data: pd.DataFrame, invalid: np.ndarray, message: str):
+        """按问题行掩码添加 ERROR 结果，details['rows'] 为问题行索引
+        
+        Args:
+            rule_name: 规则名称
+            data: 数据框
+            invalid: 问题行掩码
+            message: 结果描述，{count} 替换为问题行数
+        """
+        count = int(invalid.sum())
+        if count == 0:
+            return
+        rows = data.index[invalid][:self.MAX_REPORTED_ROWS].tolist()
+        details = {"rows": rows}
+        if count > len(rows):
+            details["truncated"] = True
+        self._add_result(rule_name, ValidationLevel.ERROR, message.format(count=count), details)
+    
+    def _number_arrays(self, data: pd.DataFrame, column: str) -> vectorized.NumberListArrays:
+        """获取号码列的定长矩阵（同一次 validate 内各规则共享）"""
+        if data is not self._arrays_data:
+            return vectorized.NumberListArrays.from_series(data[column])
+        with self._arrays_lock:
+            if column not in self._arrays:
+                self._arrays[column] = vectorized.NumberListArrays.from_series(data[column])
+            return self._arrays[column]
+    
+    def _number_list_mask(self, data: pd.DataFrame, column: str, check: str, *args) -> np.ndarray:
+        """号码列表规则的逐行通过掩码
+        
+        Args:
+            data: 数据框
+            column: 列名
+            check: 规则（count / range / distinct / typed）
+            *args: 规则参数（号码数量或最大值）
+            
+        Returns:
+            布尔数组
+        """
+        if self.vectorized:
+            return getattr(self._number_arrays(data, column), f'{check}_ok')(*args)
+        row_check = getattr(vectorized, f'row_{check}_ok')
+        return np.array([row_check(value, *args) for value in data[column]], dtype=bool)
+    
+    def _validate_number_list(self, data: pd.DataFrame, column: str, rule_name: str,
+                              check: str, arg: Any, message: str):
+        """号码列表规则（数量、范围、重复）"""
+        if column not in data.columns:
+            return
+        
+        args = (arg,) if arg is not None else ()
+        invalid = ~self._number_list_mask(data, column, check, *args)
+        self._add_row_result(rule_name, data, invalid, message)
     
     # ==================== 基础验证方法 ====================
     
@@ -380,157 +482,51 @@ class DataValidator:
     
     def _validate_ssq_red_count(self, data: pd.DataFrame, params: Dict):
         """验证双色球红球数量"""
-        if 'red_numbers' not in data.columns:
-            return
-        
-        def check_count(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            return isinstance(numbers, (list, tuple)) and len(numbers) == 6
-        
-        invalid_count = data[~data['red_numbers'].apply(check_count)]
-        if not invalid_count.empty:
-            self._add_result("ssq_red_count", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_count)} 条记录的红球数量不正确")
+        self._validate_number_list(data, 'red_numbers', "ssq_red_count", 'count', 6,
+                                   "发现 {count} 条记录的红球数量不正确")
     
     def _validate_ssq_red_range(self, data: pd.DataFrame, params: Dict):
         """验证双色球红球范围"""
-        if 'red_numbers' not in data.columns:
-            return
-        
-        def check_range(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            if not isinstance(numbers, (list, tuple)):
-                return False
-            return all(isinstance(n, int) and 1 <= n <= 33 for n in numbers)
-        
-        invalid_range = data[~data['red_numbers'].apply(check_range)]
-        if not invalid_range.empty:
-            self._add_result("ssq_red_range", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_range)} 条记录的红球号码超出范围")
+        self._validate_number_list(data, 'red_numbers', "ssq_red_range", 'range', 33,
+                                   "发现 {count} 条记录的红球号码超出范围")
     
     def _validate_ssq_red_duplicates(self, data: pd.DataFrame, params: Dict):
         """验证双色球红球重复"""
-        if 'red_numbers' not in data.columns:
-            return
-        
-        def check_duplicates(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            if not isinstance(numbers, (list, tuple)):
-                return False
-            return len(numbers) == len(set(numbers))
-        
-        has_duplicates = data[~data['red_numbers'].apply(check_duplicates)]
-        if not has_duplicates.empty:
-            self._add_result("ssq_red_duplicates", ValidationLevel.ERROR,
-                           f"发现 {len(has_duplicates)} 条记录的红球号码有重复")
+        self._validate_number_list(data, 'red_numbers', "ssq_red_duplicates", 'distinct', None,
+                                   "发现 {count} 条记录的红球号码有重复")
     
     def _validate_ssq_blue_range(self, data: pd.DataFrame, params: Dict):
         """验证双色球蓝球范围"""
         if 'blue_number' not in data.columns:
             return
         
-        def check_blue_range(number):
-            try:
-                if isinstance(number, str):
-                    number = int(number)
-                return isinstance(number, (int, float)) and 1 <= number <= 16
-            except ValueError:
-                return False
-        
-        invalid_blue = data[~data['blue_number'].apply(check_blue_range)]
-        if not invalid_blue.empty:
-            self._add_result("ssq_blue_range", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_blue)} 条记录的蓝球号码超出范围")
+        if self.vectorized:
+            valid = vectorized.number_range_ok(data['blue_number'], 16)
+        else:
+            valid = np.array([vectorized.row_number_ok(value, 16) for value in data['blue_number']], dtype=bool)
+        self._add_row_result("ssq_blue_range", data, ~valid, "发现 {count} 条记录的蓝球号码超出范围")
     
     # ==================== 大乐透验证方法 ====================
     
     def _validate_dlt_front_count(self, data: pd.DataFrame, params: Dict):
         """验证大乐透前区数量"""
-        if 'front_numbers' not in data.columns:
-            return
-        
-        def check_count(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            return isinstance(numbers, (list, tuple)) and len(numbers) == 5
-        
-        invalid_count = data[~data['front_numbers'].apply(check_count)]
-        if not invalid_count.empty:
-            self._add_result("dlt_front_count", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_count)} 条记录的前区号码数量不正确")
+        self._validate_number_list(data, 'front_numbers', "dlt_front_count", 'count', 5,
+                                   "发现 {count} 条记录的前区号码数量不正确")
     
     def _validate_dlt_front_range(self, data: pd.DataFrame, params: Dict):
         """验证大乐透前区范围"""
-        if 'front_numbers' not in data.columns:
-            return
-        
-        def check_range(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            if not isinstance(numbers, (list, tuple)):
-                return False
-            return all(isinstance(n, int) and 1 <= n <= 35 for n in numbers)
-        
-        invalid_range = data[~data['front_numbers'].apply(check_range)]
-        if not invalid_range.empty:
-            self._add_result("dlt_front_range", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_range)} 条记录的前区号码超出范围")
+        self._validate_number_list(data, 'front_numbers', "dlt_front_range", 'range', 35,
+                                   "发现 {count} 条记录的前区号码超出范围")
     
     def _validate_dlt_back_count(self, data: pd.DataFrame, params: Dict):
         """验证大乐透后区数量"""
-        if 'back_numbers' not in data.columns:
-            return
-        
-        def check_count(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            return isinstance(numbers, (list, tuple)) and len(numbers) == 2
-        
-        invalid_count = data[~data['back_numbers'].apply(check_count)]
-        if not invalid_count.empty:
-            self._add_result("dlt_back_count", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_count)} 条记录的后区号码数量不正确")
+        self._validate_number_list(data, 'back_numbers', "dlt_back_count", 'count', 2,
+                                   "发现 {count} 条记录的后区号码数量不正确")
     
     def _validate_dlt_back_range(self, data: pd.DataFrame, params: Dict):
         """验证大乐透后区范围"""
-        if 'back_numbers' not in data.columns:
-            return
-        
-        def check_range(numbers):
-            if isinstance(numbers, str):
-                try:
-                    numbers = json.loads(numbers)
-                except json.JSONDecodeError:
-                    return False
-            if not isinstance(numbers, (list, tuple)):
-                return False
-            return all(isinstance(n, int) and 1 <= n <= 12 for n in numbers)
-        
-        invalid_range = data[~data['back_numbers'].apply(check_range)]
-        if not invalid_range.empty:
-            self._add_result("dlt_back_range", ValidationLevel.ERROR,
-                           f"发现 {len(invalid_range)} 条记录的后区号码超出范围")
+        self._validate_number_list(data, 'back_numbers', "dlt_back_range", 'range', 12,
+                                   "发现 {count} 条记录的后区号码超出范围")
     
     # ==================== 新增验证方法 ====================
     
@@ -603,29 +599,7 @@ class DataValidator:
         Returns:
             无效记录数
         """
-        invalid_count = 0
-
-        for idx, value in data[column].items():
-            # 检查是否为列表类型
-            if not isinstance(value, (list, tuple)):
-                invalid_count += 1
-                continue
-
-            # 检查列表长度
-            if len(value) != expected_count:
-                invalid_count += 1
-                continue
-
-            # 检查列表元素是否为整数
-            try:
-                for num in value:
-                    if not isinstance(num, (int, np.integer)):
-                        invalid_count += 1
-                        break
-            except Exception:
-                invalid_count += 1
-
-        return invalid_count
+        return int((~self._number_list_mask(data, column, 'typed', expected_count)).sum())
 
     def _validate_number_type(self, data: pd.DataFrame, column: str) -> int:
         """验证单个号码类型
@@ -637,6 +611,9 @@ class DataValidator:
         Returns:
             无效记录数
         """
+        if self.vectorized:
+            return vectorized.count_non_integers(data[column])
+
         invalid_count = 0
 
         for idx, value in data[column].items():
@@ -0,0 +1,633 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+向量化清洗/验证内核
+把逐行清洗、验证函数的语义翻译为 pandas 字符串、日期和数值运算：能批量确定结果的行走向量路径，
+其余行（罕见格式）回退到原逐行函数，保证输出与逐行路径完全一致（含 dtype）
+"""
+
+import json
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 逐行函数签名
+RowFunc = Callable[[object], object]
+
+# 整数字符串安全转换为 int64 的最大位数
+_INT64_SAFE_DIGITS = 18
+
+# str(float) 不使用科学计数法的区间 [1e-4, 1e16)
+_PLAIN_FLOAT_MIN = 1e-4
+_PLAIN_FLOAT_MAX = 1e16
+
+
+def _identity(value):
+    return value
+
+
+def infer_like_apply(values, index) -> pd.Series:
+    """按 Series.apply 的规则推断结果 dtype
+
+    逐元素恒等映射走与 apply 相同的类型推断（整数→int64，含空值→float64，
+    全为空值→object，Timestamp/NaT→datetime64 等），不调用任何清洗逻辑。
+
+    Args:
+        values: 结果对象数组
+        index: 结果索引
+
+    Returns:
+        结果 Series
+    """
+    return pd.Series(values, index=index, dtype=object).map(_identity)
+
+
+def _from_optional(values: np.ndarray, valid: np.ndarray, index) -> pd.Series:
+    """由数值数组和有效掩码构造结果（无效位置为空值），dtype 与逐行 apply 一致"""
+    if valid.all():
+        return pd.Series(values, index=index)
+    if not valid.any():
+        return pd.Series([None] * len(valid), index=index, dtype=object)
+    return pd.Series(np.where(valid, values, np.nan).astype(np.float64), index=index)
+
+
+def _apply_rows(values: np.ndarray, positions: np.ndarray, func: RowFunc, out: np.ndarray) -> None:
+    """对回退行逐行调用原函数"""
+    for pos in positions.tolist():
+        out[pos] = func(values[pos])
+
+
+def _present_text(series: pd.Series) -> pd.Series:
+    """非空值转为字符串（与逐行路径的 str(value).strip() 一致），保留原索引"""
+    return series[series.notna()].astype(str).str.strip()
+
+
+_to_str = np.frompyfunc(str, 1, 1)
+
+
+# ==================== 期号 ====================
+
+def clean_issue_numbers(series: pd.Series, lottery_type: str, rowwise: RowFunc) -> pd.Series:
+    """向量化标准化期号：删除非数字字符，位数足够时补零到标准长度
+
+    Args:
+        series: 期号列
+        lottery_type: 彩票类型
+        rowwise: 逐行清洗函数（非字符串/整数列时回退）
+
+    Returns:
+        标准化后的期号列
+    """
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if series.empty or kind not in ('string', 'integer'):
+        return series.apply(rowwise)
+
+    # 与逐行路径的 re.sub(r'[^\d]', '') 相同，\d 也匹配全角数字
+    digits = _present_text(series).str.replace(r'\D', '', regex=True)
+    lengths = digits.str.len()
+    if lottery_type == 'ssq':
+        cleaned = digits[lengths >= 6].str.zfill(8)
+    elif lottery_type == 'dlt':
+        cleaned = digits[lengths >= 4].str.zfill(5)
+    else:
+        cleaned = digits[lengths >= 4]
+
+    out = np.full(len(series), None, dtype=object)
+    out[series.index.get_indexer(cleaned.index)] = cleaned.to_numpy(dtype=object)
+    return infer_like_apply(out, series.index)
+
+
+# ==================== 日期 ====================
+
+def standardize_dates(series: pd.Series, formats: Sequence[str], rowwise: RowFunc) -> pd.Series:
+    """向量化标准化日期
+
+    datetime64 列原样保留（全为 NaT 时逐行路径结果为 object）；字符串按 formats 依次批量解析，
+    每种格式只解析前面格式未能解析的行；全部格式都失败的行逐行解析（自动识别格式）。
+
+    Args:
+        series: 日期列
+        formats: 依次尝试的日期格式（与逐行解析函数的顺序一致）
+        rowwise: 逐行解析函数
+
+    Returns:
+        datetime64 日期列（全部无法解析时与逐行路径一致为 object）
+    """
+    if series.empty:
+        return series.apply(rowwise)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind == 'M' and series.notna().any():
+        return series.copy()
+    if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+        return series.apply(rowwise)
+
+    present = series.notna().to_numpy()
+    if not present.any():
+        return series.apply(rowwise)
+
+    hits = []
+    remaining = series[present]
+    for fmt in formats:
+        if remaining.empty:
+            break
+        converted = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        parsed_ok = converted.notna()
+        hits.append(converted[parsed_ok])
+        remaining = remaining[~parsed_ok]
+
+    parsed = pd.concat(hits).reindex(series.index) if hits else pd.Series(pd.NaT, index=series.index)
+    if remaining.empty:
+        return parsed
+
+    out = parsed.astype(object).to_numpy(copy=True)
+    out[~present] = None
+    positions = series.index.get_indexer(remaining.index)
+    _apply_rows(series.to_numpy(dtype=object), positions, rowwise, out)
+    return infer_like_apply(out, series.index)
+
+
+# ==================== 号码列表 ====================
+
+def _strict_int_rows(rows: list) -> np.ndarray:
+    """逐行判断是否全部为 int64 范围内的 Python 整数（批量转换失败时使用）"""
+    return np.fromiter(
+        (all(type(x) is int and -(1 << 63) <= x < (1 << 63) for x in row) for row in rows),
+        dtype=bool, count=len(rows)
+    )
+
+
+def list_matrix(values: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """提取长度为 width 且元素全为整数的列表行
+
+    Args:
+        values: 对象数组
+        width: 列表长度
+
+    Returns:
+        (行位置, rows×width 的 int64 矩阵)
+    """
+    candidates = np.flatnonzero(np.fromiter(
+        (type(v) is list and len(v) == width for v in values), dtype=bool, count=len(values)
+    ))
+    if candidates.size == 0 or width == 0:
+        return candidates[:0], np.empty((0, width), dtype=np.int64)
+
+    rows = values[candidates].tolist()
+    flat = np.fromiter(chain.from_iterable(rows), dtype=object, count=len(rows) * width)
+    if pd.api.types.infer_dtype(flat, skipna=False) == 'integer':
+        try:
+            return candidates, flat.astype(np.int64).reshape(len(rows), width)
+        except OverflowError:
+            pass
+
+    # 含布尔值、浮点数、超大整数等的行交给逐行路径
+    strict = _strict_int_rows(rows)
+    kept = [row for row, ok in zip(rows, strict) if ok]
+    matrix = np.array(kept, dtype=np.int64).reshape(len(kept), width)
+    return candidates[strict], matrix
+
+
+def _number_text_patterns(width: int) -> Tuple[str, str]:
+    """JSON 数组 "[1, 2]" 和逗号分隔 "01,02" 两种写法的正则（恰好 width 个不超过 9 位的数字）
+
+    两种写法在逐行解析中都直接得到整数列表；JSON 数字不能有前导零。
+    """
+    json_number = r'(0|[1-9][0-9]{0,8})'
+    plain_number = r'([0-9]{1,9})'
+    bracketed = r' *\[ *' + r' *, *'.join([json_number] * width) + r' *\] *'
+    plain = r' *' + r' *, *'.join([plain_number] * width) + r' *'
+    return bracketed, plain
+
+
+def text_matrix(values: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """提取 JSON 数组 "[1, 2]" 或逗号分隔 "01,02" 形式、恰好 width 个数字的字符串行
+
+    用 str.extract 一次完成格式匹配和数字提取，其他写法交给逐行路径。
+
+    Args:
+        values: 对象数组
+        width: 号码个数
+
+    Returns:
+        (行位置, rows×width 的 int64 矩阵)
+    """
+    candidates = np.flatnonzero(np.fromiter(
+        (type(v) is str for v in values), dtype=bool, count=len(values)
+    ))
+    if candidates.size == 0 or width == 0:
+        return candidates[:0], np.empty((0, width), dtype=np.int64)
+
+    text = pd.Series(values[candidates], dtype=object)
+    bracketed, plain = _number_text_patterns(width)
+    numbers = text.str.extract(f'^{bracketed}$')
+    if width > 1:
+        # 单个数字不带括号时逐行解析得不到列表
+        numbers = numbers.fillna(text.str.extract(f'^{plain}$'))
+    matched = numbers.notna().all(axis=1).to_numpy()
+    return candidates[matched], numbers[matched].to_numpy(dtype=str).astype(np.int64)
+
+
+def fix_number_matrix(matrix: np.ndarray, max_value: int) -> Tuple[np.ndarray, np.ndarray]:
+    """批量修复号码矩阵：全部在 [1, max_value] 内且互不重复的行有效，结果升序
+
+    Args:
+        matrix: rows×width 整数矩阵
+        max_value: 号码最大值
+
+    Returns:
+        (升序矩阵, 有效行掩码)
+    """
+    in_range = ((matrix >= 1) & (matrix <= max_value)).all(axis=1)
+    ordered = np.sort(matrix, axis=1)
+    distinct = (np.diff(ordered, axis=1) != 0).all(axis=1)
+    return ordered, in_range & distinct
+
+
+def fix_number_lists(series: pd.Series, width: int, max_value: int,
+                     parse_rowwise: RowFunc, fix_rowwise: RowFunc) -> Tuple[pd.Series, int]:
+    """向量化解析并修复号码列表列
+
+    等价于先 apply(parse_rowwise) 再 apply(fix_rowwise)。
+
+    Args:
+        series: 号码列
+        width: 号码个数
+        max_value: 号码最大值
+        parse_rowwise: 逐行解析函数
+        fix_rowwise: 逐行修复函数
+
+    Returns:
+        (修复后的号码列, 解析后非空记录数)
+    """
+    if series.empty:
+        parsed = series.apply(parse_rowwise)
+        return parsed.apply(fix_rowwise), int(parsed.notna().sum())
+
+    values = series.to_numpy(dtype=object)
+    list_rows, list_values = list_matrix(values, width)
+    text_rows, text_values = text_matrix(values, width)
+    rows = np.concatenate([list_rows, text_rows])
+    ordered, valid = fix_number_matrix(np.vstack([list_values, text_values]), max_value)
+
+    result = [None] * len(values)
+    for pos, numbers in zip(rows[valid].tolist(), ordered[valid].tolist()):
+        result[pos] = numbers
+
+    parsed_count = rows.size
+    fast = np.zeros(len(values), dtype=bool)
+    fast[rows] = True
+    for pos in np.flatnonzero(~fast).tolist():
+        parsed = parse_rowwise(values[pos])
+        if parsed is not None:
+            parsed_count += 1
+            result[pos] = fix_rowwise(parsed)
+
+    return pd.Series(result, index=series.index, dtype=object), parsed_count
+
+
+def fix_scalar_numbers(series: pd.Series, max_value: int, rowwise: RowFunc) -> pd.Series:
+    """向量化修复单个号码列（如蓝球）：int() 截断后在 [1, max_value] 内有效
+
+    Args:
+        series: 号码列
+        max_value: 号码最大值
+        rowwise: 逐行修复函数（object 列或含无穷值时回退）
+
+    Returns:
+        修复后的号码列
+    """
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else None
+    if series.empty or kind not in ('i', 'u', 'f'):
+        return series.apply(rowwise)
+
+    values = series.to_numpy()
+    if kind == 'f':
+        if np.isinf(values).any():
+            # int(inf) 抛出 OverflowError，保持逐行路径的行为
+            return series.apply(rowwise)
+        present = ~np.isnan(values)
+        values = np.trunc(np.where(present, values, 0))
+    else:
+        present = np.ones(len(values), dtype=bool)
+    values = np.clip(values, -1, max_value + 1)
+
+    valid = present & (values >= 1) & (values <= max_value)
+    return _from_optional(values.astype(np.int64), valid, series.index)
+
+
+# ==================== 数值字段 ====================
+
+def _count_changed(original: pd.Series, result: pd.Series) -> int:
+    """统计原值与结果都非空且字符串形式不同的记录数"""
+    both = (original.notna() & result.notna()).to_numpy()
+    if not both.any():
+        return 0
+    before = _to_str(original.to_numpy(dtype=object)[both])
+    after = _to_str(result.to_numpy(dtype=object)[both])
+    return int((before != after).sum())
+
+
+def clean_numeric_values(series: pd.Series, rowwise: RowFunc) -> Tuple[pd.Series, int]:
+    """向量化清理数值字段（去除非数字字符后转为 int/float）
+
+    Args:
+        series: 数值字段列
+        rowwise: 逐行清理函数
+
+    Returns:
+        (清理后的列, 被修改的记录数)
+    """
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else 'O'
+    if series.empty:
+        return series.apply(rowwise), 0
+
+    values = series.to_numpy()
+    if kind in ('i', 'u'):
+        if kind == 'u' and values.max() >= (1 << 63) or kind == 'i' and values.min() == np.iinfo(values.dtype).min:
+            result = series.apply(rowwise)
+            return result, _count_changed(series, result)
+        values = values.astype(np.int64)
+        # str() 后去掉负号
+        return pd.Series(np.abs(values), index=series.index), int((values < 0).sum())
+
+    if kind == 'f':
+        finite = np.isfinite(values)
+        magnitude = np.abs(np.where(finite, values, 0.0))
+        plain = finite & ((magnitude == 0) | ((magnitude >= _PLAIN_FLOAT_MIN) & (magnitude < _PLAIN_FLOAT_MAX)))
+        if (finite & ~plain).any():
+            # 科学计数法形式的字符串清理结果无规律，逐行处理
+            result = series.apply(rowwise)
+            return result, _count_changed(series, result)
+        result = _from_optional(magnitude, plain, series.index)
+        return result, int((plain & np.signbit(values)).sum())
+
+    if pd.api.types.infer_dtype(series, skipna=True) not in (
+            'string', 'integer', 'floating', 'mixed-integer', 'mixed-integer-float'):
+        result = series.apply(rowwise)
+        return result, _count_changed(series, result)
+
+    objects = series.to_numpy(dtype=object)
+    present = np.flatnonzero(series.notna().to_numpy())
+    # 与逐行路径的 re.sub(r'[^\d.]', '') 相同
+    text = _present_text(series).str.replace(r'[^\d.]', '', regex=True)
+
+    # 全角数字等非 ASCII 数字和超过 int64 的整数交给逐行路径
+    is_int = text.str.fullmatch(f'[0-9]{{1,{_INT64_SAFE_DIGITS}}}').to_numpy(dtype=bool)
+    is_float = text.str.fullmatch(r'[0-9]+\.[0-9]*|\.[0-9]+').to_numpy(dtype=bool)
+    # 空串、纯小数点、多个小数点：int()/float() 失败，结果为空值
+    is_invalid = (~text.str.contains(r'\d') | (text.str.count(r'\.') >= 2)).to_numpy(dtype=bool)
+    fallback = present[~(is_int | is_float | is_invalid)]
+
+    ints = pd.to_numeric(text[is_int]).to_numpy(dtype=np.int64)
+    # pd.to_numeric 解析小数与 float() 可能相差最后一位，小数按 float() 的规则转换
+    floats = text[is_float].astype(np.float64).to_numpy()
+
+    if fallback.size == 0:
+        if not is_float.any() and not is_invalid.any() and present.size == len(series):
+            result = pd.Series(ints, index=series.index)
+        elif not is_int.any() and not is_float.any():
+            result = pd.Series([None] * len(series), index=series.index, dtype=object)
+        else:
+            numbers = np.full(len(series), np.nan)
+            numbers[present[is_int]] = ints
+            numbers[present[is_float]] = floats
+            result = pd.Series(numbers, index=series.index)
+    else:
+        out = np.full(len(series), None, dtype=object)
+        out[present[is_int]] = ints.astype(object)
+        out[present[is_float]] = floats.astype(object)
+        _apply_rows(objects, fallback, rowwise, out)
+        result = infer_like_apply(out, series.index)
+
+    return result, _count_changed(series, result)
+
+
+# ==================== 号码列表验证 ====================
+
+# 超过该长度的列表不进入定长矩阵，逐行验证
+MAX_MATRIX_SLOTS = 64
+
+
+def row_count_ok(numbers, count: int) -> bool:
+    """逐行检查号码数量（字符串按 JSON 解析）"""
+    if isinstance(numbers, str):
+        try:
+            numbers = json.loads(numbers)
+        except json.JSONDecodeError:
+            return False
+    return isinstance(numbers, (list, tuple)) and len(numbers) == count
+
+
+def row_range_ok(numbers, max_value: int) -> bool:
+    """逐行检查号码范围：全部为 int 且在 [1, max_value] 内（字符串按 JSON 解析）"""
+    if isinstance(numbers, str):
+        try:
+            numbers = json.loads(numbers)
+        except json.JSONDecodeError:
+            return False
+    if not isinstance(numbers, (list, tuple)):
+        return False
+    return all(isinstance(n, int) and 1 <= n <= max_value for n in numbers)
+
+
+def row_distinct_ok(numbers) -> bool:
+    """逐行检查号码不重复（字符串按 JSON 解析，不可哈希元素抛出 TypeError）"""
+    if isinstance(numbers, str):
+        try:
+            numbers = json.loads(numbers)
+        except json.JSONDecodeError:
+            return False
+    if not isinstance(numbers, (list, tuple)):
+        return False
+    return len(numbers) == len(set(numbers))
+
+
+def row_typed_ok(numbers, count: int) -> bool:
+    """逐行检查号码列表类型：list/tuple、长度为 count、元素为 int 或 np.integer"""
+    if not isinstance(numbers, (list, tuple)) or len(numbers) != count:
+        return False
+    return all(isinstance(n, (int, np.integer)) for n in numbers)
+
+
+def row_number_ok(number, max_value: int) -> bool:
+    """逐行检查单个号码范围（字符串先转为整数）"""
+    try:
+        if isinstance(number, str):
+            number = int(number)
+        return isinstance(number, (int, float)) and 1 <= number <= max_value
+    except ValueError:
+        return False
+
+
+def _type_mask(kinds: np.ndarray, predicate: Callable[[type], bool]) -> np.ndarray:
+    """按类型判断（同一类型只判断一次）"""
+    present = set(kinds.tolist())
+    selected = {kind for kind in present if predicate(kind)}
+    if len(selected) in (0, len(present)):
+        return np.full(len(kinds), bool(selected))
+    return np.fromiter(map(selected.__contains__, kinds.tolist()), dtype=bool, count=len(kinds))
+
+
+def _types(values: np.ndarray) -> np.ndarray:
+    return np.fromiter(map(type, values), dtype=object, count=len(values))
+
+
+@dataclass
+class NumberListArrays:
+    """号码列表列的定长表示
+
+    每行的列表（字符串按 JSON 解析）左对齐写入 rows×slots 矩阵，超出长度的位置填充，
+    各规则在矩阵上用掩码一次算出所有行的结果；过长或含超大整数的列表逐行验证。
+    """
+    sequences: np.ndarray      # 每行的列表/元组（字符串为 JSON 解析结果），非序列为 None
+    is_sequence: np.ndarray    # 是否为序列
+    from_text: np.ndarray      # 序列是否来自字符串
+    lengths: np.ndarray        # 序列长度
+    matrix_rows: np.ndarray    # 进入矩阵的行位置
+    values: np.ndarray         # matrix_rows × slots 的 int64 元素值（非整数元素为 0）
+    slot_mask: np.ndarray      # 有效位置
+    is_int: np.ndarray         # 元素为 int（isinstance(n, int)，含 bool）
+    is_integer: np.ndarray     # 元素为 int 或 np.integer
+    slow_rows: np.ndarray      # 逐行验证的行位置
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> 'NumberListArrays':
+        """由号码列构造
+
+        Args:
+            series: 号码列（列表、元组、JSON 字符串或其他值）
+
+        Returns:
+            NumberListArrays
+        """
+        raw = series.to_numpy(dtype=object)
+        n = len(raw)
+        kinds = _types(raw)
+        is_native = _type_mask(kinds, lambda t: issubclass(t, (list, tuple)))
+        is_text = _type_mask(kinds, lambda t: issubclass(t, str))
+
+        sequences = np.full(n, None, dtype=object)
+        sequences[is_native] = raw[is_native]
+        from_text = np.zeros(n, dtype=bool)
+        for pos in np.flatnonzero(is_text).tolist():
+            try:
+                parsed = json.loads(raw[pos])
+            except json.JSONDecodeError:
+                continue
+            if isinstance(parsed, (list, tuple)):
+                sequences[pos] = parsed
+                from_text[pos] = True
+        is_sequence = is_native | from_text
+
+        lengths = np.zeros(n, dtype=np.int64)
+        seq_rows = np.flatnonzero(is_sequence)
+        lengths[seq_rows] = np.fromiter(map(len, sequences[seq_rows]), dtype=np.int64, count=seq_rows.size)
+
+        fits = lengths[seq_rows] <= MAX_MATRIX_SLOTS
+        matrix_rows, slow_rows = seq_rows[fits], seq_rows[~fits]
+        row_lengths = lengths[matrix_rows]
+        slots = int(row_lengths.max()) if matrix_rows.size else 0
+        slot_mask = np.arange(slots) < row_lengths[:, None]
+
+        flat = np.fromiter(chain.from_iterable(sequences[matrix_rows]), dtype=object, count=int(row_lengths.sum()))
+        element_kinds = _types(flat)
+        flat_int = _type_mask(element_kinds, lambda t: issubclass(t, int))
+        flat_integer = flat_int | _type_mask(element_kinds, lambda t: issubclass(t, np.integer))
+
+        flat_values = np.zeros(len(flat), dtype=np.int64)
+        try:
+            flat_values[flat_integer] = flat[flat_integer].astype(np.int64)
+        except OverflowError:
+            # 超出 int64 的整数：所在行逐行验证
+            huge = np.zeros(len(flat), dtype=bool)
+            huge[flat_integer] = [not -(1 << 63) <= int(x) < (1 << 63) for x in flat[flat_integer].tolist()]
+            flat_values[flat_integer & ~huge] = flat[flat_integer & ~huge].astype(np.int64)
+            huge_matrix = np.zeros(slot_mask.shape, dtype=bool)
+            huge_matrix[slot_mask] = huge
+            keep = ~huge_matrix.any(axis=1)
+            slow_rows = np.sort(np.concatenate([slow_rows, matrix_rows[~keep]]))
+            # 整体重建，保持元素与行对齐
+            kept = np.repeat(keep, row_lengths)
+            matrix_rows, row_lengths, slot_mask = matrix_rows[keep], row_lengths[keep], slot_mask[keep]
+            flat_values, flat_int, flat_integer = flat_values[kept], flat_int[kept], flat_integer[kept]
+
+        values = np.zeros(slot_mask.shape, dtype=np.int64)
+        values[slot_mask] = flat_values
+        is_int = np.ones(slot_mask.shape, dtype=bool)
+        is_int[slot_mask] = flat_int
+        is_integer = np.ones(slot_mask.shape, dtype=bool)
+        is_integer[slot_mask] = flat_integer
+
+        return cls(sequences=sequences, is_sequence=is_sequence, from_text=from_text, lengths=lengths,
+                   matrix_rows=matrix_rows, values=values, slot_mask=slot_mask, is_int=is_int,
+                   is_integer=is_integer, slow_rows=slow_rows)
+
+    def _scatter(self, matrix_result: np.ndarray, row_check: Callable[[object], bool]) -> np.ndarray:
+        """合并矩阵行结果和逐行结果（非序列行为 False）"""
+        result = np.zeros(len(self.sequences), dtype=bool)
+        result[self.matrix_rows] = matrix_result
+        for pos in self.slow_rows.tolist():
+            result[pos] = row_check(self.sequences[pos])
+        return result
+
+    def count_ok(self, count: int) -> np.ndarray:
+        """号码数量正确的行"""
+        return self.is_sequence & (self.lengths == count)
+
+    def range_ok(self, max_value: int) -> np.ndarray:
+        """号码全部为 int 且在 [1, max_value] 内的行（空列表视为通过）"""
+        in_range = (self.values >= 1) & (self.values <= max_value) | ~self.slot_mask
+        return self._scatter((self.is_int & in_range).all(axis=1), lambda seq: row_range_ok(seq, max_value))
+
+    def distinct_ok(self) -> np.ndarray:
+        """号码不重复的行（整数元素用排序差分判断，其他元素按集合语义逐行判断）"""
+        integer_rows = self.is_integer.all(axis=1)
+        # 填充位置写入互不相同且小于任何元素的值，排序后不影响相邻差分
+        padding = np.iinfo(np.int64).min + np.arange(self.values.shape[1])
+        padded = np.where(self.slot_mask, self.values, padding)
+        ordered = np.sort(padded[integer_rows], axis=1)
+        result = np.zeros(len(self.sequences), dtype=bool)
+        result[self.matrix_rows[integer_rows]] = (np.diff(ordered, axis=1) != 0).all(axis=1)
+
+        # 含非整数元素（浮点数、字符串、嵌套列表等）或未进入矩阵的行按集合语义逐行判断，
+        # 按行顺序执行以保持不可哈希元素抛出异常的时机
+        python_rows = np.sort(np.concatenate([self.slow_rows, self.matrix_rows[~integer_rows]]))
+        for pos in python_rows.tolist():
+            result[pos] = row_distinct_ok(self.sequences[pos])
+        return result
+
+    def typed_ok(self, count: int) -> np.ndarray:
+        """原生 list/tuple、长度为 count 且元素均为 int/np.integer 的行（字符串不解析）"""
+        native = self.is_sequence & ~self.from_text & (self.lengths == count)
+        return native & self._scatter(self.is_integer.all(axis=1), lambda seq: row_typed_ok(seq, len(seq)))
+
+
+def number_range_ok(series: pd.Series, max_value: int) -> np.ndarray:
+    """单个号码列（如蓝球）在 [1, max_value] 内的行
+
+    Args:
+        series: 号码列
+        max_value: 号码最大值
+
+    Returns:
+        布尔数组
+    """
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else None
+    if kind in ('i', 'u', 'b', 'f'):
+        values = series.to_numpy()
+        return (values >= 1) & (values <= max_value)
+    return series.apply(lambda number: row_number_ok(number, max_value)).to_numpy(dtype=bool)
+
+
+def count_non_integers(series: pd.Series) -> int:
+    """统计不是 int/np.integer 的值个数（逐个取出时的 Python 类型）"""
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else None
+    if kind in ('i', 'u', 'b'):
+        return 0
+    if kind == 'f':
+        return len(series)
+    kinds = _types(series.to_numpy(dtype=object)) if kind == 'O' else _types(np.array(list(series), dtype=object))
+    return int((~_type_mask(kinds, lambda t: issubclass(t, (int, np.integer)))).sum())
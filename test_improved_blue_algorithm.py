@@ -9,11 +9,11 @@ import sys
 import os
 sys.path.insert(0, 'src')
 
-import json
 import pandas as pd
 import numpy as np
 from collections import Counter
 from core.generators.smart_generator import SmartNumberGenerator
+from core.storage import get_history_cache
 
 def test_improved_blue_algorithm():
     """测试改进的蓝球算法"""
@@ -21,14 +21,14 @@ def test_improved_blue_algorithm():
     
     # 加载真实数据
     try:
-        with open('data/ssq_history.json', 'r', encoding='utf-8') as f:
-            history_data = json.load(f)
+        # 通过历史缓存读取，包含追加日志中尚未合并的最新开奖
+        history_data = get_history_cache().get_records('data/ssq_history.json')
         
-        print(f"✓ 成功加载 {history_data['total_periods']} 期双色球历史数据")
+        print(f"✓ 成功加载 {len(history_data)} 期双色球历史数据")
         
         # 转换数据格式
         data_list = []
-        for item in history_data['data']:
+        for item in history_data:
             data_list.append({
                 'draw_num': item['draw_num'],
                 'draw_date': item['draw_date'],
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+混杂格式历史数据构造工具（向量化清洗、验证测试共用）
+"""
+
+import random
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def messy_numbers(rng: random.Random, width: int, max_value: int,
+                  extra: Optional[Callable[[List[int]], List]] = None):
+    """随机一组号码的某种写法（含各种格式和错误）
+
+    Args:
+        rng: 随机数生成器
+        width: 号码个数
+        max_value: 最大号码
+        extra: 由正确号码生成额外写法的函数（各测试关心的特殊错误）
+
+    Returns:
+        号码列表、元组、字符串或缺失值等
+    """
+    base = rng.sample(range(1, max_value + 1), width)
+    choices = [
+        base, base, base, base[:-1], base + [3], [base[0]] * width, [0] + base[1:], [-3] + base[1:],
+        [float(x) for x in base], [True] + base[1:], tuple(base), str(base), ','.join(map(str, base)),
+        ','.join(f'{x:02d}' for x in base), [str(x) for x in base], [np.int64(x) for x in base],
+        None, float('nan'), [], 'garbage'
+    ]
+    if extra is not None:
+        choices += extra(base)
+    return rng.choice(choices)
+
+
+def messy_frame(lottery_type: str, rows: int, seed: int, fields: Callable[[random.Random, int], Dict],
+                blue_values: Sequence = (), extra_numbers: Optional[Callable[[List[int]], List]] = None,
+                index: Optional[Sequence] = None) -> pd.DataFrame:
+    """构造混杂格式的历史数据
+
+    Args:
+        lottery_type: 彩票类型 ('ssq'/'dlt')
+        rows: 记录数
+        seed: 随机种子
+        fields: 生成第 i 条记录号码以外字段的函数
+        blue_values: 蓝球除正常号码、0、17 和缺失值以外的额外取值
+        extra_numbers: 号码列的额外写法，见 messy_numbers
+        index: 行索引（None 表示默认索引）
+
+    Returns:
+        历史数据 DataFrame
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        record = fields(rng, i)
+        if lottery_type == 'ssq':
+            record['red_numbers'] = messy_numbers(rng, 6, 33, extra_numbers)
+            record['blue_number'] = rng.choice([rng.randint(1, 16), 0, 17, None, *blue_values])
+        else:
+            record['front_numbers'] = messy_numbers(rng, 5, 35, extra_numbers)
+            record['back_numbers'] = messy_numbers(rng, 2, 12, extra_numbers)
+        records.append(record)
+    return pd.DataFrame(records, index=index)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+去热门接受表抽样器测试
+"""
+
+import itertools
+import unittest
+
+import numpy as np
+
+from src.core.generators.anti_popular import AntiPopularSampler, PopularityDetector, get_acceptance_table
+from src.core.generators.anti_popular.acceptance_sampler import main_hard_reject, main_scores
+from src.core.generators.smart_generator import SmartNumberGenerator
+from src.core.storage import get_combination_table
+
+SSQ_STRICT = {'max_score': 1, 'max_run': 2, 'max_same_last_digit': 2, 'odd_bounds': (2, 4),
+              'sum_bounds': (70, 140), 'max_red_overlap': 1, 'max_blue_dup': 1}
+DLT_MODERATE = {'max_score': 2, 'max_run': 2, 'max_same_last_digit': 2, 'odd_bounds': (1, 4),
+                'sum_bounds': (60, 120), 'max_front_overlap': 2, 'max_back_overlap': 1,
+                'avoid_back_consecutive': False}
+
+
+class TestAcceptanceSampler(unittest.TestCase):
+    """去热门接受表抽样器测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(22)
+
+    def test_scores_match_detector(self):
+        """测试全空间的热门度分数和硬性拒绝标记与逐注检测一致"""
+        for lottery_type, config in (('ssq', dict(SSQ_STRICT, sum_bounds=(80, 120))), ('dlt', DLT_MODERATE)):
+            table = get_combination_table(lottery_type)
+            scores = main_scores(table, config['sum_bounds'])
+            rejected = main_hard_reject(table, config)
+            for rank in self.rng.integers(0, len(table), 3000).tolist():
+                numbers = [int(n) for n in table.numbers[rank]]
+                if lottery_type == 'ssq':
+                    expected = PopularityDetector.calculate_ssq_score(numbers, 1, config['sum_bounds'])
+                    reject = PopularityDetector.check_hard_reject_ssq(numbers, 1, config)
+                else:
+                    expected = PopularityDetector.calculate_dlt_score(numbers, [1, 5])
+                    reject = PopularityDetector.check_hard_reject_dlt(numbers, [1, 5], config)
+                self.assertEqual(scores[rank], expected, numbers)
+                self.assertEqual(rejected[rank], reject, numbers)
+
+    def test_constraints_enforced(self):
+        """测试每注通过硬性规则和热门度阈值，且多注之间满足重叠约束（无需放宽）"""
+        sampler = AntiPopularSampler('dlt', DLT_MODERATE, rng=self.rng)
+        picks = sampler.sample(8)
+        self.assertEqual((sampler.main_rounds, sampler.extra_rounds), (1, 1))
+        for front, back, score in picks:
+            self.assertFalse(PopularityDetector.check_hard_reject_dlt(front, back, DLT_MODERATE))
+            self.assertEqual(PopularityDetector.calculate_dlt_score(front, back), score)
+            self.assertLessEqual(score, DLT_MODERATE['max_score'])
+        for (front1, back1, _), (front2, back2, _) in itertools.combinations(picks, 2):
+            self.assertLessEqual(len(set(front1) & set(front2)), 2)
+            self.assertLessEqual(len(set(back1) & set(back2)), 1)
+
+    def test_unreachable_threshold_raises(self):
+        """测试热门度阈值无法达到时抛出异常，而不是提高阈值"""
+        # 红球不含连号时生日化规则至少计 2 分
+        unreachable = dict(SSQ_STRICT, max_run=1)
+        with self.assertRaises(ValueError):
+            get_acceptance_table('ssq', unreachable)
+        with self.assertRaises(ValueError):
+            AntiPopularSampler('ssq', unreachable, rng=self.rng)
+
+        table = get_acceptance_table('ssq', dict(unreachable, max_score=2))
+        self.assertEqual(table.max_score, 2)
+        self.assertTrue(np.all(table.main_scores <= 2))
+
+    def test_presets_feasible(self):
+        """测试全部预设模式的接受表非空，且能选满较多注数"""
+        for lottery_type in ('ssq', 'dlt'):
+            for mode in ('strict', 'moderate', 'light'):
+                generator = SmartNumberGenerator(lottery_type)
+                generator.set_anti_popular_config(enabled=True, mode=mode)
+                config = generator.anti_popular_config[lottery_type]
+                self.assertGreater(len(get_acceptance_table(lottery_type, config)), 0, f'{lottery_type}/{mode}')
+                sampler = AntiPopularSampler(lottery_type, config, rng=self.rng)
+                self.assertEqual(len(sampler.sample(200)), 200, f'{lottery_type}/{mode}')
+
+    def test_constraints_hold_within_rounds(self):
+        """测试重叠约束用尽后开始新的一轮：选满 count 注，每轮内的号码两两满足约束"""
+        config = dict(DLT_MODERATE, max_back_overlap=0)
+        sampler = AntiPopularSampler('dlt', config, rng=self.rng)
+        picks = sampler.sample(14)
+        self.assertEqual(len(picks), 14)
+        # 两两不重叠的后区组合每轮最多 6 个
+        self.assertGreaterEqual(sampler.extra_rounds, 3)
+        backs = [back for _, back, _ in picks]
+        first_round = next(i for i in range(1, len(backs)) if any(set(backs[i]) & set(b) for b in backs[:i]))
+        self.assertLessEqual(first_round, 6)
+        for back1, back2 in itertools.combinations(backs[:first_round], 2):
+            self.assertFalse(set(back1) & set(back2))
+        for front, back, score in picks:
+            self.assertFalse(PopularityDetector.check_hard_reject_dlt(front, back, config))
+            self.assertLessEqual(score, config['max_score'])
+
+        sampler = AntiPopularSampler('ssq', dict(SSQ_STRICT, max_score=2, max_run=1), rng=self.rng)
+        picks = sampler.sample(40)
+        self.assertEqual(len(picks), 40)
+        self.assertGreater(sampler.extra_rounds, 1)
+        self.assertGreater(sampler.main_rounds, 1)
+        blues = [blue for _, blue, _ in picks]
+        # 可用蓝球为热门度为 0 的 12 个，每轮每个只用一次
+        self.assertFalse(set(blues) & {7, 8, 9, 10})
+        self.assertEqual(len(set(blues[:12])), 12)
+        self.assertEqual(sorted(blues[:12]), sorted(blues[12:24]))
+        reds = [set(red) for red, _, _ in picks]
+        first_round = next(i for i in range(1, len(reds)) if any(len(reds[i] & r) > 1 for r in reds[:i]))
+        for red1, red2 in itertools.combinations(reds[:first_round], 2):
+            self.assertLessEqual(len(red1 & red2), SSQ_STRICT['max_red_overlap'])
+
+
+if __name__ == '__main__':
+    unittest.main()
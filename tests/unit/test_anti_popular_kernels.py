@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+去热门批量检测函数测试
+用随机生成的号码（含未排序、重复、越界和空号码等情况）检查批量版本、单注版本与逐注参考实现的结果完全一致。
+"""
+
+import unittest
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+
+from src.core.generators.anti_popular import PopularityDetector, SequenceAnalyzer
+
+
+# ==================== 逐注参考实现（批量化之前的规则） ====================
+
+def ref_max_run(nums):
+    if not nums:
+        return 0
+    run, best = 1, 1
+    for i in range(1, len(nums)):
+        if nums[i] == nums[i - 1] + 1:
+            run += 1
+            best = max(best, run)
+        else:
+            run = 1
+    return best
+
+
+def ref_is_ap(seq):
+    if len(seq) <= 2:
+        return True
+    d = seq[1] - seq[0]
+    return all(seq[i] - seq[i - 1] == d for i in range(2, len(seq)))
+
+
+def ref_has_ap(seq, k):
+    if len(seq) < k:
+        return False
+    return any(ref_is_ap(sorted(comb)) for comb in combinations(seq, k))
+
+
+def ref_zones(nums, zones, max_num):
+    zone_size = max_num // zones
+    distribution = [0] * zones
+    for num in nums:
+        distribution[min((num - 1) // zone_size, zones - 1)] += 1
+    return distribution
+
+
+def ref_ssq_score(red, blue, sum_bounds):
+    score = 0
+    run = ref_max_run(red)
+    score += 5 if run >= 5 else 3 if run == 4 else 1 if run == 3 else 0
+    score += 5 if ref_is_ap(red) else 3 if ref_has_ap(red, 5) else 1 if ref_has_ap(red, 4) else 0
+    birth = sum(1 for x in red if x <= 31)
+    score += 3 if birth == 6 else 2 if birth >= 5 else 0
+    digits = Counter(x % 10 for x in red)
+    same = max(digits.values()) if digits else 0
+    score += 3 if same >= 4 else 2 if same == 3 else 0
+    mult5 = sum(1 for x in red if x % 5 == 0)
+    score += 3 if mult5 >= 4 else 1 if mult5 == 3 else 0
+    score += sum(1 for x in red if x % 2 == 1) in (0, 6)
+    score += not (sum_bounds[0] <= sum(red) <= sum_bounds[1])
+    zone = max(ref_zones(red, 3, 33))
+    score += 3 if zone == 6 else 1 if zone >= 5 else 0
+    return score + (7 <= blue <= 10)
+
+
+def ref_dlt_score(front, back):
+    score = 0
+    run = ref_max_run(front)
+    score += 4 if run >= 4 else 2 if run == 3 else 0
+    score += 4 if ref_is_ap(front) else 2 if ref_has_ap(front, 4) else 0
+    birth = sum(1 for x in front if x <= 31)
+    score += 4 if birth == 5 else 2 if birth >= 4 else 0
+    digits = Counter(x % 10 for x in front)
+    score += 2 if (max(digits.values()) if digits else 0) >= 3 else 0
+    score += 2 if sum(1 for x in front if x % 5 == 0) >= 3 else 0
+    score += sum(1 for x in front if x % 2 == 1) in (0, 5)
+    score += sum(front) < 60 or sum(front) > 120
+    return score + (len(back) == 2 and abs(back[0] - back[1]) == 1)
+
+
+def ref_reject(nums, config, default_odd, default_sum):
+    odd = sum(1 for x in nums if x % 2 == 1)
+    odd_bounds = config.get('odd_bounds', default_odd)
+    sum_bounds = config.get('sum_bounds', default_sum)
+    return (ref_max_run(nums) > config.get('max_run', 2)
+            or any(c > config.get('max_same_last_digit', 2) for c in Counter(x % 10 for x in nums).values())
+            or not odd_bounds[0] <= odd <= odd_bounds[1]
+            or not sum_bounds[0] <= sum(nums) <= sum_bounds[1])
+
+
+class TestAntiPopularKernels(unittest.TestCase):
+    """批量检测函数等价性测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(23)
+
+    def _random_rows(self, count, width, low, high, sort=False, distinct=False):
+        """随机号码矩阵"""
+        if distinct:
+            rows = np.array([self.rng.choice(np.arange(low, high + 1), width, replace=False) for _ in range(count)])
+        else:
+            rows = self.rng.integers(low, high + 1, (count, width))
+        rows = rows.reshape(count, width)
+        return np.sort(rows, axis=1) if sort else rows
+
+    def _cases(self):
+        """各种宽度和取值范围的号码矩阵"""
+        for width in range(0, 8):
+            yield self._random_rows(300, width, 1, 12)                   # 未排序、含重复
+            yield self._random_rows(300, width, 1, 35, sort=True)        # 已排序
+            yield self._random_rows(100, width, -20, 40)                 # 含越界号码
+        yield self._random_rows(2000, 6, 1, 33, sort=True, distinct=True)
+        yield self._random_rows(2000, 5, 1, 35, sort=True, distinct=True)
+        yield self._random_rows(50, 4, 10 ** 6, 10 ** 6 + 30)          # 超出 int16 的大号码
+        # 构造的等差、连号行
+        yield np.array([[1, 2, 3, 4, 5, 6], [3, 8, 13, 18, 23, 28], [1, 5, 9, 13, 20, 33], [2, 4, 6, 8, 9, 30]])
+
+    def test_sequence_kernels(self):
+        """测试 SequenceAnalyzer 的批量版本、单注版本与参考实现一致"""
+        for rows in self._cases():
+            lists = rows.tolist()
+            with self.subTest(shape=rows.shape, low=int(rows.min()) if rows.size else None):
+                self.assertEqual(SequenceAnalyzer.max_consecutive_run_batch(rows).tolist(),
+                                 [ref_max_run(r) for r in lists])
+                self.assertEqual(SequenceAnalyzer.is_arithmetic_progression_batch(rows).tolist(),
+                                 [ref_is_ap(r) for r in lists])
+                for k in range(0, 7):
+                    self.assertEqual(SequenceAnalyzer.has_ap_k_of_m_batch(rows, k).tolist(),
+                                     [ref_has_ap(r, k) for r in lists])
+                self.assertEqual(SequenceAnalyzer.count_multiples_batch(rows, 5).tolist(),
+                                 [sum(1 for x in r if x % 5 == 0) for r in lists])
+                odd, even = SequenceAnalyzer.count_odd_even_batch(rows)
+                self.assertEqual(list(zip(odd.tolist(), even.tolist())),
+                                 [(sum(1 for x in r if x % 2 == 1), sum(1 for x in r if x % 2 != 1)) for r in lists])
+                self.assertEqual(SequenceAnalyzer.count_birthday_like_batch(rows, 31).tolist(),
+                                 [sum(1 for x in r if x <= 31) for r in lists])
+                digits = SequenceAnalyzer.last_digit_distribution_batch(rows)
+                self.assertEqual([Counter({d: c for d, c in enumerate(row) if c}) for row in digits.tolist()],
+                                 [Counter(x % 10 for x in r) for r in lists])
+                other = self._random_rows(len(rows), 4, 1, 12)
+                self.assertEqual(SequenceAnalyzer.overlap_count_batch(rows, other).tolist(),
+                                 [len(set(a) & set(b)) for a, b in zip(lists, other.tolist())])
+                if rows.size == 0 or rows.min() >= 1:
+                    self.assertEqual(SequenceAnalyzer.zone_distribution_batch(rows, 3, 33).tolist(),
+                                     [ref_zones(r, 3, 33) for r in lists])
+
+                for r in lists[:20]:
+                    self.assertEqual(SequenceAnalyzer.max_consecutive_run(r), ref_max_run(r))
+                    self.assertEqual(SequenceAnalyzer.has_ap_k_of_m(r, 4), ref_has_ap(r, 4))
+                    self.assertEqual(SequenceAnalyzer.last_digit_distribution(r), Counter(x % 10 for x in r))
+                    self.assertEqual(SequenceAnalyzer.count_odd_even(r),
+                                     (sum(1 for x in r if x % 2 == 1), sum(1 for x in r if x % 2 != 1)))
+
+    def test_argument_errors(self):
+        """测试不满足前置条件的参数报 ValueError；大于最大号码的号码计入最后一个区间"""
+        self.assertEqual(SequenceAnalyzer.zone_distribution([1, 12, 40], 3, 33), [1, 1, 1])
+        for nums, zones, max_num in (([0, 12], 3, 33), ([-40], 3, 33), ([1], 3, 2), ([1], 0, 33)):
+            with self.subTest(nums=nums, zones=zones, max_num=max_num):
+                with self.assertRaises(ValueError):
+                    SequenceAnalyzer.zone_distribution(nums, zones, max_num)
+        with self.assertRaises(ValueError):
+            SequenceAnalyzer.count_multiples([5, 10], 0)
+        with self.assertRaises(ValueError):
+            SequenceAnalyzer.has_ap_k_of_m([1, 2, 3], -1)
+
+    def test_popularity_scores(self):
+        """测试热门度分数与硬性拒绝的批量版本、单注版本与参考实现一致"""
+        configs = ({}, {'max_run': 1, 'max_same_last_digit': 1, 'odd_bounds': (3, 3), 'sum_bounds': (90, 110)})
+        for reds in (self._random_rows(3000, 6, 1, 33, sort=True, distinct=True),
+                     self._random_rows(500, 6, 1, 33), self._random_rows(300, 7, 1, 40)):
+            blues = self.rng.integers(1, 17, len(reds))
+            expected = [ref_ssq_score(r, b, (80, 120)) for r, b in zip(reds.tolist(), blues.tolist())]
+            self.assertEqual(PopularityDetector.calculate_ssq_scores(reds, blues, (80, 120)).tolist(), expected)
+            self.assertEqual([PopularityDetector.calculate_ssq_score(r, b, (80, 120))
+                              for r, b in zip(reds.tolist()[:50], blues.tolist()[:50])], expected[:50])
+            for config in configs:
+                self.assertEqual(PopularityDetector.check_hard_reject_ssq_batch(reds, config).tolist(),
+                                 [ref_reject(r, config, (2, 4), (70, 140)) for r in reds.tolist()])
+
+        fronts = self._random_rows(3000, 5, 1, 35, sort=True, distinct=True)
+        backs = self._random_rows(3000, 2, 1, 12, sort=True, distinct=True)
+        expected = [ref_dlt_score(f, b) for f, b in zip(fronts.tolist(), backs.tolist())]
+        self.assertEqual(PopularityDetector.calculate_dlt_scores(fronts, backs).tolist(), expected)
+        self.assertEqual([PopularityDetector.calculate_dlt_score(f, b)
+                          for f, b in zip(fronts.tolist()[:50], backs.tolist()[:50])], expected[:50])
+        for config in configs + ({'avoid_back_consecutive': True},):
+            consecutive = (backs[:, 1] - backs[:, 0] == 1) & config.get('avoid_back_consecutive', False)
+            self.assertEqual(PopularityDetector.check_hard_reject_dlt_batch(fronts, backs, config).tolist(),
+                             [ref_reject(f, config, (1, 4), (60, 120)) or bool(c)
+                              for f, c in zip(fronts.tolist(), consecutive.tolist())])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按期数有界加载测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest.mock import call, patch
+
+import pandas as pd
+
+from src.core.data_manager import LotteryDataManager
+from src.core.storage import get_history_cache
+
+
+def _make_dlt_records(count):
+    records = []
+    start = date(2021, 1, 2)
+    for i in range(count):
+        front = sorted({(i * 7 + k * 5) % 35 + 1 for k in range(5)})
+        while len(front) < 5:
+            front = sorted(set(front) | {len(front) + 30})
+        records.append({
+            'draw_num': f'{21001 + i}',
+            'draw_date': (start + timedelta(days=3 * i)).isoformat(),
+            'front_numbers': front,
+            'back_numbers': [i % 12 + 1, (i + 5) % 12 + 1] if i % 12 != (i + 5) % 12 else [1, 2],
+            'prize_pool': str(800000000 + i),
+            'sales': '' if i == 3 else str(300000000 + i),
+            'first_prize_num': i % 4,
+            'first_prize_amount': f'{10000 + i:,}',
+        })
+    records.reverse()
+    return records
+
+
+class TestBoundedHistory(unittest.TestCase):
+    """有界加载测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.data_manager = LotteryDataManager(self.test_dir)
+        self.records = _make_dlt_records(400)
+        with open(self.data_manager.data_files['dlt'], 'w', encoding='utf-8') as f:
+            json.dump({'fetch_time': '2024-01-01 00:00:00', 'total_periods': len(self.records),
+                       'data': self.records}, f, ensure_ascii=False)
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def test_bounded_matches_full(self):
+        """测试有界加载结果与全量加载后截取一致（含 dtype）"""
+        full = self.data_manager._load_history_from_json('dlt')
+        for periods in (1, 50, 100, 200):
+            get_history_cache().invalidate()
+            df = self.data_manager.get_history_data('dlt', periods=periods)
+            pd.testing.assert_frame_equal(df, full.head(periods))
+
+    def test_only_window_is_cleaned(self):
+        """测试有界加载只清洗最新窗口内的记录"""
+        cleaner = self.data_manager.cleaners['dlt']
+        original = cleaner.clean_data
+        sizes = []
+
+        def spy(data, *args, **kwargs):
+            sizes.append(len(data))
+            return original(data, *args, **kwargs)
+
+        cleaner.clean_data = spy
+        df = self.data_manager.get_history_data('dlt', periods=50)
+        self.assertEqual(len(df), 50)
+        self.assertEqual(sizes, [64])
+
+        # 全量数据已缓存后直接截取，不再清洗
+        self.data_manager.get_history_data('dlt')
+        sizes.clear()
+        self.data_manager.get_history_data('dlt', periods=50)
+        self.assertEqual(sizes, [])
+
+    def test_fresh_store_reads_newest_rows(self):
+        """测试列式存储同步时只读取最新窗口内的行"""
+        full = self.data_manager.get_history_data('dlt')
+        store = self.data_manager._get_columnar_store('dlt')
+        self.assertTrue(self.data_manager._columnar_store_fresh('dlt'))
+
+        get_history_cache().invalidate()
+        with patch.object(store, 'load_frame', wraps=store.load_frame) as load_frame:
+            df = self.data_manager.get_history_data('dlt', periods=50)
+        self.assertEqual(load_frame.call_args_list, [call(64)])
+        pd.testing.assert_frame_equal(df, full.head(50))
+
+    def test_insufficient_window_falls_back(self):
+        """测试请求期数超过全部记录时返回全部数据"""
+        df = self.data_manager.get_history_data('dlt', periods=1000)
+        self.assertEqual(len(df), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分支定界搜索测试
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.core.evaluators.branch_bound import branch_bound_top_k
+from src.core.evaluators.dlt_evaluator import DLTNumberEvaluator
+from src.core.evaluators.sharded_search import SearchSpace, history_exact_keys, number_masks, search_top_k
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import get_history_cache
+
+
+class TestBranchBound(unittest.TestCase):
+    """分支定界搜索测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(19)
+        self.test_dir = tempfile.mkdtemp()
+        self.ssq_file = os.path.join(self.test_dir, 'ssq_history.json')
+        self.dlt_file = os.path.join(self.test_dir, 'dlt_history.json')
+        self.ssq_history = [{'draw_num': str(3000 - i),
+                             'red_numbers': sorted(int(n) for n in self.rng.choice(33, 6, replace=False) + 1),
+                             'blue_number': int(self.rng.integers(1, 17))} for i in range(150)]
+        self.dlt_history = [{'draw_num': str(3000 - i),
+                             'front_numbers': sorted(int(n) for n in self.rng.choice(35, 5, replace=False) + 1),
+                             'back_numbers': sorted(int(n) for n in self.rng.choice(12, 2, replace=False) + 1)}
+                            for i in range(150)]
+        for path, history in ((self.ssq_file, self.ssq_history), (self.dlt_file, self.dlt_history)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'data': history}, f)
+
+    def tearDown(self):
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    @staticmethod
+    def _plain(results):
+        return [(round(score, 6), item.tolist()) for score, item in results]
+
+    def test_bounds_admissible(self):
+        """测试上界不低于实际得分（排除与历史完全一致的号码，允许 0.05 的舍入）"""
+        cases = ((SSQNumberEvaluator(self.ssq_file), 'ssq', self.ssq_history, 33, 6, 16, 1),
+                 (SSQNumberEvaluator(self.ssq_file, missing_curve='gaussian'), 'ssq', self.ssq_history, 33, 6, 16, 1),
+                 (DLTNumberEvaluator(self.dlt_file), 'dlt', self.dlt_history, 35, 5, 12, 2))
+        for evaluator, lottery_type, history, main_max, main_count, extra_max, extra_count in cases:
+            mains = np.sort([self.rng.choice(main_max, main_count, replace=False) + 1 for _ in range(3000)], axis=1)
+            extras = np.sort([self.rng.choice(extra_max, extra_count, replace=False) + 1 for _ in range(3000)],
+                             axis=1)
+            # 加入与历史主区相同、副区不同的号码
+            field = 'red_numbers' if lottery_type == 'ssq' else 'front_numbers'
+            mains[:20] = [draw[field] for draw in history[:20]]
+            keys = (number_masks(mains) << extra_max) | number_masks(extras)
+            regular = ~np.isin(keys, history_exact_keys(SearchSpace.for_lottery(lottery_type), history))
+            totals = evaluator.evaluate_many(mains, extras if extra_count > 1 else extras[:, 0])['total']
+
+            bounds = evaluator.score_bounds()
+            for chosen in range(main_count + 1):
+                rest = mains[:, chosen:]
+                upper = bounds.upper(mains[:, :chosen], bounds.freq_values[rest].sum(axis=1),
+                                     bounds.missing_values[rest].sum(axis=1)) + bounds.extra_scores(extras)
+                self.assertTrue(np.all(totals[regular] <= upper[regular] + 0.05 + 1e-9),
+                                f'{lottery_type} chosen={chosen}')
+
+    def test_matches_exhaustive(self):
+        """测试结果（含并列及顺序）与全量评分一致，且只评分少量号码"""
+        cases = (('ssq', self.ssq_history, {'history_file': self.ssq_file}, range(1, 17), None),
+                 ('ssq', self.ssq_history, {'history_file': self.ssq_file, 'missing_curve': 'gaussian'},
+                  range(5, 25), lambda reds: reds.sum(axis=1) >= 80),
+                 ('dlt', self.dlt_history, {'history_file': self.dlt_file}, range(3, 19), None))
+        for lottery_type, history, options, pool, main_filter in cases:
+            space = SearchSpace.for_lottery(lottery_type, pool, main_filter)
+            for top_k in (1, 10):
+                expected = search_top_k(space, top_k, history, options)
+                result = branch_bound_top_k(space, top_k, history, options)
+                self.assertEqual(self._plain(result.results), self._plain(expected.results),
+                                 f'{lottery_type} {options} top_k={top_k}')
+                self.assertLess(result.scored, expected.checked / 2)
+
+    def test_progress(self):
+        """测试进度回调在结束时报告完成"""
+        calls = []
+        space = SearchSpace.for_lottery('ssq', range(1, 13))
+        branch_bound_top_k(space, 3, self.ssq_history, {'history_file': self.ssq_file},
+                           progress=lambda done, total, eta: calls.append((done, total)))
+        self.assertTrue(calls)
+        self.assertEqual(calls[-1][0], calls[-1][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量候选号码工厂测试
+"""
+
+import unittest
+
+import numpy as np
+
+from src.core.generators.candidate_factory import (CandidateFactory, blue_probabilities, gumbel_top_k,
+                                                   pool_masks)
+from src.core.models import DLTNumber, SSQNumber
+
+
+class TestCandidateFactory(unittest.TestCase):
+    """批量候选工厂测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(21)
+        self.ssq_pools = {
+            'red': {'hot': [1, 5, 9, 13, 17, 21, 25], 'cold': [2, 6, 10, 14, 18, 22, 26],
+                    'normal': [n for n in range(1, 34) if n % 4 not in (1, 2) or n > 26]},
+            'blue_analysis': {},
+        }
+        self.dlt_pools = {
+            'front': {'hot': [1, 2, 3, 4, 5, 6, 7], 'cold': [29, 30, 31, 32, 33, 34, 35],
+                      'normal': list(range(8, 29))},
+            'back': {'hot': [1, 2, 3], 'cold': [10, 11, 12], 'normal': list(range(4, 10))},
+        }
+
+    def test_gumbel_top_k(self):
+        """测试逐行在掩码内抽取指定个数，可选位置不足时全部选中"""
+        mask = np.zeros((3000, 10), dtype=bool)
+        mask[:, :6] = True
+        mask[2000:, 2:] = False
+        k = np.full(3000, 3)
+        selected = gumbel_top_k(self.rng, mask, k)
+        self.assertFalse(np.any(selected & ~mask))
+        self.assertTrue(np.all(selected[:2000].sum(axis=1) == 3))
+        self.assertTrue(np.all(selected[2000:].sum(axis=1) == 2))
+        # 等概率：每个可选位置被选中的频率约为 1/2
+        self.assertTrue(np.allclose(selected[:2000, :6].mean(axis=0), 0.5, atol=0.05))
+
+    def test_recipe_conformance(self):
+        """测试每注号码严格符合配方，且升序、不重复"""
+        recipes = [(2, 1, 3), (2, 0, 4), (3, 0, 3)]
+        factory = CandidateFactory('ssq', self.ssq_pools, recipes, rng=self.rng)
+        tickets = factory.draw(3000)
+        self.assertEqual((tickets.dtype, tickets.shape), (np.int8, (3000, 7)))
+        reds = tickets[:, :6].astype(np.int64)
+        self.assertTrue(np.all(np.diff(reds, axis=1) > 0))
+        masks = pool_masks(self.ssq_pools['red'], 33)
+        counts = masks[:, reds - 1].sum(axis=2).T
+        expected = np.array(recipes)[np.arange(3000) % 3]
+        np.testing.assert_array_equal(counts, expected)
+        self.assertTrue(np.all((tickets[:, 6] >= 1) & (tickets[:, 6] <= 16)))
+
+        factory = CandidateFactory('dlt', self.dlt_pools, [(2, 1, 2)], back_recipe=(1, 1, 0), rng=self.rng)
+        tickets = factory.draw(1000).astype(np.int64)
+        self.assertTrue(np.all(np.isin(tickets[:, 5], [1, 2, 3])))
+        self.assertTrue(np.all(np.isin(tickets[:, 6], [10, 11, 12])))
+        numbers = factory.to_numbers(tickets[:2])
+        self.assertIsInstance(numbers[0], DLTNumber)
+        self.assertEqual(numbers[0].front, tickets[0, :5].tolist())
+
+    def test_small_pools_filled(self):
+        """测试号码池不足时与逐注规则一致：温号补足，仍不足时从全部号码补足"""
+        pools = {'red': {'hot': [1, 2], 'cold': [33], 'normal': [10]}, 'blue_analysis': {}}
+        factory = CandidateFactory('ssq', pools, [(3, 2, 1)], rng=self.rng)
+        tickets = factory.draw(500).astype(np.int64)
+        reds = tickets[:, :6]
+        self.assertTrue(np.all(np.diff(reds, axis=1) > 0))
+        for number in (1, 2, 10, 33):
+            self.assertTrue(np.all((reds == number).any(axis=1)))
+        self.assertIsInstance(factory.to_numbers(tickets[:1])[0], SSQNumber)
+
+    def test_blue_probabilities(self):
+        """测试增强方法的蓝球概率与逐注算法的计算一致（不含随机性因子时）"""
+        analysis = {name: {num: (num * k % 17) / 17 for num in range(1, 17)}
+                    for k, name in enumerate(['frequency_scores', 'missing_scores', 'trend_scores',
+                                              'pattern_scores'], start=3)}
+        weights = {'frequency': 0.4, 'missing': 0.3, 'trend': 0.2, 'pattern': 0.1, 'random': 0.0}
+        scores = [sum(weights[name.split('_')[0]] * analysis[name][num] for name in analysis)
+                  for num in range(1, 17)]
+        adjusted = np.array(scores) - min(scores) + 0.1
+        probabilities = blue_probabilities(self.rng, analysis, 'enhanced', weights, 4)
+        np.testing.assert_allclose(probabilities, np.tile(adjusted / adjusted.sum(), (4, 1)))
+
+        ensemble = blue_probabilities(self.rng, analysis, 'ensemble', dict(weights, random=0.05), 5000)
+        np.testing.assert_allclose(ensemble.sum(axis=1), 1.0)
+        best = max(analysis['missing_scores'].items(), key=lambda x: x[1])[0]
+        self.assertAlmostEqual((ensemble[:, best - 1] == 1.0).mean(), 0.2, delta=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+列式开奖数据存储测试
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.core.data_manager import LotteryDataManager
+from src.core.storage import ColumnarDrawStore
+
+
+def _write_history(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'fetch_time': '2024-01-10 00:00:00', 'total_periods': len(records), 'data': records},
+                  f, ensure_ascii=False, indent=2)
+
+
+class TestColumnarStore(unittest.TestCase):
+    """列式存储测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.data_manager = LotteryDataManager(self.test_dir)
+        self.ssq_records = [
+            {'draw_num': '2024003', 'draw_date': '2024-01-07', 'red_numbers': [3, 9, 14, 21, 28, 33],
+             'blue_number': 5, 'prize_pool': 1500000000, 'sales': 350000000,
+             'first_prize_num': 6, 'first_prize_amount': 6000000},
+            {'draw_num': '2024002', 'draw_date': '2024-01-04', 'red_numbers': [1, 8, 12, 19, 25, 30],
+             'blue_number': 16, 'prize_pool': 1400000000, 'sales': 340000000,
+             'first_prize_num': 3, 'first_prize_amount': 7000000},
+            {'draw_num': '2024001', 'draw_date': '2024-01-02', 'red_numbers': [2, 7, 11, 17, 22, 32],
+             'blue_number': 1, 'prize_pool': 1300000000, 'sales': 330000000,
+             'first_prize_num': 10, 'first_prize_amount': 5000000},
+        ]
+        self.dlt_records = [
+            {'draw_num': '24002', 'draw_date': '2024-01-03', 'front_numbers': [4, 11, 19, 27, 35],
+             'back_numbers': [2, 9], 'prize_pool': '812345678.5', 'sales': '',
+             'first_prize_num': 2, 'first_prize_amount': '10,000,000'},
+            {'draw_num': '24001', 'draw_date': '2024-01-01', 'front_numbers': [1, 6, 13, 22, 30],
+             'back_numbers': [3, 12], 'prize_pool': '800000000', 'sales': '300000000',
+             'first_prize_num': 1, 'first_prize_amount': '9,000,000'},
+        ]
+        _write_history(self.data_manager.data_files['ssq'], self.ssq_records)
+        _write_history(self.data_manager.data_files['dlt'], self.dlt_records)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+
+    def test_store_matches_json_pipeline(self):
+        """测试列式存储还原的数据与 JSON 流程一致"""
+        for lottery_type in ('ssq', 'dlt'):
+            expected = self.data_manager._load_history_from_json(lottery_type)
+            first = self.data_manager.get_history_data(lottery_type)
+            store = self.data_manager._get_columnar_store(lottery_type)
+            self.assertTrue(store.is_fresh(self.data_manager.data_files[lottery_type],
+                                           self.data_manager._columnar_build_key()))
+            second = self.data_manager.get_history_data(lottery_type)
+            pd.testing.assert_frame_equal(first, expected)
+            pd.testing.assert_frame_equal(second, expected)
+
+    def test_periods_and_arrays(self):
+        """测试期数截取和原始数组访问"""
+        df = self.data_manager.get_history_data('ssq', periods=2)
+        self.assertEqual(len(df), 2)
+
+        arrays = self.data_manager.get_history_arrays('ssq')
+        self.assertEqual(len(arrays), 3)
+        self.assertEqual(arrays.numbers['red'].dtype, np.uint8)
+        self.assertEqual(arrays.numbers['red'].shape, (3, 6))
+        self.assertEqual(arrays.numbers['blue'][:, 0].tolist(), [5, 16, 1])
+        self.assertEqual(arrays.draw_num.dtype, np.int32)
+
+        dlt_arrays = self.data_manager.get_history_arrays('dlt')
+        self.assertAlmostEqual(dlt_arrays.get_value('prize_pool')[0], 812345678.5)
+
+    def test_stale_store_is_rebuilt(self):
+        """测试 JSON 文件变化后存储自动失效"""
+        self.data_manager.get_history_data('ssq')
+        new_record = dict(self.ssq_records[0], draw_num='2024004', draw_date='2024-01-09')
+        _write_history(self.data_manager.data_files['ssq'], [new_record] + self.ssq_records)
+
+        df = self.data_manager.get_history_data('ssq')
+        self.assertEqual(len(df), 4)
+        pd.testing.assert_frame_equal(df, self.data_manager._load_history_from_json('ssq'))
+
+    def test_touch_keeps_store_fresh(self):
+        """测试仅修改时间变化时存储仍然有效"""
+        self.data_manager.get_history_data('ssq')
+        file_path = self.data_manager.data_files['ssq']
+        stat = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        store = self.data_manager._get_columnar_store('ssq')
+        self.assertTrue(store.is_fresh(file_path, self.data_manager._columnar_build_key()))
+
+    def test_unsupported_frame_is_skipped(self):
+        """测试不符合定长格式的数据不写入存储"""
+        store = ColumnarDrawStore(os.path.join(self.test_dir, 'store'), 'ssq')
+        df = pd.DataFrame({
+            'draw_num': ['2024001'],
+            'draw_date': pd.to_datetime(['2024-01-01']),
+            'red_numbers': [[1, 2, 3]],
+            'blue_number': [1],
+        })
+        self.assertFalse(store.write(df, self.data_manager.data_files['ssq']))
+        self.assertIsNone(store.load_frame())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+号码组合属性表测试
+"""
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from src.core.config_manager import get_config_manager
+from src.core.storage import CombinationTable, get_combination_table
+from src.core.storage.combination_table import default_cache_dir
+
+
+def _attributes(numbers, zones):
+    """逐注计算的参考属性"""
+    diffs = {b - a for a, b in itertools.combinations(numbers, 2)}
+    run = best = 1
+    for a, b in zip(numbers, numbers[1:]):
+        run = run + 1 if b == a + 1 else 1
+        best = max(best, run)
+    counts = [sum(1 for n in numbers if low <= n <= high) for low, high in zones]
+    return {
+        'sum': sum(numbers), 'odd': sum(n % 2 for n in numbers), 'big': sum(1 for n in numbers if n >= 18),
+        'zone1': counts[0], 'zone2': counts[1], 'zone3': counts[2], 'zones': sum(1 for c in counts if c),
+        'span': numbers[-1] - numbers[0], 'ac': len(diffs) - (len(numbers) - 1), 'max_run': best,
+        'tails': dict(Counter(n % 10 for n in numbers)),
+    }
+
+
+class TestCombinationTable(unittest.TestCase):
+    """组合属性表测试类"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_attributes_match(self):
+        """测试每个编号的组合和属性与逐注计算一致"""
+        table = CombinationTable.build('dlt')
+        combos = list(itertools.combinations(range(1, 36), 5))
+        self.assertEqual(len(table), len(combos))
+        colex = sorted(combos, key=lambda c: c[::-1])
+        self.assertEqual([tuple(row) for row in table.numbers[:1000].tolist()], colex[:1000])
+
+        rng = np.random.default_rng(20)
+        for rank in rng.integers(0, len(table), 500).tolist() + [len(table) - 1]:
+            numbers = [int(n) for n in table.numbers[rank]]
+            self.assertEqual(table.rank(numbers[::-1]), rank)
+            self.assertEqual(table.row(numbers), _attributes(numbers, ((1, 12), (13, 24), (25, 35))))
+
+    def test_mask(self):
+        """测试条件掩码与逐注筛选一致"""
+        table = CombinationTable.build('dlt')
+        mask = table.mask(odd=(2, 3), zones=3, sum=[60, 61, 62]) & (table.count_in(20, 35) >= 2)
+        expected = [c for c in itertools.combinations(range(1, 36), 5)
+                    if 2 <= sum(n % 2 for n in c) <= 3 and sum(c) in (60, 61, 62)
+                    and _attributes(list(c), ((1, 12), (13, 24), (25, 35)))['zones'] == 3
+                    and sum(1 for n in c if n >= 20) >= 2]
+        self.assertEqual(sorted(map(tuple, table.combinations(mask).tolist())), expected)
+        rows = np.array([expected[0], [1, 2, 3, 4, 5]])
+        self.assertEqual(table.contains(mask, rows).tolist(), [True, False])
+
+    def test_cached_memory_map(self):
+        """测试首次构建后保存，之后以只读内存映射读取；版本不符时重建"""
+        table = get_combination_table('ssq', self.test_dir)
+        self.assertIs(get_combination_table('ssq', self.test_dir), table)
+        self.assertIsInstance(table['sum'], np.memmap)
+        self.assertFalse(table['sum'].flags.writeable)
+        self.assertEqual(len(table), 1107568)
+        self.assertEqual(table.row([1, 2, 3, 31, 32, 33])['max_run'], 3)
+
+        loaded = CombinationTable.load(os.path.join(self.test_dir, 'ssq'), 'ssq')
+        self.assertEqual(loaded['ac'][123456], table['ac'][123456])
+        meta_path = os.path.join(self.test_dir, 'ssq', 'meta.json')
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, version=0), f)
+        self.assertIsNone(CombinationTable.load(os.path.join(self.test_dir, 'ssq'), 'ssq'))
+
+    def test_default_cache_dir_independent_of_cwd(self):
+        """测试默认缓存目录取自配置的数据目录，与当前工作目录无关"""
+        expected = default_cache_dir()
+        self.assertTrue(expected.is_absolute())
+        self.assertEqual(expected.parts[-2:], ('cache', 'combinations'))
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.test_dir)
+            self.assertEqual(default_cache_dir(), expected)
+        finally:
+            os.chdir(cwd)
+
+        with patch.object(get_config_manager(), 'get_data_path', return_value=self.test_dir):
+            self.assertEqual(default_cache_dir(), Path(self.test_dir) / 'cache' / 'combinations')
+
+
+if __name__ == '__main__':
+    unittest.main()
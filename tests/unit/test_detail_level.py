@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+评价结果详细程度（detail_level）测试
+"""
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.core.evaluators.dlt_evaluator import DLTNumberEvaluator
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import get_history_cache
+
+
+class TestDetailLevel(unittest.TestCase):
+    """detail_level 测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.rng = np.random.default_rng(15)
+        self.test_dir = tempfile.mkdtemp()
+        self.ssq_file = os.path.join(self.test_dir, 'ssq_history.json')
+        self.dlt_file = os.path.join(self.test_dir, 'dlt_history.json')
+        self.ssq_history = [{'draw_num': str(3000 - i),
+                             'red_numbers': sorted(int(n) for n in self.rng.choice(33, 6, replace=False) + 1),
+                             'blue_number': int(self.rng.integers(1, 17))} for i in range(120)]
+        self.dlt_history = [{'draw_num': str(3000 - i),
+                             'front_numbers': sorted(int(n) for n in self.rng.choice(35, 5, replace=False) + 1),
+                             'back_numbers': sorted(int(n) for n in self.rng.choice(12, 2, replace=False) + 1)}
+                            for i in range(120)]
+        for path, history in ((self.ssq_file, self.ssq_history), (self.dlt_file, self.dlt_history)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'data': history}, f)
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _ssq_tickets(self):
+        tickets = [([int(n) for n in self.rng.choice(33, 6, replace=False) + 1], int(self.rng.integers(1, 17)))
+                   for _ in range(200)]
+        draw = self.ssq_history[7]
+        return tickets + [(list(draw['red_numbers']), draw['blue_number'])]
+
+    def _dlt_tickets(self):
+        tickets = [([int(n) for n in self.rng.choice(35, 5, replace=False) + 1],
+                    [int(n) for n in self.rng.choice(12, 2, replace=False) + 1]) for _ in range(200)]
+        draw = self.dlt_history[7]
+        return tickets + [(list(draw['front_numbers']), list(draw['back_numbers']))]
+
+    def test_scores_match_full(self):
+        """测试 scores/summary 的得分与完整评价一致"""
+        for evaluator, tickets in ((SSQNumberEvaluator(self.ssq_file), self._ssq_tickets()),
+                                   (DLTNumberEvaluator(self.dlt_file), self._dlt_tickets())):
+            for periods in (None, 30):
+                for first, second in tickets:
+                    full = evaluator.evaluate(first, second, periods)
+                    for level in ('scores', 'summary'):
+                        result = evaluator.evaluate(first, second, periods, detail_level=level)
+                        for key in ('scores', 'total_score', 'rating', 'stars'):
+                            self.assertEqual(result[key], full[key], f'{level} {key} {first} {second}')
+                    summary = evaluator.evaluate(first, second, periods, detail_level='summary')
+                    self.assertIn('summary', summary)
+                    self.assertNotIn('summary', dict(evaluator.evaluate(first, second, periods,
+                                                                        detail_level='scores')))
+
+    def test_lazy_details(self):
+        """测试 scores 结果的明细在首次访问时才补算"""
+        evaluator = SSQNumberEvaluator(self.ssq_file)
+        red, blue = [1, 5, 12, 19, 26, 33], 9
+        full = evaluator.evaluate(red, blue)
+        result = evaluator.evaluate(red, blue, detail_level='scores')
+        self.assertFalse(dict.__contains__(result, 'frequency'))
+        self.assertIn('total_score', result)
+        self.assertFalse(dict.__contains__(result, 'frequency'))
+        self.assertEqual(result['frequency'], full['frequency'])
+        self.assertEqual(result.get('suggestions'), full['suggestions'])
+        self.assertEqual(dict(result), full)
+
+        # 检查详情键、遍历和序列化时同样补全详情
+        self.assertIn('pattern', evaluator.evaluate(red, blue, detail_level='scores'))
+        views = (len, sorted, lambda r: sorted(r.keys()), lambda r: dict(r.items()),
+                 lambda r: dict(zip(r.keys(), r.values())), lambda r: json.dumps(r, sort_keys=True, default=str))
+        for view in views:
+            self.assertEqual(view(evaluator.evaluate(red, blue, detail_level='scores')), view(full))
+
+        restored = pickle.loads(pickle.dumps(evaluator.evaluate(red, blue, detail_level='scores')))
+        self.assertEqual(restored, full)
+
+    def test_invalid_level(self):
+        """测试无效的 detail_level"""
+        evaluator = DLTNumberEvaluator(self.dlt_file)
+        with self.assertRaises(ValueError):
+            evaluator.evaluate([1, 2, 3, 4, 5], [1, 2], detail_level='brief')
+
+
+if __name__ == '__main__':
+    unittest.main()
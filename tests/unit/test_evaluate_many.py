@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量评分（evaluate_many）测试
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.core.evaluators.batch_scoring import StreamingTopK
+from src.core.evaluators.dlt_evaluator import DLTNumberEvaluator
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import get_history_cache
+
+
+def _random_ssq_history(rng, periods):
+    """随机生成双色球历史（最新一期在前），其中第 0 期与第 50 期号码相同"""
+    records = []
+    for i in range(periods):
+        records.append({'draw_num': str(2024000 + periods - i), 'draw_date': '2024-01-01',
+                        'red_numbers': sorted(int(n) for n in rng.choice(33, 6, replace=False) + 1),
+                        'blue_number': int(rng.integers(1, 17))})
+    records[50]['red_numbers'] = list(records[0]['red_numbers'])
+    records[50]['blue_number'] = records[0]['blue_number']
+    return records
+
+
+def _random_dlt_history(rng, periods):
+    """随机生成大乐透历史（最新一期在前），其中第 0 期与第 40 期号码相同"""
+    records = []
+    for i in range(periods):
+        records.append({'draw_num': str(24000 + periods - i), 'draw_date': '2024-01-01',
+                        'front_numbers': sorted(int(n) for n in rng.choice(35, 5, replace=False) + 1),
+                        'back_numbers': sorted(int(n) for n in rng.choice(12, 2, replace=False) + 1)})
+    records[40]['front_numbers'] = list(records[0]['front_numbers'])
+    records[40]['back_numbers'] = list(records[0]['back_numbers'])
+    return records
+
+
+class TestSSQEvaluateMany(unittest.TestCase):
+    """双色球批量评分测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.rng = np.random.default_rng(11)
+        self.test_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.test_dir, 'ssq_history.json')
+        self.history = _random_ssq_history(self.rng, 300)
+        with open(self.history_file, 'w', encoding='utf-8') as f:
+            json.dump({'data': self.history}, f)
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _tickets(self, count):
+        """随机号码，混入与历史完全相同、红球相同蓝球不同和含重复号码的注"""
+        reds = np.argsort(self.rng.random((count, 33)), axis=1)[:, :6] + 1
+        blues = self.rng.integers(1, 17, count)
+        for i in range(20):
+            draw = self.history[int(self.rng.integers(len(self.history)))]
+            reds[i] = self.rng.permutation(draw['red_numbers'])
+            blues[i] = draw['blue_number'] if i % 2 else draw['blue_number'] % 16 + 1
+        reds[20:25, 1] = reds[20:25, 0]
+        reds[25] = self.history[0]['red_numbers']
+        blues[25] = self.history[0]['blue_number']
+        return reds, blues
+
+    def test_matches_evaluate(self):
+        """测试批量得分与逐注 evaluate 的得分完全一致"""
+        reds, blues = self._tickets(300)
+        for curve, blue_weight, periods in (('linear', 0.3, None), ('gaussian', 0.45, 30), ('linear', 0.0, 0)):
+            evaluator = SSQNumberEvaluator(self.history_file, freq_blue_weight=blue_weight,
+                                           missing_blue_weight=blue_weight, missing_curve=curve)
+            batch = evaluator.evaluate_many(reds, blues, periods)
+            for i in range(len(reds)):
+                expected = evaluator.evaluate(reds[i].tolist(), int(blues[i]), periods)['scores']
+                for key, values in batch.items():
+                    self.assertEqual(values[i], expected[key], f'{curve} 第 {i} 注 {key}')
+
+    def test_invalid_input(self):
+        """测试形状或号码范围错误时报错"""
+        evaluator = SSQNumberEvaluator(self.history_file)
+        with self.assertRaises(ValueError):
+            evaluator.evaluate_many(np.ones((3, 5), dtype=int), np.ones(3, dtype=int))
+        with self.assertRaises(ValueError):
+            evaluator.evaluate_many(np.array([[1, 2, 3, 4, 5, 34]]), np.array([1]))
+        with self.assertRaises(ValueError):
+            evaluator.evaluate_many(np.array([[1, 2, 3, 4, 5, 6]]), np.array([17]))
+        self.assertEqual(len(evaluator.evaluate_many(np.zeros((0, 6), dtype=int),
+                                                     np.zeros(0, dtype=int))['total']), 0)
+
+    def test_throughput(self):
+        """测试百万注评分在数秒内完成"""
+        evaluator = SSQNumberEvaluator(self.history_file)
+        reds = np.argsort(self.rng.random((1_000_000, 33)), axis=1)[:, :6] + 1
+        blues = self.rng.integers(1, 17, len(reds))
+        start_time = time.time()
+        totals = evaluator.evaluate_many(reds, blues)['total']
+        self.assertLess(time.time() - start_time, 10)
+        self.assertTrue(((totals >= 0) & (totals <= 100)).all())
+
+
+class TestDLTEvaluateMany(unittest.TestCase):
+    """大乐透批量评分测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.rng = np.random.default_rng(12)
+        self.test_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.test_dir, 'dlt_history.json')
+        self.history = _random_dlt_history(self.rng, 300)
+        with open(self.history_file, 'w', encoding='utf-8') as f:
+            json.dump({'data': self.history}, f)
+        self.evaluator = DLTNumberEvaluator(self.history_file)
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _tickets(self, count):
+        """随机号码，混入与历史完全或部分相同和含重复号码的注"""
+        fronts = np.argsort(self.rng.random((count, 35)), axis=1)[:, :5] + 1
+        backs = np.argsort(self.rng.random((count, 12)), axis=1)[:, :2] + 1
+        for i in range(30):
+            draw = self.history[int(self.rng.integers(len(self.history)))]
+            fronts[i] = self.rng.permutation(draw['front_numbers'])
+            if i % 3:
+                backs[i] = draw['back_numbers'][::-1]
+            if i % 3 == 2:
+                fronts[i, 0] = next(n for n in range(1, 36) if n not in draw['front_numbers'])
+        fronts[30:35, 1] = fronts[30:35, 0]
+        backs[35:40, 1] = backs[35:40, 0]
+        fronts[40] = self.history[0]['front_numbers']
+        backs[40] = self.history[0]['back_numbers']
+        return fronts, backs
+
+    def test_matches_evaluate(self):
+        """测试批量得分与逐注 evaluate 的得分完全一致"""
+        fronts, backs = self._tickets(300)
+        for periods in (None, 30, 0):
+            batch = self.evaluator.evaluate_many(fronts, backs, periods)
+            for i in range(len(fronts)):
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    expected = self.evaluator.evaluate(fronts[i].tolist(), backs[i].tolist(), periods)['scores']
+                for key, values in batch.items():
+                    self.assertEqual(values[i], expected[key], f'periods={periods} 第 {i} 注 {key}')
+
+    def test_invalid_input(self):
+        """测试形状或号码范围错误时报错"""
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate_many(np.ones((2, 5), dtype=int), np.ones((3, 2), dtype=int))
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate_many(np.array([[1, 2, 3, 4, 5]]), np.array([[1, 13]]))
+
+    def test_throughput(self):
+        """测试百万注评分在数秒内完成"""
+        fronts = np.argsort(self.rng.random((1_000_000, 35)), axis=1)[:, :5] + 1
+        backs = np.argsort(self.rng.random((len(fronts), 12)), axis=1)[:, :2] + 1
+        start_time = time.time()
+        totals = self.evaluator.evaluate_many(fronts, backs)['total']
+        self.assertLess(time.time() - start_time, 15)
+        self.assertTrue(((totals >= 0) & (totals <= 100)).all())
+
+
+class TestStreamingTopK(unittest.TestCase):
+    """流式前 K 名测试类"""
+
+    def test_matches_full_sort(self):
+        """测试分块流式选取与全部排序后按第 K 名截断（含并列）一致"""
+        rng = np.random.default_rng(17)
+        for k in (1, 5, 40):
+            scores = np.round(rng.normal(80, 5, 20000), 1)
+            items = np.arange(len(scores))
+            top = StreamingTopK(k)
+            for start in range(0, len(scores), 777):
+                top.push(scores[start:start + 777], items[start:start + 777])
+
+            ranked = sorted(zip(scores.tolist(), items.tolist()), key=lambda x: x[0], reverse=True)
+            cutoff = ranked[k - 1][0]
+            expected = [(s, i) for s, i in ranked if s >= cutoff or np.isclose(s, cutoff)]
+            self.assertEqual([(s, int(i)) for s, i in top.results()], expected)
+            self.assertEqual(top.seen, len(scores))
+
+        empty = StreamingTopK(3)
+        empty.push(np.zeros(0), np.zeros((0, 7)))
+        self.assertEqual(empty.results(), [])
+        with self.assertRaises(ValueError):
+            StreamingTopK(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对冲式多源获取测试（使用本地 HTTP 服务模拟慢速、失败和正常的数据源）
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ALL_COMPLETED, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+from src.core.data_manager import LotteryDataManager
+from src.core.hedged_fetcher import HedgedFetcher, SourceStatsRegistry
+
+SLOW_SECONDS = 1.5
+
+SPORTTERY_PAYLOAD = {
+    'success': True,
+    'value': {
+        'total': 2,
+        'list': [
+            {'lotteryDrawNum': '23002', 'lotteryDrawTime': '2023-01-04',
+             'lotteryDrawResult': '03 08 15 22 31 02 09'},
+            {'lotteryDrawNum': '23001', 'lotteryDrawTime': '2023-01-02',
+             'lotteryDrawResult': '01 05 12 20 33 04 11'},
+        ]
+    }
+}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """按路径模拟不同表现的数据源"""
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/slow':
+            time.sleep(SLOW_SECONDS)
+        if path == '/fail':
+            self.send_error(404)
+            return
+        body = SPORTTERY_PAYLOAD if path != '/empty' else {'success': False, 'message': 'empty'}
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHedgedFetcher(unittest.TestCase):
+    """对冲式获取测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _source(self, path):
+        def fetch(cancel_event):
+            response = requests.get(self.base_url + path, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        return path, fetch
+
+    def test_hedged_mode_skips_slow_source(self):
+        """测试最优数据源响应慢时，对冲延迟后启动的数据源胜出"""
+        stats = SourceStatsRegistry()
+        fetcher = HedgedFetcher(stats, mode='hedged', hedge_delay=0.1)
+
+        start_time = time.time()
+        result = fetcher.fetch([self._source('/slow'), self._source('/good')])
+        execution_time = time.time() - start_time
+
+        self.assertEqual(result.source, '/good')
+        self.assertEqual(result.value, SPORTTERY_PAYLOAD)
+        self.assertLess(execution_time, SLOW_SECONDS)
+        self.assertEqual(stats.get('/slow').cancelled, 1)
+        self.assertEqual(stats.get('/good').successes, 1)
+
+    def test_failures_trigger_next_source(self):
+        """测试失败或无效的数据源立即切换到下一个，全部失败时返回 None"""
+        stats = SourceStatsRegistry()
+        fetcher = HedgedFetcher(stats, mode='hedged', hedge_delay=30)
+        sources = [self._source('/fail'), self._source('/empty'), self._source('/good')]
+
+        start_time = time.time()
+        result = fetcher.fetch(sources, validate=lambda data: data.get('success'))
+        self.assertLess(time.time() - start_time, 5)
+
+        self.assertEqual(result.source, '/good')
+        self.assertEqual(stats.get('/fail').failures, 1)
+        self.assertEqual(stats.get('/empty').last_error, '返回数据无效')
+        self.assertIsNone(fetcher.fetch(sources[:2], validate=lambda data: data.get('success')))
+
+    def test_all_completed_requests_settled(self):
+        """测试同一轮完成的请求全部按结果结算，不计为取消"""
+        stats = SourceStatsRegistry()
+        fetcher = HedgedFetcher(stats, mode='parallel')
+        sources = [(name, lambda event, name=name: {'success': name != 'bad'}) for name in ('bad', 'good', 'also')]
+
+        # 等全部请求完成后再返回，使它们落在同一轮
+        with patch('src.core.hedged_fetcher.wait',
+                   side_effect=lambda fs, timeout=None, return_when=None: wait(fs, timeout, ALL_COMPLETED)):
+            result = fetcher.fetch(sources, validate=lambda data: data.get('success'))
+
+        self.assertEqual(result.source, 'good')
+        self.assertEqual((stats.get('bad').failures, stats.get('good').successes, stats.get('also').successes),
+                         (1, 1, 1))
+        self.assertEqual(sum(stats.get(name).cancelled for name in ('bad', 'good', 'also')), 0)
+
+    def test_fastest_healthy_source_first(self):
+        """测试统计持久化后，最快的健康数据源被优先尝试"""
+        path = f'{self.test_dir}/source_stats.json'
+        sources = [self._source('/fail'), self._source('/slow'), self._source('/good')]
+        HedgedFetcher(SourceStatsRegistry(path), mode='parallel').fetch(sources)
+        HedgedFetcher(SourceStatsRegistry(path, max_failures=1), mode='sequential').fetch(sources[:1])
+
+        stats = SourceStatsRegistry(path, max_failures=1)
+        self.assertEqual(stats.rank(['/fail', '/slow', '/good']), ['/good', '/slow', '/fail'])
+
+        calls = []
+        fetcher = HedgedFetcher(stats, mode='sequential')
+        result = fetcher.fetch([(name, lambda event, name=name: calls.append(name) or name)
+                                for name in ('/fail', '/slow', '/good')])
+        self.assertEqual(result.source, '/good')
+        self.assertEqual(calls, ['/good'])
+
+    def test_data_manager_fetch(self):
+        """测试数据管理器并发请求配置的备选数据源"""
+        data_manager = LotteryDataManager(self.test_dir)
+        backup_apis = [
+            {'name': name, 'url': f'{self.base_url}/{path}', 'type': 'sporttery', 'params': {}}
+            for name, path in (('慢速源', 'slow'), ('失败源', 'fail'), ('正常源', 'good'))
+        ]
+        overrides = {'api.backup_apis.dlt': backup_apis, 'api.fetch_mode': 'parallel'}
+        original_get = data_manager.config_manager.get
+
+        with patch.object(data_manager.config_manager, 'get',
+                          side_effect=lambda key, default=None: overrides.get(key, original_get(key, default))):
+            start_time = time.time()
+            items = data_manager._fetch_online_data_as_list('dlt')
+            execution_time = time.time() - start_time
+
+        self.assertEqual([item['draw_num'] for item in items], ['23002', '23001'])
+        self.assertEqual(items[0]['front_numbers'], [3, 8, 15, 22, 31])
+        self.assertLess(execution_time, SLOW_SECONDS)
+
+        stats = SourceStatsRegistry(f'{self.test_dir}/source_stats.json')
+        self.assertEqual(stats.get('正常源').successes, 1)
+        self.assertEqual(stats.rank(['慢速源', '失败源', '正常源'])[0], '正常源')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程级历史数据缓存测试
+"""
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+
+from src.core.storage import HistoryCache, ReadOnlyList, get_history_cache
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.data_manager import LotteryDataManager
+
+
+SSQ_RECORDS = [
+    {'draw_num': '2024002', 'draw_date': '2024-01-04', 'red_numbers': [1, 8, 12, 19, 25, 30],
+     'blue_number': 16, 'prize_pool': 1400000000, 'sales': 340000000,
+     'first_prize_num': 3, 'first_prize_amount': 7000000},
+    {'draw_num': '2024001', 'draw_date': '2024-01-02', 'red_numbers': [2, 7, 11, 17, 22, 32],
+     'blue_number': 1, 'prize_pool': 1300000000, 'sales': 330000000,
+     'first_prize_num': 10, 'first_prize_amount': 5000000},
+]
+
+
+def _write_history(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'fetch_time': '2024-01-10 00:00:00', 'total_periods': len(records), 'data': records},
+                  f, ensure_ascii=False, indent=2)
+
+
+class TestHistoryCache(unittest.TestCase):
+    """历史数据缓存测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.test_dir, 'ssq_history.json')
+        _write_history(self.history_file, SSQ_RECORDS)
+        self.cache = HistoryCache()
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate(self.history_file)
+        shutil.rmtree(self.test_dir)
+
+    def test_records_shared_and_readonly(self):
+        """测试记录只解析一次且为只读"""
+        first = self.cache.get_records(self.history_file)
+        second = self.cache.get_records(self.history_file)
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats['misses'], 1)
+        self.assertEqual(first, SSQ_RECORDS)
+
+        with self.assertRaises(TypeError):
+            first[0]['blue_number'] = 1
+        with self.assertRaises(TypeError):
+            first[0]['red_numbers'].append(33)
+        with self.assertRaises(TypeError):
+            first.append({})
+
+        restored = pickle.loads(pickle.dumps(first))
+        self.assertEqual(restored, SSQ_RECORDS)
+        self.assertIsInstance(restored, ReadOnlyList)
+
+    def test_invalidation_on_file_change(self):
+        """测试文件改写后自动失效，仅 touch 时沿用缓存"""
+        first = self.cache.get_records(self.history_file)
+
+        stat = os.stat(self.history_file)
+        os.utime(self.history_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIs(self.cache.get_records(self.history_file), first)
+
+        _write_history(self.history_file, SSQ_RECORDS[:1])
+        self.assertEqual(len(self.cache.get_records(self.history_file)), 1)
+
+    def test_concurrent_load_once(self):
+        """测试并发读取只加载一次"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return object()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                self.cache.get_or_load('test', self.history_file, loader)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(map(id, results))), 1)
+
+    def test_evaluators_share_history(self):
+        """测试多个评价器共享同一份历史数据"""
+        e1 = SSQNumberEvaluator(self.history_file)
+        e2 = SSQNumberEvaluator(self.history_file)
+        self.assertIs(e1.load_history(), e2.load_history())
+
+        e1.evaluate([1, 8, 12, 19, 25, 31], 16)
+        self.assertTrue(e1._cache)
+        _write_history(self.history_file, SSQ_RECORDS[:1])
+        self.assertEqual(len(e1.load_history()), 1)
+        self.assertFalse(e1._cache)
+
+    def test_data_manager_frame_view(self):
+        """测试数据管理器返回的 DataFrame 修改不影响缓存"""
+        _write_history(os.path.join(self.test_dir, 'dlt_history.json'), [])
+        manager = LotteryDataManager(self.test_dir)
+        df = manager.get_history_data('ssq')
+        df.loc[df.index[0], 'blue_number'] = 99
+        again = LotteryDataManager(self.test_dir).get_history_data('ssq')
+        self.assertEqual(again['blue_number'].iloc[0], 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+历史重复过滤器批量计算测试
+"""
+
+import copy
+import dataclasses
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.core.filters import HistoryDuplicateFilter
+from src.core.models import DLTNumber, SSQNumber
+
+
+def _random_records(rng, count):
+    """随机双色球历史（最新在前）"""
+    return [{'period': str(2000 + count - i),
+             'red_numbers': sorted(int(n) for n in rng.choice(33, 6, replace=False) + 1),
+             'blue_number': int(rng.integers(1, 17))} for i in range(count)]
+
+
+def _reference(candidate, records, config, max_allowed):
+    """逐期集合运算的参考实现: (是否通过, 重复度评分, 最大重复数, 期号)"""
+    score = 0.0
+    counts = []
+    for i, record in enumerate(records):
+        overlap = len(set(candidate.red) & set(record['red_numbers']))
+        counts.append(overlap)
+        score += overlap * (1.0 / (i + 1))
+        if config['exact_match_reject'] and overlap == 6 and candidate.blue == record['blue_number']:
+            return False, 100.0, overlap, record['period']
+        if i < config['recent_strict_periods'] and overlap > config['recent_max_overlap']:
+            return False, score, overlap, record['period']
+    best = max(counts)
+    period = records[counts.index(best)]['period'] if best > 0 else None
+    return best <= max_allowed, score, best, period
+
+
+class TestHistoryDuplicateFilter(unittest.TestCase):
+    """历史重复过滤器测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(24)
+        self.records = _random_records(self.rng, 150)
+        self.candidates = [SSQNumber(red=sorted(int(n) for n in self.rng.choice(33, 6, replace=False) + 1),
+                                     blue=int(self.rng.integers(1, 17))) for _ in range(400)]
+        # 与历史完全相同或高度重复的号码
+        for position in (3, 40, 99):
+            record = self.records[position]
+            self.candidates.append(SSQNumber(red=record['red_numbers'], blue=record['blue_number']))
+            self.candidates.append(SSQNumber(red=record['red_numbers'][:5] + [33 if record['red_numbers'][5] != 33 else 1],
+                                             blue=record['blue_number']))
+
+    def test_batch_matches_reference(self):
+        """测试批量结果与逐期计算一致"""
+        for config in ({}, {'exact_match_reject': False, 'recent_max_overlap': 2, 'max_red_overlap': 3}):
+            history_filter = HistoryDuplicateFilter('ssq', config)
+            results = history_filter.evaluate(self.candidates, self.records, 120)
+            self.assertEqual(len(results), len(self.candidates))
+            for candidate, result in zip(self.candidates, results):
+                valid, score, overlap, period = _reference(candidate, self.records[:120], history_filter.config,
+                                                           history_filter.config['max_red_overlap'])
+                self.assertEqual((result.is_valid, result.max_overlap, result.overlap_period),
+                                 (valid, overlap, period))
+                self.assertAlmostEqual(result.overlap_score, score)
+                self.assertEqual(result.reason is None, valid)
+
+            ranked = history_filter.filter_batch(self.candidates, self.records, 120)
+            scores = [result.overlap_score for _, result in ranked]
+            self.assertEqual(scores, sorted(scores))
+            single = history_filter.filter(self.candidates[-1], self.records, 120)
+            self.assertEqual(single, results[-1])
+
+    def test_dataframe_formats(self):
+        """测试 DataFrame 的列表列、字符串列和单独号码列与字典列表结果一致"""
+        history_filter = HistoryDuplicateFilter('ssq')
+        expected = history_filter.evaluate(self.candidates, self.records)
+        frame = pd.DataFrame(self.records)
+        split = pd.DataFrame({'period': frame['period'], 'blue': frame['blue_number']})
+        for k in range(6):
+            split[f'red_{k + 1}'] = [r[k] for r in frame['red_numbers']]
+        strings = frame.assign(red_numbers=[','.join(map(str, r)) for r in frame['red_numbers']])
+        for data in (frame, split, strings):
+            self.assertEqual(HistoryDuplicateFilter('ssq').evaluate(self.candidates, data), expected)
+
+        # 没有期号列时以行号作为期号
+        labels = HistoryDuplicateFilter('ssq').evaluate(self.candidates[-6:], frame.drop(columns='period'))
+        self.assertEqual([r.overlap_period for r in labels[::2]], ['3', '40', '99'])
+
+        dlt_records = [{'period': '1', 'front_numbers': '1,2,3,4,5', 'back_numbers': '1,2'}]
+        result = HistoryDuplicateFilter('dlt').filter(DLTNumber(front=[1, 2, 3, 4, 5], back=[1, 2]),
+                                                      pd.DataFrame(dlt_records))
+        self.assertEqual((result.is_valid, result.overlap_score, result.reason), (False, 100.0, '与1完全相同'))
+
+    def test_memoized_until_history_or_config_changes(self):
+        """测试重复查询直接返回缓存结果，历史数据或配置变化后重新计算"""
+        history_filter = HistoryDuplicateFilter('ssq')
+        first = history_filter.evaluate(self.candidates, self.records)
+        hits = history_filter._cache.stats['hits']
+        second = history_filter.evaluate(self.candidates, self.records)
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+        self.assertGreaterEqual(history_filter._cache.stats['hits'] - hits, len(self.candidates))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            first[0].is_valid = not first[0].is_valid
+
+        # 内容相同的另一份历史数据命中缓存；原地修改后重新计算
+        copied = copy.deepcopy(self.records)
+        self.assertTrue(all(a is b for a, b in zip(first, history_filter.evaluate(self.candidates, copied))))
+        candidate = self.candidates[0]
+        copied[0]['red_numbers'] = list(candidate.red)
+        self.assertEqual(history_filter.filter(candidate, copied).max_overlap, 6)
+
+        # 新开奖：与最新一期完全相同的号码被拒绝
+        newer = [{'period': '9999', 'red_numbers': candidate.red, 'blue_number': candidate.blue}] + self.records
+        self.assertEqual(history_filter.filter(candidate, newer).reason, '与9999完全相同')
+        self.records.insert(0, newer[0])
+        self.assertEqual(history_filter.filter(candidate, self.records).overlap_period, '9999')
+
+        history_filter.update_config(exact_match_reject=False, recent_max_overlap=6)
+        self.assertEqual(history_filter.filter(candidate, self.records).max_overlap, 6)
+        self.assertTrue(history_filter.filter(candidate, []).is_valid)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+历史数据追加日志测试
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.core.data_manager import LotteryDataManager
+from src.core.storage import HistoryJournal, get_history_cache
+
+
+def _ssq_record(draw_num, draw_date, blue=1):
+    return {'draw_num': draw_num, 'draw_date': draw_date, 'red_numbers': [1, 5, 9, 14, 22, 30],
+            'blue_number': blue, 'prize_pool': 1000000000, 'sales': 300000000,
+            'first_prize_num': 5, 'first_prize_amount': 6000000}
+
+
+class TestHistoryJournal(unittest.TestCase):
+    """追加日志测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.base_records = [_ssq_record('2024002', '2024-01-04'), _ssq_record('2024001', '2024-01-02')]
+        self.data_manager = LotteryDataManager(self.test_dir)
+        self.file_path = self.data_manager.data_files['ssq']
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump({'fetch_time': '2024-01-05 00:00:00', 'total_periods': 2, 'data': self.base_records},
+                      f, ensure_ascii=False, indent=2)
+        self.journal = HistoryJournal(self.file_path)
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def test_append_and_merge(self):
+        """测试追加记录后读取合并结果，基础文件不变"""
+        with open(self.file_path, 'rb') as f:
+            base_bytes = f.read()
+
+        self.journal.append([_ssq_record('2024003', '2024-01-07')], '2024-01-08 00:00:00')
+        self.journal.append([_ssq_record('2024002', '2024-01-04', blue=9)])
+
+        with open(self.file_path, 'rb') as f:
+            self.assertEqual(f.read(), base_bytes)
+
+        raw = self.journal.read_raw()
+        self.assertEqual([r['draw_num'] for r in raw['data']], ['2024003', '2024002', '2024001'])
+        self.assertEqual(raw['total_periods'], 3)
+        # 已存在的期号以基础文件为准
+        self.assertEqual(raw['data'][1]['blue_number'], 1)
+
+    def test_torn_tail_is_ignored_and_repaired(self):
+        """测试写入中途崩溃留下的不完整行被忽略并在下次追加前截断"""
+        self.journal.append([_ssq_record('2024003', '2024-01-07')])
+        with open(self.journal.journal_path, 'ab') as f:
+            f.write(b'{"fetch_time": "2024-01-09", "record": {"draw_num": "2024')
+
+        self.assertEqual(len(self.journal.read_records()), 3)
+
+        self.journal.append([_ssq_record('2024004', '2024-01-09')])
+        self.assertEqual(self.journal.pending_count(), 2)
+        self.assertEqual(self.journal.read_records()[0]['draw_num'], '2024004')
+
+    def test_compact(self):
+        """测试压缩后基础文件包含全部记录且日志被删除"""
+        self.journal.append([_ssq_record('2024003', '2024-01-07')])
+        expected = self.journal.read_records()
+
+        self.assertTrue(self.journal.compact())
+        self.assertFalse(os.path.exists(self.journal.journal_path))
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            compacted = json.load(f)
+        self.assertEqual(compacted['data'], expected)
+        self.assertEqual(compacted['total_periods'], 3)
+        self.assertFalse(self.journal.compact())
+
+    @patch('src.core.data_manager.LotteryDataManager._fetch_online_data_as_list')
+    def test_update_data_appends_to_journal(self, mock_fetch):
+        """测试 update_data 只追加新记录，读取方透明合并"""
+        self.assertEqual(len(self.data_manager.get_history_data('ssq')), 2)
+        mock_fetch.return_value = [_ssq_record('2024003', '2024-01-07'), _ssq_record('2024002', '2024-01-04')]
+
+        self.assertTrue(self.data_manager.update_data('ssq'))
+        self.assertEqual(self.journal.pending_count(), 1)
+
+        df = self.data_manager.get_history_data('ssq')
+        self.assertEqual(len(df), 3)
+        self.assertEqual(int(df['draw_num'].iloc[0]), 2024003)
+        self.assertEqual(self.data_manager.get_issue_data('ssq', '2024003')['draw_num'], '2024003')
+
+        self.assertTrue(self.data_manager.compact_history('ssq'))
+        self.assertEqual(len(self.data_manager.get_history_data('ssq')), 3)
+
+    @patch('src.core.data_manager.LotteryDataManager._fetch_online_data_as_list')
+    def test_update_data_dedups_by_key_index(self, mock_fetch):
+        """测试 update_data 按期号索引去重，不解析全部历史数据，日志只读取一次"""
+        mock_fetch.return_value = [_ssq_record('2024003', '2024-01-07'), _ssq_record('2024001', '2024-01-02')]
+        self.assertTrue(self.data_manager.update_data('ssq'))
+        self.assertTrue(os.path.exists(self.journal.keys_path))
+
+        # 新进程：基础文件的期号从索引读取
+        mock_fetch.return_value = [_ssq_record('2024004', '2024-01-09'), _ssq_record('2024003', '2024-01-07')]
+        manager = LotteryDataManager(self.test_dir)
+        with patch.object(HistoryJournal, 'read_raw', side_effect=AssertionError), \
+                patch.object(get_history_cache(), 'get_records', side_effect=AssertionError), \
+                patch.object(HistoryJournal, 'read_journal', autospec=True,
+                             side_effect=HistoryJournal.read_journal) as read_journal:
+            self.assertTrue(manager.update_data('ssq'))
+        self.assertEqual(read_journal.call_count, 1)
+        self.assertEqual([e['record']['draw_num'] for e in self.journal.read_journal()], ['2024003', '2024004'])
+
+        # 基础文件被改写后重新建立索引
+        self.assertTrue(manager.compact_history('ssq'))
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        raw['data'].insert(0, _ssq_record('2024005', '2024-01-11'))
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False)
+        mock_fetch.return_value = [_ssq_record('2024005', '2024-01-11')]
+        self.assertTrue(manager.update_data('ssq'))
+        self.assertFalse(os.path.exists(self.journal.journal_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+计算结果缓存测试
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import MemoCache, data_version, get_history_cache, invalidate_memo_caches
+
+
+class TestMemoCache(unittest.TestCase):
+    """MemoCache 测试类"""
+
+    def test_bounded_lru(self):
+        """测试超出上限时淘汰最早且最近未读取的条目"""
+        cache = MemoCache('test', max_entries=3)
+        for key in 'abc':
+            cache[key] = key.upper()
+        self.assertEqual(cache.get('a'), 'A')
+        cache['d'] = 'D'
+        self.assertEqual(len(cache), 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        info = cache.info()
+        self.assertEqual((info['hits'], info['evictions']), (1, 1))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.info()['misses'], 1)
+
+    def test_version_keys(self):
+        """测试数据版本变化后旧条目失效，旧版本的计算结果不会写入新版本"""
+        cache = MemoCache('test')
+        cache.set_version(1)
+        self.assertEqual(cache.get_or_compute('k', lambda: 'v1'), 'v1')
+        self.assertFalse(cache.set_version(1))
+        self.assertEqual(cache.get_or_compute('k', lambda: 'other'), 'v1')
+
+        def stale():
+            cache.set_version(2)
+            return 'stale'
+
+        cache.clear()
+        self.assertEqual(cache.get_or_compute('k', stale), 'stale')
+        self.assertNotIn('k', cache)
+        self.assertEqual(cache.get_or_compute('k', lambda: 'v2'), 'v2')
+
+    def test_data_version_by_content(self):
+        """测试没有版本号的数据按内容区分版本（期数和首尾期号相同、号码不同时版本不同）"""
+        rng = np.random.default_rng(16)
+        frames = [pd.DataFrame({'draw_num': [str(2024050 - i) for i in range(50)],
+                                'blue_number': rng.integers(1, 17, 50)}) for _ in range(2)]
+        self.assertNotEqual(data_version(frames[0]), data_version(frames[1]))
+        self.assertEqual(data_version(frames[0]), data_version(frames[0].copy()))
+
+        version = data_version(frames[0])
+        frames[0].loc[10, 'blue_number'] = frames[0].loc[10, 'blue_number'] % 16 + 1
+        self.assertNotEqual(data_version(frames[0]), version)
+
+        records = [{'draw_num': '1', 'red_numbers': [1, 2, 3, 4, 5, 6]}]
+        self.assertEqual(data_version(records), data_version([dict(records[0])]))
+        self.assertNotEqual(data_version(records), data_version([dict(records[0], red_numbers=[1, 2, 3, 4, 5, 7])]))
+        # 无法计算摘要的数据不会命中缓存
+        unpicklable = [lambda: None]
+        self.assertNotEqual(data_version(unpicklable), data_version(unpicklable))
+
+    def test_invalidate_by_source(self):
+        """测试按数据文件失效"""
+        first = MemoCache('first', source='data/ssq_history.json')
+        second = MemoCache('second', source='data/dlt_history.json')
+        first['k'] = second['k'] = 1
+        invalidate_memo_caches('data/ssq_history.json')
+        self.assertNotIn('k', first)
+        self.assertIn('k', second)
+
+    def test_concurrent_access(self):
+        """测试多线程读写时条目数不超过上限"""
+        cache = MemoCache('test', max_entries=50)
+        errors = []
+
+        def worker(seed):
+            rng = np.random.default_rng(seed)
+            try:
+                for key in rng.integers(0, 200, 2000).tolist():
+                    self.assertEqual(cache.get_or_compute(key, lambda: key * 2), key * 2)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 50)
+
+
+class TestEvaluatorCache(unittest.TestCase):
+    """评价器统计缓存测试类"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.test_dir, 'ssq_history.json')
+        rng = np.random.default_rng(16)
+        self.history = [{'draw_num': str(3000 - i),
+                         'red_numbers': sorted(int(n) for n in rng.choice(33, 6, replace=False) + 1),
+                         'blue_number': int(rng.integers(1, 17))} for i in range(100)]
+        self._write(self.history)
+
+    def tearDown(self):
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, history):
+        with open(self.history_file, 'w', encoding='utf-8') as f:
+            json.dump({'data': history}, f)
+
+    def test_new_draw_invalidates(self):
+        """测试写入新开奖数据后评价器统计缓存失效"""
+        evaluator = SSQNumberEvaluator(self.history_file)
+        red, blue = [1, 2, 3, 4, 5, 6], 7
+        before = evaluator.evaluate(red, blue, periods=10)
+        self.assertGreater(evaluator.cache_info()['size'], 0)
+        evaluator.evaluate(red, blue, periods=10)
+        self.assertGreater(evaluator.cache_info()['hits'], 0)
+
+        newest = {'draw_num': '3001', 'red_numbers': red, 'blue_number': blue}
+        self._write([newest] + self.history)
+        get_history_cache().invalidate(self.history_file)
+        self.assertEqual(evaluator.cache_info()['size'], 0)
+
+        after = evaluator.evaluate(red, blue, periods=10)
+        self.assertEqual(after, SSQNumberEvaluator(self.history_file).evaluate(red, blue, periods=10))
+        self.assertNotEqual(after['frequency'], before['frequency'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+号码出现次数前缀和表测试
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.core.analyzers import FrequencyAnalyzer
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import (
+    OccurrenceTable, get_history_cache, history_occurrence_tables, occurrence_tables
+)
+
+
+def _random_draws(rng, count):
+    """随机双色球红球（最新在前）"""
+    return [sorted(int(n) for n in rng.choice(33, 6, replace=False) + 1) for _ in range(count)]
+
+
+class TestOccurrenceTable(unittest.TestCase):
+    """出现次数前缀和表测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(14)
+        self.draws = _random_draws(self.rng, 150)
+        self.table = OccurrenceTable.from_draws(self.draws, 33)
+
+    def test_window_frequency(self):
+        """测试任意窗口的频率与逐期统计一致"""
+        for offset, periods in ((0, None), (0, 30), (10, 25), (140, 50), (150, 5), (7, 0)):
+            stop = len(self.draws) if periods is None else offset + periods
+            counter = Counter(n for draw in self.draws[offset:stop] for n in draw)
+            expected = [counter.get(n, 0) for n in range(34)]
+            self.assertEqual(self.table.frequency(periods, offset).tolist(), expected)
+
+        occurrences = self.table.occurrences(20, offset=3)
+        self.assertEqual(occurrences.shape, (20, 34))
+        self.assertEqual([np.flatnonzero(row).tolist() for row in occurrences], self.draws[3:23])
+
+    def test_missing_as_of(self):
+        """测试任意历史时点的遗漏值与逐期查找一致"""
+        for offset in (0, 1, 37, 149, 150):
+            history = self.draws[offset:]
+            missing = self.table.missing(offset, default=-1).tolist()
+            for number in range(1, 34):
+                expected = next((i for i, draw in enumerate(history) if number in draw), -1)
+                self.assertEqual(missing[number], expected, f'offset={offset} 号码 {number}')
+
+    def test_append(self):
+        """测试追加新的期只更新新增行"""
+        newest = [1, 2, 3, 4, 5, 6]
+        self.table.append(newest)
+        self.table.append('1, 7')
+        self.assertEqual(len(self.table), 152)
+        self.assertEqual(self.table.missing().tolist()[1:8], [0, 1, 1, 1, 1, 1, 0])
+        rebuilt = OccurrenceTable.from_draws([[1, 7], newest] + self.draws, 33)
+        self.assertEqual(self.table.frequency(40, 1).tolist(), rebuilt.frequency(40, 1).tolist())
+        self.assertEqual(self.table.missing(5).tolist(), rebuilt.missing(5).tolist())
+
+    def test_invalid_numbers_ignored(self):
+        """测试范围外或无法解析的号码不计入"""
+        table = OccurrenceTable.from_draws([[1, 40, 'x'], None, 16.0, [0, 3]], 16)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.frequency().tolist()[:4], [0, 1, 0, 1])
+        self.assertEqual(table.frequency()[16], 1)
+        self.assertEqual(table.missing(default=99).tolist()[:4], [99, 0, 99, 3])
+
+
+class TestSharedOccurrenceTables(unittest.TestCase):
+    """评价器共享出现次数表测试类"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.test_dir, 'ssq_history.json')
+        rng = np.random.default_rng(15)
+        self.history = [{'draw_num': str(3000 - i), 'red_numbers': red, 'blue_number': int(rng.integers(1, 17))}
+                        for i, red in enumerate(_random_draws(rng, 120))]
+        with open(self.history_file, 'w', encoding='utf-8') as f:
+            json.dump({'data': self.history}, f)
+
+    def tearDown(self):
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def test_evaluators_share_tables(self):
+        """测试同一文件的评价器共用一份表，且频率与直接构建一致"""
+        first = SSQNumberEvaluator(self.history_file)
+        second = SSQNumberEvaluator(self.history_file)
+        tables = first.get_occurrence_tables(first.load_history())
+        self.assertIs(second.get_occurrence_tables(second.load_history()), tables)
+
+        expected = occurrence_tables('ssq', self.history)
+        for zone in ('red', 'blue'):
+            self.assertEqual(tables[zone].frequency(33).tolist(), expected[zone].frequency(33).tolist())
+        counters = first._frequency_counters(first.load_history(), 33)
+        self.assertEqual(counters['blue'], Counter(draw['blue_number'] for draw in self.history[:33]))
+
+    def test_history_tables_cached_per_version(self):
+        """测试同一版本的历史数据共用一份表，数据变化后重新构建"""
+        frame = pd.DataFrame(self.history)
+        tables = history_occurrence_tables('ssq', frame)
+        self.assertIs(history_occurrence_tables('ssq', frame.copy()), tables)
+        self.assertIsNot(history_occurrence_tables('ssq', frame.head(60)), tables)
+        self.assertEqual(tables['blue'].frequency(40).tolist(),
+                         OccurrenceTable.from_draws(frame['blue_number'].head(40), 16).frequency().tolist())
+
+        # 期号相同而号码不同的数据（如更正后重新获取的开奖）不共用表
+        numbers = frame.drop(columns='draw_num')
+        self.assertIs(history_occurrence_tables('ssq', numbers), tables)
+        corrected = frame.copy()
+        corrected.loc[5, 'blue_number'] = corrected.loc[5, 'blue_number'] % 16 + 1
+        blue = history_occurrence_tables('ssq', corrected)['blue']
+        self.assertEqual(blue.frequency().tolist(),
+                         OccurrenceTable.from_draws(corrected['blue_number'], 16).frequency().tolist())
+        frame.loc[5, 'blue_number'] = corrected.loc[5, 'blue_number']
+        self.assertIs(history_occurrence_tables('ssq', frame)['blue'], blue)
+
+        # 频率分析结果与逐期统计一致
+        analyzer = FrequencyAnalyzer('ssq')
+        red = analyzer.extract_numbers(frame, 'red_numbers')
+        frequency, missing = analyzer._frequency_and_missing(red, (1, 33), frame, 'red')
+        self.assertEqual(frequency, analyzer.calculate_frequency(red, (1, 33)))
+        self.assertEqual(missing, analyzer.calculate_missing_values(red, (1, 33)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+历史号码位图索引测试
+"""
+
+import unittest
+
+import numpy as np
+
+from src.core.storage import OverlapIndex
+
+
+def _random_records(rng, count, start=1000):
+    """随机双色球历史（最新在前）"""
+    return [{'draw_num': str(start + count - i),
+             'red_numbers': sorted(int(n) for n in rng.choice(33, 6, replace=False) + 1),
+             'blue_number': int(rng.integers(1, 17))} for i in range(count)]
+
+
+class TestOverlapIndex(unittest.TestCase):
+    """位图索引测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(13)
+        self.records = _random_records(self.rng, 200)
+        self.index = OverlapIndex.for_lottery('ssq', self.records)
+
+    def test_single_ticket_queries(self):
+        """测试单注查询与逐期集合运算一致"""
+        for _ in range(50):
+            red = [int(n) for n in self.rng.choice(33, 6, replace=False) + 1]
+            expected = [len(set(red) & set(r['red_numbers'])) for r in self.records]
+            self.assertEqual(self.index.overlap_counts(red).tolist(), expected)
+            self.assertEqual(self.index.overlap_counts(red, periods=30).tolist(), expected[:30])
+            self.assertEqual(self.index.histogram(red).tolist(), np.bincount(expected, minlength=7).tolist())
+
+        draw = self.records[57]
+        self.assertEqual(self.index.exact_position(draw['red_numbers'][::-1], [draw['blue_number']]), 57)
+        self.assertIsNone(self.index.exact_position(draw['red_numbers'], [draw['blue_number']], periods=57))
+        self.assertEqual(self.index.label(57), draw['draw_num'])
+        self.assertEqual(self.index.extra_equal([draw['blue_number']]).tolist(),
+                         [r['blue_number'] == draw['blue_number'] for r in self.records])
+
+    def test_batch_queries(self):
+        """测试批量最大重合数和完全匹配与单注查询一致"""
+        reds = np.argsort(self.rng.random((500, 33)), axis=1)[:, :6] + 1
+        blues = self.rng.integers(1, 17, 500)
+        reds[:5] = [self.records[i]['red_numbers'] for i in (0, 3, 3, 99, 199)]
+        blues[:5] = [self.records[i]['blue_number'] for i in (0, 3, 3, 99, 199)]
+        blues[2] = blues[2] % 16 + 1
+
+        best, position = self.index.max_overlap(reds, periods=120)
+        exact = self.index.exact_positions(reds, blues)
+        matrix = self.index.overlap_matrix(reds, periods=120)
+        self.assertEqual(matrix.shape, (500, 120))
+        for i in range(len(reds)):
+            counts = self.index.overlap_counts(reds[i].tolist(), periods=120)
+            np.testing.assert_array_equal(matrix[i], counts)
+            self.assertEqual(best[i], counts.max())
+            self.assertEqual(position[i], counts.argmax())
+            expected = self.index.exact_position(reds[i].tolist(), [int(blues[i])])
+            self.assertEqual(exact[i], -1 if expected is None else expected)
+        self.assertEqual(exact[:5].tolist(), [0, 3, -1, 99, 199])
+
+    def test_incremental_sync(self):
+        """测试追加新的期时只写入新增部分，历史被改写时重建"""
+        newer = _random_records(self.rng, 3, start=1200) + list(self.records)
+        self.assertEqual(self.index.sync(newer), 3)
+        self.assertEqual(self.index.sync(newer), 0)
+        self.assertEqual(len(self.index), 203)
+        red = newer[1]['red_numbers']
+        self.assertEqual(self.index.overlap_counts(red).tolist(),
+                         [len(set(red) & set(r['red_numbers'])) for r in newer])
+
+        self.index.append({'draw_num': '1300', 'red_numbers': red, 'blue_number': 1})
+        self.assertEqual(self.index.overlap_counts(red)[0], 6)
+        self.assertEqual(self.index.label(0), '1300')
+
+        rewritten = [dict(r) for r in newer]
+        rewritten[-1] = dict(rewritten[-1], red_numbers=[1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.index.sync(rewritten), len(rewritten))
+        self.assertEqual(self.index.overlap_counts([1, 2, 3, 4, 5, 6])[-1], 6)
+
+    def test_irregular_draws(self):
+        """测试含重复或无效号码的期不参与完全匹配"""
+        index = OverlapIndex.for_lottery('dlt', [
+            {'draw_num': '2', 'front_numbers': [1, 2, 3, 4, 4], 'back_numbers': [1, 2]},
+            {'draw_num': '1', 'front_numbers': '1,2,3,4,5', 'back_numbers': [1, 'x']},
+        ])
+        self.assertEqual(index.overlap_counts([1, 2, 3, 4, 5]).tolist(), [4, 5])
+        self.assertEqual(index.extra_overlap_counts([1, 2]).tolist(), [2, 1])
+        self.assertIsNone(index.exact_position([1, 2, 3, 4], [1, 2]))
+        with self.assertRaises(ValueError):
+            index.overlap_counts([1, 2, 3, 4, 99])
+
+
+if __name__ == '__main__':
+    unittest.main()
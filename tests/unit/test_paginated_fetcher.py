@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并发分页获取测试（使用本地 HTTP 服务模拟分页接口）
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from src.core.data_manager import LotteryDataManager
+from src.core.paginated_fetcher import PageCursorStore, PaginatedFetcher, TokenBucket
+from src.core.storage import get_history_cache
+
+TOTAL_DRAWS = 200
+PAGE_LATENCY = 0.05
+
+
+def _draw(index):
+    """第 index 新的一期（0 为最新）"""
+    number = 24000 + TOTAL_DRAWS - index
+    day = 1 + index % 28
+    return {'lotteryDrawNum': str(number), 'lotteryDrawTime': f'2023-01-{day:02d}',
+            'lotteryDrawResult': '01 05 12 20 33 04 11'}
+
+
+class _PagingHandler(BaseHTTPRequestHandler):
+    """体彩网格式的分页接口"""
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        page_no = int(query['pageNo'][0])
+        page_size = int(query['pageSize'][0])
+        with server.lock:
+            server.requests.append(page_no)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(PAGE_LATENCY)
+            if page_no in server.fail_pages:
+                server.fail_pages.discard(page_no)
+                self.send_error(404)
+                return
+            start = (page_no - 1) * page_size
+            body = {'success': True, 'value': {
+                'total': TOTAL_DRAWS,
+                'list': [_draw(i) for i in range(start, min(start + page_size, TOTAL_DRAWS))]
+            }}
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPaginatedFetcher(unittest.TestCase):
+    """并发分页获取测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _PagingHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/history'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.server.requests = []
+        self.server.active = self.server.max_active = 0
+        self.server.fail_pages = set()
+        self.data_manager = LotteryDataManager(self.test_dir)
+        self.overrides = {
+            'api.backup_apis.dlt': [{'name': '分页源', 'url': self.url, 'type': 'sporttery', 'params': {}}],
+            'api.page_size': 5, 'api.host_rate_limit': 0,
+        }
+        original_get = self.data_manager.config_manager.get
+        patcher = patch.object(self.data_manager.config_manager, 'get',
+                               side_effect=lambda key, default=None: self.overrides.get(key, original_get(key, default)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data_manager.date_limit = None
+
+    def tearDown(self):
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _fetch(self):
+        items = self.data_manager._fetch_online_data_as_list('dlt')
+        return [item['draw_num'] for item in items] if items else items
+
+    def _save_history(self, draw_nums):
+        records = [{'draw_num': num, 'draw_date': '2023-01-01', 'front_numbers': [1, 5, 12, 20, 33],
+                    'back_numbers': [4, 11]} for num in draw_nums]
+        with open(self.data_manager.data_files['dlt'], 'w', encoding='utf-8') as f:
+            json.dump({'data': records}, f)
+        get_history_cache().invalidate()
+
+    def test_concurrent_backfill(self):
+        """测试完整回填按页码顺序合并，并发数不超过窗口且明显快于逐页获取"""
+        start_time = time.time()
+        draw_nums = self._fetch()
+        concurrent_time = time.time() - start_time
+
+        self.assertEqual(draw_nums, [str(24000 + TOTAL_DRAWS - i) for i in range(TOTAL_DRAWS)])
+        self.assertEqual(sorted(self.server.requests), list(range(1, TOTAL_DRAWS // 5 + 1)))
+        self.assertLessEqual(self.server.max_active, 4)
+
+        self.overrides['api.page_concurrency'] = 1
+        start_time = time.time()
+        self.assertEqual(self._fetch(), draw_nums)
+        serial_time = time.time() - start_time
+        self.assertLess(concurrent_time, serial_time / 2)
+
+    def test_stops_at_known_draw(self):
+        """测试遇到本地已有期号时停止翻页"""
+        self._save_history([str(24000 + TOTAL_DRAWS - i) for i in range(3, TOTAL_DRAWS)])
+        self.assertEqual(self._fetch(), [str(24000 + TOTAL_DRAWS - i) for i in range(5)])
+        self.assertEqual(self.server.requests, [1])
+
+    def test_resumes_interrupted_backfill(self):
+        """测试回填中途失败后保存游标，下次从断点继续"""
+        self.server.fail_pages = {8}
+        first = self._fetch()
+        self.assertEqual(len(first), 35)
+        self.assertEqual(PageCursorStore(f'{self.test_dir}/fetch_cursors.json').get(f'dlt:{self.url}:5'), 8)
+
+        self._save_history(first)
+        self.server.requests = []
+        second = self._fetch()
+        self.assertEqual(second[:5], first[:5])
+        self.assertEqual(second[5:], [str(24000 + TOTAL_DRAWS - i) for i in range(35, TOTAL_DRAWS)])
+        self.assertNotIn(2, self.server.requests)
+        self.assertIsNone(PageCursorStore(f'{self.test_dir}/fetch_cursors.json').get(f'dlt:{self.url}:5'))
+
+    def test_token_bucket_limits_rate(self):
+        """测试令牌桶限制请求速率"""
+        bucket = TokenBucket(rate=40, capacity=2)
+        start_time = time.time()
+        for _ in range(12):
+            bucket.acquire()
+        self.assertGreaterEqual(time.time() - start_time, 0.2)
+
+        cancel_event = threading.Event()
+        cancel_event.set()
+        bucket = TokenBucket(rate=0.01)
+        bucket.acquire()
+        self.assertFalse(bucket.acquire(cancel_event))
+
+    def test_first_page_failure(self):
+        """测试第一页失败时返回 None 且不保存游标"""
+        fetcher = PaginatedFetcher(cursors=PageCursorStore())
+
+        def fail(page_no):
+            raise IOError('down')
+
+        self.assertIsNone(fetcher.fetch(fail, cursor_key='k'))
+        self.assertIsNone(fetcher.cursors.get('k'))
+
+
+if __name__ == '__main__':
+    unittest.main()
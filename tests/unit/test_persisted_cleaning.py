@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+持久化清洗/验证结果测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.core.data_manager import LotteryDataManager
+from src.core.storage import HistoryJournal, get_history_cache
+from src.core.validation import DataCleaner
+
+
+def _ssq_record(i):
+    return {'draw_num': f'{2023001 + i}', 'draw_date': f'2023-{1 + i // 28:02d}-{1 + i % 28:02d}',
+            'red_numbers': sorted({(i + k * 6) % 33 + 1 for k in range(6)}),
+            'blue_number': i % 16 + 1, 'prize_pool': 1000000000 + i, 'sales': 300000000 + i,
+            'first_prize_num': i % 7, 'first_prize_amount': '' if i % 10 == 0 else 5000000 + i}
+
+
+class TestPersistedCleaning(unittest.TestCase):
+    """持久化清洗结果测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.data_manager = LotteryDataManager(self.test_dir)
+        self.records = [_ssq_record(i) for i in range(60)][::-1]
+        with open(self.data_manager.data_files['ssq'], 'w', encoding='utf-8') as f:
+            json.dump({'fetch_time': '2023-03-01 00:00:00', 'total_periods': 60, 'data': self.records[5:]},
+                      f, ensure_ascii=False, indent=2)
+
+        self.cleaned_sizes = []
+        cleaner = self.data_manager.cleaners['ssq']
+        original = cleaner.clean_data
+
+        def spy(data, *args, **kwargs):
+            self.cleaned_sizes.append(len(data))
+            return original(data, *args, **kwargs)
+
+        cleaner.clean_data = spy
+
+    def tearDown(self):
+        """测试后清理"""
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _reload(self):
+        get_history_cache().invalidate()
+        return self.data_manager.get_history_data('ssq')
+
+    def test_unchanged_data_skips_pipeline(self):
+        """测试数据未变化时跳过清洗，报告仍可获取"""
+        self._reload()
+        self.assertEqual(self.cleaned_sizes, [55])
+        self._reload()
+        self.assertEqual(self.cleaned_sizes, [55])
+
+        report = self.data_manager.get_data_quality_report('ssq')
+        self.assertEqual(report['cleaning']['total_records'], 55)
+        self.assertIn('summary', report['validation'])
+        self.assertEqual(self.cleaned_sizes, [55])
+
+    def test_only_new_records_are_cleaned(self):
+        """测试新增记录只清洗增量部分，结果与完整流程一致"""
+        self._reload()
+        HistoryJournal(self.data_manager.data_files['ssq']).append(self.records[:5])
+
+        df = self._reload()
+        self.assertEqual(self.cleaned_sizes, [55, 5])
+        pd.testing.assert_frame_equal(df, self.data_manager._load_history_from_json('ssq'))
+
+        report = self.data_manager.get_data_quality_report('ssq')
+        self.assertEqual(report['cleaning']['total_records'], 60)
+
+        # 压缩日志后内容不变，不再清洗
+        self.cleaned_sizes.clear()
+        self.data_manager.compact_history('ssq')
+        self._reload()
+        self.assertEqual(self.cleaned_sizes, [])
+
+    def test_merged_report_shifts_base_rows(self):
+        """测试合并报告时已有数据的问题行索引随新增记录后移"""
+        def report(rows):
+            error = {'rule': 'red_ball_range', 'message': '红球超出范围', 'details': {'rows': rows}}
+            return {'validation': {'valid': False, 'errors': [error], 'warnings': [], 'infos': []}}
+
+        base = report([0, 7])
+        merged = LotteryDataManager._merge_reports(base, report([1]), 5)
+        self.assertEqual([e['details']['rows'] for e in merged['validation']['errors']], [[5, 12], [1]])
+        self.assertEqual(base['validation']['errors'][0]['details']['rows'], [0, 7])
+
+    def test_modified_record_triggers_full_clean(self):
+        """测试已校验记录被修改时完整重新清洗"""
+        self._reload()
+        records = self.records[5:]
+        records[10] = dict(records[10], blue_number=3)
+        with open(self.data_manager.data_files['ssq'], 'w', encoding='utf-8') as f:
+            json.dump({'data': records}, f, ensure_ascii=False)
+
+        self._reload()
+        self.assertEqual(self.cleaned_sizes, [55, 55])
+
+    def test_rule_version_change_invalidates(self):
+        """测试清洗规则版本变化时持久化结果失效"""
+        self._reload()
+        with patch.object(DataCleaner, 'RULES_VERSION', DataCleaner.RULES_VERSION + 1):
+            self._reload()
+        self.assertEqual(self.cleaned_sizes, [55, 55])
+
+
+if __name__ == '__main__':
+    unittest.main()
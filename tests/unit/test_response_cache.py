@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 响应缓存测试（使用本地 HTTP 服务模拟支持条件请求的接口）
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from src.core.api_parsers import SportteryParser, get_parser
+from src.core.network_client import NetworkClient
+from src.core.response_cache import ResponseCache, parse_cache_control
+
+PAYLOAD = json.dumps({'success': True, 'value': {'total': 1, 'list': [
+    {'lotteryDrawNum': '23001', 'lotteryDrawTime': '2023-01-02', 'lotteryDrawResult': '01 05 12 20 33 04 11'}
+]}}).encode('utf-8')
+
+
+class _CachingHandler(BaseHTTPRequestHandler):
+    """按路径返回不同缓存头的接口，记录完整响应体的发送次数"""
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        headers = {
+            '/etag': {'ETag': '"v1"'},
+            '/modified': {'Last-Modified': 'Mon, 02 Jan 2023 00:00:00 GMT'},
+            '/fresh': {'Cache-Control': 'max-age=600', 'ETag': '"f1"'},
+            '/nostore': {'Cache-Control': 'no-store', 'ETag': '"n1"'},
+        }.get(path, {})
+
+        if (self.headers.get('If-None-Match') == headers.get('ETag') and 'ETag' in headers) or \
+                (self.headers.get('If-Modified-Since') == headers.get('Last-Modified') and 'Last-Modified' in headers):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        self.server.bodies_sent += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestResponseCache(unittest.TestCase):
+    """响应缓存测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _CachingHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.server.hits = {}
+        self.server.bodies_sent = 0
+        self.client = NetworkClient()
+        self.client.cache = ResponseCache(self.test_dir)
+
+    def tearDown(self):
+        self.client.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_conditional_requests(self):
+        """测试 ETag/Last-Modified 验证通过时复用缓存的响应体"""
+        for path in ('/etag', '/modified'):
+            first = self.client.get_json(self.base_url + path, params={'page': 1})
+            second = self.client.get_json(self.base_url + path, params={'page': 1})
+            self.assertEqual(first, second)
+            self.assertEqual(self.server.hits[f'{path}?page=1'], 2)
+
+        self.assertEqual(self.server.bodies_sent, 2)
+        metrics = self.client.cache_metrics()
+        self.assertEqual((metrics['requests'], metrics['revalidated'], metrics['misses']), (4, 2, 2))
+        self.assertEqual(metrics['hit_ratio'], 0.5)
+        self.assertEqual(metrics['bytes_saved'], 2 * len(PAYLOAD))
+
+    def test_fresh_response_skips_network(self):
+        """测试 max-age 内直接命中缓存，no-store 不缓存"""
+        for _ in range(3):
+            response = self.client.get(self.base_url + '/fresh')
+            self.client.get(self.base_url + '/nostore')
+        self.assertEqual(self.server.hits, {'/fresh': 1, '/nostore': 3})
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.json(), json.loads(PAYLOAD))
+        self.assertEqual(self.client.cache_metrics()['hits'], 2)
+
+    def test_cache_persists_on_disk(self):
+        """测试缓存保存在磁盘上，新的客户端可以直接复用"""
+        self.client.get(self.base_url + '/etag')
+        client = NetworkClient()
+        client.cache = ResponseCache(self.test_dir)
+        response = client.get(self.base_url + '/etag')
+        self.assertEqual(response.content, PAYLOAD)
+        self.assertEqual(self.server.bodies_sent, 1)
+        client.close()
+
+    def test_lru_eviction(self):
+        """测试超过容量时淘汰最近最少使用的条目"""
+        self.client.cache = ResponseCache(self.test_dir, max_bytes=len(PAYLOAD) * 2)
+        urls = [f'{self.base_url}/etag?page={page}' for page in range(3)]
+        self.client.get(urls[0])
+        self.client.get(urls[1])
+        self.client.get(urls[0])
+        self.client.get(urls[2])
+
+        self.assertLessEqual(self.client.cache.total_bytes, len(PAYLOAD) * 2)
+        self.assertEqual(self.client.cache.metrics.evicted, 1)
+        self.assertIsNotNone(self.client.cache.lookup(urls[0]))
+        self.assertIsNone(self.client.cache.lookup(urls[1]))
+
+    def test_parser_skips_known_body(self):
+        """测试解析器跳过已解析过的响应体"""
+        parser = get_parser('sporttery')
+        data, digest = self.client.get_json_with_digest(self.base_url + '/etag')
+        with patch.object(SportteryParser, 'parse', wraps=parser.parse) as parse:
+            first = parser.parse_body(data, 'dlt', digest)
+            first[0]['draw_num'] = 'changed'
+            data, digest = self.client.get_json_with_digest(self.base_url + '/etag')
+            second = get_parser('sporttery').parse_body(data, 'dlt', digest)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(second[0]['draw_num'], '23001')
+        self.assertEqual(second[0]['front_numbers'], [1, 5, 12, 20, 33])
+
+    def test_parse_cache_control(self):
+        """测试 Cache-Control 解析"""
+        self.assertEqual(parse_cache_control('public, max-age=60, no-cache="Set-Cookie"'),
+                         {'public': None, 'max-age': '60', 'no-cache': 'Set-Cookie'})
+        self.assertEqual(parse_cache_control(None), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分片搜索引擎测试
+"""
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.core.evaluators import batch_scoring
+from src.core.evaluators.sharded_search import SearchSpace, search_top_k
+from src.core.evaluators.ssq_evaluator import SSQNumberEvaluator
+from src.core.storage import get_history_cache
+
+
+class TestCombinationRanks(unittest.TestCase):
+    """组合序编号测试类"""
+
+    def test_colex_and_lex_ranks(self):
+        """测试组合序还原与字典序编号和 itertools 一致"""
+        combos = list(itertools.combinations(range(9), 4))
+        colex = sorted(combos, key=lambda c: c[::-1])
+        unranked = batch_scoring.colex_unrank(np.arange(len(combos)), 4, 9)
+        self.assertEqual([tuple(row) for row in unranked.tolist()], colex)
+
+        numbers = np.array(colex) + 1
+        expected = [combos.index(c) for c in colex]
+        self.assertEqual(batch_scoring.lex_ranks(numbers, 9).tolist(), expected)
+
+
+class TestShardedSearch(unittest.TestCase):
+    """分片搜索测试类"""
+
+    POOL = [2, 5, 7, 11, 16, 20, 23, 28, 31]
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.test_dir, 'ssq_history.json')
+        rng = np.random.default_rng(18)
+        self.history = [{'draw_num': str(3000 - i),
+                         'red_numbers': sorted(int(n) for n in rng.choice(33, 6, replace=False) + 1),
+                         'blue_number': int(rng.integers(1, 17))} for i in range(80)]
+        # 一期号码落在候选池内，用于验证排除历史完全一致的号码
+        self.history[3] = dict(self.history[3], red_numbers=[2, 5, 7, 11, 16, 20], blue_number=9)
+        with open(self.history_file, 'w', encoding='utf-8') as f:
+            json.dump({'data': self.history}, f)
+        self.options = {'history_file': self.history_file}
+        self.space = SearchSpace.for_lottery('ssq', self.POOL)
+
+    def tearDown(self):
+        get_history_cache().invalidate()
+        shutil.rmtree(self.test_dir)
+
+    def _brute_force(self, top_k, periods=None):
+        """逐注评分的参考结果（同分按号码字典序）"""
+        evaluator = SSQNumberEvaluator(self.history_file)
+        evaluator.use_history(self.history)
+        tickets = [(reds, blue) for reds in itertools.combinations(self.POOL, 6) for blue in range(1, 17)
+                   if (list(reds), blue) != ([2, 5, 7, 11, 16, 20], 9)]
+        reds = np.array([t[0] for t in tickets])
+        blues = np.array([[t[1]] for t in tickets])
+        totals = evaluator.evaluate_many(reds, blues, periods)['total']
+        ranked = sorted(zip(totals.tolist(), tickets), key=lambda x: (-x[0], x[1]))
+        cutoff = ranked[top_k - 1][0]
+        return [(s, list(reds) + [blue]) for s, (reds, blue) in ranked
+                if s >= cutoff or np.isclose(s, cutoff)], len(tickets)
+
+    @staticmethod
+    def _plain(search):
+        return [(score, item.tolist()) for score, item in search.results]
+
+    def test_matches_brute_force(self):
+        """测试单进程与多进程、不同分片数的结果都与逐注评分一致"""
+        expected, count = self._brute_force(5)
+        for workers, shards in ((1, None), (1, 7), (2, 5)):
+            search = search_top_k(self.space, 5, self.history, self.options, workers=workers, shards=shards)
+            self.assertEqual(search.checked, count)
+            got = self._plain(search)
+            self.assertEqual([item for _, item in got], [item for _, item in expected], f'{workers}/{shards}')
+            np.testing.assert_allclose([s for s, _ in got], [s for s, _ in expected])
+
+    def test_periods(self):
+        """测试分析期数传给评价器"""
+        expected, _ = self._brute_force(5, periods=10)
+        self.assertNotEqual(expected, self._brute_force(5)[0])
+        search = search_top_k(self.space, 5, self.history, self.options, workers=2, shards=4, periods=10)
+        got = self._plain(search)
+        self.assertEqual([item for _, item in got], [item for _, item in expected])
+        np.testing.assert_allclose([s for s, _ in got], [s for s, _ in expected])
+
+    def test_checkpoint_resume(self):
+        """测试检查点恢复：已完成的分片不重复计算，参数变化时检查点失效"""
+        checkpoint_dir = os.path.join(self.test_dir, 'checkpoints')
+        first = search_top_k(self.space, 5, self.history, self.options, shards=6, checkpoint_dir=checkpoint_dir)
+        self.assertEqual(first.resumed_shards, 0)
+        os.remove(os.path.join(checkpoint_dir, 'shard_00002.json'))
+
+        progress = []
+        resumed = search_top_k(self.space, 5, self.history, self.options, shards=6, checkpoint_dir=checkpoint_dir,
+                               progress=lambda done, total, eta: progress.append((done, total)))
+        self.assertEqual(resumed.resumed_shards, 5)
+        self.assertEqual(resumed.checked, first.checked)
+        self.assertLess(resumed.scored, first.scored)
+        self.assertEqual(self._plain(resumed), self._plain(first))
+        self.assertEqual(progress, [(self.space.size, self.space.size)])
+
+        changed = search_top_k(self.space, 3, self.history, self.options, shards=6, checkpoint_dir=checkpoint_dir)
+        self.assertEqual(changed.resumed_shards, 0)
+        changed = search_top_k(self.space, 3, self.history, self.options, shards=6, checkpoint_dir=checkpoint_dir,
+                               periods=10)
+        self.assertEqual(changed.resumed_shards, 0)
+
+    def test_filter_change_invalidates_checkpoint(self):
+        """测试同名过滤函数的实际掩码变化时检查点失效"""
+        checkpoint_dir = os.path.join(self.test_dir, 'checkpoints')
+        bound = {'low': 80}
+
+        def main_filter(reds):
+            return reds.sum(axis=1) >= bound['low']
+
+        space = SearchSpace.for_lottery('ssq', self.POOL, main_filter=main_filter)
+        search_top_k(space, 3, self.history, self.options, shards=4, checkpoint_dir=checkpoint_dir)
+        self.assertEqual(search_top_k(space, 3, self.history, self.options, shards=4,
+                                      checkpoint_dir=checkpoint_dir).resumed_shards, 4)
+        bound['low'] = 90
+        changed = search_top_k(space, 3, self.history, self.options, shards=4, checkpoint_dir=checkpoint_dir)
+        self.assertEqual(changed.resumed_shards, 0)
+        self.assertTrue(all(item[:6].sum() >= 90 for _, item in changed.results))
+
+        # 设置 pattern_mask 时按组合表掩码识别
+        main_filter.pattern_mask = lambda: np.array([True, False, bound['low'] > 85])
+        digest = space.filter_digest()
+        bound['low'] = 80
+        self.assertNotEqual(space.filter_digest(), digest)
+
+    def test_main_filter(self):
+        """测试主区过滤条件"""
+        space = SearchSpace.for_lottery('ssq', self.POOL, main_filter=lambda reds: reds.sum(axis=1) % 2 == 0)
+        search = search_top_k(space, 3, self.history, self.options, shards=4)
+        even = sum(1 for reds in itertools.combinations(self.POOL, 6) if sum(reds) % 2 == 0)
+        excluded = 1 if sum([2, 5, 7, 11, 16, 20]) % 2 == 0 else 0
+        self.assertEqual(search.checked, even * 16 - excluded)
+        self.assertTrue(all(item[:6].sum() % 2 == 0 for _, item in search.results))
+
+
+if __name__ == '__main__':
+    unittest.main()
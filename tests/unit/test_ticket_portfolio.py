@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+号码组合增量多样性统计测试
+"""
+
+import itertools
+import unittest
+
+import numpy as np
+
+from src.core.generators.anti_popular import CorrelationChecker, TicketPortfolio
+
+
+class TestTicketPortfolio(unittest.TestCase):
+    """号码组合增量统计测试类"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(25)
+
+    def _picks(self, lottery_type, count):
+        """随机号码列表 [(主区, 副区, 分数), ...]"""
+        if lottery_type == 'ssq':
+            return [(sorted(int(n) for n in self.rng.choice(33, 6, replace=False) + 1),
+                     int(self.rng.integers(1, 17)), 0) for _ in range(count)]
+        return [(sorted(int(n) for n in self.rng.choice(35, 5, replace=False) + 1),
+                 sorted(int(n) for n in self.rng.choice(12, 2, replace=False) + 1), 0) for _ in range(count)]
+
+    def test_incremental_statistics(self):
+        """测试逐注加入后的重叠统计和多样性分数与两两比较一致（超过初始容量时扩容）"""
+        for lottery_type, main_count, extra_count in (('ssq', 6, 1), ('dlt', 5, 2)):
+            picks = self._picks(lottery_type, 120)
+            portfolio = TicketPortfolio(lottery_type, capacity=4)
+            for end, pick in enumerate(picks, start=1):
+                portfolio.add(pick[0], pick[1])
+                if end not in (1, 2, 7, 120):
+                    continue
+                extra = lambda p: {p[1]} if lottery_type == 'ssq' else set(p[1])
+                main_overlaps = [len(set(a[0]) & set(b[0])) for a, b in itertools.combinations(picks[:end], 2)]
+                extra_overlaps = [len(extra(a) & extra(b)) for a, b in itertools.combinations(picks[:end], 2)]
+                self.assertEqual(len(portfolio), end)
+                self.assertEqual(portfolio.main_pair_overlap, sum(main_overlaps))
+                self.assertEqual(portfolio.extra_pair_overlap, sum(extra_overlaps))
+                self.assertEqual(portfolio.max_main_overlap, max(main_overlaps, default=None))
+                self.assertEqual(portfolio.min_extra_overlap, min(extra_overlaps, default=None))
+                total = sum(m / main_count + 0.5 * e / extra_count for m, e in zip(main_overlaps, extra_overlaps))
+                expected = max(0.0, 1.0 - total / len(main_overlaps)) if main_overlaps else 1.0
+                self.assertAlmostEqual(portfolio.diversity_score, expected)
+            self.assertEqual(portfolio.main_usage.sum(), 120 * main_count)
+
+    def test_can_add(self):
+        """测试能否加入的查询与逐注比较一致"""
+        picks = self._picks('dlt', 60)
+        portfolio = TicketPortfolio.from_picks(picks, 'dlt')
+        self.assertTrue(TicketPortfolio('dlt').can_add([1, 2, 3, 4, 5], 0))
+        for front, back, _ in self._picks('dlt', 300):
+            front_max = max(len(set(front) & set(p[0])) for p in picks)
+            back_max = max(len(set(back) & set(p[1])) for p in picks)
+            self.assertEqual(portfolio.overlaps(front).max(), front_max)
+            for limit in range(4):
+                self.assertEqual(portfolio.can_add(front, limit), front_max <= limit)
+                self.assertEqual(portfolio.can_add(front, limit, back, 1), front_max <= limit and back_max <= 1)
+        with self.assertRaises(ValueError):
+            portfolio.add([1, 2, 3, 4, 64], [1, 2])
+
+    def test_report(self):
+        """测试相关性报告的字段和数值"""
+        picks = [([1, 2, 3, 4, 5, 6], 3, 0), ([1, 2, 3, 10, 11, 12], 3, 0), ([20, 21, 22, 23, 24, 25], 9, 0)]
+        report = CorrelationChecker.get_correlation_report(picks, 'ssq')
+        self.assertEqual(report['blue_usage'], {3: 2, 9: 1})
+        self.assertEqual(list(report['blue_usage']), [3, 9])
+        self.assertEqual((report['unique_blues'], report['max_red_overlap'], report['min_red_overlap']), (2, 3, 0))
+        self.assertAlmostEqual(report['avg_red_overlap'], 1.0)
+        self.assertAlmostEqual(report['diversity_score'], 1.0 - (3 / 6 + 0.5) / 3)
+
+        report = CorrelationChecker.get_correlation_report(self._picks('dlt', 1), 'dlt')
+        self.assertEqual(report, {'total_picks': 1, 'diversity_score': 1.0, 'overlap_details': []})
+        self.assertEqual(CorrelationChecker.calculate_diversity_score(picks, 'other'), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+向量化数据清洗测试
+"""
+
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.core.validation import DataCleaner
+from tests.unit.messy_data import messy_frame
+
+
+def _record_fields(rng, i):
+    """号码以外的字段（期号、日期、金额的各种写法）"""
+    day = pd.Timestamp('2010-01-01') + pd.Timedelta(days=i)
+    return {
+        'draw_num': rng.choice([str(2010001 + i), f' {2010001 + i} ', f'第{2010001 + i}期', str(10001 + i),
+                                2010001 + i, '１２３４５６', 'abc', None]),
+        'draw_date': rng.choice([day.strftime('%Y-%m-%d')] * 4 + [day.strftime('%Y/%m/%d'),
+                                 day.strftime('%Y年%m月%d日'), '2024-02-30', 'bad', None]),
+        'prize_pool': rng.choice([rng.randint(0, 10 ** 9), -rng.randint(1, 100), None]),
+        'sales': rng.choice([f'{rng.randint(0, 10 ** 9):,}', f'{rng.random() * 1e6:.2f}', '', '1.2.3',
+                             '１２３', '9' * 25, 1e20, None]),
+        'first_prize_num': rng.randint(0, 20),
+        'first_prize_amount': rng.choice([rng.random() * 1e7, -0.0, 1e17, 1e-6, float('nan')]),
+    }
+
+
+def _extra_numbers(base):
+    """清洗关心的号码字符串写法"""
+    return ['[' + ','.join(f'{x:02d}' for x in base) + ']', ' '.join(map(str, base))]
+
+
+def _messy_frame(lottery_type, rows, seed):
+    return messy_frame(lottery_type, rows, seed, _record_fields, extra_numbers=_extra_numbers)
+
+
+class TestVectorizedCleaner(unittest.TestCase):
+    """向量化清洗测试类"""
+
+    def _assert_same(self, lottery_type, data, **kwargs):
+        expected, expected_report = DataCleaner(lottery_type, use_vectorized=False).clean_data(data.copy(), **kwargs)
+        actual, actual_report = DataCleaner(lottery_type, use_vectorized=True).clean_data(data.copy(), **kwargs)
+        pd.testing.assert_frame_equal(actual, expected)
+        self.assertEqual(actual_report, expected_report)
+
+    def test_matches_rowwise_on_messy_data(self):
+        """测试混杂格式数据的清洗结果和报告与逐行路径一致（含 dtype）"""
+        for seed in range(6):
+            for lottery_type in ('ssq', 'dlt'):
+                with self.subTest(seed=seed, lottery_type=lottery_type):
+                    data = _messy_frame(lottery_type, 200, seed)
+                    self._assert_same(lottery_type, data)
+                    self._assert_same(lottery_type, data, auto_fix=False, remove_invalid=False)
+
+    def test_matches_rowwise_on_typed_columns(self):
+        """测试 datetime64 日期列、整数/浮点号码列与逐行路径一致"""
+        data = _messy_frame('ssq', 100, 42)
+        data['draw_date'] = pd.to_datetime(data['draw_date'], format='%Y-%m-%d', errors='coerce')
+        data['blue_number'] = [i % 18 for i in range(100)]
+        data['red_numbers'] = [[1, 5, 9, 14, 22, 30 + i % 5] for i in range(100)]
+        self._assert_same('ssq', data)
+
+        data['blue_number'] = data['blue_number'].astype(float)
+        data.loc[3, 'blue_number'] = np.nan
+        self._assert_same('ssq', data)
+
+    def test_large_history(self):
+        """测试十万条记录可在数秒内完成清洗"""
+        rows = 100000
+        rng = np.random.default_rng(0)
+        red = np.sort(np.argsort(rng.random((rows, 33)), axis=1)[:, :6] + 1, axis=1)
+        dates = pd.Timestamp('1800-01-01') + pd.to_timedelta(np.arange(rows), unit='D')
+        data = pd.DataFrame({
+            'draw_num': [str(1000001 + i) for i in range(rows)],
+            'draw_date': dates.strftime('%Y-%m-%d'),
+            'red_numbers': red.tolist(),
+            'blue_number': rng.integers(1, 17, rows),
+            'prize_pool': rng.integers(0, 10 ** 9, rows),
+            'sales': rng.random(rows) * 1e8,
+            'first_prize_num': rng.integers(0, 20, rows),
+            'first_prize_amount': [f'{x:,}' for x in rng.integers(0, 10 ** 7, rows)],
+        })
+
+        start_time = time.time()
+        cleaned, report = DataCleaner('ssq', use_vectorized=True).clean_data(data)
+        execution_time = time.time() - start_time
+
+        self.assertEqual(len(cleaned), rows)
+        self.assertEqual(report['removed_records'], 0)
+        self.assertEqual(cleaned['red_numbers'].iloc[0], red[0].tolist())
+        self.assertLess(execution_time, 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+向量化数据验证测试
+"""
+
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.core.validation import DataValidator
+from tests.unit.messy_data import messy_frame
+
+
+def _record_fields(rng, i):
+    """号码以外的字段"""
+    return {'draw_num': rng.choice([str(2010001 + i), 2010001 + i, None, 'x']), 'draw_date': f'2021-01-{i % 28 + 1:02d}'}
+
+
+def _extra_numbers(base):
+    """验证关心的号码错误：重复的 1 与 1.0、超大整数、号码过多、缺失值、小数"""
+    return ['[1, 1.0]', [2 ** 70] + base[1:], [1, 1.0] + base[2:], list(range(1, 100)),
+            [None] * len(base), [1.5] + base[1:]]
+
+
+def _messy_frame(lottery_type, rows, seed):
+    return messy_frame(lottery_type, rows, seed, _record_fields, blue_values=('5', 'x', 3.5, True),
+                       extra_numbers=_extra_numbers, index=[f'r{i}' for i in range(rows)])
+
+
+class TestVectorizedValidator(unittest.TestCase):
+    """向量化验证测试类"""
+
+    def test_matches_rowwise_on_messy_data(self):
+        """测试混杂格式数据的验证报告与逐行路径一致（含并行执行）"""
+        for seed in range(6):
+            for lottery_type in ('ssq', 'dlt'):
+                with self.subTest(seed=seed, lottery_type=lottery_type):
+                    data = _messy_frame(lottery_type, 120, seed)
+                    expected = DataValidator(lottery_type, vectorized=False).validate(data)
+                    for kwargs in ({'vectorized': True}, {'vectorized': True, 'parallel': True}):
+                        self.assertEqual(DataValidator(lottery_type, **kwargs).validate(data), expected)
+
+    def test_reports_offending_rows(self):
+        """测试验证结果包含出错记录的索引"""
+        data = pd.DataFrame({
+            'draw_num': ['2023001', '2023002', '2023003', '2023004'],
+            'draw_date': ['2023-01-01', '2023-01-03', '2023-01-05', '2023-01-08'],
+            'red_numbers': [[1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 34], [1, 1, 3, 4, 5, 6]],
+            'blue_number': [1, 17, 5, 6],
+        })
+        validator = DataValidator('ssq', vectorized=True)
+        validator.validate(data)
+        rows = {result.rule_name: result.details['rows'] for result in validator.results
+                if result.details and 'rows' in result.details}
+
+        self.assertEqual(rows['ssq_red_count'], [1])
+        self.assertEqual(rows['ssq_red_range'], [2])
+        self.assertEqual(rows['ssq_red_duplicates'], [3])
+        self.assertEqual(rows['ssq_blue_range'], [1])
+
+    def test_large_history(self):
+        """测试十万条记录的号码规则可在数秒内完成"""
+        rows = 100000
+        rng = np.random.default_rng(0)
+        red = np.sort(np.argsort(rng.random((rows, 33)), axis=1)[:, :6] + 1, axis=1)
+        red[::1000, 1] = red[::1000, 0]
+        data = pd.DataFrame({'red_numbers': red.tolist(), 'blue_number': rng.integers(1, 17, rows)})
+
+        validator = DataValidator('ssq', vectorized=True)
+        start_time = time.time()
+        validator.validate(data)
+        execution_time = time.time() - start_time
+
+        duplicates = [result for result in validator.results if result.rule_name == 'ssq_red_duplicates']
+        self.assertEqual(duplicates[0].details['rows'], list(range(0, rows, 1000)))
+        self.assertLess(execution_time, 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()